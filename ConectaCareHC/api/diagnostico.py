@@ -0,0 +1,103 @@
+# api/diagnostico.py
+# Rastreio das requisições Flask (utils/rastreio.py) e endpoints de diagnóstico.
+#
+# instrumentar(app) faz de cada requisição uma operação ("GET /api/pacientes/<cpf>", pela regra da rota),
+# cronometra a serialização JSON (app.json) como trecho 'json', devolve os tempos por categoria no
+# cabeçalho Server-Timing (aba Network do navegador) e, só com CONECTACARE_DIAGNOSTICO=1 (os endpoints
+# não têm controle de acesso e expõem os tempos das operações e os perfis gravados), registra o blueprint:
+#   GET /api/diagnostico/lentas?limite=20   -> operações recentes mais lentas deste processo, com os trechos
+#   GET /api/diagnostico/perfis/<arquivo>   -> baixa um perfil gravado (.prof, .folded, .txt)
+#
+# Perfil de uma requisição: cabeçalho "X-ConectaCare-Perfil: cprofile" (ou pilhas, tracemalloc, combinados
+# com vírgula), aceito só com CONECTACARE_PERFIL_POR_CABECALHO=1; os arquivos gravados voltam no
+# cabeçalho X-ConectaCare-Perfis. Com o Gunicorn, cada worker tem as suas operações recentes.
+
+import os
+from functools import partial
+
+from flask import Blueprint, g, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+
+from ConectaCareHC.utils import rastreio
+
+CABECALHO_PERFIL = 'X-ConectaCare-Perfil'
+LIMITE_LENTAS = 200
+
+diagnostico_bp = Blueprint('diagnostico', __name__, url_prefix='/api/diagnostico')
+
+
+@diagnostico_bp.route('/lentas', methods=['GET'])
+def operacoes_lentas():
+    limite = request.args.get('limite', default=20, type=int)
+    if limite is None or not 1 <= limite <= LIMITE_LENTAS:
+        return jsonify({'erro': f"'limite' deve estar entre 1 e {LIMITE_LENTAS}."}), 400
+    return jsonify(rastreio.resumo_lentas(limite))
+
+
+@diagnostico_bp.route('/perfis/<path:arquivo>', methods=['GET'])
+def baixar_perfil(arquivo):
+    # send_from_directory recusa caminhos que saiam do diretório
+    return send_from_directory(rastreio.diretorio_perfis(), arquivo, as_attachment=True)
+
+
+# --- Instrumentação do app ---
+
+class ProvedorJSONRastreado(DefaultJSONProvider):
+    """Serialização do jsonify cronometrada como trecho 'json'."""
+
+    def dumps(self, obj, **kwargs):
+        with rastreio.trecho('json', 'serializar'):
+            return super().dumps(obj, **kwargs)
+
+
+def _nome_requisicao():
+    regra = request.url_rule.rule if request.url_rule is not None else '<sem rota>'
+    return f"{request.method} {regra}"
+
+
+def _iniciar():
+    perfil = request.headers.get(CABECALHO_PERFIL) if rastreio.PERFIL_POR_CABECALHO else None
+    try:
+        g.operacao_rastreada = rastreio.iniciar_operacao(_nome_requisicao(), perfil)
+    except ValueError as e:
+        g.operacao_rastreada = None
+        return jsonify({'erro': str(e)}), 400
+
+
+def _cabecalhos(resposta):
+    estado = g.pop('operacao_rastreada', None)
+    if estado is None:
+        return resposta
+    operacao = estado[0]
+    categorias = sorted({categoria for categoria, _ in operacao.trechos})
+    resposta.headers['Server-Timing'] = ", ".join(
+        f"{categoria};dur={operacao.tempo_em(categoria) * 1e3:.2f}" for categoria in categorias)
+    if operacao.perfis:
+        # Os nomes são definidos no início da operação; os arquivos são gravados no encerramento
+        resposta.headers['X-ConectaCare-Perfis'] = ", ".join(os.path.basename(caminho)
+                                                             for caminho in operacao.perfis.values())
+    # Encerrada quando o servidor fecha a resposta: inclui o corpo enviado em streaming (stream_with_context
+    # chama o teardown_request antes de gerar o corpo)
+    resposta.call_on_close(partial(rastreio.encerrar_operacao, estado, resposta.status_code))
+    return resposta
+
+
+def _encerrar(erro):
+    # Só sobra estado se o after_request não rodou
+    rastreio.encerrar_operacao(g.pop('operacao_rastreada', None), 'erro')
+
+
+def instrumentar(app, diagnostico=None):
+    """
+    Liga o rastreio das requisições de `app` e, se `diagnostico` (padrão: CONECTACARE_DIAGNOSTICO=1),
+    registra os endpoints de diagnóstico.
+    """
+    app.json = ProvedorJSONRastreado(app)
+    app.before_request(_iniciar)
+    app.after_request(_cabecalhos)
+    app.teardown_request(_encerrar)
+    if diagnostico is None:
+        diagnostico = os.getenv("CONECTACARE_DIAGNOSTICO") == "1"
+    if diagnostico:
+        app.register_blueprint(diagnostico_bp)
+    return app
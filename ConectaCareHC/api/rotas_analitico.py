@@ -0,0 +1,61 @@
+# api/rotas_analitico.py
+# Relatório de indicadores operacionais (crud/analitico.py), em cache:
+#   GET /api/analitico/relatorio[?secao=pacientes|agendamentos|cuidadores|metadados]
+#
+# O relatório é calculado fora do ciclo das requisições (python -m ConectaCareHC.crud.analitico, via cron).
+# Cada worker guarda o JSON já serializado de cada seção enquanto o arquivo não muda (mtime), e a resposta
+# leva ETag e Cache-Control: um navegador ou proxy revalida com If-None-Match e recebe 304 sem corpo.
+
+import os
+import threading
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from ConectaCareHC.crud import analitico
+
+SEGUNDOS_CACHE_CLIENTE = 60
+
+analitico_bp = Blueprint('analitico', __name__, url_prefix='/api/analitico')
+
+# (mtime do relatório em ns, {seção ou None: bytes}, ETag)
+_cache = (None, {}, None)
+_trava_cache = threading.Lock()
+
+
+def _serializar(dados):
+    return current_app.json.dumps(dados).encode('utf-8')
+
+
+def _secoes_serializadas():
+    """Seções serializadas do relatório atual (recarregado só se o arquivo mudou); None se ainda não existe."""
+    global _cache
+    try:
+        modificado = os.stat(analitico.caminho_relatorio()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _cache[0] != modificado:
+        with _trava_cache:
+            if _cache[0] != modificado:
+                relatorio = analitico.carregar_relatorio()
+                if relatorio is None:
+                    return None
+                serializadas = {secao: _serializar(relatorio[secao]) for secao in relatorio}
+                serializadas[None] = _serializar(relatorio)
+                _cache = (modificado, serializadas, f"{relatorio['metadados']['marca']}-{modificado}")
+    return _cache
+
+
+@analitico_bp.route('/relatorio', methods=['GET'])
+def relatorio():
+    secao = request.args.get('secao') or None
+    if secao is not None and secao not in analitico.SECOES + ('metadados',):
+        return jsonify({'erro': f"'secao' deve ser uma de: {', '.join(analitico.SECOES + ('metadados',))}."}), 400
+    cache = _secoes_serializadas()
+    if cache is None:
+        return jsonify({'erro': 'Relatório ainda não gerado. Execute python -m ConectaCareHC.crud.analitico.'}), 404
+    _, serializadas, etag = cache
+    resposta = Response(serializadas[secao], mimetype='application/json')
+    resposta.set_etag(f"{etag}-{secao or 'completo'}")
+    resposta.cache_control.private = True
+    resposta.cache_control.max_age = SEGUNDOS_CACHE_CLIENTE
+    return resposta.make_conditional(request)
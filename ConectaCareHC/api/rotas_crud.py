@@ -0,0 +1,482 @@
+# api/rotas_crud.py
+# Blueprint com as operações de crud/repositorio.py expostas como endpoints JSON.
+
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from ConectaCareHC.crud import repositorio
+from ConectaCareHC.utils.cpf import normalizar_cpf
+from ConectaCareHC.utils.validacao import resolver_ceps_do_lote, validar_dados_pessoa
+
+crud_bp = Blueprint('crud', __name__, url_prefix='/api')
+
+TAMANHO_LOTE_STREAMING = 500
+LIMITE_REGISTROS_LOTE = 5000
+
+ERRO_BANCO = ({'erro': 'Erro ao acessar o banco de dados'}, 500)
+
+
+# --- Funções Auxiliares ---
+
+def _erro(mensagem, status):
+    return jsonify({'erro': mensagem}), status
+
+
+@crud_bp.before_request
+def _normalizar_cpf_da_rota():
+    """O <cpf> das rotas chega às funções na forma canônica: /pacientes/123.456.789-09 é /pacientes/12345678909."""
+    if request.view_args and 'cpf' in request.view_args:
+        cpf = normalizar_cpf(request.view_args['cpf'])
+        if cpf is None:
+            return _erro(f"CPF inválido: {request.view_args['cpf']}", 400)
+        request.view_args['cpf'] = cpf
+
+
+def _cpfs_mal_formados(itens, campos):
+    """
+    Troca os CPFs dos `campos` de cada item (dict) pela forma canônica. Retorna os índices dos itens com
+    algum CPF mal formado (esses ficam como vieram).
+    """
+    mal_formados = []
+    for i, item in enumerate(itens):
+        normalizados = {c: normalizar_cpf(item[c]) for c in campos}
+        if None in normalizados.values():
+            mal_formados.append(i)
+        else:
+            item.update(normalizados)
+    return mal_formados
+
+
+def _ler_lote():
+    """Lê o corpo de uma requisição de lote (lista JSON). Retorna (lista, resposta de erro)."""
+    registros = request.get_json(silent=True)
+    if not isinstance(registros, list) or not registros:
+        return None, _erro("O corpo da requisição deve ser uma lista JSON não vazia.", 400)
+    if len(registros) > LIMITE_REGISTROS_LOTE:
+        return None, _erro(f"O lote deve ter no máximo {LIMITE_REGISTROS_LOTE} registros.", 413)
+    return registros, None
+
+
+def _resposta_em_streaming(itens):
+    """
+    Envia os itens como um array JSON (ou NDJSON com ?formato=ndjson) à medida que são lidos do banco,
+    sem montar a lista inteira na memória.
+    """
+    if request.args.get('formato') == 'ndjson':
+        def gerar_ndjson():
+            for item in itens:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        return Response(stream_with_context(gerar_ndjson()), mimetype='application/x-ndjson')
+
+    def gerar_array():
+        yield "["
+        for i, item in enumerate(itens):
+            yield ("," if i else "") + json.dumps(item, ensure_ascii=False)
+        yield "]"
+    return Response(stream_with_context(gerar_array()), mimetype='application/json')
+
+
+# --- Pacientes e Cuidadores ---
+
+def _cadastrar(tabela):
+    pessoa, mensagem = validar_dados_pessoa(request.get_json(silent=True))
+    if mensagem:
+        return _erro(mensagem, 400)
+
+    situacao = repositorio.inserir_pessoa(tabela, pessoa)
+    if situacao == repositorio.DUPLICADO:
+        return _erro(f"CPF {pessoa['cpf']} já cadastrado.", 409)
+    if situacao is None:
+        return ERRO_BANCO
+    return jsonify({'cpf': pessoa['cpf'], 'mensagem': 'Cadastro realizado com sucesso.'}), 201
+
+
+def _cadastrar_lote(tabela):
+    registros, resposta_erro = _ler_lote()
+    if resposta_erro:
+        return resposta_erro
+
+    # Cada CEP distinto é consultado uma vez, em paralelo, antes da validação (e não registro a registro)
+    enderecos_cep = resolver_ceps_do_lote(registros)
+
+    validos, indices_validos, erros = [], [], []
+    for i, dados in enumerate(registros):
+        pessoa, mensagem = validar_dados_pessoa(dados, enderecos_cep)
+        if mensagem:
+            erros.append({'indice': i, 'erro': mensagem})
+        else:
+            validos.append(pessoa)
+            indices_validos.append(i)
+
+    erros_banco = repositorio.inserir_pessoas_em_lote(tabela, validos)
+    if erros_banco is None:
+        return ERRO_BANCO
+
+    # Os índices do banco se referem à lista de válidos; convertemos para a posição no lote original
+    erros += [{'indice': indices_validos[e['indice']], 'erro': e['erro']} for e in erros_banco]
+    erros.sort(key=lambda e: e['indice'])
+    inseridos = len(validos) - len(erros_banco)
+    return jsonify({'inseridos': inseridos, 'erros': erros}), 201 if inseridos else 400
+
+
+def _consultar(busca, cpf, rotulo):
+    row = busca(cpf)
+    if row is None:
+        return _erro(f"{rotulo} com CPF {cpf} não encontrado(a).", 404)
+    return jsonify(repositorio.pessoa_para_dict(row))
+
+
+def _atualizar(tabela, cpf, rotulo):
+    dados = request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return _erro("O corpo da requisição deve ser um objeto JSON.", 400)
+
+    campos = {c: v for c, v in dados.items()
+              if c in repositorio.CAMPOS_PESSOA_ATUALIZAVEIS + repositorio.CAMPOS_ENDERECO_ATUALIZAVEIS}
+    if not campos:
+        return _erro("Nenhum campo atualizável informado.", 400)
+    if 'idade' in campos and (not isinstance(campos['idade'], int) or campos['idade'] < 0):
+        return _erro("O campo 'idade' deve ser um número inteiro positivo.", 400)
+
+    situacao = repositorio.atualizar_pessoa(tabela, cpf, campos)
+    if situacao == repositorio.NAO_ENCONTRADO:
+        return _erro(f"{rotulo} com CPF {cpf} não encontrado(a).", 404)
+    if situacao is None:
+        return ERRO_BANCO
+    return jsonify({'cpf': cpf, 'mensagem': 'Cadastro atualizado com sucesso.'})
+
+
+def _excluir(tabela, cpf, rotulo):
+    situacao = repositorio.excluir_pessoa(tabela, cpf)
+    if situacao == repositorio.NAO_ENCONTRADO:
+        return _erro(f"{rotulo} com CPF {cpf} não encontrado(a).", 404)
+    if situacao == repositorio.COM_DEPENDENCIAS:
+        return _erro("Não é possível excluir o registro. Existem vínculos ou agendamentos associados.", 409)
+    if situacao is None:
+        return ERRO_BANCO
+    return jsonify({'cpf': cpf, 'mensagem': 'Cadastro excluído com sucesso.'})
+
+
+def _listar(linhas):
+    if linhas is None:
+        return ERRO_BANCO
+    return _resposta_em_streaming(repositorio.pessoa_para_dict(row) for row in linhas)
+
+
+@crud_bp.route('/pacientes', methods=['POST'])
+def cadastrar_paciente():
+    return _cadastrar('PACIENTES')
+
+
+@crud_bp.route('/pacientes/lote', methods=['POST'])
+def cadastrar_pacientes_em_lote():
+    return _cadastrar_lote('PACIENTES')
+
+
+@crud_bp.route('/pacientes', methods=['GET'])
+def listar_pacientes():
+    """Lista os pacientes em streaming; aceita ?idade_minima=N (filtro) e ?formato=ndjson."""
+    idade_minima = request.args.get('idade_minima')
+    if idade_minima is not None and not idade_minima.isdigit():
+        return _erro("O parâmetro 'idade_minima' deve ser um número inteiro positivo.", 400)
+    idade_minima = int(idade_minima) if idade_minima is not None else None
+    return _listar(repositorio.iterar_pacientes(idade_minima, TAMANHO_LOTE_STREAMING))
+
+
+@crud_bp.route('/pacientes/<cpf>', methods=['GET'])
+def consultar_paciente(cpf):
+    return _consultar(repositorio.buscar_paciente_por_cpf, cpf, "Paciente")
+
+
+@crud_bp.route('/pacientes/<cpf>', methods=['PUT', 'PATCH'])
+def atualizar_paciente(cpf):
+    return _atualizar('PACIENTES', cpf, "Paciente")
+
+
+@crud_bp.route('/pacientes/<cpf>', methods=['DELETE'])
+def excluir_paciente(cpf):
+    return _excluir('PACIENTES', cpf, "Paciente")
+
+
+@crud_bp.route('/cuidadores', methods=['POST'])
+def cadastrar_cuidador():
+    return _cadastrar('CUIDADORES')
+
+
+@crud_bp.route('/cuidadores/lote', methods=['POST'])
+def cadastrar_cuidadores_em_lote():
+    return _cadastrar_lote('CUIDADORES')
+
+
+@crud_bp.route('/cuidadores', methods=['GET'])
+def listar_cuidadores():
+    return _listar(repositorio.iterar_cuidadores(TAMANHO_LOTE_STREAMING))
+
+
+@crud_bp.route('/cuidadores/<cpf>', methods=['GET'])
+def consultar_cuidador(cpf):
+    return _consultar(repositorio.buscar_cuidador_por_cpf, cpf, "Cuidador")
+
+
+@crud_bp.route('/cuidadores/<cpf>', methods=['PUT', 'PATCH'])
+def atualizar_cuidador(cpf):
+    return _atualizar('CUIDADORES', cpf, "Cuidador")
+
+
+@crud_bp.route('/cuidadores/<cpf>', methods=['DELETE'])
+def excluir_cuidador(cpf):
+    return _excluir('CUIDADORES', cpf, "Cuidador")
+
+
+# --- Vínculos e Agendamentos ---
+
+def _resposta_lote(resultado):
+    if resultado is None:
+        return ERRO_BANCO
+    inseridos, erros = resultado
+    return jsonify({'inseridos': inseridos, 'erros': erros}), 201 if inseridos or not erros else 400
+
+
+def _campos_presentes(itens, campos):
+    return all(isinstance(item, dict) and all(item.get(c) for c in campos) for item in itens)
+
+
+@crud_bp.route('/vinculos', methods=['POST'])
+def vincular():
+    dados = request.get_json(silent=True)
+    if not _campos_presentes([dados], ['cpf_paciente', 'cpf_cuidador']):
+        return _erro("Informe 'cpf_paciente' e 'cpf_cuidador'.", 400)
+    if _cpfs_mal_formados([dados], ['cpf_paciente', 'cpf_cuidador']):
+        return _erro("CPF inválido em 'cpf_paciente' ou 'cpf_cuidador'.", 400)
+
+    resultado = repositorio.vincular(dados['cpf_paciente'], dados['cpf_cuidador'])
+    if resultado is None:
+        return ERRO_BANCO
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        return _erro(f"Paciente com CPF {dados['cpf_paciente']} não encontrado(a).", 404)
+    if resultado['situacao'] == repositorio.CUIDADOR_NAO_ENCONTRADO:
+        return _erro(f"Cuidador(a) com CPF {dados['cpf_cuidador']} não encontrado(a).", 404)
+    if resultado['situacao'] == repositorio.DUPLICADO:
+        return _erro(f"Paciente {resultado['paciente']} já está vinculado(a) ao(à) cuidador(a) {resultado['cuidador']}.", 409)
+    return jsonify(resultado), 201
+
+
+@crud_bp.route('/vinculos/lote', methods=['POST'])
+def vincular_em_lote():
+    pares, resposta_erro = _ler_lote()
+    if resposta_erro:
+        return resposta_erro
+    if not _campos_presentes(pares, ['cpf_paciente', 'cpf_cuidador']):
+        return _erro("Todos os itens devem ter 'cpf_paciente' e 'cpf_cuidador'.", 400)
+    mal_formados = _cpfs_mal_formados(pares, ['cpf_paciente', 'cpf_cuidador'])
+    if mal_formados:
+        return jsonify({'erro': "CPFs inválidos; nada foi gravado.", 'indices': mal_formados}), 400
+    return _resposta_lote(repositorio.vincular_em_lote(pares))
+
+
+@crud_bp.route('/agendamentos', methods=['POST'])
+def agendar():
+    dados = request.get_json(silent=True)
+    if not _campos_presentes([dados], ['cpf_paciente', 'data_consulta']):
+        return _erro("Informe 'cpf_paciente' e 'data_consulta' (DD/MM/AAAA).", 400)
+    if not repositorio.data_valida(dados['data_consulta']):
+        return _erro(f"Data inválida: {dados['data_consulta']}. Use o formato DD/MM/AAAA.", 400)
+    if _cpfs_mal_formados([dados], ['cpf_paciente']):
+        return _erro(f"CPF inválido: {dados['cpf_paciente']}", 400)
+
+    resultado = repositorio.agendar(dados['cpf_paciente'], dados['data_consulta'])
+    if resultado is None:
+        return ERRO_BANCO
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        return _erro(f"Paciente com CPF {dados['cpf_paciente']} não encontrado(a).", 404)
+    return jsonify({'paciente': resultado['paciente'], 'data_consulta': dados['data_consulta']}), 201
+
+
+@crud_bp.route('/agendamentos/lote', methods=['POST'])
+def agendar_em_lote():
+    agendamentos, resposta_erro = _ler_lote()
+    if resposta_erro:
+        return resposta_erro
+    if not _campos_presentes(agendamentos, ['cpf_paciente', 'data_consulta']):
+        return _erro("Todos os itens devem ter 'cpf_paciente' e 'data_consulta' (DD/MM/AAAA).", 400)
+    invalidas = [i for i, a in enumerate(agendamentos) if not repositorio.data_valida(a['data_consulta'])]
+    if invalidas:
+        return jsonify({'erro': "Datas inválidas (use o formato DD/MM/AAAA); nada foi gravado.",
+                        'indices': invalidas}), 400
+    mal_formados = _cpfs_mal_formados(agendamentos, ['cpf_paciente'])
+    if mal_formados:
+        return jsonify({'erro': "CPFs inválidos; nada foi gravado.", 'indices': mal_formados}), 400
+    return _resposta_lote(repositorio.agendar_em_lote(agendamentos))
+
+
+@crud_bp.route('/pacientes/<cpf>/agendamentos', methods=['GET'])
+def listar_agendamentos(cpf):
+    """Datas das consultas do paciente (?de=DD/MM/AAAA&ate=DD/MM/AAAA, opcionais)."""
+    de, ate = request.args.get('de'), request.args.get('ate')
+    try:
+        repositorio.converter_periodo(de, ate)
+    except ValueError:
+        return _erro("Os parâmetros 'de' e 'ate' devem estar no formato DD/MM/AAAA.", 400)
+    nome_paciente = repositorio.buscar_nome_paciente(cpf)
+    if not nome_paciente:
+        return _erro(f"Paciente com CPF {cpf} não encontrado(a).", 404)
+
+    agendamentos = repositorio.buscar_agendamentos(cpf, de, ate)
+    if agendamentos is None:
+        return ERRO_BANCO
+    return jsonify({'paciente': nome_paciente, 'agendamentos': agendamentos})
+
+
+# --- Pareamento por proximidade ---
+
+def _parametro_numerico(nome, tipo, padrao=None):
+    """Lê um parâmetro numérico positivo da query string. Retorna (valor, resposta de erro)."""
+    texto = request.args.get(nome)
+    if texto is None:
+        return padrao, None
+    try:
+        valor = tipo(texto)
+    except ValueError:
+        valor = None
+    if valor is None or valor <= 0:
+        return None, _erro(f"O parâmetro '{nome}' deve ser um número positivo.", 400)
+    return valor, None
+
+
+@crud_bp.route('/pacientes/<cpf>/cuidadores-proximos', methods=['GET'])
+def cuidadores_proximos(cpf):
+    """Cuidadores com vaga mais próximos do paciente (?k=5&raio_km=...)."""
+    from ConectaCareHC.crud import pareamento
+
+    k, resposta_erro = _parametro_numerico('k', int, 5)
+    raio_km, resposta_erro_raio = _parametro_numerico('raio_km', float)
+    if resposta_erro or resposta_erro_raio:
+        return resposta_erro or resposta_erro_raio
+
+    resultado = pareamento.cuidadores_proximos(cpf, k, raio_km)
+    if resultado is None:
+        return ERRO_BANCO
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        return _erro(f"Paciente com CPF {cpf} não encontrado(a).", 404)
+    if resultado['situacao'] == pareamento.SEM_COORDENADAS:
+        return _erro(f"O CEP do paciente {cpf} não tem coordenadas na base de centroides.", 422)
+    return jsonify({'cpf_paciente': cpf, 'cuidadores': resultado['cuidadores']})
+
+
+@crud_bp.route('/vinculos/sugestoes', methods=['GET'])
+def sugerir_vinculos():
+    """
+    Sugere um cuidador próximo para cada paciente sem vínculo (?raio_km=...&capacidade=5).
+    Nada é gravado: as sugestões aceitas são enviadas para POST /api/vinculos/lote.
+    """
+    from ConectaCareHC.crud import pareamento
+
+    raio_km, resposta_erro = _parametro_numerico('raio_km', float)
+    capacidade, resposta_erro_capacidade = _parametro_numerico('capacidade', int, pareamento.CAPACIDADE_CUIDADOR)
+    if resposta_erro or resposta_erro_capacidade:
+        return resposta_erro or resposta_erro_capacidade
+
+    resultado = pareamento.sugerir_vinculos(raio_km, capacidade)
+    if resultado is None:
+        return ERRO_BANCO
+    return jsonify(resultado)
+
+
+# --- Roteirização das visitas do dia ---
+
+def _parametros_rota():
+    """Lê ?data=DD/MM/AAAA (obrigatória) e ?retornar=0|1. Retorna (data, retornar, resposta de erro)."""
+    from ConectaCareHC.crud import roteirizacao
+
+    data = request.args.get('data')
+    if not roteirizacao.data_valida(data):
+        return None, None, _erro("Informe o parâmetro 'data' no formato DD/MM/AAAA.", 400)
+    return data, request.args.get('retornar', '1') != '0', None
+
+
+@crud_bp.route('/cuidadores/<cpf>/rota', methods=['GET'])
+def rota_do_cuidador(cpf):
+    """Ordem das visitas do dia do cuidador (?data=DD/MM/AAAA&retornar=1), partindo do seu endereço."""
+    from ConectaCareHC.crud import roteirizacao
+
+    data, retornar, resposta_erro = _parametros_rota()
+    if resposta_erro:
+        return resposta_erro
+    rota = roteirizacao.rota_do_cuidador(cpf, data, retornar)
+    if rota is None:
+        return ERRO_BANCO
+    return jsonify({'data': data, **rota})
+
+
+@crud_bp.route('/rotas', methods=['GET'])
+def rotas_do_dia():
+    """Rotas do dia de todos os cuidadores com visitas (?data=DD/MM/AAAA&retornar=1)."""
+    from ConectaCareHC.crud import roteirizacao
+
+    data, retornar, resposta_erro = _parametros_rota()
+    if resposta_erro:
+        return resposta_erro
+    rotas = roteirizacao.otimizar_rotas(data, retornar=retornar)
+    if rotas is None:
+        return ERRO_BANCO
+    return jsonify({'data': data, 'rotas': rotas})
+
+
+# --- Visão 360 do paciente ---
+
+def _a_partir_de():
+    """Lê ?a_partir_de=DD/MM/AAAA (opcional). Retorna (data ou None, resposta de erro)."""
+    data = request.args.get('a_partir_de')
+    if data is not None and not repositorio.data_valida(data):
+        return None, _erro(f"Data inválida em 'a_partir_de': {data}. Use o formato DD/MM/AAAA.", 400)
+    return data, None
+
+
+@crud_bp.route('/pacientes/<cpf>/visao', methods=['GET'])
+def visao_paciente(cpf):
+    """Paciente, endereço, cuidadores e próximos agendamentos (?a_partir_de=DD/MM/AAAA) numa consulta."""
+    a_partir_de, resposta_erro = _a_partir_de()
+    if resposta_erro:
+        return resposta_erro
+    visao = repositorio.buscar_visao_paciente(cpf, a_partir_de)
+    if visao is None:
+        return ERRO_BANCO
+    if not visao:
+        return _erro(f"Paciente com CPF {cpf} não encontrado(a).", 404)
+    return jsonify(visao)
+
+
+@crud_bp.route('/pacientes/visao', methods=['POST'])
+def visoes_pacientes():
+    """Versão em lote: o corpo é uma lista de CPFs."""
+    cpfs, resposta_erro = _ler_lote()
+    if resposta_erro:
+        return resposta_erro
+    if not all(isinstance(cpf, str) for cpf in cpfs):
+        return _erro("O corpo deve ser uma lista de CPFs (texto).", 400)
+    normalizados = [normalizar_cpf(cpf) for cpf in cpfs]
+    mal_formados = [i for i, cpf in enumerate(normalizados) if cpf is None]
+    if mal_formados:
+        return jsonify({'erro': "CPFs inválidos.", 'indices': mal_formados}), 400
+    cpfs = normalizados
+    a_partir_de, resposta_erro = _a_partir_de()
+    if resposta_erro:
+        return resposta_erro
+
+    visoes = repositorio.buscar_visoes_pacientes(cpfs, a_partir_de)
+    if visoes is None:
+        return ERRO_BANCO
+    return jsonify({'pacientes': list(visoes.values()),
+                    'nao_encontrados': [cpf for cpf in dict.fromkeys(cpfs) if cpf not in visoes]})
+
+
+# --- Exportação ---
+
+@crud_bp.route('/exportacao', methods=['GET'])
+def exportar():
+    """Mesmo conteúdo do arquivo gerado pelo menu de exportação, em streaming."""
+    itens = repositorio.iterar_dados_exportacao(TAMANHO_LOTE_STREAMING)
+    if itens is None:
+        return ERRO_BANCO
+    return _resposta_em_streaming(itens)
@@ -1,16 +1,56 @@
+import sys
+
+sys.path.append('.')
+
 from flask import Flask, request, jsonify
-import joblib
+
+from ConectaCareHC.api.diagnostico import instrumentar
+from ConectaCareHC.crud.modelo import ModeloEmUso, colunas_de_registros
+from ConectaCareHC.utils.rastreio import trecho
 
 app = Flask(__name__) # Garanta que 'app' está definido globalmente
+# Tempo de cada requisição por trecho (inferência, JSON) e, com CONECTACARE_DIAGNOSTICO=1,
+# /api/diagnostico/lentas
+instrumentar(app)
+
+# Versão ativa do registro de modelos (crud/modelo.py), recarregada sem reiniciar o worker quando
+# `python -m ConectaCareHC.crud.treinamento` (ou `main.py modelo ativar`) troca a versão
+modelo_em_uso = ModeloEmUso()
+# Carregada na importação, isto é, na subida de cada worker do Gunicorn (ou no master, com --preload),
+# antes da primeira requisição
+modelo_em_uso.carregar_ativo()
+
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    """
+    Probabilidade de consulta nos próximos DIAS_JANELA dias. Corpo: {"pacientes": [{"idade", "uf",
+    "cidade", "cuidadores", "consultas_anteriores", "dias_desde_ultima"}, ...]} ou um único objeto.
+    """
     try:
-        return jsonify({"message": "Endpoint de previsão acessado com sucesso! (Lógica interna a ser implementada)"})
+        # A mesma versão do começo ao fim da requisição, mesmo que outra seja ativada no meio
+        modelo = modelo_em_uso.obter()
+        if modelo is None:
+            return jsonify({'error': "Nenhum modelo ativo (python -m ConectaCareHC.crud.treinamento)."}), 503
+        dados = request.get_json(force=True)
+        registros = dados.get('pacientes', [dados]) if isinstance(dados, dict) else dados
+        colunas = colunas_de_registros(registros)
+        with trecho('modelo', 'inferencia'):
+            probabilidades = modelo.prever(colunas)
+        return jsonify({'versao': modelo.versao, 'probabilidades': [round(p, 4) for p in probabilidades]})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 
+@app.route('/modelo', methods=['GET'])
+def modelo_ativo():
+    """Metadados da versão em uso neste worker."""
+    modelo = modelo_em_uso.obter()
+    if modelo is None:
+        return jsonify({'error': "Nenhum modelo ativo."}), 503
+    return jsonify(modelo.metadados)
+
+
 if __name__ == '__main__':
 
     print("API configurada para ser iniciada via Gunicorn.")
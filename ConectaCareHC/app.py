@@ -1,11 +1,39 @@
 # app.py
+import sys
+import threading
+
+sys.path.append('.')
+
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import requests
 
+from ConectaCareHC.api.diagnostico import instrumentar
+from ConectaCareHC.api.rotas_analitico import analitico_bp
+from ConectaCareHC.api.rotas_crud import crud_bp
+from ConectaCareHC.utils.api_cep import URL_VIACEP
+from ConectaCareHC.utils.rastreio import trecho
+
 app = Flask(__name__)
 # Configura CORS para permitir todas as origens (ou especifique seu frontend)
 CORS(app)
+# Endpoints JSON do CRUD (pacientes, cuidadores, vínculos, agendamentos e exportação)
+app.register_blueprint(crud_bp)
+# Relatório de indicadores operacionais (gerado por crud/analitico.py), em cache
+app.register_blueprint(analitico_bp)
+# Tempo de cada requisição por trecho (banco, ViaCEP, JSON) e, com CONECTACARE_DIAGNOSTICO=1,
+# /api/diagnostico/lentas
+instrumentar(app)
+
+# Uma sessão do requests por thread (ou greenlet, no perfil gevent): a conexão com o ViaCEP é
+# reaproveitada entre requisições em vez de aberta (com TLS) a cada consulta
+_local = threading.local()
+
+
+def _sessao_viacep():
+    if not hasattr(_local, 'sessao'):
+        _local.sessao = requests.Session()
+    return _local.sessao
 
 @app.route('/api/cep/<cep>', methods=['GET'])
 def consultar_cep(cep):
@@ -18,8 +46,9 @@ def consultar_cep(cep):
             return jsonify({'erro': 'CEP inválido'}), 400
         
         # Consulta o ViaCEP
-        url = f'https://viacep.com.br/ws/{cep_limpo}/json/'
-        response = requests.get(url, timeout=10)
+        url = f'{URL_VIACEP}/{cep_limpo}/json/'
+        with trecho('http', 'viacep'):
+            response = _sessao_viacep().get(url, timeout=10)
         
         if response.status_code == 200:
             dados = response.json()
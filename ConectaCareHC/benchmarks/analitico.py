@@ -0,0 +1,106 @@
+# benchmarks/analitico.py
+# Indicadores operacionais (crud/analitico.py) no substituto local, com 1 milhão de pacientes sintéticos:
+# tempo da atualização completa (leitura de todas as tabelas em blocos) contra a incremental (só as
+# chaves registradas em ALTERACOES) depois de lotes de alterações de 0,1% e 1% das linhas -- idades,
+# endereços (cidade/UF), agendamentos incluídos e excluídos e vínculos desfeitos. Cada incremental é
+# conferida com uma atualização completa feita logo em seguida, que também entra na tabela.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.analitico --pacientes 1000000 --fracoes 0.001 0.01
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import CIDADES, carregar_em_massa, criar_banco_temporario, remover_banco
+from ConectaCareHC.crud import analitico
+
+
+def aplicar_alteracoes(caminho, cpfs, fracao, rng):
+    """Altera `fracao` das linhas de cada tipo. Retorna a quantidade de linhas alteradas."""
+    quantidade = max(int(len(cpfs) * fracao), 1)
+    conexao = sqlite3.connect(caminho)
+    try:
+        amostra = rng.sample(cpfs, quantidade)
+        conexao.executemany("UPDATE PACIENTES SET IDADE = ? WHERE CPF = ?",
+                            [(rng.randint(0, 105), cpf) for cpf in amostra])
+        conexao.executemany(
+            "UPDATE ENDERECOS SET CIDADE = ?, UF = ? WHERE ID_ENDERECO = (SELECT ID_ENDERECO FROM PACIENTES WHERE CPF = ?)",
+            [rng.choice(CIDADES)[:2] + (cpf,) for cpf in amostra[:quantidade // 10]])
+        conexao.executemany("INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) VALUES (?, ?)",
+                            [(rng.choice(cpfs), f"2027-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+                             for _ in range(quantidade)])
+        maior = conexao.execute("SELECT MAX(ID_AGENDAMENTO) FROM AGENDAMENTOS").fetchone()[0]
+        conexao.executemany("DELETE FROM AGENDAMENTOS WHERE ID_AGENDAMENTO = ?",
+                            [(rng.randint(1, maior),) for _ in range(quantidade)])
+        conexao.executemany("DELETE FROM VINCULOS_PACIENTE_CUIDADOR WHERE CPF_PACIENTE = ?",
+                            [(cpf,) for cpf in rng.sample(cpfs, quantidade // 10)])
+        conexao.commit()
+    finally:
+        conexao.close()
+    return quantidade * 3 + (quantidade // 10) * 2
+
+
+def _atualizar(completa):
+    inicio = time.perf_counter()
+    relatorio = analitico.atualizar(completa)
+    if relatorio is None:
+        raise RuntimeError("Falha na atualização dos indicadores.")
+    return relatorio, time.perf_counter() - inicio
+
+
+def _iguais(a, b):
+    return all(a[secao] == b[secao] for secao in analitico.SECOES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atualização completa x incremental dos indicadores.")
+    parser.add_argument("--pacientes", type=int, default=1_000_000)
+    parser.add_argument("--cuidadores", type=int, default=20_000)
+    parser.add_argument("--agendamentos-por-paciente", type=int, default=2, dest="agendamentos_por_paciente")
+    parser.add_argument("--fracoes", type=float, nargs="+", default=[0.001, 0.01])
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="analitico-")
+    os.environ['CONECTACARE_ANALITICO'] = diretorio
+    os.environ['CONECTACARE_ARQUIVO_AGENDAMENTOS'] = os.path.join(diretorio, "arquivo")
+    rng = random.Random(11)
+    try:
+        inicio = time.perf_counter()
+        cpfs, _ = carregar_em_massa(caminho, args.pacientes, args.cuidadores, args.agendamentos_por_paciente)
+        print(f"Carga: {args.pacientes} pacientes, {args.cuidadores} cuidadores, "
+              f"{args.pacientes * args.agendamentos_por_paciente} agendamentos em {time.perf_counter() - inicio:.1f} s")
+
+        _, duracao = _atualizar(True)
+        print(f"Primeira atualização (completa, inclui limpar o registro da carga): {duracao:.2f} s\n")
+
+        print(f"{'alteração':>10} {'linhas':>8} {'chaves':>8} {'incremental (s)':>16} {'completa (s)':>13} "
+              f"{'ganho':>7} {'confere':>8}")
+        for fracao in args.fracoes:
+            linhas = aplicar_alteracoes(caminho, cpfs, fracao, rng)
+            incremental, tempo_incremental = _atualizar(False)
+            completo, tempo_completo = _atualizar(True)
+            metadados = incremental['metadados']
+            if metadados['modo'] != 'incremental':
+                print(f"{fracao:>10.2%}: alterações demais, a atualização foi completa")
+                continue
+            print(f"{fracao:>10.2%} {linhas:>8} {metadados['chaves_alteradas']:>8} {tempo_incremental:>16.3f} "
+                  f"{tempo_completo:>13.2f} {tempo_completo / tempo_incremental:>6.0f}x "
+                  f"{'sim' if _iguais(incremental, completo) else 'NÃO':>8}")
+
+        _, duracao = _atualizar(False)
+        print(f"\nSem alterações (só a margem de reprocessamento): {duracao:.3f} s")
+        tamanho = os.path.getsize(os.path.join(diretorio, "estado.npz")) / 1e6
+        print(f"Estado gravado: {tamanho:.1f} MB")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
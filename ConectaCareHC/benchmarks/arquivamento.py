@@ -0,0 +1,162 @@
+# benchmarks/arquivamento.py
+# Arquivamento dos agendamentos antigos (crud/arquivamento.py) no substituto local: para históricos de
+# 1 a 10 anos, mede as consultas "quentes" com todo o histórico no banco e depois do arquivamento
+#   - próximas consultas de um paciente (buscar_agendamentos a partir de hoje);
+#   - agenda do mês atual de todos os pacientes (iterar_agendamentos);
+# e também o histórico completo de um paciente, que depois do arquivamento passa pelos arquivos (com os
+# meses já em cache; a primeira leitura, que carrega todos, aparece à parte). Mostra ainda o tempo do job
+# (incluindo o VACUUM) e o tamanho do banco e dos arquivos.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.arquivamento --anos 1 3 6 10 --por-mes 20000
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import arquivamento, repositorio
+from ConectaCareHC.crud.db_conexao import sessao_bd
+
+MESES_FUTUROS = 6
+
+
+def _mes(hoje, deslocamento):
+    indice = hoje.year * 12 + hoje.month - 1 + deslocamento
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def gerar_historico(caminho, cpfs, anos, por_mes, hoje, rng):
+    """`por_mes` agendamentos em cada mês, de `anos` atrás até MESES_FUTUROS à frente. Retorna o total."""
+    conexao = sqlite3.connect(caminho)
+    total = 0
+    try:
+        for deslocamento in range(-12 * anos, MESES_FUTUROS):
+            inicio = _mes(hoje, deslocamento)
+            dias = (_mes(hoje, deslocamento + 1) - inicio).days
+            conexao.executemany(
+                "INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) VALUES (?, ?)",
+                [(rng.choice(cpfs), (inicio + timedelta(days=rng.randrange(dias))).isoformat()) for _ in range(por_mes)])
+            total += por_mes
+        conexao.commit()
+    finally:
+        conexao.close()
+    return total
+
+
+def _latencias_ms(funcao, argumentos):
+    duracoes = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcao(argumento)
+        duracoes.append((time.perf_counter() - inicio) * 1e3)
+    duracoes.sort()
+    return statistics.median(duracoes), duracoes[int(len(duracoes) * 0.95)]
+
+
+def medir_consultas(amostra, hoje):
+    de_hoje = hoje.strftime("%d/%m/%Y")
+    inicio_mes, fim_mes = _mes(hoje, 0), _mes(hoje, 1) - timedelta(days=1)
+    gc.collect()
+    with sessao_bd():
+        for cpf in amostra[:50]:  # Aquece o cache de instruções e as páginas do banco
+            repositorio.buscar_agendamentos(cpf, de_hoje)
+        proximas = _latencias_ms(lambda cpf: repositorio.buscar_agendamentos(cpf, de_hoje), amostra)
+        agenda_mes = _latencias_ms(
+            lambda _: sum(1 for _ in repositorio.iterar_agendamentos(inicio_mes.strftime("%d/%m/%Y"),
+                                                                      fim_mes.strftime("%d/%m/%Y"))), range(10))
+        historico = _latencias_ms(repositorio.buscar_agendamentos, amostra[:max(len(amostra) // 10, 1)])
+    return proximas, agenda_mes, historico
+
+
+def _tamanho_banco_mb(caminho):
+    conexao = sqlite3.connect(caminho)
+    try:
+        conexao.execute("VACUUM")
+    finally:
+        conexao.close()
+    return os.path.getsize(caminho) / 2 ** 20
+
+
+def _tamanho_diretorio_mb(diretorio):
+    return sum(os.path.getsize(os.path.join(diretorio, nome)) for nome in os.listdir(diretorio)) / 2 ** 20
+
+
+def medir(anos, pacientes, por_mes, consultas, meses_quentes):
+    rng = random.Random(anos)
+    hoje = date.today()
+    diretorio = tempfile.mkdtemp(prefix="bench_arquivo_")
+    os.environ["CONECTACARE_ARQUIVO_AGENDAMENTOS"] = diretorio
+    caminho = criar_banco_temporario()
+    try:
+        cpfs, _ = popular_banco(caminho, pacientes)
+        total = gerar_historico(caminho, cpfs, anos, por_mes, hoje, rng)
+        amostra = rng.sample(cpfs, min(consultas, len(cpfs)))
+        referencia = {cpf: repositorio.buscar_agendamentos(cpf) for cpf in amostra[:200]}
+
+        antes = medir_consultas(amostra, hoje)
+        banco_antes = _tamanho_banco_mb(caminho)
+
+        inicio = time.perf_counter()
+        resultado = arquivamento.arquivar_agendamentos(meses_quentes)
+        duracao = time.perf_counter() - inicio
+        if resultado is None:
+            raise RuntimeError("O arquivamento falhou.")
+        if {cpf: repositorio.buscar_agendamentos(cpf) for cpf in referencia} != referencia:
+            raise RuntimeError("O histórico dos pacientes mudou depois do arquivamento.")
+
+        arquivamento._cache_meses.clear()
+        inicio = time.perf_counter()
+        repositorio.buscar_agendamentos(amostra[-1])
+        primeira_leitura = time.perf_counter() - inicio
+        depois = medir_consultas(amostra, hoje)
+        return {
+            'anos': anos, 'total': total, 'arquivados': resultado['agendamentos'], 'job_s': duracao,
+            'antes': antes, 'depois': depois, 'primeira_leitura': primeira_leitura, 'banco_antes': banco_antes,
+            'banco_depois': _tamanho_banco_mb(caminho), 'arquivo': _tamanho_diretorio_mb(diretorio),
+        }
+    finally:
+        os.environ.pop("CONECTACARE_ARQUIVO_AGENDAMENTOS", None)
+        arquivamento._cache_meses.clear()
+        remover_banco(caminho)
+        shutil.rmtree(diretorio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência das consultas quentes com e sem o histórico no banco.")
+    parser.add_argument("--anos", type=int, nargs="+", default=[1, 3, 6, 10])
+    parser.add_argument("--pacientes", type=int, default=20_000)
+    parser.add_argument("--por-mes", type=int, default=20_000, help="Agendamentos por mês.")
+    parser.add_argument("--consultas", type=int, default=2_000)
+    parser.add_argument("--meses-quentes", type=int, default=arquivamento.MESES_QUENTES)
+    args = parser.parse_args()
+
+    resultados = [medir(anos, args.pacientes, args.por_mes, args.consultas, args.meses_quentes) for anos in args.anos]
+
+    print(f"\n{args.pacientes:,} pacientes, {args.por_mes:,} agendamentos/mês, {args.meses_quentes} meses quentes "
+          f"+ {MESES_FUTUROS} futuros; latências p50/p95 em ms (sem arquivo -> com arquivo)")
+    print(f"{'anos':>4} {'agendamentos':>13} {'próximas do paciente':>26} {'agenda do mês':>24} "
+          f"{'histórico do paciente':>26}")
+    for r in resultados:
+        colunas = []
+        for indice in range(3):
+            (p50_a, p95_a), (p50_d, p95_d) = r['antes'][indice], r['depois'][indice]
+            colunas.append(f"{p50_a:.2f}/{p95_a:.2f} -> {p50_d:.2f}/{p95_d:.2f}")
+        print(f"{r['anos']:>4} {r['total']:>13,} {colunas[0]:>26} {colunas[1]:>24} {colunas[2]:>26}")
+
+    print(f"\n{'anos':>4} {'arquivados':>11} {'job':>8} {'linhas/s':>10} {'banco antes':>12} {'banco depois':>13} "
+          f"{'arquivos':>9} (MB) {'1ª leitura do arquivo':>22}")
+    for r in resultados:
+        print(f"{r['anos']:>4} {r['arquivados']:>11,} {r['job_s']:>7.1f}s {r['arquivados'] / r['job_s']:>10,.0f} "
+              f"{r['banco_antes']:>12.1f} {r['banco_depois']:>13.1f} {r['arquivo']:>9.1f}      {r['primeira_leitura'] * 1e3:>18.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
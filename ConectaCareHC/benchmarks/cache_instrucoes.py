@@ -0,0 +1,87 @@
+# benchmarks/cache_instrucoes.py
+# Mede o ganho das instruções registradas (crud/registro_sql.py) no substituto local:
+#   (a) parse: consultas por CPF repetidas numa sessão, sem cache de instruções (stmtcachesize=0,
+#       cada execução reanalisa o SQL) e com TAMANHO_CACHE_INSTRUCOES;
+#   (b) fetch: listagem completa de pacientes com o arraysize/prefetchrows padrão do driver (100/2)
+#       e com o LEITURA_EM_MASSA da consulta registrada, contando as idas e voltas com latência simulada.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.cache_instrucoes --pacientes 20000 --consultas 20000 --latencia-ms 1
+
+import argparse
+import random
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import db_local
+from ConectaCareHC.crud import registro_sql as reg
+
+
+def medir_parse(caminho, cpfs, stmtcachesize):
+    """Executa PACIENTE_POR_CPF para cada CPF numa única conexão e retorna o tempo em segundos."""
+    conexao = db_local.conectar_bd_local(caminho, stmtcachesize=stmtcachesize)
+    try:
+        inicio = time.perf_counter()
+        with conexao.cursor() as cursor:
+            for cpf in cpfs:
+                if reg.PACIENTE_POR_CPF.executar(cursor, {'cpf': cpf}).fetchone() is None:
+                    raise RuntimeError(f"Paciente {cpf} não encontrado")
+        return time.perf_counter() - inicio
+    finally:
+        conexao.close()
+
+
+def medir_listagem(caminho, arraysize, prefetchrows):
+    """Lê a listagem completa de pacientes e retorna (segundos, idas e voltas, linhas)."""
+    conexao = db_local.conectar_bd_local(caminho)
+    try:
+        db_local.zerar_estatisticas()
+        inicio = time.perf_counter()
+        with conexao.cursor() as cursor:
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = prefetchrows
+            cursor.execute(reg.PACIENTES.sql)
+            linhas = len(cursor.fetchall())
+        return time.perf_counter() - inicio, db_local.ESTATISTICAS['viagens'], linhas
+    finally:
+        conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de instruções e arraysize/prefetchrows por consulta.")
+    parser.add_argument("--pacientes", type=int, default=20000)
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--latencia-ms", type=float, default=1.0, help="Latência simulada por ida e volta (listagem).")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    try:
+        cpfs, _ = popular_banco(caminho, args.pacientes)
+        rng = random.Random(7)
+        amostra = [rng.choice(cpfs) for _ in range(args.consultas)]
+
+        print(f"(a) {args.consultas} consultas por CPF numa sessão")
+        print(f"{'stmtcachesize':<16} {'tempo (s)':>10} {'consultas/s':>12}")
+        tempos = {}
+        for tamanho in (0, reg.TAMANHO_CACHE_INSTRUCOES):
+            tempos[tamanho] = medir_parse(caminho, amostra, tamanho)
+            print(f"{tamanho:<16} {tempos[tamanho]:>10.2f} {args.consultas / tempos[tamanho]:>12.0f}")
+        print(f"Ganho do cache: {tempos[0] / tempos[reg.TAMANHO_CACHE_INSTRUCOES]:.2f}x\n")
+
+        db_local.LATENCIA_REDE_S = args.latencia_ms / 1000
+        print(f"(b) listagem de {args.pacientes} pacientes, latência simulada de {args.latencia_ms} ms")
+        print(f"{'configuração':<28} {'tempo (s)':>10} {'idas e voltas':>14}")
+        configuracoes = (("padrão do driver (100/2)", 100, 2),
+                         ("LEITURA_EM_MASSA", reg.LEITURA_EM_MASSA['arraysize'], reg.LEITURA_EM_MASSA['prefetchrows']))
+        for nome, arraysize, prefetchrows in configuracoes:
+            duracao, viagens, linhas = medir_listagem(caminho, arraysize, prefetchrows)
+            if linhas != args.pacientes:
+                raise RuntimeError(f"Listagem devolveu {linhas} linhas")
+            print(f"{nome:<28} {duracao:>10.2f} {viagens:>14}")
+    finally:
+        db_local.LATENCIA_REDE_S = 0.0
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/carga_api.py
+# Teste de carga dos endpoints JSON do CRUD (api/rotas_crud.py) contra o substituto local (SQLite).
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.carga_api --pacientes 5000 --requisicoes 2000 --concorrencia 8
+#   python -m ConectaCareHC.benchmarks.carga_api --mix consulta=60,listagem=5,cadastro=20,lote=10,agendamento=5
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, gerar_pessoa, popular_banco, remover_banco
+
+MIX_PADRAO = "consulta=60,listagem=5,cadastro=20,lote=10,agendamento=5"
+TAMANHO_LOTE = 100
+
+
+def percentil(valores, p):
+    """Percentil `p` (0 a 100) das latências; 0.0 sem valores. Também usado por carga_gunicorn.py."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def ler_mix(texto):
+    """"consulta=60,listagem=5" -> {'consulta': 60, 'listagem': 5} (pesos das operações da carga)."""
+    mix = {}
+    for parte in texto.split(","):
+        nome, peso = parte.split("=")
+        mix[nome.strip()] = int(peso)
+    return mix
+
+
+class GeradorCarga:
+    """Executa uma mistura de operações no app Flask (test client) e coleta latências por operação."""
+
+    def __init__(self, app, cpfs, semente=7):
+        self.app = app
+        self.cpfs = cpfs
+        self.rng = random.Random(semente)
+        self.trava = threading.Lock()
+        self.proximo_indice = 1_000_000
+        self.latencias = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.registros_gravados = defaultdict(int)
+        self.local = threading.local()
+
+    def _cliente(self):
+        if not hasattr(self.local, 'cliente'):
+            self.local.cliente = self.app.test_client()
+        return self.local.cliente
+
+    def _novos_registros(self, quantidade):
+        with self.trava:
+            inicio = self.proximo_indice
+            self.proximo_indice += quantidade
+        rng = random.Random(inicio)
+        return [gerar_pessoa(i, rng, 30_000_000_000) for i in range(inicio, inicio + quantidade)]
+
+    def executar(self, operacao):
+        cliente = self._cliente()
+        cpf = self.rng.choice(self.cpfs)
+        inicio = time.perf_counter()
+
+        if operacao == 'consulta':
+            resposta = cliente.get(f"/api/pacientes/{cpf}")
+            gravados = 0
+        elif operacao == 'listagem':
+            resposta = cliente.get("/api/pacientes?idade_minima=90")
+            resposta.get_data()  # consome o streaming inteiro
+            gravados = 0
+        elif operacao == 'cadastro':
+            resposta = cliente.post("/api/pacientes", json=self._novos_registros(1)[0])
+            gravados = 1
+        elif operacao == 'lote':
+            resposta = cliente.post("/api/pacientes/lote", json=self._novos_registros(TAMANHO_LOTE))
+            gravados = TAMANHO_LOTE
+        elif operacao == 'agendamento':
+            resposta = cliente.post("/api/agendamentos", json={'cpf_paciente': cpf, 'data_consulta': "15/03/2027"})
+            gravados = 1
+        else:
+            raise ValueError(f"Operação desconhecida: {operacao}")
+
+        duracao = time.perf_counter() - inicio
+        with self.trava:
+            self.latencias[operacao].append(duracao)
+            if resposta.status_code >= 400:
+                self.erros[operacao] += 1
+            else:
+                self.registros_gravados[operacao] += gravados
+
+
+def executar_carga(n_pacientes, requisicoes, concorrencia, mix):
+    caminho = criar_banco_temporario()
+    try:
+        print(f"Populando o banco local com {n_pacientes} pacientes...")
+        cpfs, _ = popular_banco(caminho, n_pacientes)
+
+        # Importado depois de apontar o DB para o substituto local
+        from ConectaCareHC.app import app
+
+        gerador = GeradorCarga(app, cpfs)
+        operacoes, pesos = zip(*mix.items())
+        sorteio = random.Random(11)
+        fila = sorteio.choices(operacoes, weights=pesos, k=requisicoes)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            list(executor.map(gerador.executar, fila))
+        duracao_total = time.perf_counter() - inicio
+
+        print(f"\n{requisicoes} requisições, concorrência {concorrencia}: "
+              f"{requisicoes / duracao_total:.1f} req/s em {duracao_total:.2f}s")
+        print(f"{'operação':<12} {'n':>6} {'p50 (ms)':>10} {'p99 (ms)':>10} {'média (ms)':>11} {'erros':>6} {'reg/s':>9}")
+        for operacao in operacoes:
+            valores = gerador.latencias[operacao]
+            if not valores:
+                continue
+            registros_por_s = gerador.registros_gravados[operacao] / sum(valores) if sum(valores) else 0
+            print(f"{operacao:<12} {len(valores):>6} {percentil(valores, 50) * 1000:>10.2f} "
+                  f"{percentil(valores, 99) * 1000:>10.2f} {statistics.mean(valores) * 1000:>11.2f} "
+                  f"{gerador.erros[operacao]:>6} {registros_por_s:>9.0f}")
+        return gerador
+    finally:
+        remover_banco(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de CRUD contra o substituto local.")
+    parser.add_argument("--pacientes", type=int, default=2000, help="Pacientes pré-carregados no banco.")
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--mix", default=MIX_PADRAO, help="Pesos por operação: consulta, listagem, cadastro, lote, agendamento.")
+    args = parser.parse_args()
+    executar_carga(args.pacientes, args.requisicoes, args.concorrencia, ler_mix(args.mix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# benchmarks/carga_gunicorn.py
+# Teste de carga HTTP de /api/cep/<cep> (app.py) e /predict (api_predicao.py) sob o Gunicorn, para
+# comparar e dimensionar os perfis de implantacao/ (sync, threads, gevent).
+#
+# Para cada perfil sobe os dois apps no Gunicorn ("threads+sync": app.py no perfil threads e
+# api_predicao.py no sync, a combinação recomendada; um nome só vale para os dois) contra substitutos
+# locais: o ViaCEP local (utils/viacep_local.py, com a latência de --latencia-viacep-ms) e um modelo
+# treinado com pacientes sintéticos num registro temporário. Para cada nível de --concorrencia, N clientes
+# (threads, conexões persistentes) disparam a mistura de requisições de --mix durante --duracao segundos;
+# sai a vazão, o p50/p99 e a taxa de erros (exceção ou status diferente do esperado) por operação.
+# Antes das medidas há --aquecimento segundos de carga descartada (o primeiro /predict de cada worker
+# carrega o sklearn e o modelo). Com --url-cep/--url-predicao a carga vai para servidores já em execução
+# e nada é iniciado.
+#
+# Operações do --mix: cep (200), cep_inexistente (404), predict (1 paciente), predict_lote
+# (TAMANHO_LOTE pacientes). Cliente e servidores dividem as CPUs da máquina: compare os perfis entre si.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.carga_gunicorn --perfis threads+sync gevent+sync --concorrencia 1 8 32
+#   python -m ConectaCareHC.benchmarks.carga_gunicorn --perfis threads --workers 2 --threads 16 --mix cep=100
+#   python -m ConectaCareHC.benchmarks.carga_gunicorn --url-cep http://10.0.0.5:8000 --mix cep=100
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from ConectaCareHC.benchmarks.carga_api import ler_mix, percentil
+from ConectaCareHC.benchmarks.dados_sinteticos import CIDADES, carregar_em_massa, criar_banco_temporario, remover_banco
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PERFIS = ('sync', 'threads', 'gevent')
+PERFIS_PADRAO = ['sync', 'threads', 'gevent', 'threads+sync']
+MIX_PADRAO = "cep=50,cep_inexistente=5,predict=35,predict_lote=10"
+TAMANHO_LOTE = 50
+APPS = {'cep': "ConectaCareHC.app:app", 'predicao': "ConectaCareHC.api_predicao:app"}
+# App que atende cada operação
+OPERACOES = {'cep': 'cep', 'cep_inexistente': 'cep', 'predict': 'predicao', 'predict_lote': 'predicao'}
+
+
+# --- Operações ---
+
+def _paciente(rng):
+    cidade, uf, _ = rng.choice(CIDADES)
+    return {'idade': rng.randint(18, 99), 'uf': uf, 'cidade': cidade, 'cuidadores': rng.randint(0, 3),
+            'consultas_anteriores': rng.randint(0, 12), 'dias_desde_ultima': rng.randint(0, 720)}
+
+
+def _requisicao(operacao, rng):
+    """(app alvo, método, caminho, corpo, status esperado)."""
+    if operacao == 'cep':
+        _, _, prefixo = rng.choice(CIDADES)
+        return 'cep', "GET", f"/api/cep/{prefixo}{rng.randrange(10 ** (8 - len(prefixo))):0{8 - len(prefixo)}d}", None, 200
+    if operacao == 'cep_inexistente':
+        return 'cep', "GET", f"/api/cep/000{rng.randrange(10 ** 5):05d}", None, 404
+    if operacao in ('predict', 'predict_lote'):
+        quantidade = 1 if operacao == 'predict' else TAMANHO_LOTE
+        corpo = json.dumps({'pacientes': [_paciente(rng) for _ in range(quantidade)]}).encode()
+        return 'predicao', "POST", "/predict", corpo, 200
+    raise ValueError(f"Operação desconhecida: {operacao}")
+
+
+# --- Gerador de carga ---
+
+class Cliente:
+    """Conexões HTTP persistentes (uma por app alvo) de uma thread do gerador."""
+
+    def __init__(self, alvos):
+        self.alvos = {app: urllib.parse.urlsplit(url) for app, url in alvos.items()}
+        self.conexoes = {}
+
+    def _conexao(self, app):
+        if app not in self.conexoes:
+            alvo = self.alvos[app]
+            self.conexoes[app] = http.client.HTTPConnection(alvo.hostname, alvo.port or 80, timeout=30)
+        return self.conexoes[app]
+
+    def enviar(self, app, metodo, caminho, corpo):
+        """Status da resposta; reabre a conexão se o servidor a fechou (o worker sync fecha após cada resposta)."""
+        conexao = self._conexao(app)
+        cabecalhos = {'Content-Type': 'application/json'} if corpo else {}
+        for tentativa in range(2):
+            reutilizada = conexao.sock is not None
+            try:
+                conexao.request(metodo, caminho, corpo, cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                return resposta.status
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conexao.close()
+                # O servidor fechou a conexão ociosa (keepalive) enquanto a requisição saía: os clientes
+                # HTTP (urllib3, navegadores) repetem nesse caso, sem contar como erro
+                if not reutilizada or tentativa:
+                    raise
+            except Exception:
+                conexao.close()
+                raise
+
+    def fechar(self):
+        for conexao in self.conexoes.values():
+            conexao.close()
+
+
+def executar_nivel(alvos, mix, concorrencia, duracao_s, semente=7):
+    """
+    `concorrencia` clientes em laço fechado durante `duracao_s` segundos.
+
+    Returns:
+        dict: 'req_s', 'erros' (fração) e 'operacoes' {operação: {'n', 'req_s', 'p50_ms', 'p99_ms', 'erros'}}.
+    """
+    operacoes, pesos = zip(*mix.items())
+    amostras = [[] for _ in range(concorrencia)]
+    inicio = time.perf_counter()
+    fim = inicio + duracao_s
+
+    def trabalhar(indice):
+        rng = random.Random(semente * 1000 + indice)
+        cliente = Cliente(alvos)
+        try:
+            while time.perf_counter() < fim:
+                operacao = rng.choices(operacoes, weights=pesos)[0]
+                app, metodo, caminho, corpo, esperado = _requisicao(operacao, rng)
+                comeco = time.perf_counter()
+                try:
+                    ok = cliente.enviar(app, metodo, caminho, corpo) == esperado
+                except Exception:
+                    ok = False
+                amostras[indice].append((operacao, time.perf_counter() - comeco, ok))
+        finally:
+            cliente.fechar()
+
+    threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    por_operacao = {}
+    total = erros = 0
+    for operacao in operacoes:
+        latencias = [duracao for lista in amostras for op, duracao, _ in lista if op == operacao]
+        falhas = sum(1 for lista in amostras for op, _, ok in lista if op == operacao and not ok)
+        total += len(latencias)
+        erros += falhas
+        por_operacao[operacao] = {
+            'n': len(latencias), 'req_s': len(latencias) / decorrido,
+            'p50_ms': percentil(latencias, 50) * 1000, 'p99_ms': percentil(latencias, 99) * 1000,
+            'erros': falhas / len(latencias) if latencias else 0.0,
+        }
+    todas = [duracao for lista in amostras for _, duracao, _ in lista]
+    return {'req_s': total / decorrido, 'erros': erros / total if total else 0.0,
+            'p99_ms': percentil(todas, 99) * 1000, 'operacoes': por_operacao}
+
+
+def imprimir_nivel(concorrencia, resultado):
+    print(f"\nconcorrência {concorrencia}: {resultado['req_s']:.1f} req/s, p99 {resultado['p99_ms']:.1f} ms, "
+          f"{resultado['erros']:.2%} de erros")
+    print(f"{'operação':<16} {'n':>7} {'req/s':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>8}")
+    for operacao, valores in resultado['operacoes'].items():
+        print(f"{operacao:<16} {valores['n']:>7} {valores['req_s']:>8.1f} {valores['p50_ms']:>10.2f} "
+              f"{valores['p99_ms']:>10.2f} {valores['erros']:>8.2%}")
+
+
+# --- Servidores locais ---
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _aguardar(url, processo, limite_s=60):
+    alvo = urllib.parse.urlsplit(url)
+    fim = time.monotonic() + limite_s
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError("O Gunicorn terminou antes de atender.")
+        conexao = http.client.HTTPConnection(alvo.hostname, alvo.port, timeout=10)
+        try:
+            conexao.request("GET", alvo.path)
+            if conexao.getresponse().status < 500:
+                return
+        except OSError:
+            pass
+        finally:
+            conexao.close()
+        time.sleep(0.2)
+    raise RuntimeError(f"O Gunicorn não respondeu a tempo ({url}).")
+
+
+def preparar_modelo(pacientes):
+    """Banco e registro de modelos temporários com um modelo ativo. Retorna (banco, diretório dos modelos)."""
+    from ConectaCareHC.crud import treinamento
+    from ConectaCareHC.crud.db_conexao import Credenciais
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="modelos-")
+    os.environ['CONECTACARE_MODELOS'] = diretorio
+    Credenciais.DB_LOCAL = caminho
+    carregar_em_massa(caminho, pacientes, pacientes // 100, 3)
+    if treinamento.treinar(ativar=True) is None:
+        raise RuntimeError("Falha ao treinar o modelo de teste.")
+    return caminho, diretorio
+
+
+class Servidores:
+    """Os dois apps no Gunicorn com o perfil dado; `alvos` é {app: URL base}."""
+
+    def __init__(self, perfil, ambiente, workers=None, threads=None):
+        self.perfis = _perfis_por_app(perfil)
+        self.ambiente = dict(ambiente, PYTHONPATH=RAIZ)
+        if workers:
+            self.ambiente['CONECTACARE_WORKERS'] = str(workers)
+        if threads:
+            self.ambiente['CONECTACARE_THREADS'] = str(threads)
+            self.ambiente['CONECTACARE_CONEXOES'] = str(threads)
+        self.processos = []
+        self.alvos = {}
+
+    def __enter__(self):
+        try:
+            for app, modulo in APPS.items():
+                porta = _porta_livre()
+                self.processos.append(subprocess.Popen(
+                    [sys.executable, "-m", "gunicorn", "-c", f"python:ConectaCareHC.implantacao.gunicorn_{self.perfis[app]}",
+                     "-b", f"127.0.0.1:{porta}", "--log-level", "warning", modulo], cwd=RAIZ, env=self.ambiente))
+                self.alvos[app] = f"http://127.0.0.1:{porta}"
+            _aguardar(self.alvos['cep'] + "/api/cep/01001000", self.processos[0])
+            _aguardar(self.alvos['predicao'] + "/modelo", self.processos[1])
+        except Exception:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *args):
+        for processo in self.processos:
+            processo.terminate()
+        for processo in self.processos:
+            processo.wait(timeout=30)
+
+
+def _perfis_por_app(perfil):
+    """'threads+sync' -> {'cep': 'threads', 'predicao': 'sync'}; 'sync' -> o mesmo para os dois apps."""
+    partes = perfil.split("+")
+    if len(partes) == 1:
+        partes *= len(APPS)
+    if len(partes) != len(APPS) or any(parte not in PERFIS for parte in partes):
+        raise ValueError(f"Perfil inválido: {perfil} (opções: {', '.join(PERFIS)}, ou app+predicao como threads+sync)")
+    return dict(zip(APPS, partes))
+
+
+def _resumo(resultados, niveis):
+    print(f"\n{'perfil':<14}" + "".join(f"{f'c={c} req/s':>14} {'p99 (ms)':>9}" for c in niveis))
+    for perfil, por_nivel in resultados.items():
+        print(f"{perfil:<14}" + "".join(f"{por_nivel[c]['req_s']:>14.1f} {por_nivel[c]['p99_ms']:>9.1f}"
+                                        for c in niveis))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga de /api/cep e /predict sob os perfis do Gunicorn.")
+    parser.add_argument("--perfis", nargs="+", default=PERFIS_PADRAO,
+                        help="sync, threads, gevent ou app.py+api_predicao.py (ex.: threads+sync).")
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos por nível de concorrência.")
+    parser.add_argument("--aquecimento", type=float, default=3.0, help="Segundos de carga descartada no início.")
+    parser.add_argument("--mix", default=MIX_PADRAO, help="Pesos por operação: cep, cep_inexistente, predict, predict_lote.")
+    parser.add_argument("--workers", type=int, help="Substitui os processos do perfil (CONECTACARE_WORKERS).")
+    parser.add_argument("--threads", type=int,
+                        help="Substitui as threads (perfil threads) ou conexões (perfil gevent) por processo.")
+    parser.add_argument("--latencia-viacep-ms", type=float, default=50.0, dest="latencia_viacep_ms")
+    parser.add_argument("--pacientes", type=int, default=20_000, help="Pacientes sintéticos do modelo de teste.")
+    parser.add_argument("--url-cep", dest="url_cep", help="app.py já em execução (nada é iniciado).")
+    parser.add_argument("--url-predicao", dest="url_predicao", help="api_predicao.py já em execução.")
+    args = parser.parse_args()
+    mix = ler_mix(args.mix)
+    for operacao in mix:
+        if operacao not in OPERACOES:
+            parser.error(f"Operação desconhecida: {operacao} (opções: {', '.join(OPERACOES)})")
+
+    if args.url_cep or args.url_predicao:
+        alvos = {app: url for app, url in (('cep', args.url_cep), ('predicao', args.url_predicao)) if url}
+        for operacao in mix:
+            if OPERACOES.get(operacao) not in alvos:
+                parser.error(f"A operação {operacao} precisa de --url-{OPERACOES.get(operacao, operacao)}.")
+        executar_nivel(alvos, mix, max(args.concorrencia), args.aquecimento)
+        for concorrencia in args.concorrencia:
+            imprimir_nivel(concorrencia, executar_nivel(alvos, mix, concorrencia, args.duracao))
+        return
+
+    from ConectaCareHC.utils.viacep_local import ViaCEPLocal
+
+    try:
+        for perfil in args.perfis:
+            _perfis_por_app(perfil)
+    except ValueError as e:
+        parser.error(str(e))
+    perfis = [perfil for perfil in args.perfis
+              if 'gevent' not in _perfis_por_app(perfil).values() or importlib.util.find_spec("gevent")]
+    if len(perfis) < len(args.perfis):
+        print("gevent não instalado: perfis com gevent ignorados.")
+    caminho, diretorio = preparar_modelo(args.pacientes)
+    resultados = {}
+    try:
+        with ViaCEPLocal(latencia_s=args.latencia_viacep_ms / 1000) as viacep:
+            ambiente = dict(os.environ, CONECTACARE_VIACEP_URL=viacep.url, CONECTACARE_DB_LOCAL=caminho)
+            for perfil in perfis:
+                print(f"\n=== Perfil {perfil} ===")
+                with Servidores(perfil, ambiente, args.workers, args.threads) as servidores:
+                    executar_nivel(servidores.alvos, mix, max(args.concorrencia), args.aquecimento)
+                    resultados[perfil] = {}
+                    for concorrencia in args.concorrencia:
+                        resultado = executar_nivel(servidores.alvos, mix, concorrencia, args.duracao)
+                        resultados[perfil][concorrencia] = resultado
+                        imprimir_nivel(concorrencia, resultado)
+        _resumo(resultados, args.concorrencia)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/cli_scriptado.py
+# Compara a vazão do modo scriptado (comandos.py, uma sessão por execução) com o caminho do menu
+# interativo (uma conexão nova por operação), usando o substituto local com latência de rede simulada.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.cli_scriptado --operacoes 2000 --latencia-ms 2
+
+import argparse
+import builtins
+import contextlib
+import io
+import random
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import db_local
+
+
+def _medir(funcao):
+    db_local.zerar_estatisticas()
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio, dict(db_local.ESTATISTICAS)
+
+
+def caminho_menu(cpfs_consulta, cpfs_agenda):
+    """Simula o operador digitando nos menus: consultar_paciente_por_cpf() e agendar_consulta()."""
+    from ConectaCareHC.crud import operacoes
+
+    respostas = iter([])
+    input_original = builtins.input
+    builtins.input = lambda prompt='': next(respostas)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for cpf in cpfs_consulta:
+                respostas = iter([cpf])
+                operacoes.consultar_paciente_por_cpf()
+            for cpf in cpfs_agenda:
+                respostas = iter([cpf, "20/11/2026"])
+                operacoes.agendar_consulta()
+    finally:
+        builtins.input = input_original
+
+
+def caminho_scriptado(cpfs_consulta, cpfs_agenda):
+    """Mesmas operações como um lote de comandos do modo scriptado (uma sessão)."""
+    from ConectaCareHC.comandos import criar_parser, executar_lote
+    from ConectaCareHC.crud.db_conexao import sessao_bd
+
+    linhas = [f"paciente get --cpf {cpf}" for cpf in cpfs_consulta]
+    linhas += [f"agenda add --cpf {cpf} --data 20/11/2026" for cpf in cpfs_agenda]
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(io.StringIO()), sessao_bd():
+        falhas = executar_lote(criar_parser(), linhas, saida)
+    if falhas:
+        raise RuntimeError(f"{falhas} comandos falharam no modo scriptado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modo scriptado x menu interativo.")
+    parser.add_argument("--pacientes", type=int, default=5000)
+    parser.add_argument("--operacoes", type=int, default=1000, help="Total de operações (80%% consultas, 20%% agendamentos).")
+    parser.add_argument("--latencia-ms", type=float, default=2.0, help="Latência simulada por ida e volta ao banco.")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    try:
+        cpfs, _ = popular_banco(caminho, args.pacientes)
+        rng = random.Random(3)
+        n_agenda = args.operacoes // 5
+        cpfs_consulta = [rng.choice(cpfs) for _ in range(args.operacoes - n_agenda)]
+        cpfs_agenda = [rng.choice(cpfs) for _ in range(n_agenda)]
+
+        db_local.LATENCIA_REDE_S = args.latencia_ms / 1000
+        print(f"{args.operacoes} operações, latência simulada de {args.latencia_ms} ms por ida e volta\n")
+        print(f"{'caminho':<12} {'tempo (s)':>10} {'ops/s':>9} {'conexões':>9} {'idas e voltas':>14}")
+        resultados = {}
+        for nome, funcao in (("menu", caminho_menu), ("scriptado", caminho_scriptado)):
+            duracao, estatisticas = _medir(lambda: funcao(cpfs_consulta, cpfs_agenda))
+            resultados[nome] = duracao
+            print(f"{nome:<12} {duracao:>10.2f} {args.operacoes / duracao:>9.0f} "
+                  f"{estatisticas['conexoes']:>9} {estatisticas['viagens']:>14}")
+        print(f"\nGanho do modo scriptado: {resultados['menu'] / resultados['scriptado']:.1f}x")
+    finally:
+        db_local.LATENCIA_REDE_S = 0.0
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
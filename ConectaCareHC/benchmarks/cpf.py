@@ -0,0 +1,114 @@
+# benchmarks/cpf.py
+# CPF: validação vetorizada (utils/cpf.validar_cpfs_em_lote) x laço Python (cpf_valido), e o efeito da
+# migração para chave numérica (crud/migracao_cpf.py) no tamanho das tabelas/índices e na latência
+# da busca por CPF, usando o substituto local.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.cpf --validacoes 10000000 --pacientes 200000
+
+import argparse
+import random
+import sqlite3
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import migracao_cpf, repositorio
+from ConectaCareHC.crud.db_conexao import sessao_bd
+from ConectaCareHC.utils.cpf import cpf_valido, validar_cpfs_em_lote
+
+
+def gerar_cpfs(quantidade, proporcao_invalidos=0.01, semente=7):
+    """Array NumPy de CPFs em texto (11 dígitos), com uma fração de dígitos verificadores trocados."""
+    import numpy as np
+
+    rng = np.random.default_rng(semente)
+    digitos = np.zeros((quantidade, 11), dtype=np.int64)
+    digitos[:, :9] = rng.integers(0, 10, size=(quantidade, 9))
+    digitos[:, 9] = (digitos[:, :9] @ np.arange(10, 1, -1)) * 10 % 11 % 10
+    digitos[:, 10] = (digitos[:, :10] @ np.arange(11, 1, -1)) * 10 % 11 % 10
+    invalidos = rng.random(quantidade) < proporcao_invalidos
+    digitos[invalidos, 10] = (digitos[invalidos, 10] + 1) % 10
+    return (digitos + ord("0")).astype(np.uint8).view("S11").ravel().astype("U11")
+
+
+def medir_validacao(quantidade, amostra):
+    cpfs = gerar_cpfs(quantidade)
+    inicio = time.perf_counter()
+    validos = validar_cpfs_em_lote(cpfs)
+    vetorizado = time.perf_counter() - inicio
+
+    lista = cpfs[:amostra].tolist()
+    inicio = time.perf_counter()
+    referencia = [cpf_valido(cpf) for cpf in lista]
+    laco = (time.perf_counter() - inicio) * quantidade / len(lista)
+    if referencia != validos[:amostra].tolist():
+        raise RuntimeError("A validação vetorizada diverge de cpf_valido.")
+
+    print(f"Validação de {quantidade:,} CPFs ({int((~validos).sum()):,} inválidos)")
+    print(f"  {'vetorizada':<22} {vetorizado:>8.2f} s  {quantidade / vetorizado:>14,.0f} CPFs/s")
+    print(f"  {'laço Python (estim.)':<22} {laco:>8.2f} s  {quantidade / laco:>14,.0f} CPFs/s  "
+          f"(medido em {amostra:,})")
+    print(f"  ganho: {laco / vetorizado:.1f}x\n")
+
+
+def tamanhos(caminho):
+    """Bytes ocupados por tabela/índice (tabela virtual dbstat do SQLite)."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        return dict(conexao.execute("SELECT NAME, SUM(PGSIZE) FROM DBSTAT GROUP BY NAME").fetchall())
+    finally:
+        conexao.close()
+
+
+def medir_buscas(cpfs):
+    with sessao_bd():
+        inicio = time.perf_counter()
+        linhas = [repositorio.buscar_paciente_por_cpf(cpf) for cpf in cpfs]
+        duracao = time.perf_counter() - inicio
+    return duracao * 1e6 / len(cpfs), [row._asdict() for row in linhas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validação vetorizada de CPF e chaves numéricas.")
+    parser.add_argument("--validacoes", type=int, default=10_000_000)
+    parser.add_argument("--amostra-laco", type=int, default=500_000, help="CPFs validados no laço Python.")
+    parser.add_argument("--pacientes", type=int, default=200_000)
+    parser.add_argument("--cuidadores", type=int, default=2_000)
+    parser.add_argument("--agendamentos", type=int, default=2, help="Agendamentos por paciente.")
+    parser.add_argument("--buscas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    medir_validacao(args.validacoes, min(args.amostra_laco, args.validacoes))
+
+    caminho = criar_banco_temporario()
+    try:
+        cpfs, _ = popular_banco(caminho, args.pacientes, args.cuidadores, args.agendamentos)
+        amostra = random.Random(3).choices(cpfs, k=args.buscas)
+
+        antes = tamanhos(caminho)
+        latencia_antes, linhas_antes = medir_buscas(amostra)
+        if not migracao_cpf.migrar_cpfs_para_numero():
+            raise RuntimeError("A migração falhou.")
+        depois = tamanhos(caminho)
+        latencia_depois, linhas_depois = medir_buscas(amostra)
+        if linhas_antes != linhas_depois:
+            raise RuntimeError("A busca por CPF devolve resultados diferentes depois da migração.")
+
+        print(f"\nTamanhos com {args.pacientes:,} pacientes ({args.agendamentos} agendamentos cada), em KiB")
+        print(f"  {'objeto':<46} {'texto':>10} {'numérico':>10}")
+        for nome in sorted(set(antes) | set(depois)):
+            if nome.startswith("sqlite_") and not nome.startswith("sqlite_autoindex"):
+                continue
+            print(f"  {nome:<46} {antes.get(nome, 0) / 1024:>10,.0f} {depois.get(nome, 0) / 1024:>10,.0f}")
+        print(f"  {'total':<46} {sum(antes.values()) / 1024:>10,.0f} {sum(depois.values()) / 1024:>10,.0f}")
+        print("  (no SQLite, CPF INTEGER PRIMARY KEY vira o próprio rowid: o índice da chave primária deixa de existir)")
+
+        print(f"\nBusca por CPF ({args.buscas:,} buscas, mesma sessão)")
+        print(f"  texto:    {latencia_antes:>8.1f} µs/busca")
+        print(f"  numérico: {latencia_depois:>8.1f} µs/busca  ({latencia_antes / latencia_depois:.2f}x)")
+    finally:
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# benchmarks/dados_sinteticos.py
+# Geração de dados sintéticos e carga do substituto local (crud/db_local.py) para os benchmarks.
+
+import os
+import random
+import sqlite3
+import tempfile
+
+from ConectaCareHC.crud.db_conexao import Credenciais
+from ConectaCareHC.crud.db_local import conectar_bd_local
+from ConectaCareHC.utils.coordenadas import coordenadas_do_cep
+from ConectaCareHC.utils.cpf import completar_cpf
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Pedro", "Rafaela", "Samuel", "Tatiana", "Vinícius"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa"]
+CIDADES = [("São Paulo", "SP", "01"), ("Campinas", "SP", "13"), ("Rio de Janeiro", "RJ", "20"),
+           ("Belo Horizonte", "MG", "30"), ("Curitiba", "PR", "80"), ("Porto Alegre", "RS", "90"),
+           ("Salvador", "BA", "40"), ("Recife", "PE", "50"), ("Fortaleza", "CE", "60"), ("Brasília", "DF", "70")]
+DISPERSAO_GRAUS = 0.15  # Desvio padrão dos pontos em volta de cada capital (~15 km)
+
+
+def gerar_cpf(indice, base=10_000_000_000):
+    """CPF sintético único e válido: os 9 primeiros dígitos de `base` + índice e os dígitos verificadores."""
+    return completar_cpf(base // 100 + indice)
+
+
+def gerar_pessoa(indice, rng, base_cpf=10_000_000_000):
+    """Gera um registro no formato aceito por repositorio.inserir_pessoa."""
+    cidade, uf, prefixo_cep = rng.choice(CIDADES)
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    return {
+        'nome': nome,
+        'cpf': gerar_cpf(indice, base_cpf),
+        'idade': rng.randint(18, 99),
+        'email': f"pessoa{indice}@exemplo.com.br",
+        'telefone_contato': f"119{rng.randint(10_000_000, 99_999_999)}",
+        'endereco': {
+            'cep': f"{prefixo_cep}{rng.randint(0, 999_999):06d}",
+            'logradouro': f"Rua {rng.choice(SOBRENOMES)}",
+            'numero': str(rng.randint(1, 3000)),
+            'complemento': rng.choice([None, "Casa", "Apto 12", "Fundos"]),
+            'bairro': f"Bairro {rng.randint(1, 50)}",
+            'cidade': cidade,
+            'uf': uf,
+        },
+    }
+
+
+def gerar_centroides_finos(caminho, rng):
+    """Base de centroides com prefixos de 5 dígitos em volta das capitais (formato de utils/coordenadas)."""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write("prefixo,latitude,longitude\n")
+        for _, _, prefixo in CIDADES:
+            latitude, longitude = coordenadas_do_cep(f"{prefixo}000000")
+            for setor in range(1000):
+                arquivo.write(f"{prefixo}{setor:03d},{latitude + rng.gauss(0, DISPERSAO_GRAUS):.6f},"
+                              f"{longitude + rng.gauss(0, DISPERSAO_GRAUS):.6f}\n")
+
+
+def criar_banco_temporario(prefixo="conectacare_bench_"):
+    """Cria um arquivo SQLite temporário e aponta conectar_bd() para ele. Retorna o caminho."""
+    descritor, caminho = tempfile.mkstemp(prefix=prefixo, suffix=".db")
+    os.close(descritor)
+    os.remove(caminho)
+    Credenciais.DB_LOCAL = caminho
+    return caminho
+
+
+def remover_banco(caminho):
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+
+def popular_banco(caminho, n_pacientes, n_cuidadores=0, agendamentos_por_paciente=0, semente=42, lote=5000):
+    """
+    Carrega pacientes, cuidadores, vínculos (1 cuidador por paciente) e agendamentos sintéticos
+    diretamente no substituto local, em lotes. Retorna (cpfs_pacientes, cpfs_cuidadores).
+    """
+    rng = random.Random(semente)
+    conexao = conectar_bd_local(caminho)
+    cpfs_pacientes, cpfs_cuidadores = [], []
+
+    def inserir(tabela, pessoas):
+        with conexao.cursor() as cursor:
+            for pessoa in pessoas:
+                end = pessoa['endereco']
+                latitude, longitude = coordenadas_do_cep(end['cep']) or (None, None)
+                id_var = cursor.var()
+                cursor.execute(
+                    "INSERT INTO ENDERECOS (CEP, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF, LATITUDE, LONGITUDE) "
+                    "VALUES (:cep, :logradouro, :numero, :complemento, :bairro, :cidade, :uf, :latitude, :longitude) "
+                    "RETURNING ID_ENDERECO INTO :id", dict(end, latitude=latitude, longitude=longitude, id=id_var))
+                pessoa['id_endereco'] = id_var.getvalue()[0]
+            cursor.executemany(
+                f"INSERT INTO {tabela} (NOME, CPF, IDADE, EMAIL, TELEFONE_CONTATO, ID_ENDERECO) "
+                "VALUES (:nome, :cpf, :idade, :email, :telefone_contato, :id_endereco)",
+                [{k: p[k] for k in ('nome', 'cpf', 'idade', 'email', 'telefone_contato', 'id_endereco')} for p in pessoas])
+        conexao.commit()
+
+    for tabela, total, base, destino in (('CUIDADORES', n_cuidadores, 20_000_000_000, cpfs_cuidadores),
+                                         ('PACIENTES', n_pacientes, 10_000_000_000, cpfs_pacientes)):
+        for inicio in range(0, total, lote):
+            pessoas = [gerar_pessoa(i, rng, base) for i in range(inicio, min(inicio + lote, total))]
+            inserir(tabela, pessoas)
+            destino.extend(p['cpf'] for p in pessoas)
+
+    with conexao.cursor() as cursor:
+        if cpfs_cuidadores:
+            cursor.executemany(
+                "INSERT INTO VINCULOS_PACIENTE_CUIDADOR (CPF_PACIENTE, CPF_CUIDADOR) VALUES (:p, :c)",
+                [{'p': cpf, 'c': cpfs_cuidadores[i % len(cpfs_cuidadores)]} for i, cpf in enumerate(cpfs_pacientes)])
+        if agendamentos_por_paciente:
+            cursor.executemany(
+                "INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) VALUES (:cpf, :data)",
+                [{'cpf': cpf, 'data': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}
+                 for cpf in cpfs_pacientes for _ in range(agendamentos_por_paciente)])
+    conexao.commit()
+    conexao.close()
+    return cpfs_pacientes, cpfs_cuidadores
+
+
+def carregar_em_massa(caminho, n_pacientes, n_cuidadores=0, agendamentos_por_paciente=0, semente=42,
+                      lote=50_000):
+    """
+    Versão de popular_banco para milhões de linhas: sqlite3 direto (executemany sem a camada Oracle),
+    IDs de endereço atribuídos aqui e sem as coordenadas dos endereços. Mesmos dados pessoais, vínculos
+    (1 cuidador por paciente) e agendamentos em 2025-2026. Retorna (cpfs_pacientes, cpfs_cuidadores).
+    """
+    conectar_bd_local(caminho).close()  # Cria o esquema
+    rng = random.Random(semente)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA synchronous = OFF")
+    cpfs_pacientes, cpfs_cuidadores = [], []
+    id_endereco = conexao.execute("SELECT COALESCE(MAX(ID_ENDERECO), 0) FROM ENDERECOS").fetchone()[0]
+    try:
+        for tabela, total, base, destino in (('CUIDADORES', n_cuidadores, 20_000_000_000, cpfs_cuidadores),
+                                             ('PACIENTES', n_pacientes, 10_000_000_000, cpfs_pacientes)):
+            for inicio in range(0, total, lote):
+                pessoas = [gerar_pessoa(i, rng, base) for i in range(inicio, min(inicio + lote, total))]
+                enderecos, linhas = [], []
+                for pessoa in pessoas:
+                    id_endereco += 1
+                    end = pessoa['endereco']
+                    enderecos.append((id_endereco, end['cep'], end['logradouro'], end['numero'], end['complemento'],
+                                      end['bairro'], end['cidade'], end['uf']))
+                    linhas.append((pessoa['nome'], pessoa['cpf'], pessoa['idade'], pessoa['email'],
+                                   pessoa['telefone_contato'], id_endereco))
+                conexao.executemany(
+                    "INSERT INTO ENDERECOS (ID_ENDERECO, CEP, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", enderecos)
+                conexao.executemany(
+                    f"INSERT INTO {tabela} (NOME, CPF, IDADE, EMAIL, TELEFONE_CONTATO, ID_ENDERECO) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", linhas)
+                destino.extend(linha[1] for linha in linhas)
+        for inicio in range(0, len(cpfs_pacientes), lote):
+            bloco = cpfs_pacientes[inicio:inicio + lote]
+            if cpfs_cuidadores:
+                conexao.executemany(
+                    "INSERT INTO VINCULOS_PACIENTE_CUIDADOR (CPF_PACIENTE, CPF_CUIDADOR) VALUES (?, ?)",
+                    [(cpf, cpfs_cuidadores[(inicio + i) % len(cpfs_cuidadores)]) for i, cpf in enumerate(bloco)])
+            if agendamentos_por_paciente:
+                conexao.executemany(
+                    "INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) VALUES (?, ?)",
+                    [(cpf, f"{rng.randint(2025, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+                     for cpf in bloco for _ in range(agendamentos_por_paciente)])
+        conexao.commit()
+    finally:
+        conexao.close()
+    return cpfs_pacientes, cpfs_cuidadores
@@ -0,0 +1,198 @@
+# benchmarks/duplicidade.py
+# Detecção de pacientes duplicados (crud/duplicidade.py) no substituto local: carrega 1 milhão de pacientes
+# sintéticos, injeta cópias de uma fração deles com variações no nome (erro de digitação, sem acentos e em
+# maiúsculas, dois erros, sobrenome do meio omitido), às vezes com 1 ano a mais na idade, e mantendo alguns
+# dados do original (endereço, telefone, e-mail) ou com um erro de digitação no CPF. Mede:
+#   1. a varredura completa: tempo, comparações feitas e recall/precisão por tipo de variação;
+#   2. a verificação online (a do cadastro interativo) de novas cópias dos duplicados injetados: recall e
+#      latência p50/p99.
+# Os CPFs sintéticos são sequenciais, então homônimos com CPFs vizinhos contam como "CPF parecido" e
+# aparecem como pares não injetados (numa base real, com CPFs espalhados, são raros).
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.duplicidade --pacientes 1000000 --fracao 0.01
+
+import argparse
+import csv
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import unicodedata
+
+from ConectaCareHC.benchmarks.dados_sinteticos import carregar_em_massa, criar_banco_temporario, remover_banco
+from ConectaCareHC.crud import duplicidade
+from ConectaCareHC.utils.cpf import completar_cpf
+
+VARIACOES = ('digitacao', 'sem_acentos', 'dois_erros', 'sem_sobrenome_do_meio')
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _erro_digitacao(nome, rng):
+    posicao = rng.randrange(1, len(nome))
+    operacao = rng.randrange(3)
+    if operacao == 0:
+        return nome[:posicao] + rng.choice(LETRAS) + nome[posicao + 1:]
+    if operacao == 1:
+        return nome[:posicao] + nome[posicao + 1:]
+    return nome[:posicao] + rng.choice(LETRAS) + nome[posicao:]
+
+
+def variar_nome(nome, variacao, rng):
+    if variacao == 'digitacao':
+        return _erro_digitacao(nome, rng)
+    if variacao == 'dois_erros':
+        return _erro_digitacao(_erro_digitacao(nome, rng), rng)
+    if variacao == 'sem_acentos':
+        return unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii').upper()
+    partes = nome.split()
+    return " ".join(partes[:1] + partes[2:]) if len(partes) > 2 else nome
+
+
+def _cpf_com_erro(cpf, rng):
+    """Outro CPF válido com um dígito da base trocado ou dois vizinhos invertidos."""
+    base = list(cpf[:9])
+    posicao = rng.randrange(8)
+    if rng.random() < 0.5 and base[posicao] != base[posicao + 1]:
+        base[posicao], base[posicao + 1] = base[posicao + 1], base[posicao]
+    else:
+        base[posicao] = rng.choice([d for d in "0123456789" if d != base[posicao]])
+    return completar_cpf("".join(base))
+
+
+def _novo_cpf(existentes, rng):
+    while True:
+        cpf = completar_cpf(rng.randrange(600_000_000, 999_999_999))
+        if cpf not in existentes:
+            existentes.add(cpf)
+            return cpf
+
+
+def _copia(original, rng, existentes, variacao=None):
+    """Cópia de `original` (linha de COLUNAS_DUPLICIDADE) como outro cadastro da mesma pessoa."""
+    cpf, nome, idade, email, telefone, cep, logradouro, numero, cidade, uf = original
+    variacao = variacao or rng.choice(VARIACOES)
+    mantem = {indicio: rng.random() < probabilidade
+              for indicio, probabilidade in (('endereco', 0.5), ('telefone', 0.5), ('email', 0.3), ('cpf', 0.3))}
+    if not any(mantem.values()):
+        mantem['telefone'] = True
+    novo_cpf = _cpf_com_erro(cpf, rng) if mantem['cpf'] else None
+    if novo_cpf is None or novo_cpf in existentes:
+        novo_cpf = _novo_cpf(existentes, rng)
+    existentes.add(novo_cpf)
+    if not mantem['endereco']:
+        cep, logradouro, numero = f"{rng.randrange(10 ** 8):08d}", f"Rua {rng.choice(LETRAS).upper()}", "1"
+    return variacao, (novo_cpf, variar_nome(nome, variacao, rng), idade + (rng.random() < 0.3),
+                      email if mantem['email'] else None,
+                      telefone if mantem['telefone'] else f"119{rng.randint(10_000_000, 99_999_999)}",
+                      cep, logradouro, numero, cidade, uf)
+
+
+def _originais(conexao, cpfs):
+    linhas = []
+    for inicio in range(0, len(cpfs), 900):
+        bloco = cpfs[inicio:inicio + 900]
+        linhas += conexao.execute(
+            "SELECT P.CPF, P.NOME, P.IDADE, P.EMAIL, P.TELEFONE_CONTATO, E.CEP, E.LOGRADOURO, E.NUMERO, E.CIDADE, E.UF "
+            f"FROM PACIENTES P JOIN ENDERECOS E ON E.ID_ENDERECO = P.ID_ENDERECO WHERE P.CPF IN "
+            f"({', '.join('?' * len(bloco))})", bloco).fetchall()
+    return linhas
+
+
+def injetar_duplicados(caminho, cpfs, quantidade, rng):
+    """Insere `quantidade` cópias. Retorna ({(cpf original, cpf cópia): variação}, originais, CPFs existentes)."""
+    existentes = set(cpfs)
+    originais = _originais(sqlite3.connect(caminho), rng.sample(cpfs, quantidade))
+    conexao = sqlite3.connect(caminho)
+    verdade = {}
+    try:
+        id_endereco = conexao.execute("SELECT MAX(ID_ENDERECO) FROM ENDERECOS").fetchone()[0]
+        enderecos, pacientes = [], []
+        for original in originais:
+            variacao, copia = _copia(original, rng, existentes)
+            id_endereco += 1
+            enderecos.append((id_endereco, copia[5], copia[6], copia[7], "Centro", copia[8], copia[9]))
+            pacientes.append(copia[:5] + (id_endereco,))
+            verdade[tuple(sorted((original[0], copia[0])))] = variacao
+        conexao.executemany("INSERT INTO ENDERECOS (ID_ENDERECO, CEP, LOGRADOURO, NUMERO, BAIRRO, CIDADE, UF) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)", enderecos)
+        conexao.executemany("INSERT INTO PACIENTES (CPF, NOME, IDADE, EMAIL, TELEFONE_CONTATO, ID_ENDERECO) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", pacientes)
+        conexao.commit()
+    finally:
+        conexao.close()
+    return verdade, originais, existentes
+
+
+def _pares_encontrados():
+    with open(duplicidade.caminho_pares(), encoding="utf-8") as arquivo:
+        return {tuple(sorted((linha['cpf_a'], linha['cpf_b']))) for linha in csv.DictReader(arquivo)}
+
+
+def medir_online(originais, existentes, quantidade, rng):
+    """Recall e latências (ms) da verificação online de novas cópias de `quantidade` originais."""
+    encontrados, latencias = 0, []
+    for original in rng.sample(originais, min(quantidade, len(originais))):
+        _, copia = _copia(original, rng, existentes)
+        pessoa = {'cpf': copia[0], 'nome': copia[1], 'idade': copia[2], 'email': copia[3],
+                  'telefone_contato': copia[4],
+                  'endereco': {'cep': copia[5], 'logradouro': copia[6], 'numero': copia[7], 'cidade': copia[8],
+                               'uf': copia[9]}}
+        inicio = time.perf_counter()
+        candidatos = duplicidade.verificar_paciente(pessoa)
+        latencias.append((time.perf_counter() - inicio) * 1e3)
+        if candidatos is None:
+            raise RuntimeError("Verificação online sem índice")
+        encontrados += any(candidato['cpf'] == original[0] for candidato in candidatos)
+    latencias.sort()
+    return encontrados / len(latencias), statistics.median(latencias), latencias[int(len(latencias) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall e tempo da detecção de pacientes duplicados.")
+    parser.add_argument("--pacientes", type=int, default=1_000_000)
+    parser.add_argument("--fracao", type=float, default=0.01, help="Fração dos pacientes que recebe uma cópia.")
+    parser.add_argument("--online", type=int, default=500, help="Verificações online medidas.")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="duplicidade-")
+    os.environ['CONECTACARE_DUPLICIDADE'] = diretorio
+    rng = random.Random(17)
+    try:
+        inicio = time.perf_counter()
+        cpfs, _ = carregar_em_massa(caminho, args.pacientes)
+        verdade, originais, existentes = injetar_duplicados(caminho, cpfs, int(args.pacientes * args.fracao), rng)
+        print(f"Carga: {args.pacientes} pacientes + {len(verdade)} duplicados injetados "
+              f"em {time.perf_counter() - inicio:.1f} s\n")
+
+        resultado = duplicidade.varrer()
+        if resultado is None:
+            raise RuntimeError("Falha na varredura")
+        pares = _pares_encontrados()
+        achados = pares & set(verdade)
+        print(f"Varredura: {resultado['duracao_s']:.1f} s, {resultado['chaves']} chaves, "
+              f"{resultado['comparacoes']} comparações ({resultado['comparacoes'] / resultado['pacientes']:.1f} por "
+              f"paciente; todos os pares seriam {resultado['pacientes'] * (resultado['pacientes'] - 1) // 2}), "
+              f"{resultado['blocos_ignorados']} blocos grandes ignorados")
+        print(f"Pares: {len(pares)} encontrados, {len(achados)} injetados; recall {len(achados) / len(verdade):.3f}, "
+              f"precisão {len(achados) / max(len(pares), 1):.3f}")
+        print(f"\n{'variação':<24} {'injetados':>10} {'recall':>8}")
+        for variacao in VARIACOES:
+            do_tipo = [par for par, tipo in verdade.items() if tipo == variacao]
+            recall = sum(par in pares for par in do_tipo) / max(len(do_tipo), 1)
+            print(f"{variacao:<24} {len(do_tipo):>10} {recall:>8.3f}")
+
+        recall, p50, p99 = medir_online(originais, existentes, args.online, rng)
+        print(f"\nVerificação online ({args.online} cadastros novos de pessoas já cadastradas): recall {recall:.3f}, "
+              f"p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/inicializacao.py
+# Benchmark de inicialização do main.py com orçamento de regressão.
+#
+# Mede (a) o tempo de importação de ConectaCareHC.main com `python -X importtime` e (b) o tempo até o
+# menu principal aparecer na tela. Falha (código de saída 1) se algum orçamento for estourado ou se
+# algum módulo pesado (driver Oracle, requests, dotenv, pandas...) for importado na inicialização.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.inicializacao --repeticoes 7
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ORCAMENTO_IMPORTACAO_MS = 60  # cumulativo de "import ConectaCareHC.main"
+ORCAMENTO_MENU_MS = 400  # do início do processo até o prompt do menu principal
+
+MODULOS_PROIBIDOS = ['oracledb', 'requests', 'dotenv', 'flask', 'pandas', 'numpy', 'sklearn', 'joblib']
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def medir_importacao():
+    """Executa `python -X importtime` e retorna ({módulo: cumulativo em ms}, cumulativo do main em ms)."""
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ConectaCareHC.main"],
+                              cwd=RAIZ, capture_output=True, text=True, check=True)
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, modulo = linha[len("import time:"):].split("|")
+        tempos[modulo.strip()] = int(cumulativo) / 1000
+    return tempos, tempos["ConectaCareHC.main"]
+
+
+def medir_menu(caminho_db):
+    """Tempo (ms) do início do processo até o prompt 'Escolha uma opção' do menu principal."""
+    ambiente = dict(os.environ, CONECTACARE_DB_LOCAL=caminho_db, PYTHONUNBUFFERED="1")
+    inicio = time.perf_counter()
+    processo = subprocess.Popen([sys.executable, os.path.join("ConectaCareHC", "main.py")], cwd=RAIZ, env=ambiente,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    lido = b""
+    while b"Escolha uma op" not in lido:
+        bloco = processo.stdout.read1(4096)
+        if not bloco:
+            raise RuntimeError("O menu principal não foi exibido.")
+        lido += bloco
+    duracao = (time.perf_counter() - inicio) * 1000
+    processo.communicate(b"4\n", timeout=30)
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do main.py.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    importacoes, tempos_menu = [], []
+    modulos = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_db = os.path.join(diretorio, "inicializacao.db")
+        for _ in range(args.repeticoes):
+            modulos, tempo_main = medir_importacao()
+            importacoes.append(tempo_main)
+            tempos_menu.append(medir_menu(caminho_db))
+
+    tempo_importacao = statistics.median(importacoes)
+    tempo_menu = statistics.median(tempos_menu)
+    carregados = [m for m in MODULOS_PROIBIDOS if m in modulos]
+
+    print(f"Importação de ConectaCareHC.main (mediana de {args.repeticoes}): {tempo_importacao:.1f} ms "
+          f"(orçamento {ORCAMENTO_IMPORTACAO_MS} ms)")
+    print(f"Até o menu principal (mediana de {args.repeticoes}): {tempo_menu:.1f} ms (orçamento {ORCAMENTO_MENU_MS} ms)")
+    print("\nMódulos do projeto mais caros na inicialização (cumulativo, ms):")
+    for modulo, tempo in sorted(((m, t) for m, t in modulos.items() if m.startswith("ConectaCareHC")),
+                                key=lambda item: -item[1])[:8]:
+        print(f"  {tempo:8.1f}  {modulo}")
+
+    falhas = []
+    if carregados:
+        falhas.append(f"módulos pesados importados na inicialização: {', '.join(carregados)}")
+    if tempo_importacao > ORCAMENTO_IMPORTACAO_MS:
+        falhas.append(f"importação acima do orçamento ({tempo_importacao:.1f} > {ORCAMENTO_IMPORTACAO_MS} ms)")
+    if tempo_menu > ORCAMENTO_MENU_MS:
+        falhas.append(f"menu acima do orçamento ({tempo_menu:.1f} > {ORCAMENTO_MENU_MS} ms)")
+
+    if falhas:
+        print("\nREGRESSÃO: " + "; ".join(falhas))
+        return 1
+    print("\nDentro do orçamento.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
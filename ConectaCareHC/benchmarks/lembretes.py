@@ -0,0 +1,235 @@
+# benchmarks/lembretes.py
+# Lembretes de consulta (crud/lembretes.py) no substituto local, com os provedores locais de e-mail e SMS
+# (utils/envio_local.py) num processo à parte, simulando a latência de cada entrega:
+#   1. geração: varredura dos agendamentos de amanhã (e a segunda execução, que não cria nada) e o plano
+#      da reserva de lotes (faixa de IDX_LEMBRETES_DEVIDOS);
+#   2. vazão com 1 e 2 despachantes (processos `python -m ConectaCareHC.crud.lembretes`) reservando da
+#      mesma fila: mensagens entregues, duplicadas no provedor (devem ser zero) e lembretes por hora,
+#      comparados com a meta de 100 mil por hora;
+#   3. queda: um despachante é morto (SIGKILL) no meio do envio; quando as reservas dele expiram, outro
+#      termina a fila. O que já tinha sido enviado chega de novo ao provedor e é descartado pela chave;
+#   4. limite de taxa: o gateway de SMS aceita só `--limite-sms` mensagens/s e responde 429 ao resto.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.lembretes --pacientes 10000 --latencia-ms 20 --workers 16
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import date, datetime, timedelta
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import lembretes
+from ConectaCareHC.crud.db_conexao import nova_conexao
+from ConectaCareHC.crud.db_local import _traduzir_sql
+
+META_POR_HORA = 100_000
+VALIDADE_QUEDA_S = 3
+
+
+def preparar_banco(caminho, pacientes):
+    popular_banco(caminho, pacientes)
+    conexao = sqlite3.connect(caminho)
+    try:
+        amanha = (date.today() + timedelta(days=1)).isoformat()
+        conexao.execute("INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) SELECT CPF, ? FROM PACIENTES", (amanha,))
+        conexao.commit()
+    finally:
+        conexao.close()
+
+
+def _sql(caminho, sql, parametros=()):
+    conexao = sqlite3.connect(caminho, timeout=30)
+    try:
+        linhas = conexao.execute(sql, parametros).fetchall()
+        conexao.commit()
+        return linhas
+    finally:
+        conexao.close()
+
+
+def reiniciar_fila(caminho):
+    """Todos os lembretes pendentes e vencidos desde um minuto atrás."""
+    vencimento = (datetime.now() - timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M:%S")
+    _sql(caminho, "UPDATE LEMBRETES SET SITUACAO = 'PENDENTE', ENVIAR_EM = ?, RESERVA = NULL, RESERVADO_ATE = NULL, "
+                  "TENTATIVAS = 0, ENVIADO_EM = NULL, ULTIMO_ERRO = NULL", (vencimento,))
+
+
+def medir_geracao(caminho):
+    inicio = time.perf_counter()
+    resultado = lembretes.gerar_lembretes()
+    duracao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    repeticao = lembretes.gerar_lembretes()
+    duracao_repeticao = time.perf_counter() - inicio
+    if resultado is None or repeticao is None or repeticao['lembretes']:
+        raise RuntimeError(f"Geração inesperada: {resultado} / {repeticao}")
+    print(f"Geração: {resultado['agendamentos']:,} agendamentos -> {resultado['lembretes']:,} lembretes em "
+          f"{duracao:.2f}s; de novo: {repeticao['lembretes']} novos em {duracao_repeticao:.2f}s")
+
+    conexao = nova_conexao()
+    try:
+        plano = conexao.conexao_sqlite.execute(
+            "EXPLAIN QUERY PLAN " + _traduzir_sql(lembretes.RESERVAR_LEMBRETES.sql),
+            {'reserva': '', 'reservado_ate': '', 'agora': '', 'limite': 1}).fetchall()
+    finally:
+        conexao.close()
+    print("Plano da reserva de um lote:")
+    for linha in plano:
+        print(f"  {linha[-1]}")
+    print()
+    return resultado['lembretes']
+
+
+# --- Provedores locais e despachantes em processos separados ---
+
+class Provedores:
+    def __init__(self, latencia_ms, limite_sms=None):
+        comando = [sys.executable, "-m", "ConectaCareHC.utils.envio_local", "--porta-smtp", "0", "--porta-http", "0",
+                   "--latencia-ms", str(latencia_ms)]
+        if limite_sms:
+            comando += ["--limite-sms", str(limite_sms)]
+        self.processo = subprocess.Popen(comando, stdout=subprocess.PIPE, text=True)
+        enderecos = json.loads(self.processo.stdout.readline())
+        self.porta_smtp = enderecos['porta_smtp']
+        self.url_sms = enderecos['url_sms']
+        self._base = self.url_sms.rsplit("/", 1)[0]
+
+    def estatisticas(self):
+        with urllib.request.urlopen(f"{self._base}/estatisticas") as resposta:
+            return json.loads(resposta.read())
+
+    def zerar(self):
+        urllib.request.urlopen(urllib.request.Request(f"{self._base}/zerar", data=b"", method="POST")).close()
+
+    def encerrar(self):
+        self.processo.send_signal(signal.SIGINT)
+        self.processo.wait()
+
+
+def iniciar_despachante(caminho, provedores, workers, validade_reserva_s=lembretes.VALIDADE_RESERVA_S):
+    ambiente = dict(os.environ, CONECTACARE_DB_LOCAL=caminho, CONECTACARE_SMTP_HOST="127.0.0.1",
+                    CONECTACARE_SMTP_PORTA=str(provedores.porta_smtp), CONECTACARE_SMS_URL=provedores.url_sms)
+    return subprocess.Popen([sys.executable, "-m", "ConectaCareHC.crud.lembretes", "--ate-esvaziar",
+                             "--workers", str(workers), "--validade-reserva", str(validade_reserva_s),
+                             "--intervalo-progresso", "3600"],
+                            env=ambiente, stdout=subprocess.PIPE, text=True)
+
+
+def _resumo(processo):
+    saida = processo.communicate()[0].strip().splitlines()
+    if processo.returncode or not saida:
+        raise RuntimeError(f"Despachante terminou com código {processo.returncode}.")
+    return json.loads(saida[-1])
+
+
+def _totais(estatisticas):
+    return {campo: sum(canal.get(campo, 0) for canal in estatisticas.values())
+            for campo in ('recebidas', 'entregues', 'duplicadas', 'limitadas')}
+
+
+def _conferir(caminho, total, provedores):
+    totais = _totais(provedores.estatisticas())
+    enviados = _sql(caminho, "SELECT COUNT(*) FROM LEMBRETES WHERE SITUACAO = 'ENVIADO'")[0][0]
+    if enviados != total or totais['entregues'] != total:
+        raise RuntimeError(f"Esperados {total} lembretes enviados: banco {enviados}, provedor {totais['entregues']}.")
+    return totais
+
+
+def _linha(rotulo, duracao, total, totais, resumos):
+    por_hora = total / duracao * 3600
+    p99 = max(canal['p99_ms'] for resumo in resumos for canal in resumo['latencia'].values())
+    em_voo = max(resumo['maximo_em_voo'] for resumo in resumos)
+    print(f"  {rotulo:<24} {duracao:>8.1f}s {por_hora:>12,.0f} {por_hora / META_POR_HORA:>7.1f}x "
+          f"{totais['duplicadas']:>10,} {totais['limitadas']:>9,} {em_voo:>7} {p99:>9.1f}")
+
+
+def _cabecalho():
+    print(f"  {'cenário':<24} {'tempo':>9} {'lembretes/h':>12} {'x meta':>8} {'duplicadas':>10} "
+          f"{'429s':>9} {'em voo':>7} {'p99 (ms)':>9}")
+
+
+def medir_vazao(caminho, total, provedores, despachantes, workers):
+    for quantidade in despachantes:
+        reiniciar_fila(caminho)
+        provedores.zerar()
+        inicio = time.perf_counter()
+        processos = [iniciar_despachante(caminho, provedores, workers) for _ in range(quantidade)]
+        resumos = [_resumo(processo) for processo in processos]
+        duracao = time.perf_counter() - inicio
+        totais = _conferir(caminho, total, provedores)
+        _linha(f"{quantidade} despachante(s)", duracao, total, totais, resumos)
+
+
+def medir_queda(caminho, total, provedores, workers):
+    reiniciar_fila(caminho)
+    provedores.zerar()
+    inicio = time.perf_counter()
+    processo = iniciar_despachante(caminho, provedores, workers, VALIDADE_QUEDA_S)
+    while _totais(provedores.estatisticas())['entregues'] < total // 3:
+        time.sleep(0.1)
+    processo.kill()
+    processo.wait()
+    entregues = _totais(provedores.estatisticas())['entregues']
+    gravados = _sql(caminho, "SELECT COUNT(*) FROM LEMBRETES WHERE SITUACAO = 'ENVIADO'")[0][0]
+    reservados = _sql(caminho, "SELECT COUNT(*) FROM LEMBRETES WHERE SITUACAO = 'RESERVADO'")[0][0]
+    time.sleep(VALIDADE_QUEDA_S + 1)  # Até as reservas do despachante morto expirarem
+    resumo = _resumo(iniciar_despachante(caminho, provedores, workers))
+    duracao = time.perf_counter() - inicio
+    totais = _conferir(caminho, total, provedores)
+    _linha("queda + recuperação", duracao, total, totais, [resumo])
+    print(f"    morto com {entregues:,} entregues e {gravados:,} gravados como enviados ({reservados:,} reservados); "
+          f"{totais['duplicadas']:,} reenvios descartados pelo provedor")
+
+
+def medir_limite(caminho, total, latencia_ms, limite_sms, workers):
+    provedores = Provedores(latencia_ms, limite_sms)
+    try:
+        reiniciar_fila(caminho)
+        inicio = time.perf_counter()
+        resumo = _resumo(iniciar_despachante(caminho, provedores, workers))
+        duracao = time.perf_counter() - inicio
+        totais = _conferir(caminho, total, provedores)
+        _linha(f"SMS limitado a {limite_sms:g}/s", duracao, total, totais, [resumo])
+        print(f"    {resumo['pausas']:,} pausas pedidas pelo gateway, {resumo['reagendados']} reagendados; "
+              f"SMS a {total / 2 / duracao:,.0f}/s")
+    finally:
+        provedores.encerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geração e envio de lembretes com provedores locais.")
+    parser.add_argument("--pacientes", type=int, default=10_000, help="Um agendamento amanhã por paciente.")
+    parser.add_argument("--latencia-ms", type=float, default=20, dest="latencia_ms",
+                        help="Latência simulada de cada entrega.")
+    parser.add_argument("--workers", type=int, default=lembretes.WORKERS, help="Threads de envio por despachante.")
+    parser.add_argument("--despachantes", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--limite-sms", type=float, default=100, dest="limite_sms",
+                        help="Mensagens de SMS/s no cenário de limite de taxa (0 = não roda).")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    provedores = Provedores(args.latencia_ms)
+    try:
+        preparar_banco(caminho, args.pacientes)
+        total = medir_geracao(caminho)
+        print(f"Envio de {total:,} lembretes (latência do provedor {args.latencia_ms:g} ms, {args.workers} threads "
+              f"por despachante, meta {META_POR_HORA:,}/h; CPUs: {os.cpu_count()})")
+        _cabecalho()
+        medir_vazao(caminho, total, provedores, args.despachantes, args.workers)
+        medir_queda(caminho, total, provedores, args.workers)
+        if args.limite_sms:
+            medir_limite(caminho, total, args.latencia_ms, args.limite_sms, args.workers)
+    finally:
+        provedores.encerrar()
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
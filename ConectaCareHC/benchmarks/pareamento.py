@@ -0,0 +1,144 @@
+# benchmarks/pareamento.py
+# Pareamento por proximidade (crud/pareamento.py):
+#   1. em memória, com 100 mil cuidadores e 1 milhão de pacientes em volta das capitais de CIDADES:
+#      construção da k-d tree, consulta dos k mais próximos de um paciente (contra a força bruta em
+#      NumPy, que também confere o resultado) e sugestão em massa respeitando as vagas;
+#   2. de ponta a ponta no substituto local (leitura do banco + sugestão + gravação dos vínculos), com
+#      uma base de centroides de 5 dígitos gerada para os CEPs sintéticos.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.pareamento --cuidadores 100000 --pacientes 1000000
+
+import argparse
+import os
+import tempfile
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import (CIDADES, DISPERSAO_GRAUS, criar_banco_temporario,
+                                                      gerar_centroides_finos, popular_banco, remover_banco)
+from ConectaCareHC.crud import pareamento
+from ConectaCareHC.crud.db_conexao import sessao_bd
+from ConectaCareHC.utils import coordenadas
+
+def gerar_pontos(rng, quantidade):
+    """Latitudes e longitudes sintéticas, distribuídas em volta das capitais de CIDADES."""
+    import numpy as np
+
+    centros = np.array([coordenadas.coordenadas_do_cep(f"{prefixo}000000") for _, _, prefixo in CIDADES])
+    escolhidos = centros[rng.integers(0, len(centros), quantidade)]
+    pontos = escolhidos + rng.normal(0, DISPERSAO_GRAUS, (quantidade, 2))
+    return pontos[:, 0], pontos[:, 1]
+
+
+def _forca_bruta(indice, latitude, longitude, k):
+    """k mais próximos calculando a distância até todos os cuidadores."""
+    import numpy as np
+
+    distancias = np.linalg.norm(indice._pontos - coordenadas.para_cartesianas([latitude], [longitude]), axis=1)
+    return np.argsort(distancias)[:k].tolist()
+
+
+def medir_em_memoria(n_cuidadores, n_pacientes, capacidade, consultas, k):
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    lat_c, lon_c = gerar_pontos(rng, n_cuidadores)
+    lat_p, lon_p = gerar_pontos(rng, n_pacientes)
+
+    inicio = time.perf_counter()
+    indice = pareamento.IndiceCuidadores(range(n_cuidadores), [""] * n_cuidadores, lat_c, lon_c,
+                                         np.zeros(n_cuidadores, dtype=np.int64), capacidade)
+    construcao = time.perf_counter() - inicio
+
+    amostra = rng.integers(0, n_pacientes, consultas)
+    inicio = time.perf_counter()
+    vizinhos = [[i for i, _ in indice.proximos(lat_p[p], lon_p[p], k)] for p in amostra]
+    por_arvore = (time.perf_counter() - inicio) / consultas
+    amostra_bruta = amostra[:max(consultas // 10, 1)]
+    inicio = time.perf_counter()
+    referencia = [_forca_bruta(indice, lat_p[p], lon_p[p], k) for p in amostra_bruta]
+    por_forca_bruta = (time.perf_counter() - inicio) / len(amostra_bruta)
+    if vizinhos[:len(referencia)] != referencia:
+        raise RuntimeError("A k-d tree devolveu vizinhos diferentes da força bruta.")
+
+    inicio = time.perf_counter()
+    atribuicoes, distancias = indice.sugerir(lat_p, lon_p)
+    sugestao = time.perf_counter() - inicio
+    ocupacao = np.bincount(atribuicoes[atribuicoes >= 0], minlength=n_cuidadores)
+    if ocupacao.max() > capacidade:
+        raise RuntimeError("A sugestão excedeu a capacidade de um cuidador.")
+
+    atendidos = atribuicoes >= 0
+    print(f"Em memória: {n_cuidadores:,} cuidadores x {n_pacientes:,} pacientes (capacidade {capacidade})")
+    print(f"  construção da k-d tree:       {construcao:>10.3f} s")
+    print(f"  {k} mais próximos (k-d tree):   {por_arvore * 1e3:>10.3f} ms/consulta")
+    print(f"  {k} mais próximos (força bruta):{por_forca_bruta * 1e3:>10.3f} ms/consulta  "
+          f"({por_forca_bruta / por_arvore:.0f}x)")
+    print(f"  sugestão para todos:          {sugestao:>10.2f} s  ({n_pacientes / sugestao:,.0f} pacientes/s)")
+    print(f"  pacientes atendidos:          {int(atendidos.sum()):>10,}  "
+          f"(distância média {np.nanmean(distancias):.1f} km, p95 {np.nanpercentile(distancias, 95):.1f} km)\n")
+
+
+def medir_com_banco(n_cuidadores, n_pacientes, capacidade, consultas):
+    import random
+
+    rng = random.Random(13)
+    diretorio = tempfile.mkdtemp(prefix="bench_pareamento_")
+    arquivo_centroides = os.path.join(diretorio, "centroides.csv")
+    caminho = criar_banco_temporario()
+    try:
+        gerar_centroides_finos(arquivo_centroides, rng)
+        coordenadas.carregar_centroides(arquivo_centroides)
+        # Só os cuidadores recebem vínculos sintéticos; os pacientes entram sem vínculo
+        popular_banco(caminho, 0, n_cuidadores)
+        cpfs, _ = popular_banco(caminho, n_pacientes)
+
+        with sessao_bd():
+            inicio = time.perf_counter()
+            for cpf in rng.sample(cpfs, min(consultas, len(cpfs))):
+                if pareamento.cuidadores_proximos(cpf)['situacao'] != 'sucesso':
+                    raise RuntimeError(f"Paciente {cpf} sem cuidadores próximos.")
+            por_consulta = (time.perf_counter() - inicio) / min(consultas, len(cpfs))
+
+            inicio = time.perf_counter()
+            resultado = pareamento.sugerir_vinculos(capacidade=capacidade)
+            sugestao = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            inseridos, erros = pareamento.aplicar_sugestoes(resultado['sugestoes'])
+            gravacao = time.perf_counter() - inicio
+            restantes = pareamento.sugerir_vinculos(capacidade=capacidade)
+
+        if erros:
+            raise RuntimeError(f"Erros ao gravar as sugestões: {erros[:3]}")
+        if restantes['sugestoes']:
+            raise RuntimeError("Depois de gravar as sugestões ainda há cuidadores com vaga para pacientes sem vínculo.")
+        print(f"Com o banco local: {n_cuidadores:,} cuidadores x {n_pacientes:,} pacientes (capacidade {capacidade})")
+        print(f"  cuidadores próximos (menu/API, índice em cache): {por_consulta * 1e3:>8.2f} ms/paciente")
+        print(f"  leitura + sugestão para todos:                   {sugestao:>8.2f} s")
+        print(f"  gravação dos vínculos sugeridos:                 {gravacao:>8.2f} s  ({inseridos:,} vínculos)")
+        print(f"  pacientes ainda sem vínculo:                     {len(restantes['sem_sugestao']):>8,}")
+    finally:
+        coordenadas.carregar_centroides()
+        remover_banco(caminho)
+        os.remove(arquivo_centroides)
+        os.rmdir(diretorio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="k-d tree de cuidadores: consultas e sugestão em massa.")
+    parser.add_argument("--cuidadores", type=int, default=100_000)
+    parser.add_argument("--pacientes", type=int, default=1_000_000)
+    parser.add_argument("--capacidade", type=int, default=12, help="Pacientes por cuidador.")
+    parser.add_argument("--consultas", type=int, default=2000, help="Consultas de k mais próximos.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--cuidadores-banco", type=int, default=2_000)
+    parser.add_argument("--pacientes-banco", type=int, default=20_000)
+    args = parser.parse_args()
+
+    medir_em_memoria(args.cuidadores, args.pacientes, args.capacidade, args.consultas, args.k)
+    if args.pacientes_banco:
+        medir_com_banco(args.cuidadores_banco, args.pacientes_banco, args.capacidade, args.consultas // 10)
+
+
+if __name__ == "__main__":
+    main()
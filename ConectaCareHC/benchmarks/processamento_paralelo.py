@@ -0,0 +1,72 @@
+# benchmarks/processamento_paralelo.py
+# Escalabilidade do motor particionado (crud/processamento_paralelo.py) na exportação de pacientes,
+# com 1, 2, 4 e 8 workers, contra a exportação serial, usando o substituto local.
+# Confere também que a saída paralela é idêntica (byte a byte) para qualquer quantidade de workers.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.processamento_paralelo --pacientes 200000 --formato ndjson --modo processos
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import db_local, exportacao
+
+
+def _medir(funcao, caminho_saida):
+    inicio = time.perf_counter()
+    with open(caminho_saida, 'w', encoding='utf-8', newline='') as arquivo:
+        total = funcao(arquivo)
+    duracao = time.perf_counter() - inicio
+    with open(caminho_saida, 'rb') as arquivo:
+        resumo = hashlib.sha256(arquivo.read()).hexdigest()[:12]
+    return duracao, total, resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação serial x motor particionado com N workers.")
+    parser.add_argument("--pacientes", type=int, default=200000)
+    parser.add_argument("--formato", choices=exportacao.FORMATOS, default='ndjson')
+    parser.add_argument("--modo", choices=['processos', 'threads'], default='processos')
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Latência simulada por ida e volta.")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="bench_paralelo_")
+    saida = os.path.join(diretorio, f"exportacao.{args.formato}")
+    try:
+        popular_banco(caminho, args.pacientes)
+        db_local.LATENCIA_REDE_S = args.latencia_ms / 1000
+        print(f"Exportação de {args.pacientes} pacientes ({args.formato}), modo {args.modo}, "
+              f"{os.cpu_count()} CPUs, latência simulada de {args.latencia_ms} ms\n")
+        print(f"{'execução':<14} {'tempo (s)':>10} {'registros/s':>12} {'speedup':>8}  sha256")
+
+        base, total, resumo = _medir(lambda arquivo: exportacao.exportar(arquivo, args.formato), saida)
+        print(f"{'serial':<14} {base:>10.2f} {total / base:>12.0f} {1.0:>8.2f}  {resumo} (ordem por nome)")
+
+        resumos = set()
+        for workers in args.workers:
+            duracao, total_paralelo, resumo = _medir(
+                lambda arquivo: exportacao.exportar_em_paralelo(arquivo, args.formato, workers, modo=args.modo),
+                saida)
+            if total_paralelo != total:
+                raise RuntimeError(f"{workers} workers exportaram {total_paralelo} registros (esperado {total})")
+            resumos.add(resumo)
+            print(f"{f'{workers} workers':<14} {duracao:>10.2f} {total / duracao:>12.0f} {base / duracao:>8.2f}  {resumo}")
+
+        print("\nSaída determinística entre execuções paralelas." if len(resumos) == 1 else
+              "\nATENÇÃO: a saída paralela variou com a quantidade de workers.")
+    finally:
+        db_local.LATENCIA_REDE_S = 0.0
+        remover_banco(caminho)
+        if os.path.exists(saida):
+            os.remove(saida)
+        os.rmdir(diretorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/rastreio.py
+# Custo do rastreio (utils/rastreio.py) no substituto local:
+#   1. trecho() isolado: sem operação atual (rastreio desligado ou fora de uma operação) e dentro de uma;
+#   2. requisições ao app Flask (test client) -- consulta de paciente por CPF e listagem -- com o rastreio
+#      desligado, ligado (só trechos) e com cada perfil (cprofile, pilhas, tracemalloc), em µs por requisição
+#      e acréscimo sobre o desligado. Os cenários se alternam em rodadas, para que variações da máquina
+#      não pesem num só deles.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.rastreio --pacientes 2000 --requisicoes 500
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import timeit
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.utils import rastreio
+
+CENARIOS = (
+    ('desligado', False, ''),
+    ('trechos', True, ''),
+    ('cprofile', True, 'cprofile'),
+    ('pilhas', True, 'pilhas'),
+    ('tracemalloc', True, 'tracemalloc'),
+)
+
+
+def medir_trecho(repeticoes=1_000_000):
+    def vazio():
+        pass
+
+    def com_trecho():
+        with rastreio.trecho('bd', 'x'):
+            pass
+
+    base = min(timeit.repeat(vazio, number=repeticoes, repeat=3))
+    fora = (min(timeit.repeat(com_trecho, number=repeticoes, repeat=3)) - base) / repeticoes
+    with rastreio.operacao('benchmark'):
+        dentro = (min(timeit.repeat(com_trecho, number=repeticoes, repeat=3)) - base) / repeticoes
+    print(f"Custo de um trecho(): sem operação atual {fora * 1e9:.0f} ns; dentro de uma operação "
+          f"{dentro * 1e9:.0f} ns\n")
+
+
+RODADAS = 5
+
+
+def medir_requisicoes(cliente, caminhos, cenario):
+    _, ativo, perfil = cenario
+    rastreio.configurar(ativo=ativo, perfil=perfil)
+    tempos = []
+    for caminho in caminhos:
+        inicio = time.perf_counter()
+        resposta = cliente.get(caminho)
+        resposta.get_data()  # Consome as respostas em streaming; o close() encerra a operação
+        resposta.close()
+        tempos.append(time.perf_counter() - inicio)
+        if resposta.status_code != 200:
+            raise RuntimeError(f"{caminho}: status {resposta.status_code}")
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo dos trechos e dos perfis do rastreio.")
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições por cenário.")
+    args = parser.parse_args()
+
+    medir_trecho()
+
+    caminho = criar_banco_temporario()
+    perfis = tempfile.mkdtemp(prefix="perfis-")
+    os.environ['CONECTACARE_DB_LOCAL'] = caminho
+    os.environ['CONECTACARE_PERFIS'] = perfis
+    try:
+        popular_banco(caminho, args.pacientes)
+        conexao = sqlite3.connect(caminho)
+        cpfs = [linha[0] for linha in conexao.execute("SELECT CPF FROM PACIENTES")]
+        conexao.close()
+
+        from ConectaCareHC.app import app
+
+        cliente = app.test_client()
+        rng = random.Random(7)
+        cenarios_requisicao = {
+            'consulta por CPF': [f"/api/pacientes/{rng.choice(cpfs)}" for _ in range(args.requisicoes)],
+            'listagem (streaming)': ["/api/pacientes?idade_minima=90"] * args.requisicoes,
+        }
+        for rotulo, caminhos in cenarios_requisicao.items():
+            medir_requisicoes(cliente, caminhos[:50], CENARIOS[0])  # Aquecimento
+            tempos = {cenario[0]: [] for cenario in CENARIOS}
+            por_rodada = max(1, args.requisicoes // RODADAS)
+            for rodada in range(RODADAS):
+                trecho_caminhos = caminhos[rodada * por_rodada:(rodada + 1) * por_rodada]
+                for cenario in CENARIOS:
+                    tempos[cenario[0]] += medir_requisicoes(cliente, trecho_caminhos, cenario)
+            print(f"{rotulo} ({por_rodada * RODADAS} requisições por cenário, em {RODADAS} rodadas)")
+            print(f"  {'cenário':<12} {'mediana (µs)':>13} {'média (µs)':>11} {'acréscimo':>10}")
+            base = statistics.median(tempos['desligado'])
+            for nome, medidos in tempos.items():
+                mediana = statistics.median(medidos)
+                print(f"  {nome:<12} {mediana * 1e6:>13.0f} {statistics.fmean(medidos) * 1e6:>11.0f} "
+                      f"{(mediana / base - 1) * 100:>+9.1f}%")
+            print()
+        print(f"Operações registradas: {len(rastreio.operacoes_recentes())}; "
+              f"arquivos de perfil gravados: {len(os.listdir(perfis))}")
+    finally:
+        rastreio.configurar(perfil='')
+        shutil.rmtree(perfis, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
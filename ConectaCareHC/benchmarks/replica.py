@@ -0,0 +1,155 @@
+# benchmarks/replica.py
+# Réplica local de leitura (crud/replica.py) contra o banco principal remoto, simulado pelo substituto local
+# com latência por ida e volta (db_local.LATENCIA_REDE_S):
+#   1. latência das leituras do cadastro pelo repositório -- consulta por CPF (p50/p99) e listagem de
+#      pacientes por idade mínima -- no principal com uma conexão por operação (como a API), no principal
+#      numa sessão (conexão reaproveitada, como o modo scriptado) e na réplica;
+#   2. custo da sincronização: cópia completa e incrementais depois de 10 a 10 mil alterações (idades,
+#      nomes, endereços, vínculos, inclusões e exclusões), conferindo a réplica com o principal ao final.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.replica --pacientes 100000 --consultas 2000 --latencia-ms 1
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import (CIDADES, carregar_em_massa, criar_banco_temporario,
+                                                      remover_banco)
+from ConectaCareHC.crud import db_local, replica, repositorio
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import sessao_bd
+
+
+def _latencias_ms(funcao, argumentos):
+    duracoes = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        if funcao(argumento) is None:
+            raise RuntimeError(f"Leitura sem resultado: {argumento}")
+        duracoes.append((time.perf_counter() - inicio) * 1e3)
+    duracoes.sort()
+    return statistics.median(duracoes), duracoes[int(len(duracoes) * 0.99)]
+
+
+def medir_leituras(cpfs, caminho_replica, listagens):
+    consulta = repositorio.buscar_paciente_por_cpf
+
+    def listagem(_):
+        return sum(1 for _ in repositorio.iterar_pacientes(idade_minima=95))
+
+    resultados = {}
+    replica.configurar('')
+    resultados['principal (conexão por operação)'] = (_latencias_ms(consulta, cpfs),
+                                                      _latencias_ms(listagem, range(listagens)))
+    with sessao_bd():
+        resultados['principal (sessão)'] = (_latencias_ms(consulta, cpfs), _latencias_ms(listagem, range(listagens)))
+    replica.configurar(caminho_replica)
+    if replica.conectar_leitura() is None:
+        raise RuntimeError("A réplica não está em uso")
+    resultados['réplica local'] = (_latencias_ms(consulta, cpfs), _latencias_ms(listagem, range(listagens)))
+    return resultados
+
+
+def aplicar_alteracoes(caminho, cpfs, cuidadores, quantidade, rng):
+    """`quantidade` alterações misturadas, direto no principal (sem latência). Retorna os CPFs incluídos."""
+    conexao = sqlite3.connect(caminho)
+    incluidos = []
+    try:
+        for _ in range(quantidade):
+            tipo = rng.randrange(6)
+            cpf = rng.choice(cpfs)
+            if tipo == 0:
+                conexao.execute("UPDATE PACIENTES SET IDADE = ? WHERE CPF = ?", (rng.randint(18, 99), cpf))
+            elif tipo == 1:
+                conexao.execute("UPDATE PACIENTES SET NOME = NOME || ' Jr' WHERE CPF = ?", (cpf,))
+            elif tipo == 2:
+                cidade, uf, _ = rng.choice(CIDADES)
+                conexao.execute("UPDATE ENDERECOS SET CIDADE = ?, UF = ? WHERE ID_ENDERECO = "
+                                "(SELECT ID_ENDERECO FROM PACIENTES WHERE CPF = ?)", (cidade, uf, cpf))
+            elif tipo == 3:
+                conexao.execute("INSERT OR IGNORE INTO VINCULOS_PACIENTE_CUIDADOR (CPF_PACIENTE, CPF_CUIDADOR) "
+                                "VALUES (?, ?)", (cpf, rng.choice(cuidadores)))
+            elif tipo == 4:
+                conexao.execute("DELETE FROM VINCULOS_PACIENTE_CUIDADOR WHERE CPF_PACIENTE = ?", (cpf,))
+            else:
+                novo = f"9{len(incluidos) + rng.randrange(10 ** 9):010d}"
+                id_endereco = conexao.execute(
+                    "INSERT INTO ENDERECOS (LOGRADOURO, NUMERO, BAIRRO, CIDADE, UF) VALUES ('Rua', '1', 'Centro', ?, ?)",
+                    rng.choice(CIDADES)[:2]).lastrowid
+                conexao.execute("INSERT OR IGNORE INTO PACIENTES (CPF, NOME, IDADE, ID_ENDERECO) VALUES (?, ?, ?, ?)",
+                                (novo, "Paciente Novo", rng.randint(18, 99), id_endereco))
+                incluidos.append(novo)
+        conexao.commit()
+    finally:
+        conexao.close()
+    return incluidos
+
+
+def conferir(caminho, caminho_replica):
+    """Linhas diferentes entre o principal e a réplica, somadas nas quatro tabelas."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        conexao.execute("ATTACH DATABASE ? AS R", (caminho_replica,))
+        diferencas = 0
+        for tabela, (_, _, colunas) in reg.TABELAS_REPLICA.items():
+            colunas = ", ".join(colunas)
+            for a, b in (("main", "R"), ("R", "main")):
+                diferencas += conexao.execute(f"SELECT COUNT(*) FROM (SELECT {colunas} FROM {a}.{tabela} "
+                                              f"EXCEPT SELECT {colunas} FROM {b}.{tabela})").fetchone()[0]
+        return diferencas
+    finally:
+        conexao.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leituras no principal remoto x réplica local e custo da sincronização.")
+    parser.add_argument("--pacientes", type=int, default=100_000)
+    parser.add_argument("--cuidadores", type=int, default=5_000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--listagens", type=int, default=20)
+    parser.add_argument("--latencia-ms", type=float, default=1.0, dest="latencia_ms",
+                        help="Latência simulada por ida e volta ao principal.")
+    parser.add_argument("--alteracoes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="replica-")
+    caminho_replica = os.path.join(diretorio, "replica.db")
+    rng = random.Random(5)
+    try:
+        cpfs, cuidadores = carregar_em_massa(caminho, args.pacientes, args.cuidadores)
+        db_local.LATENCIA_REDE_S = args.latencia_ms / 1000
+
+        inicio = time.perf_counter()
+        resultado = replica.sincronizar(caminho=caminho_replica)
+        print(f"Sincronização completa: {resultado['linhas']} linhas em {time.perf_counter() - inicio:.2f} s "
+              f"({os.path.getsize(caminho_replica) / 1e6:.1f} MB); latência simulada {args.latencia_ms} ms\n")
+
+        replica.configurar(defasagem_maxima_s=3600)
+        amostra = [rng.choice(cpfs) for _ in range(args.consultas)]
+        print(f"{'leituras':<34} {'CPF p50 (ms)':>13} {'CPF p99 (ms)':>13} {'listagem p50 (ms)':>18}")
+        for rotulo, (por_cpf, listagem) in medir_leituras(amostra, caminho_replica, args.listagens).items():
+            print(f"{rotulo:<34} {por_cpf[0]:>13.3f} {por_cpf[1]:>13.3f} {listagem[0]:>18.1f}")
+
+        print(f"\n{'alterações':>10} {'chaves':>8} {'sincronização (ms)':>19}")
+        for quantidade in args.alteracoes:
+            cpfs += aplicar_alteracoes(caminho, cpfs, cuidadores, quantidade, rng)
+            inicio = time.perf_counter()
+            resultado = replica.sincronizar(caminho=caminho_replica)
+            print(f"{quantidade:>10} {resultado['chaves']:>8} {(time.perf_counter() - inicio) * 1e3:>19.1f}")
+        print(f"\nDiferenças entre o principal e a réplica: {conferir(caminho, caminho_replica)}")
+    finally:
+        db_local.LATENCIA_REDE_S = 0.0
+        replica.configurar('')
+        shutil.rmtree(diretorio, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
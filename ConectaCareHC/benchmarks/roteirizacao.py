@@ -0,0 +1,160 @@
+# benchmarks/roteirizacao.py
+# Roteirização das visitas do dia (crud/roteirizacao.py) no substituto local:
+#   1. tempo para resolver as rotas de todos os cuidadores, numa conexão e com 2/4 processos
+#      (motor de crud/processamento_paralelo.py);
+#   2. qualidade: distância total na ordem dos agendamentos x vizinho mais próximo x vizinho mais
+#      próximo + 2-opt, e a diferença para a rota ótima (força bruta) nas rotas curtas.
+#
+# Os pacientes são vinculados ao cuidador mais próximo com vaga (crud/pareamento.py), como na operação
+# real, e todos têm uma consulta na data medida; as coordenadas vêm de uma base de centroides de 5 dígitos.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.roteirizacao --cuidadores 10000 --visitas 8
+
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import (criar_banco_temporario, gerar_centroides_finos,
+                                                      popular_banco, remover_banco)
+from ConectaCareHC.crud import pareamento, repositorio, roteirizacao
+from ConectaCareHC.crud.db_conexao import sessao_bd
+from ConectaCareHC.crud.registro_sql import VISITAS_DO_DIA
+from ConectaCareHC.utils import coordenadas
+
+DATA = "10/11/2026"
+
+
+def preparar_banco(caminho, n_cuidadores, visitas):
+    """Cuidadores, pacientes vinculados por proximidade (`visitas` por cuidador) e uma consulta de cada em DATA."""
+    popular_banco(caminho, 0, n_cuidadores)
+    popular_banco(caminho, n_cuidadores * visitas)
+    with sessao_bd():
+        sugestoes = pareamento.sugerir_vinculos(capacidade=visitas)
+        inseridos, erros = pareamento.aplicar_sugestoes(sugestoes['sugestoes'])
+    if erros:
+        raise RuntimeError(f"Erros ao gravar os vínculos: {erros[:3]}")
+
+    conexao = sqlite3.connect(caminho)
+    try:
+        dia, mes, ano = DATA.split("/")
+        # Ordem dos agendamentos aleatória (como chegam as marcações), não a do cadastro
+        conexao.execute("INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) "
+                        "SELECT CPF, ? FROM PACIENTES ORDER BY RANDOM()", (f"{ano}-{mes}-{dia}",))
+        conexao.commit()
+    finally:
+        conexao.close()
+    return inseridos
+
+
+def medir_tempos(configuracoes):
+    print(f"Rotas do dia {DATA} para todos os cuidadores")
+    print(f"  {'execução':<22} {'tempo':>9} {'rotas/s':>10} {'km total':>12}")
+    referencia = n_rotas = None
+    for rotulo, workers in configuracoes:
+        inicio = time.perf_counter()
+        with sessao_bd():
+            rotas = roteirizacao.otimizar_rotas(DATA, workers=workers)
+        duracao = time.perf_counter() - inicio
+        if rotas is None or len(rotas) != (n_rotas or len(rotas)):
+            raise RuntimeError(f"{rotulo}: esperadas {n_rotas} rotas.")
+        n_rotas = len(rotas)
+        total_km = sum(rota['distancia_km'] for rota in rotas)
+        referencia = referencia or total_km
+        if abs(total_km - referencia) > 1e-6 * referencia:
+            print(f"  (aviso: {rotulo} chegou a outra distância total; o 2-opt tem limite de tempo por rota)")
+        print(f"  {rotulo:<22} {duracao:>8.2f}s {len(rotas) / duracao:>10,.0f} {total_km:>12,.0f}")
+    print(f"  (CPUs disponíveis: {os.cpu_count()})\n")
+
+
+def _rota_agendada(matriz, retornar):
+    """Distância visitando na ordem dos agendamentos (índices 1..n da matriz)."""
+    rota = list(range(len(matriz))) + ([0] if retornar else [])
+    return roteirizacao.comprimento(rota, matriz)
+
+
+def _otima(matriz, retornar):
+    n = len(matriz) - 1
+    fim = [0] if retornar else []
+    return min(roteirizacao.comprimento([0, *ordem, *fim], matriz)
+               for ordem in itertools.permutations(range(1, n + 1)))
+
+
+def medir_qualidade(retornar, amostra_exata, maximo_exato):
+    with sessao_bd():
+        linhas = repositorio.executar_sql(VISITAS_DO_DIA, roteirizacao._datas(DATA))
+    grupos = [[v for v in visitas if v.latitude is not None]
+              for visitas in roteirizacao._agrupar_por_cuidador(linhas)]
+
+    totais = {'agendada': 0.0, 'vizinho': 0.0, 'vizinho_2opt': 0.0}
+    lacunas, lacunas_vizinho = [], []
+    rng = random.Random(5)
+    curtas = [g for g in grupos if 2 <= len(g) <= maximo_exato]
+    conferidas = {id(g) for g in rng.sample(curtas, min(amostra_exata, len(curtas)))}
+    for visitas in grupos:
+        if not visitas:
+            continue
+        latitudes = [visitas[0].latitude_cuidador] + [v.latitude for v in visitas]
+        longitudes = [visitas[0].longitude_cuidador] + [v.longitude for v in visitas]
+        _, vizinho = roteirizacao.resolver_rota(latitudes, longitudes, retornar, melhorar=False)
+        _, melhorada = roteirizacao.resolver_rota(latitudes, longitudes, retornar, tempo_limite_s=None)
+        matriz = coordenadas.matriz_distancias_km(latitudes, longitudes)
+        totais['agendada'] += _rota_agendada(matriz, retornar)
+        totais['vizinho'] += vizinho
+        totais['vizinho_2opt'] += melhorada
+        if id(visitas) in conferidas:
+            otima = _otima(matriz, retornar)
+            lacunas.append(melhorada / otima - 1 if otima else 0.0)
+            lacunas_vizinho.append(vizinho / otima - 1 if otima else 0.0)
+
+    tipo = "com retorno" if retornar else "sem retorno"
+    print(f"Qualidade ({len(grupos):,} rotas, {tipo}): distância total em km")
+    for rotulo, chave in (("ordem dos agendamentos", 'agendada'), ("vizinho mais próximo", 'vizinho'),
+                          ("vizinho + 2-opt", 'vizinho_2opt')):
+        print(f"  {rotulo:<24} {totais[chave]:>12,.0f}  ({totais[chave] / totais['agendada']:.1%})")
+    if lacunas:
+        lacunas.sort()
+        print(f"  diferença para a ótima em {len(lacunas)} rotas de até {maximo_exato} visitas: "
+              f"2-opt média {sum(lacunas) / len(lacunas):.2%}, p95 {lacunas[int(len(lacunas) * 0.95)]:.2%}, "
+              f"ótima em {sum(l < 1e-9 for l in lacunas) / len(lacunas):.0%} | "
+              f"vizinho média {sum(lacunas_vizinho) / len(lacunas_vizinho):.2%}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roteirização das visitas do dia: tempo e qualidade.")
+    parser.add_argument("--cuidadores", type=int, default=10_000)
+    parser.add_argument("--visitas", type=int, default=8, help="Pacientes (visitas no dia) por cuidador.")
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4])
+    parser.add_argument("--amostra-exata", type=int, default=300, help="Rotas conferidas por força bruta.")
+    parser.add_argument("--maximo-exato", type=int, default=8, help="Visitas por rota na força bruta.")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix="bench_roteirizacao_")
+    arquivo_centroides = os.path.join(diretorio, "centroides.csv")
+    caminho = criar_banco_temporario()
+    try:
+        gerar_centroides_finos(arquivo_centroides, random.Random(13))
+        coordenadas.carregar_centroides(arquivo_centroides)
+        inicio = time.perf_counter()
+        vinculos = preparar_banco(caminho, args.cuidadores, args.visitas)
+        print(f"Base: {args.cuidadores:,} cuidadores, {vinculos:,} pacientes vinculados por proximidade, "
+              f"1 visita cada ({time.perf_counter() - inicio:.1f}s para preparar)\n")
+
+        configuracoes = [("1 conexão", None)] + [(f"{w} processos", w) for w in args.workers]
+        medir_tempos(configuracoes)
+        for retornar in (True, False):
+            medir_qualidade(retornar, args.amostra_exata, args.maximo_exato)
+    finally:
+        coordenadas.carregar_centroides()
+        remover_banco(caminho)
+        os.remove(arquivo_centroides)
+        os.rmdir(diretorio)
+
+
+if __name__ == "__main__":
+    main()
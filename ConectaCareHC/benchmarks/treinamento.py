@@ -0,0 +1,182 @@
+# benchmarks/treinamento.py
+# Treinamento do modelo de demanda (crud/treinamento.py) no substituto local, com pacientes sintéticos:
+#   1. tempo e pico de memória do treinamento em blocos (partial_fit) para alguns tamanhos de bloco e
+#      para o bloco do tamanho da base ("tudo" -- a base inteira na memória de uma vez). Cada treinamento
+#      roda num processo novo: o pico é o ru_maxrss do processo menos o que ele ocupava antes de treinar;
+#   2. troca de versão sob carga: Gunicorn servindo /predict enquanto as versões treinadas são ativadas
+#      alternadamente; conta as respostas com erro e as versões vistas nas respostas.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.treinamento --pacientes 1000000 --blocos 10000 50000 200000
+#   python -m ConectaCareHC.benchmarks.treinamento --pacientes 100000 --workers 2 --duracao 10
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+from ConectaCareHC.benchmarks.dados_sinteticos import CIDADES, carregar_em_massa, criar_banco_temporario, remover_banco
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _treinar_no_processo(caminho, estimador, bloco):
+    """Executado num processo novo (spawn). Retorna (metadados, pico de memória em MB)."""
+    from ConectaCareHC.crud import treinamento
+    from ConectaCareHC.crud.db_conexao import Credenciais
+
+    Credenciais.DB_LOCAL = caminho
+    # Importa numpy/pandas/sklearn (que já traz o scipy.sparse) antes da medida: o pico conta só o treinamento
+    import pandas, sklearn.linear_model, sklearn.metrics  # noqa: F401, E401
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultado = treinamento.treinar(estimador, tamanho_bloco=bloco, ativar=False)
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return resultado, (pico - antes) / 1024
+
+
+def medir_treinamentos(caminho, estimador, blocos):
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+    for bloco in blocos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            resultado, pico_mb = executor.submit(_treinar_no_processo, caminho, estimador, bloco).result()
+        if resultado is None:
+            raise RuntimeError(f"Falha no treinamento com blocos de {bloco}")
+        resultados.append((bloco, resultado, pico_mb))
+    return resultados
+
+
+# --- Troca de versão sob carga ---
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _aguardar(url, processo, limite_s=30):
+    fim = time.monotonic() + limite_s
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError("O Gunicorn terminou antes de atender.")
+        try:
+            urllib.request.urlopen(url, timeout=10).read()
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("O Gunicorn não respondeu a tempo.")
+
+
+def medir_troca(caminho, versoes, workers, clientes, duracao_s, intervalo_troca_s):
+    from ConectaCareHC.crud import modelo
+
+    porta = _porta_livre()
+    base = f"http://127.0.0.1:{porta}"
+    ambiente = dict(os.environ, CONECTACARE_DB_LOCAL=caminho, PYTHONPATH=RAIZ)
+    gunicorn = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{porta}", "--log-level", "warning",
+         "ConectaCareHC.api_predicao:app"], cwd=RAIZ, env=ambiente)
+    corpo = json.dumps({'pacientes': [{'idade': 20 + i * 7, 'uf': uf, 'cidade': cidade, 'cuidadores': 1,
+                                       'consultas_anteriores': i % 4, 'dias_desde_ultima': 30 * i}
+                                      for i, (cidade, uf, _) in enumerate(CIDADES[:10])]}).encode()
+    contagem = {'ok': 0, 'erros': 0}
+    vistas = {}
+    latencias = []
+    trava = threading.Lock()
+    parar = threading.Event()
+
+    def cliente():
+        while not parar.is_set():
+            pedido = urllib.request.Request(base + "/predict", corpo, {'Content-Type': 'application/json'})
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(pedido, timeout=10) as resposta:
+                    versao = json.load(resposta)['versao']
+                with trava:
+                    contagem['ok'] += 1
+                    vistas[versao] = vistas.get(versao, 0) + 1
+                    latencias.append(time.perf_counter() - inicio)
+            except Exception:
+                with trava:
+                    contagem['erros'] += 1
+
+    trocas = 0
+    try:
+        modelo.ativar(versoes[0])
+        _aguardar(base + "/modelo", gunicorn)
+        threads = [threading.Thread(target=cliente, daemon=True) for _ in range(clientes)]
+        for thread in threads:
+            thread.start()
+        fim = time.monotonic() + duracao_s
+        while time.monotonic() < fim:
+            time.sleep(intervalo_troca_s)
+            trocas += 1
+            modelo.ativar(versoes[trocas % len(versoes)])
+        parar.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        gunicorn.terminate()
+        gunicorn.wait(timeout=30)
+    latencias.sort()
+    p99 = latencias[int(len(latencias) * 0.99)] * 1e3 if latencias else float('nan')
+    return contagem, vistas, trocas, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e memória do treinamento em blocos; troca de versão sob carga.")
+    parser.add_argument("--pacientes", type=int, default=1_000_000)
+    parser.add_argument("--cuidadores", type=int, default=20_000)
+    parser.add_argument("--agendamentos-por-paciente", type=int, default=3, dest="agendamentos_por_paciente")
+    parser.add_argument("--estimador", default='logistica')
+    parser.add_argument("--blocos", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--sem-tudo", action="store_true", dest="sem_tudo",
+                        help="Não mede o bloco do tamanho da base.")
+    parser.add_argument("--workers", type=int, default=2, help="Workers do Gunicorn na troca de versão.")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--intervalo-troca", type=float, default=0.5, dest="intervalo_troca")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    diretorio = tempfile.mkdtemp(prefix="modelos-")
+    os.environ['CONECTACARE_MODELOS'] = diretorio
+    try:
+        inicio = time.perf_counter()
+        carregar_em_massa(caminho, args.pacientes, args.cuidadores, args.agendamentos_por_paciente)
+        print(f"Carga: {args.pacientes} pacientes, {args.pacientes * args.agendamentos_por_paciente} agendamentos "
+              f"em {time.perf_counter() - inicio:.1f} s\n")
+
+        blocos = args.blocos + ([] if args.sem_tudo else [args.pacientes])
+        print(f"{'bloco':>9} {'treino (s)':>11} {'pico (MB)':>10} {'AUC':>7} {'log loss':>9}")
+        resultados = medir_treinamentos(caminho, args.estimador, blocos)
+        for bloco, resultado, pico_mb in resultados:
+            validacao = resultado['validacao'] or {}
+            rotulo = "tudo" if bloco == args.pacientes and not args.sem_tudo else str(bloco)
+            print(f"{rotulo:>9} {resultado['duracao_s']:>11.1f} {pico_mb:>10.0f} {validacao.get('auc', 0):>7.4f} "
+                  f"{validacao.get('log_loss', 0):>9.4f}")
+
+        versoes = [resultado['versao'] for _, resultado, _ in resultados]
+        contagem, vistas, trocas, p99 = medir_troca(caminho, versoes, args.workers, args.clientes, args.duracao,
+                                                    args.intervalo_troca)
+        print(f"\nTroca de versão sob carga ({args.workers} workers, {args.clientes} clientes, {args.duracao:.0f} s): "
+              f"{trocas} ativações, {contagem['ok']} respostas, {contagem['erros']} erros, p99 {p99:.1f} ms")
+        print("Respostas por versão: " + ", ".join(f"{versao}: {n}" for versao, n in sorted(vistas.items())))
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/visao_paciente.py
+# Compara a montagem da visão completa de pacientes (dados + endereço + cuidadores + agendamentos):
+#   - cadeia: o caminho atual do menu (busca do paciente, busca do nome + agendamentos, vínculos e
+#     uma busca por cuidador), cada chamada com a sua conexão;
+#   - cadeia em sessão: as mesmas chamadas reaproveitando uma conexão (sessao_bd);
+#   - visão: repositorio.buscar_visao_paciente, uma consulta por paciente;
+#   - visão em lote: repositorio.buscar_visoes_pacientes, uma consulta por bloco de CPFs.
+# Conta conexões e idas e voltas ao banco com a latência simulada do substituto local.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.benchmarks.visao_paciente --pacientes 5000 --amostra 300 --latencia-ms 2
+
+import argparse
+import random
+import time
+
+from ConectaCareHC.benchmarks.dados_sinteticos import criar_banco_temporario, popular_banco, remover_banco
+from ConectaCareHC.crud import db_local, repositorio
+from ConectaCareHC.crud.db_conexao import sessao_bd
+
+A_PARTIR_DE = "01/01/2026"
+
+SQL_CUIDADORES_DO_PACIENTE = "SELECT CPF_CUIDADOR FROM VINCULOS_PACIENTE_CUIDADOR WHERE CPF_PACIENTE = :cpf"
+
+
+def visao_por_cadeia(cpf):
+    """Monta a visão com as chamadas separadas que o menu faz hoje."""
+    row = repositorio.buscar_paciente_por_cpf(cpf)
+    if row is None:
+        return {}
+    visao = repositorio.pessoa_para_dict(row)
+    repositorio.buscar_nome_paciente(cpf)  # listar_consultas() confirma o paciente de novo
+    visao['agendamentos'] = repositorio.buscar_agendamentos(cpf)
+    visao['cuidadores'] = [repositorio.pessoa_para_dict(repositorio.buscar_cuidador_por_cpf(cpf_cuidador))
+                           for (cpf_cuidador,) in repositorio.executar_sql(SQL_CUIDADORES_DO_PACIENTE, {'cpf': cpf})]
+    return visao
+
+
+def caminho_cadeia(cpfs):
+    return [visao_por_cadeia(cpf) for cpf in cpfs]
+
+
+def caminho_cadeia_em_sessao(cpfs):
+    with sessao_bd():
+        return caminho_cadeia(cpfs)
+
+
+def caminho_visao(cpfs):
+    with sessao_bd():
+        return [repositorio.buscar_visao_paciente(cpf, A_PARTIR_DE) for cpf in cpfs]
+
+
+def caminho_visao_em_lote(cpfs):
+    visoes = repositorio.buscar_visoes_pacientes(cpfs, A_PARTIR_DE)
+    return [visoes[cpf] for cpf in cpfs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visão 360 do paciente x cadeia de consultas.")
+    parser.add_argument("--pacientes", type=int, default=5000)
+    parser.add_argument("--cuidadores", type=int, default=500)
+    parser.add_argument("--agendamentos", type=int, default=4, help="Agendamentos por paciente.")
+    parser.add_argument("--amostra", type=int, default=300, help="Pacientes consultados por caminho.")
+    parser.add_argument("--latencia-ms", type=float, default=2.0, help="Latência simulada por ida e volta.")
+    args = parser.parse_args()
+
+    caminho = criar_banco_temporario()
+    try:
+        cpfs, _ = popular_banco(caminho, args.pacientes, args.cuidadores, args.agendamentos)
+        amostra = random.Random(5).sample(cpfs, min(args.amostra, len(cpfs)))
+
+        # Os caminhos devem devolver o mesmo conteúdo (todos os agendamentos sintéticos são de 2026)
+        for pela_cadeia, em_lote in zip(caminho_cadeia(amostra[:20]), caminho_visao_em_lote(amostra[:20])):
+            pela_cadeia['cuidadores'] = [{c: cuidador[c] for c in repositorio.CAMPOS_CUIDADOR_VISAO}
+                                         for cuidador in pela_cadeia['cuidadores']]
+            if pela_cadeia != em_lote:
+                raise RuntimeError(f"A visão diverge da cadeia de consultas para o CPF {em_lote['cpf']}.")
+
+        db_local.LATENCIA_REDE_S = args.latencia_ms / 1000
+        print(f"Visão de {len(amostra)} pacientes, latência simulada de {args.latencia_ms} ms por ida e volta\n")
+        print(f"{'caminho':<18} {'tempo (s)':>10} {'ms/paciente':>12} {'conexões':>9} {'idas e voltas':>14}")
+        resultados = {}
+        for nome, funcao in (("cadeia", caminho_cadeia), ("cadeia em sessão", caminho_cadeia_em_sessao),
+                             ("visão", caminho_visao), ("visão em lote", caminho_visao_em_lote)):
+            db_local.zerar_estatisticas()
+            inicio = time.perf_counter()
+            funcao(amostra)
+            duracao = time.perf_counter() - inicio
+            resultados[nome] = duracao
+            print(f"{nome:<18} {duracao:>10.2f} {duracao * 1000 / len(amostra):>12.1f} "
+                  f"{db_local.ESTATISTICAS['conexoes']:>9} {db_local.ESTATISTICAS['viagens']:>14}")
+        print(f"\nGanho da visão sobre a cadeia: {resultados['cadeia'] / resultados['visão']:.1f}x "
+              f"(em lote: {resultados['cadeia'] / resultados['visão em lote']:.1f}x)")
+    finally:
+        db_local.LATENCIA_REDE_S = 0.0
+        remover_banco(caminho)
+
+
+if __name__ == "__main__":
+    main()
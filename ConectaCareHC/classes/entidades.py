@@ -1,9 +1,6 @@
 
-# Incluindo a importação da nova função de utilidade para a API
-import ConectaCareHC.utils.api_cep
-from ConectaCareHC.utils.api_cep import buscar_endereco_por_cep
-
-import json
+# As entidades não dependem da API de CEP: o endereço chega pronto (string formatada) de crud/operacoes.py,
+# assim importar as classes não carrega o 'requests'.
 
 class Paciente:
     #Representa um paciente no sistema.
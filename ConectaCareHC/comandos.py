@@ -0,0 +1,636 @@
+# comandos.py
+# Modo scriptado (não interativo) do main.py: subcomandos argparse com saída em JSON lines.
+#
+# Todos os comandos de uma execução rodam no mesmo processo e reutilizam uma única conexão
+# (db_conexao.sessao_bd). Cada resultado é uma linha JSON no stdout; as mensagens informativas
+# das funções de CRUD vão para o stderr.
+#
+# Exemplos (a partir da raiz do repositório):
+#   python ConectaCareHC/main.py paciente get --cpf 48396277893
+#   python ConectaCareHC/main.py paciente list --idade-minima 60
+#   python ConectaCareHC/main.py paciente visao --cpf 48396277893 --cpf 12345678901
+#   python ConectaCareHC/main.py paciente duplicados
+#   python ConectaCareHC/main.py agenda add --cpf 48396277893 --data 10/11/2026
+#   python ConectaCareHC/main.py vinculo sugerir --raio-km 20 --aplicar
+#   python ConectaCareHC/main.py agenda rotas --data 10/11/2026 --workers 4
+#   python ConectaCareHC/main.py agenda arquivar --meses-quentes 12
+#   python ConectaCareHC/main.py lembrete gerar --dias 2
+#   python ConectaCareHC/main.py lembrete enviar --workers 16
+#   python ConectaCareHC/main.py cpf verificar --tabela paciente
+#   python ConectaCareHC/main.py analitico atualizar [--completa]
+#   python ConectaCareHC/main.py analitico relatorio --secao pacientes
+#   python ConectaCareHC/main.py replica sincronizar
+#   python ConectaCareHC/main.py modelo treinar --estimador logistica --epocas 2
+#   python ConectaCareHC/main.py export --format csv --saida pacientes.csv
+#   python ConectaCareHC/main.py export --format ndjson --workers 4 --saida pacientes.ndjson
+#   python ConectaCareHC/main.py lote --arquivo comandos.txt   (ou: ... lote < comandos.txt)
+#   python ConectaCareHC/main.py --perfil cprofile,pilhas paciente visao --cpf 48396277893
+#
+# No modo lote, cada linha do arquivo/stdin é um comando (ex.: "paciente get --cpf 123");
+# linhas vazias e iniciadas por '#' são ignoradas.
+#
+# Cada comando é uma operação rastreada (utils/rastreio.py). Com --perfil (ou CONECTACARE_PERFIL), o perfil
+# pedido é gravado por comando e, ao final, as operações mais lentas são resumidas no stderr.
+
+import argparse
+import contextlib
+import json
+import shlex
+import sys
+import traceback
+from datetime import date
+
+from ConectaCareHC.crud import exportacao, repositorio
+from ConectaCareHC.crud.db_conexao import sessao_bd
+from ConectaCareHC.utils import rastreio
+from ConectaCareHC.utils.cpf import cpf_valido, normalizar_cpf
+from ConectaCareHC.utils.validacao import validar_dados_pessoa
+
+TABELAS = {'paciente': 'PACIENTES', 'cuidador': 'CUIDADORES'}
+
+
+class ErroComando(Exception):
+    """Erro de uso ou de execução de um comando (vira uma linha com "ok": false)."""
+
+
+class AjudaExibida(ErroComando):
+    """-h/--help: a ajuda já foi impressa e o comando não é executado."""
+
+
+class ParserComandos(argparse.ArgumentParser):
+    """ArgumentParser que lança ErroComando em vez de encerrar o processo (necessário no modo lote)."""
+
+    def error(self, message):
+        raise ErroComando(message)
+
+    def exit(self, status=0, message=None):
+        # O argparse só encerra o processo sozinho depois da ajuda (-h), que num lote acabaria com as demais linhas
+        if status:
+            raise ErroComando((message or "").strip() or f"Encerrado com o código {status}.")
+        raise AjudaExibida("Ajuda exibida; o comando não foi executado.")
+
+
+# --- Execução dos comandos ---
+
+def _pessoa_get(args):
+    busca = repositorio.buscar_paciente_por_cpf if args.entidade == 'paciente' else repositorio.buscar_cuidador_por_cpf
+    row = busca(args.cpf)
+    if row is None:
+        raise ErroComando(f"{args.entidade.capitalize()} com CPF {args.cpf} não encontrado(a).")
+    yield repositorio.pessoa_para_dict(row)
+
+
+def _pessoa_list(args):
+    if args.entidade == 'paciente':
+        linhas = repositorio.iterar_pacientes(args.idade_minima)
+    else:
+        linhas = repositorio.iterar_cuidadores()
+    if linhas is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    for row in linhas:
+        yield repositorio.pessoa_para_dict(row)
+
+
+def _paciente_visao(args):
+    if args.a_partir_de is not None and not repositorio.data_valida(args.a_partir_de):
+        raise ErroComando(f"Data inválida: {args.a_partir_de}. Use o formato DD/MM/AAAA.")
+    visoes = repositorio.buscar_visoes_pacientes(args.cpf, args.a_partir_de)
+    if visoes is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    nao_encontrados = [cpf for cpf in args.cpf if cpf not in visoes]
+    yield from visoes.values()
+    if nao_encontrados:
+        raise ErroComando(f"Paciente(s) não encontrado(s): {', '.join(nao_encontrados)}.")
+
+
+def _paciente_duplicados(args):
+    from ConectaCareHC.crud import duplicidade
+
+    resultado = duplicidade.varrer()
+    if resultado is None:
+        raise ErroComando("Erro na varredura de pacientes duplicados.")
+    yield resultado
+
+
+def _pessoa_add(args):
+    dados = {
+        'nome': args.nome, 'cpf': args.cpf, 'idade': args.idade, 'email': args.email,
+        'telefone_contato': args.telefone,
+        'endereco': {'cep': args.cep, 'logradouro': args.logradouro, 'numero': args.numero,
+                     'complemento': args.complemento, 'bairro': args.bairro, 'cidade': args.cidade, 'uf': args.uf},
+    }
+    pessoa, mensagem = validar_dados_pessoa(dados)
+    if mensagem:
+        raise ErroComando(mensagem)
+
+    situacao = repositorio.inserir_pessoa(TABELAS[args.entidade], pessoa)
+    if situacao == repositorio.DUPLICADO:
+        raise ErroComando(f"CPF {args.cpf} já cadastrado.")
+    if situacao is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    yield {'cpf': args.cpf, 'situacao': situacao}
+
+
+def _pessoa_update(args):
+    campos = {c: getattr(args, c) for c in repositorio.CAMPOS_PESSOA_ATUALIZAVEIS + repositorio.CAMPOS_ENDERECO_ATUALIZAVEIS
+              if getattr(args, c, None) is not None}
+    if args.telefone is not None:
+        campos['telefone_contato'] = args.telefone
+    if not campos:
+        raise ErroComando("Nenhum campo para atualizar informado.")
+
+    situacao = repositorio.atualizar_pessoa(TABELAS[args.entidade], args.cpf, campos)
+    if situacao == repositorio.NAO_ENCONTRADO:
+        raise ErroComando(f"{args.entidade.capitalize()} com CPF {args.cpf} não encontrado(a).")
+    if situacao is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    yield {'cpf': args.cpf, 'situacao': situacao, 'campos': sorted(campos)}
+
+
+def _pessoa_delete(args):
+    situacao = repositorio.excluir_pessoa(TABELAS[args.entidade], args.cpf)
+    if situacao == repositorio.NAO_ENCONTRADO:
+        raise ErroComando(f"{args.entidade.capitalize()} com CPF {args.cpf} não encontrado(a).")
+    if situacao == repositorio.COM_DEPENDENCIAS:
+        raise ErroComando("Não é possível excluir o registro. Existem vínculos ou agendamentos associados.")
+    if situacao is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    yield {'cpf': args.cpf, 'situacao': situacao}
+
+
+def _vinculo_add(args):
+    resultado = repositorio.vincular(args.paciente, args.cuidador)
+    if resultado is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        raise ErroComando(f"Paciente com CPF {args.paciente} não encontrado(a).")
+    if resultado['situacao'] == repositorio.CUIDADOR_NAO_ENCONTRADO:
+        raise ErroComando(f"Cuidador(a) com CPF {args.cuidador} não encontrado(a).")
+    yield resultado
+
+
+def _vinculo_proximos(args):
+    from ConectaCareHC.crud import pareamento
+
+    resultado = pareamento.cuidadores_proximos(args.paciente, args.k, args.raio_km)
+    if resultado is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        raise ErroComando(f"Paciente com CPF {args.paciente} não encontrado(a).")
+    if resultado['situacao'] == pareamento.SEM_COORDENADAS:
+        raise ErroComando(f"O CEP do paciente {args.paciente} não tem coordenadas na base de centroides.")
+    yield from resultado['cuidadores']
+
+
+def _vinculo_sugerir(args):
+    from ConectaCareHC.crud import pareamento
+
+    resultado = pareamento.sugerir_vinculos(args.raio_km, args.capacidade)
+    if resultado is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    yield from resultado['sugestoes']
+    if args.aplicar:
+        gravados = pareamento.aplicar_sugestoes(resultado['sugestoes'])
+        if gravados is None:
+            raise ErroComando("Erro ao gravar os vínculos sugeridos.")
+        yield {'vinculos_gravados': gravados[0], 'erros': gravados[1], 'sem_sugestao': resultado['sem_sugestao']}
+    else:
+        yield {'sem_sugestao': resultado['sem_sugestao']}
+
+
+def _agenda_add(args):
+    if not repositorio.data_valida(args.data):
+        raise ErroComando(f"Data inválida: {args.data}. Use o formato DD/MM/AAAA.")
+    resultado = repositorio.agendar(args.cpf, args.data)
+    if resultado is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    if resultado['situacao'] == repositorio.PACIENTE_NAO_ENCONTRADO:
+        raise ErroComando(f"Paciente com CPF {args.cpf} não encontrado(a).")
+    yield {'cpf': args.cpf, 'paciente': resultado['paciente'], 'data_consulta': args.data}
+
+
+def _agenda_list(args):
+    agendamentos = repositorio.buscar_agendamentos(args.cpf, args.de, args.ate)
+    if agendamentos is None:
+        raise ErroComando("Erro ao acessar o banco de dados (verifique as datas no formato DD/MM/AAAA).")
+    for data in agendamentos:
+        yield {'cpf': args.cpf, 'data_consulta': data}
+
+
+def _agenda_rotas(args):
+    from ConectaCareHC.crud import roteirizacao
+
+    if not roteirizacao.data_valida(args.data):
+        raise ErroComando(f"Data inválida: {args.data}. Use o formato DD/MM/AAAA.")
+    if args.cuidador:
+        rotas = [roteirizacao.rota_do_cuidador(args.cuidador, args.data, not args.sem_retorno)]
+        if rotas[0] is None:
+            rotas = None
+    else:
+        rotas = roteirizacao.otimizar_rotas(args.data, args.workers, args.modo, retornar=not args.sem_retorno)
+    if rotas is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    for rota in rotas:
+        yield {'data': args.data, **rota}
+
+
+def _agenda_arquivar(args):
+    from ConectaCareHC.crud import arquivamento
+
+    resultado = arquivamento.arquivar_agendamentos(args.meses_quentes)
+    if resultado is None:
+        raise ErroComando("Erro ao arquivar os agendamentos.")
+    yield dict(resultado, diretorio=arquivamento.diretorio_arquivo())
+
+
+def _lembrete_gerar(args):
+    from ConectaCareHC.crud import lembretes
+
+    resultado = lembretes.gerar_lembretes(args.dias)
+    if resultado is None:
+        raise ErroComando("Erro ao gerar os lembretes.")
+    yield resultado
+
+
+def _lembrete_enviar(args):
+    from ConectaCareHC.crud import lembretes
+
+    resumo = lembretes.despachar(workers=args.workers, tamanho_reserva=args.reserva)
+    if resumo is None:
+        raise ErroComando("Erro ao conectar ao banco de dados.")
+    yield resumo
+
+
+def _lembrete_situacao(args):
+    from ConectaCareHC.crud import lembretes
+
+    situacao = lembretes.situacao_lembretes()
+    if situacao is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+    yield situacao
+
+
+def _analitico_atualizar(args):
+    from ConectaCareHC.crud import analitico
+
+    relatorio = analitico.atualizar(args.completa)
+    if relatorio is None:
+        raise ErroComando("Erro ao atualizar os indicadores.")
+    yield dict(relatorio['metadados'], relatorio=analitico.caminho_relatorio())
+
+
+def _analitico_relatorio(args):
+    from ConectaCareHC.crud import analitico
+
+    relatorio = analitico.carregar_relatorio()
+    if relatorio is None:
+        raise ErroComando("Relatório ainda não gerado (analitico atualizar).")
+    yield {args.secao: relatorio[args.secao]} if args.secao else relatorio
+
+
+def _replica_sincronizar(args):
+    from ConectaCareHC.crud import replica
+
+    resultado = replica.sincronizar(args.completa)
+    if resultado is None:
+        raise ErroComando("Erro ao sincronizar a réplica.")
+    yield resultado
+
+
+def _replica_situacao(args):
+    from ConectaCareHC.crud import replica
+
+    situacao = replica.situacao()
+    if situacao is None:
+        raise ErroComando("Réplica não configurada ou ainda não sincronizada (CONECTACARE_REPLICA).")
+    yield situacao
+
+
+def _modelo_treinar(args):
+    from ConectaCareHC.crud import treinamento
+
+    resultado = treinamento.treinar(args.estimador, args.corte, args.bloco, args.epocas, not args.nao_ativar)
+    if resultado is None:
+        raise ErroComando("Erro ao treinar o modelo.")
+    yield resultado
+
+
+def _modelo_versoes(args):
+    from ConectaCareHC.crud import modelo
+
+    yield from modelo.versoes()
+
+
+def _modelo_ativar(args):
+    from ConectaCareHC.crud import modelo
+
+    if not modelo.ativar(args.versao):
+        raise ErroComando(f"Versão de modelo não encontrada: {args.versao}")
+    yield {'versao': args.versao, 'ativa': True}
+
+
+def _export(args):
+    caminho = args.saida or f"pacientes_consulta_exportada.{args.format}"
+    arquivo = args.saida_padrao if caminho == '-' else open(caminho, 'w', encoding='utf-8', newline='')
+    try:
+        if args.workers:
+            def progresso(concluidas, total, particao):
+                print(f"Exportação: {concluidas}/{total} partições concluídas", file=sys.stderr)
+
+            total = exportacao.exportar_em_paralelo(arquivo, args.format, args.workers, modo=args.modo,
+                                                    progresso=progresso)
+        else:
+            total = exportacao.exportar(arquivo, args.format)
+    finally:
+        if arquivo is not args.saida_padrao:
+            arquivo.close()
+    if total is None:
+        raise ErroComando("Erro ao acessar o banco de dados.")
+
+    if caminho != '-':
+        yield {'arquivo': caminho, 'formato': args.format, 'registros': total}
+
+
+def _cpf_verificar(args):
+    tabelas = [TABELAS[args.tabela]] if args.tabela else list(TABELAS.values())
+    invalidos = 0
+    for tabela in tabelas:
+        verificacao = repositorio.verificar_cpfs(tabela)
+        if verificacao is None:
+            raise ErroComando("Erro ao acessar o banco de dados.")
+        invalidos += len(verificacao['invalidos'])
+        yield verificacao
+    if invalidos:
+        raise ErroComando(f"{invalidos} CPFs inválidos encontrados.")
+
+
+# --- Definição dos subcomandos ---
+
+def _adicionar_subcomandos_pessoa(subparsers, entidade):
+    parser = subparsers.add_parser(entidade, help=f"Operações de {entidade}.")
+    parser.set_defaults(entidade=entidade)
+    acoes = parser.add_subparsers(dest='acao', required=True)
+
+    get = acoes.add_parser('get', help="Consulta por CPF.")
+    get.add_argument('--cpf', type=_cpf, required=True)
+    get.set_defaults(executar=_pessoa_get)
+
+    listar = acoes.add_parser('list', help="Lista todos os registros.")
+    if entidade == 'paciente':
+        listar.add_argument('--idade-minima', type=int, dest='idade_minima', help="Filtra por idade mínima.")
+    listar.set_defaults(executar=_pessoa_list, idade_minima=None)
+
+    if entidade == 'paciente':
+        visao = acoes.add_parser('visao', help="Dados, cuidadores e próximos agendamentos (numa consulta).")
+        visao.add_argument('--cpf', type=_cpf, required=True, action='append', help="Pode ser repetido.")
+        visao.add_argument('--a-partir-de', dest='a_partir_de', help="Data inicial dos agendamentos (DD/MM/AAAA).")
+        visao.set_defaults(executar=_paciente_visao)
+
+        duplicados = acoes.add_parser('duplicados', help="Procura cadastros duplicados (grava pares.csv e o índice "
+                                                         "usado no cadastro interativo).")
+        duplicados.set_defaults(executar=_paciente_duplicados)
+
+    add = acoes.add_parser('add', help="Cadastra (endereço via ViaCEP se só --cep e --numero forem informados).")
+    add.add_argument('--cpf', type=_cpf, required=True)
+    for campo in ('nome', 'email', 'telefone', 'numero'):
+        add.add_argument(f'--{campo}', required=True)
+    add.add_argument('--idade', type=int, required=True)
+    for campo in ('cep', 'logradouro', 'complemento', 'bairro', 'cidade', 'uf'):
+        add.add_argument(f'--{campo}')
+    add.set_defaults(executar=_pessoa_add)
+
+    update = acoes.add_parser('update', help="Atualiza apenas os campos informados.")
+    update.add_argument('--cpf', type=_cpf, required=True)
+    update.add_argument('--idade', type=int)
+    for campo in ('nome', 'email', 'telefone', 'cep', 'logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf'):
+        update.add_argument(f'--{campo}')
+    update.set_defaults(executar=_pessoa_update)
+
+    delete = acoes.add_parser('delete', help="Exclui o cadastro e o endereço associado.")
+    delete.add_argument('--cpf', type=_cpf, required=True)
+    delete.set_defaults(executar=_pessoa_delete)
+
+
+def _cpf(texto):
+    # Todos os argumentos de CPF chegam aos comandos na forma canônica (11 dígitos), como no menu
+    if not cpf_valido(texto):
+        raise argparse.ArgumentTypeError(f"CPF inválido: {texto}")
+    return normalizar_cpf(texto)
+
+
+def _perfil(texto):
+    try:
+        rastreio.perfis_validos(texto)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return texto
+
+
+def criar_parser():
+    parser = ParserComandos(prog="main.py", description="ConectaCare HC - modo scriptado (saída em JSON lines).")
+    parser.add_argument('--perfil', type=_perfil,
+                        help=f"Grava o perfil de cada comando ({', '.join(rastreio.PERFIS)}; combináveis com vírgula).")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    _adicionar_subcomandos_pessoa(subparsers, 'paciente')
+    _adicionar_subcomandos_pessoa(subparsers, 'cuidador')
+
+    vinculo = subparsers.add_parser('vinculo', help="Vínculos paciente <-> cuidador.")
+    vinculo_acoes = vinculo.add_subparsers(dest='acao', required=True)
+    vinculo_add = vinculo_acoes.add_parser('add')
+    vinculo_add.add_argument('--paciente', type=_cpf, required=True, help="CPF do paciente.")
+    vinculo_add.add_argument('--cuidador', type=_cpf, required=True, help="CPF do cuidador.")
+    vinculo_add.set_defaults(executar=_vinculo_add)
+    vinculo_proximos = vinculo_acoes.add_parser('proximos', help="Cuidadores com vaga mais próximos do paciente.")
+    vinculo_proximos.add_argument('--paciente', type=_cpf, required=True, help="CPF do paciente.")
+    vinculo_proximos.add_argument('--k', type=int, default=5)
+    vinculo_proximos.add_argument('--raio-km', type=float, dest='raio_km')
+    vinculo_proximos.set_defaults(executar=_vinculo_proximos)
+    vinculo_sugerir = vinculo_acoes.add_parser('sugerir', help="Sugere cuidadores próximos aos pacientes sem vínculo.")
+    vinculo_sugerir.add_argument('--raio-km', type=float, dest='raio_km')
+    vinculo_sugerir.add_argument('--capacidade', type=int, default=5, help="Pacientes por cuidador.")
+    vinculo_sugerir.add_argument('--aplicar', action='store_true', help="Grava os vínculos sugeridos.")
+    vinculo_sugerir.set_defaults(executar=_vinculo_sugerir)
+
+    agenda = subparsers.add_parser('agenda', help="Agendamentos de consulta.")
+    agenda_acoes = agenda.add_subparsers(dest='acao', required=True)
+    agenda_add = agenda_acoes.add_parser('add')
+    agenda_add.add_argument('--cpf', type=_cpf, required=True)
+    agenda_add.add_argument('--data', required=True, help="Data no formato DD/MM/AAAA.")
+    agenda_add.set_defaults(executar=_agenda_add)
+    agenda_list = agenda_acoes.add_parser('list')
+    agenda_list.add_argument('--cpf', type=_cpf, required=True)
+    agenda_list.add_argument('--de', help="Data inicial (DD/MM/AAAA).")
+    agenda_list.add_argument('--ate', help="Data final, inclusive (DD/MM/AAAA).")
+    agenda_list.set_defaults(executar=_agenda_list)
+    agenda_arquivar = agenda_acoes.add_parser('arquivar', help="Move os meses antigos para o arquivo colunar.")
+    agenda_arquivar.add_argument('--meses-quentes', type=int, default=12, dest='meses_quentes',
+                                 help="Meses anteriores ao atual que permanecem no banco.")
+    agenda_arquivar.set_defaults(executar=_agenda_arquivar)
+    agenda_rotas = agenda_acoes.add_parser('rotas', help="Ordem das visitas do dia de cada cuidador.")
+    agenda_rotas.add_argument('--data', required=True, help="Data no formato DD/MM/AAAA.")
+    agenda_rotas.add_argument('--cuidador', type=_cpf, help="CPF do cuidador (padrão: todos com visitas no dia).")
+    agenda_rotas.add_argument('--sem-retorno', action='store_true', dest='sem_retorno',
+                              help="A rota termina na última visita, sem voltar para o endereço do cuidador.")
+    agenda_rotas.add_argument('--workers', type=int, help="Resolve em paralelo, por faixas de CPF do cuidador.")
+    agenda_rotas.add_argument('--modo', choices=['processos', 'threads'], default='processos',
+                              help="Pool usado com --workers.")
+    agenda_rotas.set_defaults(executar=_agenda_rotas)
+
+    lembrete = subparsers.add_parser('lembrete', help="Lembretes de consulta por e-mail e SMS.")
+    lembrete_acoes = lembrete.add_subparsers(dest='acao', required=True)
+    lembrete_gerar = lembrete_acoes.add_parser('gerar', help="Cria os lembretes dos agendamentos dos próximos dias.")
+    lembrete_gerar.add_argument('--dias', type=int, default=2, help="Agendamentos de hoje até N dias à frente.")
+    lembrete_gerar.set_defaults(executar=_lembrete_gerar)
+    lembrete_enviar = lembrete_acoes.add_parser('enviar', help="Envia os lembretes vencidos e sai.")
+    lembrete_enviar.add_argument('--workers', type=int, default=16, help="Threads de envio.")
+    lembrete_enviar.add_argument('--reserva', type=int, default=500, help="Lembretes reservados por lote.")
+    lembrete_enviar.set_defaults(executar=_lembrete_enviar)
+    lembrete_situacao = lembrete_acoes.add_parser('situacao', help="Quantidade de lembretes por situação e canal.")
+    lembrete_situacao.set_defaults(executar=_lembrete_situacao)
+
+    cpf = subparsers.add_parser('cpf', help="Verificações de CPF na base.")
+    cpf_acoes = cpf.add_subparsers(dest='acao', required=True)
+    cpf_verificar = cpf_acoes.add_parser('verificar', help="Confere os dígitos verificadores de todos os CPFs.")
+    cpf_verificar.add_argument('--tabela', choices=list(TABELAS), help="Padrão: pacientes e cuidadores.")
+    cpf_verificar.set_defaults(executar=_cpf_verificar)
+
+    analitico = subparsers.add_parser('analitico', help="Indicadores operacionais (idades, locais, agenda, carga).")
+    analitico_acoes = analitico.add_subparsers(dest='acao', required=True)
+    analitico_atualizar = analitico_acoes.add_parser(
+        'atualizar', help="Atualiza os indicadores a partir das alterações desde a última execução.")
+    analitico_atualizar.add_argument('--completa', action='store_true', help="Relê todas as tabelas.")
+    analitico_atualizar.set_defaults(executar=_analitico_atualizar)
+    analitico_relatorio = analitico_acoes.add_parser('relatorio', help="Mostra o último relatório gerado.")
+    analitico_relatorio.add_argument('--secao', choices=['pacientes', 'agendamentos', 'cuidadores', 'metadados'])
+    analitico_relatorio.set_defaults(executar=_analitico_relatorio)
+
+    replica = subparsers.add_parser('replica', help="Réplica local de leitura do cadastro (CONECTACARE_REPLICA).")
+    replica_acoes = replica.add_subparsers(dest='acao', required=True)
+    replica_sincronizar = replica_acoes.add_parser(
+        'sincronizar', help="Aplica à réplica as alterações desde a última sincronização.")
+    replica_sincronizar.add_argument('--completa', action='store_true', help="Copia todas as tabelas.")
+    replica_sincronizar.set_defaults(executar=_replica_sincronizar)
+    replica_situacao = replica_acoes.add_parser('situacao', help="Marca e defasagem da réplica.")
+    replica_situacao.set_defaults(executar=_replica_situacao)
+
+    modelo = subparsers.add_parser('modelo', help="Modelo de demanda servido por api_predicao.py.")
+    modelo_acoes = modelo.add_subparsers(dest='acao', required=True)
+    modelo_treinar = modelo_acoes.add_parser('treinar', help="Treina (em blocos) e registra uma nova versão.")
+    modelo_treinar.add_argument('--estimador', choices=['logistica', 'huber', 'bernoulli'], default='logistica')
+    modelo_treinar.add_argument('--corte', type=date.fromisoformat,
+                                help="Início da janela do rótulo, AAAA-MM-DD (padrão: hoje menos a janela).")
+    modelo_treinar.add_argument('--bloco', type=int, default=50_000, help="Pacientes por bloco (partial_fit).")
+    modelo_treinar.add_argument('--epocas', type=int, default=1)
+    modelo_treinar.add_argument('--nao-ativar', action='store_true', dest='nao_ativar',
+                                help="Só grava a versão, sem ativá-la.")
+    modelo_treinar.set_defaults(executar=_modelo_treinar)
+    modelo_versoes = modelo_acoes.add_parser('versoes', help="Lista as versões registradas.")
+    modelo_versoes.set_defaults(executar=_modelo_versoes)
+    modelo_ativar = modelo_acoes.add_parser('ativar', help="Ativa uma versão (volta a uma anterior, por exemplo).")
+    modelo_ativar.add_argument('--versao', required=True)
+    modelo_ativar.set_defaults(executar=_modelo_ativar)
+
+    export = subparsers.add_parser('export', help="Exporta pacientes com endereço.")
+    export.add_argument('--format', choices=exportacao.FORMATOS, default='json')
+    export.add_argument('--saida', help="Arquivo de saída ('-' para stdout). Padrão: pacientes_consulta_exportada.<formato>")
+    export.add_argument('--workers', type=int, help="Exporta em paralelo, por faixas de CPF (saída ordenada por CPF).")
+    export.add_argument('--modo', choices=['processos', 'threads'], default='processos',
+                        help="Pool usado com --workers.")
+    export.set_defaults(executar=_export)
+
+    lote = subparsers.add_parser('lote', help="Executa um comando por linha lido de um arquivo ou do stdin.")
+    lote.add_argument('--arquivo', help="Arquivo de comandos (padrão: stdin).")
+    lote.set_defaults(executar=None)
+
+    return parser
+
+
+def _nome_comando(args):
+    return f"{args.comando} {args.acao}" if getattr(args, 'acao', None) else args.comando
+
+
+def executar_argumentos(parser, argv, saida, linha=None):
+    """Interpreta e executa um comando, escrevendo os resultados em JSON lines. Retorna True se deu certo."""
+    def emitir(registro):
+        if linha is not None:
+            registro = {'linha': linha, **registro}
+        saida.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    comando = " ".join(argv[:2])
+    try:
+        args = parser.parse_args(argv)
+        comando = _nome_comando(args)
+        if args.executar is None:
+            raise ErroComando("O comando 'lote' não pode ser usado dentro de um lote.")
+
+        args.saida_padrao = saida
+        with rastreio.operacao(f"cli {comando}", args.perfil):
+            for resultado in args.executar(args):
+                emitir({'comando': comando, 'ok': True, 'resultado': resultado})
+        return True
+    except ErroComando as e:
+        emitir({'comando': comando, 'ok': False, 'erro': str(e)})
+        return False
+    except Exception as e:
+        # Uma falha inesperada (ex.: arquivo de saída inacessível) encerra só este comando, não o lote
+        traceback.print_exc(file=sys.stderr)
+        emitir({'comando': comando, 'ok': False, 'erro': f"{type(e).__name__}: {e}"})
+        return False
+
+
+def executar_lote(parser, linhas, saida):
+    """Executa uma sequência de comandos (um por linha). Retorna a quantidade de comandos com erro."""
+    falhas = 0
+    for numero, texto in enumerate(linhas, start=1):
+        texto = texto.strip()
+        if not texto or texto.startswith('#'):
+            continue
+        try:
+            argv = shlex.split(texto)
+        except ValueError as e:
+            saida.write(json.dumps({'linha': numero, 'comando': texto, 'ok': False, 'erro': str(e)},
+                                   ensure_ascii=False) + "\n")
+            falhas += 1
+            continue
+        if not executar_argumentos(parser, argv, saida, linha=numero):
+            falhas += 1
+    return falhas
+
+
+def main(argv=None):
+    """Ponto de entrada do modo scriptado. Retorna o código de saída do processo."""
+    argv = sys.argv[1:] if argv is None else argv
+    parser = criar_parser()
+    saida = sys.stdout
+
+    try:
+        args = parser.parse_args(argv)
+    except AjudaExibida:
+        return 0
+    except ErroComando as e:
+        parser.print_usage(sys.stderr)
+        print(f"main.py: erro: {e}", file=sys.stderr)
+        return 2
+
+    # As funções de CRUD imprimem mensagens para humanos; no modo scriptado elas vão para o stderr
+    with contextlib.redirect_stdout(sys.stderr), sessao_bd() as sessao:
+        if sessao is None:
+            saida.write(json.dumps({'comando': _nome_comando(args), 'ok': False,
+                                    'erro': "Não foi possível conectar ao banco de dados."}, ensure_ascii=False) + "\n")
+            return 1
+
+        try:
+            if args.comando == 'lote':
+                parser.set_defaults(perfil=args.perfil)  # O --perfil do lote vale para todas as linhas
+                if args.arquivo:
+                    with open(args.arquivo, encoding='utf-8') as arquivo:
+                        falhas = executar_lote(parser, arquivo, saida)
+                else:
+                    falhas = executar_lote(parser, sys.stdin, saida)
+                return 1 if falhas else 0
+
+            return 0 if executar_argumentos(parser, argv, saida) else 1
+        finally:
+            if args.perfil or rastreio.PERFIL_PADRAO:
+                rastreio.imprimir_resumo(sys.stderr)
@@ -0,0 +1,51 @@
+# crud/alteracoes.py
+# Consumidores do registro de alterações (ALTERACOES, gravado pelos gatilhos de crud/db_local.py ou, no
+# Oracle, pelos de analitico.instrucoes_oracle()): crud/analitico.py e crud/replica.py.
+#
+# Cada consumidor guarda em CONSUMIDORES_ALTERACOES a sua marca (o maior ID_ALTERACAO já aplicado) e, a
+# cada execução, lê as chaves alteradas entre a marca e o maior ID atual. Relê também as últimas
+# MARGEM_REPROCESSAMENTO alterações antes da marca: no Oracle, os IDs da sequência são atribuídos antes do
+# commit, então uma transação longa pode gravar um ID menor que o de outra já lida. Por isso os consumidores
+# aplicam as alterações relendo as linhas atuais das chaves -- reprocessar uma chave não muda o resultado.
+# O registro é limpo até a menor marca dos consumidores (menos a margem).
+
+from ConectaCareHC.crud import registro_sql as reg
+
+MARGEM_REPROCESSAMENTO = 1000
+TAMANHO_BLOCO = 50_000
+
+
+def maior_alteracao(cursor):
+    return reg.MAIOR_ALTERACAO.executar(cursor).fetchone()[0]
+
+
+def marca_registrada(cursor, consumidor):
+    """Marca do consumidor no banco; None se ele ainda não está registrado."""
+    linha = reg.MARCA_CONSUMIDOR.executar(cursor, {'consumidor': consumidor}).fetchone()
+    return None if linha is None else linha.marca
+
+
+def chaves_alteradas(cursor, marca, ate):
+    """{tabela: conjunto de chaves (texto)} alteradas depois de `marca` (com a margem) até `ate`, inclusive."""
+    chaves = {}
+    reg.ALTERACOES_DO_INTERVALO.executar(cursor, {'de': max(marca - MARGEM_REPROCESSAMENTO, 0), 'ate': ate})
+    while True:
+        linhas = cursor.fetchmany(TAMANHO_BLOCO)
+        if not linhas:
+            break
+        for tabela, chave in linhas:
+            chaves.setdefault(tabela, set()).add(str(chave))
+    return chaves
+
+
+def gravar_marca(cursor, consumidor, marca):
+    parametros = {'consumidor': consumidor, 'marca': marca}
+    reg.ATUALIZAR_MARCA_CONSUMIDOR.executar(cursor, parametros)
+    if cursor.rowcount == 0:
+        reg.INSERIR_MARCA_CONSUMIDOR.executar(cursor, parametros)
+
+
+def limpar(cursor):
+    """Apaga o que todos os consumidores já leram. Retorna a quantidade de linhas apagadas."""
+    reg.LIMPAR_ALTERACOES.executar(cursor, {'margem': MARGEM_REPROCESSAMENTO})
+    return cursor.rowcount
@@ -0,0 +1,499 @@
+# crud/analitico.py
+# Indicadores operacionais diários: distribuição de idades e pacientes por UF/cidade, agendamentos por
+# mês (incluindo os meses arquivados, crud/arquivamento.py) e carga dos cuidadores.
+#
+# Os indicadores são calculados com pandas/NumPy sobre um estado colunar mínimo (uma linha por paciente,
+# agendamento e cuidador, só com as colunas usadas), gravado em <diretório>/estado.npz junto do relatório
+# pronto (relatorio.json, servido por api/rotas_analitico.py). A primeira execução (ou --completa) lê as
+# tabelas inteiras em blocos de TAMANHO_BLOCO linhas; as seguintes só releem as chaves registradas em
+# ALTERACOES desde a última marca deste consumidor (CONSUMIDORES_ALTERACOES) e substituem essas linhas
+# no estado -- a chave que não volta na releitura foi excluída.
+#
+# A leitura das alterações e a marca seguem o protocolo de crud/alteracoes.py. A marca só avança no banco
+# depois que o estado e o relatório foram gravados.
+#
+# O diretório é o da variável CONECTACARE_ANALITICO ou dados/analitico. No Oracle, instrucoes_oracle()
+# cria as tabelas e os gatilhos que o substituto local já cria (crud/db_local.py).
+#
+# Uso (cron, a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.analitico [--completa]
+#   python -m ConectaCareHC.crud.analitico --oracle-ddl
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from ConectaCareHC.crud import alteracoes as registro_alteracoes
+from ConectaCareHC.crud import arquivamento
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import conectar_bd
+from ConectaCareHC.crud.db_local import TABELAS_ALTERACOES
+
+CONSUMIDOR = "analitico"
+TAMANHO_BLOCO = 50_000
+# Acima desta fração de chaves alteradas (sobre as linhas do estado), a leitura completa sai mais barata
+FRACAO_INCREMENTAL = 0.2
+LARGURA_FAIXA_IDADE = 10
+ULTIMA_FAIXA_IDADE = 90  # "90+"
+IDADE_IDOSO = 60
+MAIS_CARREGADOS = 10
+CAMINHO_ANALITICO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "analitico")
+
+SECOES = ('pacientes', 'agendamentos', 'cuidadores')
+
+
+def diretorio_analitico():
+    return os.getenv("CONECTACARE_ANALITICO") or CAMINHO_ANALITICO_PADRAO
+
+
+def caminho_relatorio():
+    return os.path.join(diretorio_analitico(), "relatorio.json")
+
+
+def _caminho_estado():
+    return os.path.join(diretorio_analitico(), "estado.npz")
+
+
+# --- Estado ---
+
+class Estado:
+    """Colunas usadas nos indicadores, uma linha por paciente, agendamento e cuidador."""
+
+    def __init__(self):
+        import numpy as np
+
+        self.marca = 0
+        self.cpf_pacientes = np.empty(0, dtype=np.int64)
+        self.idades = np.empty(0, dtype=np.int16)
+        self.locais_pacientes = np.empty(0, dtype=np.int32)  # Índice em self.locais
+        self.locais = []  # "UF\tCIDADE"
+        self._codigos_locais = {}
+        self.id_agendamentos = np.empty(0, dtype=np.int64)
+        self.meses = np.empty(0, dtype=np.int32)  # ano * 12 + mês - 1
+        self.cpf_cuidadores = np.empty(0, dtype=np.int64)
+        self.cargas = np.empty(0, dtype=np.int32)
+        self.arquivados = {}  # {AAAA-MM: (mtime do arquivo, quantidade)}
+
+    def codificar_locais(self, ufs, cidades):
+        """Códigos (índices em self.locais) dos pares UF/cidade, acrescentando os novos."""
+        import numpy as np
+        import pandas as pd
+
+        codigos, unicos = pd.factorize(ufs.str.upper() + "\t" + cidades.str.strip().str.upper())
+        globais = np.empty(len(unicos), dtype=np.int32)
+        for i, local in enumerate(unicos):
+            codigo = self._codigos_locais.get(local)
+            if codigo is None:
+                codigo = self._codigos_locais[local] = len(self.locais)
+                self.locais.append(local)
+            globais[i] = codigo
+        return globais[codigos]
+
+    def gravar(self):
+        """Grava o estado (troca atômica do arquivo)."""
+        import numpy as np
+
+        caminho = _caminho_estado()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        meses = sorted(self.arquivados)
+        temporario = caminho + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            np.savez(arquivo, marca=np.int64(self.marca), cpf_pacientes=self.cpf_pacientes, idades=self.idades,
+                     locais_pacientes=self.locais_pacientes, locais=np.array(self.locais, dtype=str),
+                     id_agendamentos=self.id_agendamentos, meses=self.meses, cpf_cuidadores=self.cpf_cuidadores,
+                     cargas=self.cargas, meses_arquivados=np.array(meses, dtype=str),
+                     contagens_arquivadas=np.array([self.arquivados[m] for m in meses], dtype=np.int64).reshape(-1, 2))
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls):
+        """Estado gravado pela última atualização; None se não houver."""
+        import numpy as np
+
+        try:
+            arquivo = np.load(_caminho_estado())
+        except FileNotFoundError:
+            return None
+        estado = cls()
+        with arquivo:
+            estado.marca = int(arquivo['marca'])
+            for nome in ('cpf_pacientes', 'idades', 'locais_pacientes', 'id_agendamentos', 'meses',
+                         'cpf_cuidadores', 'cargas'):
+                setattr(estado, nome, arquivo[nome])
+            estado.locais = arquivo['locais'].tolist()
+            estado.arquivados = {mes: tuple(contagem) for mes, contagem in
+                                 zip(arquivo['meses_arquivados'].tolist(), arquivo['contagens_arquivadas'].tolist())}
+        estado._codigos_locais = {local: i for i, local in enumerate(estado.locais)}
+        return estado
+
+    def linhas(self):
+        return len(self.cpf_pacientes) + len(self.id_agendamentos) + len(self.cpf_cuidadores)
+
+
+# --- Leitura ---
+
+def _quadro(linhas, colunas):
+    import pandas as pd
+
+    return pd.DataFrame.from_records(linhas, columns=colunas)
+
+
+def _blocos(cursor, consulta, colunas):
+    """DataFrames de até TAMANHO_BLOCO linhas da consulta (fetchmany)."""
+    consulta.executar(cursor)
+    while True:
+        linhas = cursor.fetchmany(TAMANHO_BLOCO)
+        if not linhas:
+            break
+        yield _quadro(linhas, colunas)
+
+
+def _por_chaves(cursor, consultas, chaves, colunas):
+    """Linhas das `chaves` (registro_sql.linhas_por_lista) num só DataFrame."""
+    return _quadro(reg.linhas_por_lista(cursor, consultas, chaves), colunas)
+
+
+def _cpfs_para_bind(cpfs):
+    return [str(cpf).zfill(reg.TAMANHO_CPF) for cpf in cpfs]
+
+
+# Cada bloco lido vira arrays do estado
+def _colunas_pacientes(estado, quadro):
+    import numpy as np
+    import pandas as pd
+
+    return (pd.to_numeric(quadro['cpf']).to_numpy(np.int64), quadro['idade'].to_numpy(np.int16),
+            estado.codificar_locais(quadro['uf'].astype(str), quadro['cidade'].astype(str)))
+
+
+def _colunas_agendamentos(quadro):
+    import numpy as np
+    import pandas as pd
+
+    datas = pd.to_datetime(quadro['data_consulta'], format='ISO8601')
+    return (quadro['id_agendamento'].to_numpy(np.int64),
+            (datas.dt.year * 12 + datas.dt.month - 1).to_numpy(np.int32))
+
+
+def _colunas_cuidadores(quadro):
+    import numpy as np
+    import pandas as pd
+
+    return pd.to_numeric(quadro['cpf']).to_numpy(np.int64), quadro['carga'].to_numpy(np.int32)
+
+
+COLUNAS_PACIENTES = ('cpf', 'idade', 'uf', 'cidade')
+COLUNAS_AGENDAMENTOS = ('id_agendamento', 'data_consulta')
+COLUNAS_CUIDADORES = ('cpf', 'carga')
+TIPOS_PACIENTES = ('int64', 'int16', 'int32')
+TIPOS_AGENDAMENTOS = ('int64', 'int32')
+TIPOS_CUIDADORES = ('int64', 'int32')
+
+
+def _concatenar(partes, tipos):
+    """Concatena as tuplas de arrays de cada bloco, coluna a coluna (arrays vazios de `tipos` sem blocos)."""
+    import numpy as np
+
+    if not partes:
+        return tuple(np.empty(0, dtype=tipo) for tipo in tipos)
+    return tuple(np.concatenate([parte[i] for parte in partes]) for i in range(len(tipos)))
+
+
+def _leitura_completa(cursor, estado):
+    import numpy as np
+
+    partes = [_colunas_pacientes(estado, q) for q in _blocos(cursor, reg.INDICADORES_PACIENTES, COLUNAS_PACIENTES)]
+    estado.cpf_pacientes, estado.idades, estado.locais_pacientes = _concatenar(partes, TIPOS_PACIENTES)
+    partes = [_colunas_agendamentos(q) for q in _blocos(cursor, reg.INDICADORES_AGENDAMENTOS, COLUNAS_AGENDAMENTOS)]
+    estado.id_agendamentos, estado.meses = _concatenar(partes, TIPOS_AGENDAMENTOS)
+    partes = [_colunas_cuidadores(q) for q in _blocos(cursor, reg.INDICADORES_CUIDADORES, COLUNAS_CUIDADORES)]
+    estado.cpf_cuidadores, estado.cargas = _concatenar(partes, TIPOS_CUIDADORES)
+
+
+def _chaves_alteradas(cursor, marca, ate):
+    """{tabela: array ordenado das chaves} alteradas desde a marca."""
+    import numpy as np
+
+    return {tabela: np.unique(np.fromiter(map(int, chaves), dtype=np.int64, count=len(chaves)))
+            for tabela, chaves in registro_alteracoes.chaves_alteradas(cursor, marca, ate).items()}
+
+
+def _substituir(chaves_estado, colunas_estado, chaves, novas):
+    """Remove do estado as linhas das `chaves` e acrescenta as relidas (`novas`, tupla de arrays)."""
+    import numpy as np
+
+    mantidas = ~np.isin(chaves_estado, chaves)
+    return tuple(np.concatenate((coluna[mantidas], nova))
+                 for coluna, nova in zip((chaves_estado,) + colunas_estado, novas))
+
+
+def _leitura_incremental(cursor, estado, ate):
+    """
+    Aplica ao estado as alterações desde a marca. Devolve a quantidade de chaves alteradas ou None se
+    forem tantas que a leitura completa compensa.
+    """
+    import numpy as np
+    import pandas as pd
+
+    alteradas = _chaves_alteradas(cursor, estado.marca, ate)
+    total = sum(len(chaves) for chaves in alteradas.values())
+    if total > FRACAO_INCREMENTAL * max(estado.linhas(), 1):
+        return None
+
+    pacientes = alteradas.get('PACIENTES', np.empty(0, dtype=np.int64))
+    enderecos = alteradas.get('ENDERECOS')
+    if enderecos is not None and len(enderecos):
+        moradores = _por_chaves(cursor, reg.PACIENTES_DOS_ENDERECOS, enderecos.tolist(), ('cpf',))
+        if len(moradores):
+            pacientes = np.union1d(pacientes, pd.to_numeric(moradores['cpf']).to_numpy(np.int64))
+    if len(pacientes):
+        relidos = _por_chaves(cursor, reg.INDICADORES_PACIENTES_POR_CPF, _cpfs_para_bind(pacientes),
+                              COLUNAS_PACIENTES)
+        estado.cpf_pacientes, estado.idades, estado.locais_pacientes = _substituir(
+            estado.cpf_pacientes, (estado.idades, estado.locais_pacientes), pacientes,
+            _colunas_pacientes(estado, relidos) if len(relidos) else _concatenar([], TIPOS_PACIENTES))
+
+    agendamentos = alteradas.get('AGENDAMENTOS')
+    if agendamentos is not None and len(agendamentos):
+        relidos = _por_chaves(cursor, reg.INDICADORES_AGENDAMENTOS_POR_ID, agendamentos.tolist(), COLUNAS_AGENDAMENTOS)
+        estado.id_agendamentos, estado.meses = _substituir(
+            estado.id_agendamentos, (estado.meses,), agendamentos,
+            _colunas_agendamentos(relidos) if len(relidos) else _concatenar([], TIPOS_AGENDAMENTOS))
+
+    # Vínculos registram o CPF do cuidador: a carga dele é relida
+    cuidadores = np.union1d(alteradas.get('CUIDADORES', np.empty(0, dtype=np.int64)),
+                            alteradas.get('VINCULOS_PACIENTE_CUIDADOR', np.empty(0, dtype=np.int64)))
+    if len(cuidadores):
+        relidos = _por_chaves(cursor, reg.INDICADORES_CUIDADORES_POR_CPF, _cpfs_para_bind(cuidadores),
+                              COLUNAS_CUIDADORES)
+        estado.cpf_cuidadores, estado.cargas = _substituir(
+            estado.cpf_cuidadores, (estado.cargas,), cuidadores,
+            _colunas_cuidadores(relidos) if len(relidos) else _concatenar([], TIPOS_CUIDADORES))
+    return total
+
+
+def _atualizar_arquivados(estado):
+    """Contagens dos meses arquivados; só os arquivos modificados desde a última execução são lidos."""
+    estado.arquivados = {mes: arquivamento.contagem_do_mes(mes, estado.arquivados.get(mes))
+                         for mes in arquivamento.meses_arquivados()}
+
+
+# --- Indicadores ---
+
+def _por_uf_e_cidade(por_local):
+    """Contagens por UF e por "CIDADE/UF" (em ordem decrescente) a partir das contagens por local."""
+    uf_cidade = por_local.index.str.split("\t", n=1, expand=True)
+    por_uf = por_local.groupby(uf_cidade.get_level_values(0)).sum()
+    por_cidade = por_local.copy()
+    por_cidade.index = [f"{cidade}/{uf}" for uf, cidade in uf_cidade]
+    return (por_uf.sort_values(ascending=False, kind='stable'),
+            por_cidade.sort_values(ascending=False, kind='stable'))
+
+
+def _resumo_pacientes(estado):
+    import numpy as np
+    import pandas as pd
+
+    idades = estado.idades.astype(np.int64)
+    faixas = np.minimum(np.clip(idades, 0, None) // LARGURA_FAIXA_IDADE, ULTIMA_FAIXA_IDADE // LARGURA_FAIXA_IDADE)
+    contagem_faixas = np.bincount(faixas, minlength=ULTIMA_FAIXA_IDADE // LARGURA_FAIXA_IDADE + 1)
+    rotulos = [f"{inicio}-{inicio + LARGURA_FAIXA_IDADE - 1}"
+               for inicio in range(0, ULTIMA_FAIXA_IDADE, LARGURA_FAIXA_IDADE)] + [f"{ULTIMA_FAIXA_IDADE}+"]
+
+    por_local = pd.Series(np.bincount(estado.locais_pacientes, minlength=len(estado.locais)),
+                          index=pd.Index(estado.locais, dtype=object))
+    por_local = por_local[por_local > 0]
+    if por_local.empty:
+        por_uf = por_cidade = por_local
+    else:
+        por_uf, por_cidade = _por_uf_e_cidade(por_local)
+
+    vazio = not len(idades)
+    return {
+        'total': int(len(idades)),
+        'idade_media': None if vazio else round(float(idades.mean()), 2),
+        'idade_mediana': None if vazio else float(np.median(idades)),
+        'idosos': int((idades >= IDADE_IDOSO).sum()),
+        'faixas_idade': dict(zip(rotulos, contagem_faixas.tolist())),
+        'por_uf': {uf: int(n) for uf, n in por_uf.items()},
+        'por_cidade': {cidade: int(n) for cidade, n in por_cidade.items()},
+    }
+
+
+def _resumo_agendamentos(estado):
+    import numpy as np
+
+    # Agendamentos no banco (inclusive os de meses já arquivados, gravados depois do arquivamento) + arquivo
+    meses, quantidades = np.unique(estado.meses, return_counts=True)
+    por_mes = {f"{mes // 12:04d}-{mes % 12 + 1:02d}": int(n) for mes, n in zip(meses.tolist(), quantidades.tolist())}
+    for mes, (_, quantidade) in estado.arquivados.items():
+        por_mes[mes] = por_mes.get(mes, 0) + int(quantidade)
+    return {
+        'total': sum(por_mes.values()),
+        'no_banco': int(len(estado.meses)),
+        'arquivados': sum(int(quantidade) for _, quantidade in estado.arquivados.values()),
+        'por_mes': dict(sorted(por_mes.items())),
+    }
+
+
+def _resumo_cuidadores(estado):
+    import numpy as np
+
+    cargas = estado.cargas.astype(np.int64)
+    vinculados = cargas[cargas > 0]
+    ordem = np.lexsort((estado.cpf_cuidadores, -cargas))[:MAIS_CARREGADOS]
+    distribuicao, quantidades = np.unique(cargas, return_counts=True)
+    vazio = not len(vinculados)
+    return {
+        'total': int(len(cargas)),
+        'sem_pacientes': int((cargas == 0).sum()),
+        'vinculos': int(cargas.sum()),
+        # Entre os cuidadores com ao menos um paciente
+        'carga_media': None if vazio else round(float(vinculados.mean()), 2),
+        'carga_mediana': None if vazio else float(np.median(vinculados)),
+        'carga_p90': None if vazio else float(np.percentile(vinculados, 90)),
+        'carga_maxima': None if vazio else int(vinculados.max()),
+        'distribuicao_carga': {str(carga): int(n) for carga, n in zip(distribuicao.tolist(), quantidades.tolist())},
+        'mais_carregados': [{'cpf': str(cpf).zfill(reg.TAMANHO_CPF), 'pacientes': int(carga)}
+                            for cpf, carga in zip(estado.cpf_cuidadores[ordem].tolist(), cargas[ordem].tolist())
+                            if carga > 0],
+    }
+
+
+def _gravar_relatorio(relatorio):
+    caminho = caminho_relatorio()
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def carregar_relatorio():
+    """Último relatório gravado (dict); None se ainda não houver."""
+    try:
+        with open(caminho_relatorio(), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+
+# --- Atualização ---
+
+def atualizar(completa=False):
+    """
+    Atualiza o estado e o relatório: só as alterações desde a última execução ou, com `completa` (ou sem
+    estado gravado), a leitura de todas as tabelas.
+
+    Returns:
+        dict: o relatório (seções SECOES e 'metadados'); None em caso de erro.
+    """
+    inicio = time.perf_counter()
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            ate = registro_alteracoes.maior_alteracao(cursor)
+            registrada = registro_alteracoes.marca_registrada(cursor, CONSUMIDOR)
+            estado = None if completa else Estado.carregar()
+            # Sem a marca no banco (ou com ela adiante do estado), as alterações podem ter sido limpas
+            if estado is not None and (registrada is None or registrada > estado.marca):
+                estado = None
+
+            alteracoes = None
+            if estado is not None:
+                alteracoes = _leitura_incremental(cursor, estado, ate)
+            if alteracoes is None:
+                # Reserva as alterações a partir daqui antes da leitura, que pode ser longa
+                registro_alteracoes.gravar_marca(cursor, CONSUMIDOR, ate)
+                conexao.commit()
+                arquivados = estado.arquivados if estado is not None else {}
+                estado = Estado()
+                estado.arquivados = arquivados
+                _leitura_completa(cursor, estado)
+            estado.marca = ate
+            _atualizar_arquivados(estado)
+
+            relatorio = {
+                'pacientes': _resumo_pacientes(estado),
+                'agendamentos': _resumo_agendamentos(estado),
+                'cuidadores': _resumo_cuidadores(estado),
+                'metadados': {
+                    'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                    'marca': ate,
+                    'modo': 'completa' if alteracoes is None else 'incremental',
+                    'chaves_alteradas': alteracoes,
+                    'duracao_s': round(time.perf_counter() - inicio, 3),
+                },
+            }
+            estado.gravar()
+            _gravar_relatorio(relatorio)
+
+            registro_alteracoes.gravar_marca(cursor, CONSUMIDOR, ate)
+            registro_alteracoes.limpar(cursor)
+        conexao.commit()
+        return relatorio
+    except Exception as e:
+        print(f"Erro ao atualizar os indicadores: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Oracle ---
+
+def instrucoes_oracle():
+    """Tabelas de alterações e gatilhos equivalentes aos do substituto local (crud/db_local.py)."""
+    instrucoes = [
+        """CREATE TABLE ALTERACOES (
+    ID_ALTERACAO NUMBER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    TABELA VARCHAR2(30) NOT NULL,
+    CHAVE VARCHAR2(20) NOT NULL
+)""",
+        """CREATE TABLE CONSUMIDORES_ALTERACOES (
+    CONSUMIDOR VARCHAR2(60) PRIMARY KEY,
+    ID_ALTERACAO NUMBER NOT NULL
+)""",
+        "CREATE INDEX IDX_VINCULOS_CUIDADOR ON VINCULOS_PACIENTE_CUIDADOR (CPF_CUIDADOR)",
+    ]
+    for tabela, (chave, colunas, inclusoes_e_exclusoes) in TABELAS_ALTERACOES.items():
+        eventos = f"INSERT OR DELETE OR UPDATE OF {colunas}" if inclusoes_e_exclusoes else f"UPDATE OF {colunas}"
+        registro = f"INSERT INTO ALTERACOES (TABELA, CHAVE) VALUES ('{tabela}', TO_CHAR(:{{}}.{chave}))"
+        instrucoes.append(f"""CREATE OR REPLACE TRIGGER TRG_ALT_{tabela[:20]}
+AFTER {eventos} ON {tabela}
+FOR EACH ROW
+BEGIN
+    IF INSERTING OR UPDATING THEN
+        {registro.format('NEW')};
+    END IF;
+    IF DELETING OR (UPDATING AND :OLD.{chave} <> :NEW.{chave}) THEN
+        {registro.format('OLD')};
+    END IF;
+END;""")
+    return instrucoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Atualiza os indicadores operacionais.")
+    parser.add_argument("--completa", action="store_true", help="Relê todas as tabelas em vez das alterações.")
+    parser.add_argument("--oracle-ddl", action="store_true", help="Só mostra a DDL das alterações no Oracle.")
+    args = parser.parse_args(argv)
+
+    if args.oracle_ddl:
+        print("\n\n".join(i if i.endswith(";") else i + ";" for i in instrucoes_oracle()))
+        return 0
+    relatorio = atualizar(args.completa)
+    if relatorio is None:
+        return 1
+    metadados = relatorio['metadados']
+    print(f"Atualização {metadados['modo']} em {metadados['duracao_s']:.2f} s (marca {metadados['marca']}): "
+          f"{relatorio['pacientes']['total']} pacientes, {relatorio['agendamentos']['total']} agendamentos, "
+          f"{relatorio['cuidadores']['total']} cuidadores. Relatório em {caminho_relatorio()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
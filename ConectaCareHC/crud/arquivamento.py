@@ -0,0 +1,332 @@
+# crud/arquivamento.py
+# Ciclo de vida dos agendamentos: AGENDAMENTOS fica só com os dados "quentes" (os últimos meses e o
+# futuro); os meses antigos vão para arquivos colunares comprimidos, um por mês, fora do banco.
+#
+# - arquivar_agendamentos(): job periódico que, mês a mês, lê os agendamentos anteriores à janela
+#   quente, grava <diretório>/agendamentos_AAAA-MM.npz e só então os exclui do banco. Cada mês é
+#   independente: se a execução for interrompida entre a gravação e a exclusão, a próxima regrava o
+#   mês sem duplicar (ID_AGENDAMENTO é único).
+# - Leitura transparente (repositorio.buscar_agendamentos / iterar_agendamentos): os arquivos só são
+#   lidos quando o período pedido começa antes do horizonte (dia seguinte ao último mês arquivado).
+#
+# Formato: NumPy .npz comprimido (zip/deflate) com um array por coluna -- id_agendamento (int64),
+# cpf_paciente (int64) e data_consulta (datetime64[D]) --, ordenado por CPF para que a busca de um
+# paciente seja uma busca binária. O diretório é o da variável CONECTACARE_ARQUIVO_AGENDAMENTOS ou
+# dados/arquivo_agendamentos.
+#
+# No Oracle, instrucoes_oracle() converte AGENDAMENTOS numa tabela particionada por mês (INTERVAL):
+# as consultas por data passam a ler só as partições do período. No substituto local, o job termina
+# com um VACUUM: sem ele, os índices ficam com páginas quase vazias e as consultas quentes pioram.
+#
+# Uso (cron, a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.arquivamento --meses-quentes 12 [--sem-compactar]
+#   python -m ConectaCareHC.crud.arquivamento --oracle-ddl
+
+import argparse
+import heapq
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from datetime import date
+
+from ConectaCareHC.crud import repositorio
+from ConectaCareHC.crud.db_conexao import Credenciais
+from ConectaCareHC.crud.registro_sql import AGENDAMENTOS_DO_PERIODO, MESES_AGENDAMENTOS_ANTERIORES
+
+MESES_QUENTES = 12
+LINHAS_EM_CACHE = 5_000_000  # ~120 MB: 8 bytes por coluna
+CAMINHO_ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "arquivo_agendamentos")
+
+_RE_ARQUIVO_MES = re.compile(r"^agendamentos_(\d{4}-\d{2})\.npz$")
+
+# Meses lidos recentemente: {caminho: (mtime, colunas)}
+_cache_meses = OrderedDict()
+# Última listagem do diretório: (diretório, mtime, meses)
+_listagem = (None, None, [])
+
+
+def diretorio_arquivo():
+    return os.getenv("CONECTACARE_ARQUIVO_AGENDAMENTOS") or CAMINHO_ARQUIVO_PADRAO
+
+
+def _caminho_mes(mes):
+    return os.path.join(diretorio_arquivo(), f"agendamentos_{mes}.npz")
+
+
+# --- Meses e horizonte ---
+
+def _inicio_do_mes(dia):
+    return dia.replace(day=1)
+
+
+def _somar_meses(dia, meses):
+    """Primeiro dia do mês `meses` depois (ou antes, se negativo) do mês de `dia`."""
+    indice = dia.year * 12 + dia.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _mes_para_data(mes):
+    ano, numero = mes.split("-")
+    return date(int(ano), int(numero), 1)
+
+
+def meses_arquivados():
+    """Meses (AAAA-MM) presentes no arquivo, em ordem. A listagem só é refeita quando o diretório muda."""
+    global _listagem
+    diretorio = diretorio_arquivo()
+    try:
+        modificado = os.stat(diretorio).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if _listagem[:2] != (diretorio, modificado):
+        meses = sorted(m.group(1) for m in map(_RE_ARQUIVO_MES.match, os.listdir(diretorio)) if m)
+        _listagem = (diretorio, modificado, meses)
+    return _listagem[2]
+
+
+def horizonte():
+    """Primeiro dia depois do último mês arquivado (antes dele, os dados podem estar no arquivo); None sem arquivo."""
+    meses = meses_arquivados()
+    return _somar_meses(_mes_para_data(meses[-1]), 1) if meses else None
+
+
+def corte_padrao(meses_quentes=MESES_QUENTES, hoje=None):
+    """Data a partir da qual os agendamentos ficam no banco: início do mês atual menos `meses_quentes`."""
+    return _somar_meses(_inicio_do_mes(hoje or date.today()), -meses_quentes)
+
+
+# --- Arquivos ---
+
+def _carregar_mes(mes):
+    """Colunas do mês (dict de arrays), com cache dos meses lidos por último (até LINHAS_EM_CACHE linhas)."""
+    import numpy as np
+
+    caminho = _caminho_mes(mes)
+    modificado = os.path.getmtime(caminho)
+    em_cache = _cache_meses.get(caminho)
+    if em_cache and em_cache[0] == modificado:
+        _cache_meses.move_to_end(caminho)
+        return em_cache[1]
+    with np.load(caminho) as arquivo:
+        colunas = {nome: arquivo[nome] for nome in arquivo.files}
+    _cache_meses[caminho] = (modificado, colunas)
+    while len(_cache_meses) > 1 and sum(len(c['id_agendamento']) for _, c in _cache_meses.values()) > LINHAS_EM_CACHE:
+        _cache_meses.popitem(last=False)
+    return colunas
+
+
+def _gravar_mes(mes, ids, cpfs, datas):
+    """Grava (ou completa) o arquivo do mês, sem repetir IDs. A troca do arquivo é atômica (os.replace)."""
+    import numpy as np
+
+    caminho = _caminho_mes(mes)
+    if os.path.exists(caminho):
+        existentes = _carregar_mes(mes)
+        ids = np.concatenate((existentes['id_agendamento'], ids))
+        cpfs = np.concatenate((existentes['cpf_paciente'], cpfs))
+        datas = np.concatenate((existentes['data_consulta'], datas))
+        _, unicos = np.unique(ids, return_index=True)
+        ids, cpfs, datas = ids[unicos], cpfs[unicos], datas[unicos]
+
+    ordem = np.lexsort((ids, datas, cpfs))
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as arquivo:
+        np.savez_compressed(arquivo, id_agendamento=ids[ordem], cpf_paciente=cpfs[ordem], data_consulta=datas[ordem])
+    os.replace(temporario, caminho)
+    _cache_meses.pop(caminho, None)
+
+
+def contagem_do_mes(mes, anterior=None):
+    """
+    (mtime do arquivo em ns, quantidade de agendamentos) de um mês arquivado; só a coluna de IDs é lida.
+    `anterior` é uma contagem já conhecida, devolvida sem abrir o arquivo se ele não mudou desde então.
+    """
+    import numpy as np
+
+    caminho = _caminho_mes(mes)
+    modificado = os.stat(caminho).st_mtime_ns
+    if anterior is not None and anterior[0] == modificado:
+        return anterior
+    with np.load(caminho) as arquivo:
+        return modificado, len(arquivo['id_agendamento'])
+
+
+def _meses_do_periodo(inicio, fim):
+    """Meses arquivados que têm dias em [inicio, fim) (datas; None = sem limite)."""
+    return [mes for mes in meses_arquivados()
+            if (inicio is None or _somar_meses(_mes_para_data(mes), 1) > inicio)
+            and (fim is None or _mes_para_data(mes) < fim)]
+
+
+def _mascara_periodo(datas, inicio, fim):
+    import numpy as np
+
+    mascara = np.ones(len(datas), dtype=bool)
+    if inicio is not None:
+        mascara &= datas >= np.datetime64(inicio, 'D')
+    if fim is not None:
+        mascara &= datas < np.datetime64(fim, 'D')
+    return mascara
+
+
+def agendamentos_do_paciente(cpf_paciente, inicio=None, fim=None):
+    """
+    Agendamentos arquivados do paciente em [inicio, fim) (datas; None = sem limite).
+    Não lê nenhum arquivo se o período começar no horizonte ou depois dele.
+
+    Returns:
+        list: (id_agendamento, data AAAA-MM-DD); None em caso de erro.
+    """
+    limite = horizonte()
+    if limite is None or (inicio is not None and inicio >= limite):
+        return []
+    try:
+        numero = int(cpf_paciente)
+    except (TypeError, ValueError):
+        return []
+
+    import numpy as np
+
+    encontrados = []
+    try:
+        for mes in _meses_do_periodo(inicio, fim):
+            colunas = _carregar_mes(mes)
+            cpfs = colunas['cpf_paciente']
+            de, ate = np.searchsorted(cpfs, numero, 'left'), np.searchsorted(cpfs, numero, 'right')
+            datas = colunas['data_consulta'][de:ate]
+            ids = colunas['id_agendamento'][de:ate]
+            mascara = _mascara_periodo(datas, inicio, fim)
+            encontrados += zip(ids[mascara].tolist(), datas[mascara].astype(str).tolist())
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao ler o arquivo de agendamentos: {e}")
+        return None
+    return encontrados
+
+
+def iterar_arquivados(inicio=None, fim=None):
+    """Gerador dos agendamentos arquivados em [inicio, fim), em ordem de data e ID (dicts de AGENDAMENTOS_DO_PERIODO)."""
+    import numpy as np
+
+    for mes in _meses_do_periodo(inicio, fim):
+        colunas = _carregar_mes(mes)
+        mascara = _mascara_periodo(colunas['data_consulta'], inicio, fim)
+        ids, cpfs, datas = (colunas[c][mascara] for c in ('id_agendamento', 'cpf_paciente', 'data_consulta'))
+        ordem = np.lexsort((ids, datas))
+        for id_agendamento, cpf, data in zip(ids[ordem].tolist(), cpfs[ordem].tolist(), datas[ordem].astype(str).tolist()):
+            yield {'id_agendamento': id_agendamento, 'cpf_paciente': f"{cpf:011d}", 'data_consulta': data}
+
+
+def mesclar_com_arquivo(inicio, fim, atrasados, recentes):
+    """
+    Junta, em ordem de data e ID, os arquivados de [inicio, fim) com as linhas do banco: `atrasados`
+    (anteriores ao horizonte, gravadas depois do último arquivamento) e `recentes` (a partir do horizonte).
+    """
+    def chave(item):
+        return item['data_consulta'], item['id_agendamento']
+
+    yield from heapq.merge(iterar_arquivados(inicio, fim), atrasados, key=chave)
+    yield from recentes
+
+
+# --- Job de arquivamento ---
+
+def compactar_banco_local():
+    """VACUUM do substituto local (reconstrói tabelas e índices sem as páginas liberadas). True se executou."""
+    Credenciais.carregar()
+    if not Credenciais.DB_LOCAL:
+        return False
+    conexao = sqlite3.connect(Credenciais.DB_LOCAL, timeout=30, isolation_level=None)
+    try:
+        conexao.execute("VACUUM")
+    finally:
+        conexao.close()
+    return True
+
+
+def arquivar_agendamentos(meses_quentes=MESES_QUENTES, antes_de=None, compactar=True, progresso=None):
+    """
+    Move para o arquivo os agendamentos anteriores a `antes_de` (data; padrão: corte_padrao(meses_quentes)),
+    um mês por vez.
+
+    Args:
+        compactar (bool): no substituto local, executa compactar_banco_local() se algo foi arquivado.
+        progresso: função chamada com (mes, quantidade) depois de cada mês arquivado.
+
+    Returns:
+        dict: {'corte': AAAA-MM-DD, 'meses': [...], 'agendamentos': total}; None em caso de erro.
+    """
+    import numpy as np
+
+    corte = antes_de or corte_padrao(meses_quentes)
+    meses = repositorio.executar_sql(MESES_AGENDAMENTOS_ANTERIORES, {'corte': corte.isoformat()})
+    if meses is None:
+        return None
+
+    arquivados, total = [], 0
+    for mes, _ in meses:
+        inicio = _mes_para_data(mes)
+        fim = min(_somar_meses(inicio, 1), corte)
+        linhas = repositorio.executar_sql(AGENDAMENTOS_DO_PERIODO, {'inicio': inicio.isoformat(), 'fim': fim.isoformat()})
+        if linhas is None:
+            return None
+        if not linhas:
+            continue
+        try:
+            ids = np.fromiter((row.id_agendamento for row in linhas), dtype=np.int64, count=len(linhas))
+            cpfs = np.array([row.cpf_paciente for row in linhas]).astype(np.int64)
+            datas = np.array([row.data_consulta for row in linhas], dtype='datetime64[D]')
+            _gravar_mes(mes, ids, cpfs, datas)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao gravar o arquivo de {mes}: {e}")
+            return None
+        if repositorio.excluir_agendamentos(ids.tolist()) is None:
+            return None
+        arquivados.append(mes)
+        total += len(linhas)
+        if progresso:
+            progresso(mes, len(linhas))
+    if compactar and total:
+        try:
+            compactar_banco_local()
+        except sqlite3.Error as e:
+            print(f"Agendamentos arquivados, mas o banco local não foi compactado: {e}")
+    return {'corte': corte.isoformat(), 'meses': arquivados, 'agendamentos': total}
+
+
+# --- Oracle ---
+
+def instrucoes_oracle():
+    """DDL que particiona AGENDAMENTOS por mês (Oracle 12.2+, online) com índices locais."""
+    return [
+        """ALTER TABLE AGENDAMENTOS MODIFY
+    PARTITION BY RANGE (DATA_CONSULTA) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+    (PARTITION AGENDAMENTOS_INICIAL VALUES LESS THAN (DATE '2000-01-01'))
+    ONLINE UPDATE INDEXES (IDX_AGENDAMENTOS_PACIENTE LOCAL)""",
+        "CREATE INDEX IDX_AGENDAMENTOS_DATA ON AGENDAMENTOS (DATA_CONSULTA) LOCAL",
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arquiva os agendamentos antigos em arquivos colunares.")
+    parser.add_argument("--meses-quentes", type=int, default=MESES_QUENTES,
+                        help="Meses anteriores ao atual que permanecem no banco.")
+    parser.add_argument("--oracle-ddl", action="store_true", help="Só mostra a DDL de particionamento do Oracle.")
+    parser.add_argument("--sem-compactar", action="store_true", help="Não executa o VACUUM no substituto local.")
+    args = parser.parse_args(argv)
+
+    if args.oracle_ddl:
+        print(";\n\n".join(instrucoes_oracle()) + ";")
+        return 0
+    resultado = arquivar_agendamentos(args.meses_quentes, compactar=not args.sem_compactar,
+                                      progresso=lambda mes, n: print(f"{mes}: {n} agendamentos"))
+    if resultado is None:
+        return 1
+    print(f"{resultado['agendamentos']} agendamentos anteriores a {resultado['corte']} arquivados "
+          f"em {diretorio_arquivo()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
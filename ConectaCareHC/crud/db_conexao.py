@@ -1,29 +1,174 @@
-
-import oracledb
 import os
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager
 
-load_dotenv()
+# O driver (oracledb) e o python-dotenv só são importados quando a primeira conexão é aberta,
+# para que a inicialização do menu não pague esse custo.
+#
+# Com o rastreio ligado (utils/rastreio.py), as conexões são envolvidas por ConexaoRastreada
+# (crud/db_rastreio.py); o rastreio também só é importado na abertura da primeira conexão.
 
 
 class Credenciais:
-    USER = os.getenv("ORACLE_USER", "rm565421")
-    PASSWORD = os.getenv("ORACLE_PASSWORD", "090407")
+    # Preenchidas na primeira conexão (carregar), depois de ler o arquivo .env
+    USER = None
+    PASSWORD = None
     DSN = "oracle.fiap.com.br:1521/orcl"
+    # Caminho de um arquivo SQLite para usar o substituto local (crud/db_local.py) no lugar do Oracle
+    DB_LOCAL = None
+    # Réplica local de leitura (crud/replica.py): arquivo ('' = desligada) e defasagem aceita em segundos
+    REPLICA = None
+    REPLICA_DEFASAGEM_S = None
+
+    _carregadas = False
+
+    @classmethod
+    def carregar(cls):
+        """Lê o .env e as variáveis de ambiente uma única vez (valores já definidos no código são mantidos)."""
+        if cls._carregadas:
+            return
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        if cls.USER is None:
+            cls.USER = os.getenv("ORACLE_USER", "rm565421")
+        if cls.PASSWORD is None:
+            cls.PASSWORD = os.getenv("ORACLE_PASSWORD", "090407")
+        if cls.DB_LOCAL is None:
+            cls.DB_LOCAL = os.getenv("CONECTACARE_DB_LOCAL")
+        if cls.REPLICA is None:
+            cls.REPLICA = os.getenv("CONECTACARE_REPLICA", "")
+        if cls.REPLICA_DEFASAGEM_S is None:
+            cls.REPLICA_DEFASAGEM_S = float(os.getenv("CONECTACARE_REPLICA_DEFASAGEM_S", "60"))
+        cls._carregadas = True
+
+
+class ConexaoCompartilhada:
+    """Conexão de uma sessão reaproveitada por várias operações: close() não a encerra."""
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+    def close(self):
+        pass
+
+
+# Sessão ativa (ver sessao_bd); enquanto existir, conectar_bd() devolve sempre a mesma conexão
+_sessao = None
+# Thread que está abrindo a sessão em segundo plano (ver iniciar_sessao_em_segundo_plano)
+_abertura_pendente = None
+
+
+def _aguardar_abertura():
+    global _abertura_pendente
+    if _abertura_pendente is not None:
+        _abertura_pendente.join()
+        _abertura_pendente = None
+
+
+def iniciar_sessao_em_segundo_plano():
+    """
+    Começa a abrir a conexão da sessão numa thread enquanto o menu é exibido.
+    A primeira chamada a conectar_bd() aguarda a abertura; se ela falhar, cada operação volta
+    a abrir a sua própria conexão (e o erro é mostrado nesse momento).
+    """
+    global _abertura_pendente
+    if _sessao is not None or _abertura_pendente is not None:
+        return
+
+    def abrir():
+        global _sessao
+        conexao = _abrir_conexao(avisar=False)
+        if conexao:
+            _sessao = ConexaoCompartilhada(conexao)
+
+    _abertura_pendente = threading.Thread(target=abrir, name="abertura-conexao-bd", daemon=True)
+    _abertura_pendente.start()
 
 
+def encerrar_sessao():
+    """Fecha a conexão da sessão (se houver)."""
+    global _sessao
+    _aguardar_abertura()
+    if _sessao is not None:
+        conexao, _sessao = _sessao, None
+        conexao._conexao.close()
+
+
+@contextmanager
+def sessao_bd():
+    """
+    Abre uma única conexão e a reutiliza em todas as chamadas de conectar_bd() dentro do bloco
+    (modo scriptado do main.py). Sessões aninhadas reaproveitam a conexão da sessão externa.
+    """
+    global _sessao
+    _aguardar_abertura()
+    if _sessao is not None:
+        yield _sessao
+        return
+
+    conexao = _abrir_conexao()
+    if not conexao:
+        yield None
+        return
+
+    _sessao = ConexaoCompartilhada(conexao)
+    try:
+        yield _sessao
+    finally:
+        encerrar_sessao()
 
 
 def conectar_bd():
-    """Tenta estabelecer uma conexão com o banco de dados Oracle."""
+    """Tenta estabelecer uma conexão com o banco de dados Oracle (ou devolve a da sessão ativa)."""
+    _aguardar_abertura()
+    if _sessao is not None:
+        return _sessao
+    return _abrir_conexao()
+
+
+def nova_conexao():
+    """Abre uma conexão própria, fora da sessão ativa (ex.: workers do processamento paralelo)."""
+    return _abrir_conexao(avisar=False)
+
+
+def _abrir_conexao(avisar=True):
+    """Abre uma nova conexão com o Oracle (ou com o substituto local, se configurado)."""
+    from ConectaCareHC.utils import rastreio
+
+    with rastreio.trecho('bd', 'conectar'):
+        conexao = _conectar(avisar)
+    if conexao and rastreio.ATIVO:
+        from ConectaCareHC.crud.db_rastreio import ConexaoRastreada
+
+        return ConexaoRastreada(conexao)
+    return conexao
+
+
+def _conectar(avisar):
+    from ConectaCareHC.crud.registro_sql import TAMANHO_CACHE_INSTRUCOES
+
+    Credenciais.carregar()
+    if Credenciais.DB_LOCAL:
+        from ConectaCareHC.crud.db_local import conectar_bd_local
+        return conectar_bd_local(Credenciais.DB_LOCAL, stmtcachesize=TAMANHO_CACHE_INSTRUCOES)
+
+    import oracledb
+
     try:
-        # A conexão será fechada automaticamente ao sair do bloco 'with'
-        conexao = oracledb.connect(user=Credenciais.USER, password=Credenciais.PASSWORD, dsn=Credenciais.DSN)
-        print("Conexão com o banco de dados Oracle estabelecida!")
+        # A conexão será fechada automaticamente ao sair do bloco 'with'.
+        # O cache de instruções comporta todas as instruções registradas em registro_sql.
+        conexao = oracledb.connect(user=Credenciais.USER, password=Credenciais.PASSWORD, dsn=Credenciais.DSN,
+                                   stmtcachesize=TAMANHO_CACHE_INSTRUCOES)
+        if avisar:
+            print("Conexão com o banco de dados Oracle estabelecida!")
         return conexao
     except oracledb.Error as e:
         erro, = e.args
-        print(f" Erro ao conectar ao Oracle: {erro.message}")
-        print("Verifique suas credenciais e a disponibilidade do serviço.")
+        if avisar:
+            print(f" Erro ao conectar ao Oracle: {erro.message}")
+            print("Verifique suas credenciais e a disponibilidade do serviço.")
         return None
-
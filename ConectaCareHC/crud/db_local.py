@@ -0,0 +1,478 @@
+# crud/db_local.py
+# Substituto local (SQLite) do banco Oracle, usado em desenvolvimento, demonstrações e benchmarks.
+#
+# É ativado definindo a variável de ambiente CONECTACARE_DB_LOCAL com o caminho do arquivo SQLite
+# (veja db_conexao.conectar_bd). Emula a parte da API do oracledb que o projeto usa:
+#   - cursor como context manager e binds nomeados (:nome)
+#   - cursor.var() com "RETURNING ... INTO :var" (também em executemany)
+#   - executemany(..., batcherrors=True) + cursor.getbatcherrors()
+#   - TO_DATE/TO_CHAR com máscaras Oracle (DD/MM/YYYY etc.), TO_NUMBER, MOD e a tabela DUAL
+#   - "FETCH FIRST n ROWS ONLY" (traduzido para LIMIT)
+#   - mensagens de erro com os códigos ORA-00001, ORA-02291 e ORA-02292
+# Os gatilhos de ALTERACOES (GATILHOS_ALTERACOES) fazem o papel dos do Oracle em analitico.instrucoes_oracle().
+# Com remota=False (réplica de leitura, crud/replica.py), a conexão não simula a latência de rede abaixo.
+#
+# Para benchmarks, LATENCIA_REDE_S simula o custo de rede do Oracle remoto: cada ida e volta ao
+# servidor (execute, executemany, commit e cada lote de `arraysize` linhas lido além das
+# `prefetchrows` que vêm com o execute) espera esse tempo, e a abertura da conexão conta como
+# VIAGENS_POR_CONEXAO idas e voltas (handshake + autenticação). ESTATISTICAS conta ambos.
+
+import functools
+import math
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+NUMBER = "NUMBER"  # Equivalente ao oracledb.NUMBER para cursor.var()
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ENDERECOS (
+    ID_ENDERECO INTEGER PRIMARY KEY AUTOINCREMENT,
+    CEP VARCHAR(8),
+    LOGRADOURO VARCHAR(150) NOT NULL,
+    NUMERO VARCHAR(20) NOT NULL,
+    COMPLEMENTO VARCHAR(100),
+    BAIRRO VARCHAR(100) NOT NULL,
+    CIDADE VARCHAR(100) NOT NULL,
+    UF VARCHAR(2) NOT NULL,
+    LATITUDE REAL,
+    LONGITUDE REAL
+);
+CREATE TABLE IF NOT EXISTS PACIENTES (
+    CPF VARCHAR(11) PRIMARY KEY,
+    NOME VARCHAR(150) NOT NULL,
+    IDADE INTEGER NOT NULL,
+    EMAIL VARCHAR(150),
+    TELEFONE_CONTATO VARCHAR(20),
+    ID_ENDERECO INTEGER NOT NULL REFERENCES ENDERECOS (ID_ENDERECO)
+);
+CREATE TABLE IF NOT EXISTS CUIDADORES (
+    CPF VARCHAR(11) PRIMARY KEY,
+    NOME VARCHAR(150) NOT NULL,
+    IDADE INTEGER NOT NULL,
+    EMAIL VARCHAR(150),
+    TELEFONE_CONTATO VARCHAR(20),
+    ID_ENDERECO INTEGER NOT NULL REFERENCES ENDERECOS (ID_ENDERECO)
+);
+CREATE TABLE IF NOT EXISTS VINCULOS_PACIENTE_CUIDADOR (
+    CPF_PACIENTE VARCHAR(11) NOT NULL REFERENCES PACIENTES (CPF),
+    CPF_CUIDADOR VARCHAR(11) NOT NULL REFERENCES CUIDADORES (CPF),
+    PRIMARY KEY (CPF_PACIENTE, CPF_CUIDADOR)
+);
+CREATE TABLE IF NOT EXISTS AGENDAMENTOS (
+    ID_AGENDAMENTO INTEGER PRIMARY KEY AUTOINCREMENT,
+    CPF_PACIENTE VARCHAR(11) NOT NULL REFERENCES PACIENTES (CPF),
+    DATA_CONSULTA DATE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IDX_AGENDAMENTOS_PACIENTE ON AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA);
+CREATE INDEX IF NOT EXISTS IDX_AGENDAMENTOS_DATA ON AGENDAMENTOS (DATA_CONSULTA);
+CREATE TABLE IF NOT EXISTS LEMBRETES (
+    ID_LEMBRETE INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_AGENDAMENTO INTEGER NOT NULL,
+    CANAL VARCHAR(5) NOT NULL,
+    DESTINO VARCHAR(150) NOT NULL,
+    ENVIAR_EM DATE NOT NULL,
+    SITUACAO VARCHAR(10) DEFAULT 'PENDENTE' NOT NULL,
+    CHAVE VARCHAR(40) NOT NULL UNIQUE,
+    RESERVA VARCHAR(64),
+    RESERVADO_ATE DATE,
+    TENTATIVAS INTEGER DEFAULT 0 NOT NULL,
+    ENVIADO_EM DATE,
+    ULTIMO_ERRO VARCHAR(200)
+);
+CREATE INDEX IF NOT EXISTS IDX_LEMBRETES_DEVIDOS ON LEMBRETES (SITUACAO, ENVIAR_EM);
+CREATE INDEX IF NOT EXISTS IDX_LEMBRETES_RESERVA ON LEMBRETES (RESERVA);
+CREATE INDEX IF NOT EXISTS IDX_VINCULOS_CUIDADOR ON VINCULOS_PACIENTE_CUIDADOR (CPF_CUIDADOR);
+CREATE TABLE IF NOT EXISTS ALTERACOES (
+    ID_ALTERACAO INTEGER PRIMARY KEY AUTOINCREMENT,
+    TABELA VARCHAR(30) NOT NULL,
+    CHAVE VARCHAR(20) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS CONSUMIDORES_ALTERACOES (
+    CONSUMIDOR VARCHAR(60) PRIMARY KEY,
+    ID_ALTERACAO INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS DUAL (DUMMY VARCHAR(1));
+INSERT INTO DUAL (DUMMY) SELECT 'X' WHERE NOT EXISTS (SELECT 1 FROM DUAL);
+"""
+
+# Registro das alterações (ALTERACOES) lido pelas atualizações incrementais (crud/analitico.py) e pela
+# réplica de leitura (crud/replica.py): cada inclusão, exclusão ou alteração das colunas usadas por eles
+# grava a tabela e a chave da linha.
+# {tabela: (coluna da chave, colunas cuja alteração é registrada, registra inclusões e exclusões)}
+COLUNAS_PESSOA_REGISTRADAS = 'CPF, NOME, IDADE, EMAIL, TELEFONE_CONTATO, ID_ENDERECO'
+TABELAS_ALTERACOES = {
+    'PACIENTES': ('CPF', COLUNAS_PESSOA_REGISTRADAS, True),
+    # Endereço novo ou excluído chega pela pessoa
+    'ENDERECOS': ('ID_ENDERECO', 'CEP, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF, LATITUDE, LONGITUDE', False),
+    'AGENDAMENTOS': ('ID_AGENDAMENTO', 'ID_AGENDAMENTO, DATA_CONSULTA', True),
+    'CUIDADORES': ('CPF', COLUNAS_PESSOA_REGISTRADAS, True),
+    # Pela chave do cuidador: quem lê relê todos os vínculos dele
+    'VINCULOS_PACIENTE_CUIDADOR': ('CPF_CUIDADOR', 'CPF_PACIENTE, CPF_CUIDADOR', True),
+}
+
+
+def _gatilhos_alteracoes():
+    """{nome: CREATE TRIGGER} -- sem IF NOT EXISTS, como o SQLite guarda o texto em sqlite_master."""
+    gatilhos = {}
+    for tabela, (chave, colunas, inclusoes_e_exclusoes) in TABELAS_ALTERACOES.items():
+        registro = "INSERT INTO ALTERACOES (TABELA, CHAVE)"
+        nome = f"TRG_ALT_{tabela[:20]}"
+        if inclusoes_e_exclusoes:
+            gatilhos[f"{nome}_I"] = (f"CREATE TRIGGER {nome}_I AFTER INSERT ON {tabela} "
+                                     f"BEGIN {registro} VALUES ('{tabela}', NEW.{chave}); END")
+            gatilhos[f"{nome}_D"] = (f"CREATE TRIGGER {nome}_D AFTER DELETE ON {tabela} "
+                                     f"BEGIN {registro} VALUES ('{tabela}', OLD.{chave}); END")
+        # Se a própria chave mudou, registra a antiga e a nova
+        gatilhos[f"{nome}_U"] = (f"CREATE TRIGGER {nome}_U AFTER UPDATE OF {colunas} ON {tabela} "
+                                 f"BEGIN {registro} SELECT '{tabela}', NEW.{chave} UNION SELECT '{tabela}', OLD.{chave}; END")
+    return gatilhos
+
+
+GATILHOS_ALTERACOES = _gatilhos_alteracoes()
+
+
+def criar_gatilhos_alteracoes(conexao):
+    """Cria os gatilhos que faltam e recria os que mudaram de definição (conexão sqlite3)."""
+    existentes = dict(conexao.execute("SELECT NAME, SQL FROM sqlite_master WHERE TYPE = 'trigger'"))
+    for nome, sql in GATILHOS_ALTERACOES.items():
+        if existentes.get(nome) != sql:
+            conexao.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            conexao.execute(sql)
+
+# Colunas incluídas depois da criação do esquema: acrescentadas aos arquivos criados antes delas
+_COLUNAS_ACRESCENTADAS = {'ENDERECOS': ('LATITUDE REAL', 'LONGITUDE REAL')}
+
+# Estatísticas iniciais (formato da sqlite_stat1) de índices que começam por uma coluna de poucos valores,
+# como as que o otimizador do Oracle teria. Sem elas, no UPDATE de reserva dos lembretes o SQLite prefere
+# IDX_LEMBRETES_DEVIDOS (SITUACAO = ?), que percorre todos os pendentes, à chave primária. Um ANALYZE as
+# substitui pelas reais.
+_ESTATISTICAS_INDICES = {('LEMBRETES', 'IDX_LEMBRETES_DEVIDOS'): "1000000 250000 2"}
+
+# Máscaras Oracle -> strftime (a ordem importa: YYYY antes de YY, HH24 antes de HH)
+_MASCARAS = [("YYYY", "%Y"), ("HH24", "%H"), ("MM", "%m"), ("DD", "%d"), ("MI", "%M"), ("SS", "%S")]
+
+_RE_FETCH_FIRST = re.compile(r"\bFETCH\s+FIRST\s+(:?\w+)\s+ROWS?\s+ONLY\b", re.IGNORECASE)
+_RE_RETURNING = re.compile(r"\bRETURNING\s+(.+?)\s+INTO\s+(:\w+(?:\s*,\s*:\w+)*)\s*$", re.IGNORECASE | re.DOTALL)
+
+_esquemas_criados = set()
+_trava_esquema = threading.Lock()
+
+LATENCIA_REDE_S = 0.0
+VIAGENS_POR_CONEXAO = 3
+ESTATISTICAS = {'conexoes': 0, 'viagens': 0}
+_trava_estatisticas = threading.Lock()
+
+
+def _ida_e_volta(quantidade=1):
+    """Registra (e, se configurado, simula a latência de) idas e voltas ao servidor."""
+    with _trava_estatisticas:
+        ESTATISTICAS['viagens'] += quantidade
+    if LATENCIA_REDE_S:
+        time.sleep(LATENCIA_REDE_S * quantidade)
+
+
+def zerar_estatisticas():
+    with _trava_estatisticas:
+        ESTATISTICAS['conexoes'] = 0
+        ESTATISTICAS['viagens'] = 0
+
+
+class ErroBancoLocal(sqlite3.DatabaseError):
+    """Erro do substituto local com mensagem no formato ORA-xxxxx, como o oracledb."""
+
+
+@functools.lru_cache(maxsize=64)
+def _mascara_para_strftime(mascara):
+    formato = mascara.upper()
+    for oracle, python in _MASCARAS:
+        formato = formato.replace(oracle, python)
+    return formato
+
+
+def _to_date(texto, mascara="YYYY-MM-DD"):
+    """TO_DATE: converte o texto para o formato ISO, que é como o SQLite guarda datas."""
+    if texto is None:
+        return None
+    data = datetime.strptime(str(texto), _mascara_para_strftime(mascara))
+    if data.hour or data.minute or data.second:
+        return data.strftime("%Y-%m-%d %H:%M:%S")
+    return data.strftime("%Y-%m-%d")
+
+
+def _to_char(valor, mascara=None):
+    """TO_CHAR: formata uma data ISO com a máscara Oracle (ou converte o valor para texto)."""
+    if valor is None:
+        return None
+    if mascara is None:
+        return str(valor)
+    # As datas são guardadas em ISO (ver _to_date): fromisoformat é bem mais rápido que strptime
+    return datetime.fromisoformat(str(valor)).strftime(_mascara_para_strftime(mascara))
+
+
+def _to_number(texto):
+    if texto is None:
+        return None
+    numero = float(texto)
+    return int(numero) if numero.is_integer() else numero
+
+
+def _mod(dividendo, divisor):
+    """MOD do Oracle: mesmo sinal do dividendo e MOD(n, 0) = n."""
+    if dividendo is None or divisor is None:
+        return None
+    if divisor == 0:
+        return dividendo
+    return math.fmod(dividendo, divisor) if isinstance(dividendo, float) or isinstance(divisor, float) else \
+        (abs(dividendo) % abs(divisor)) * (1 if dividendo >= 0 else -1)
+
+
+@functools.lru_cache(maxsize=256)
+def _traduzir_sql(sql):
+    """Trechos da sintaxe Oracle sem equivalente direto no SQLite."""
+    return _RE_FETCH_FIRST.sub(r"LIMIT \1", sql)
+
+
+def _traduzir_erro(erro, sql):
+    """Converte erros do SQLite para as mensagens ORA-xxxxx que o restante do código reconhece."""
+    mensagem = str(erro)
+    if "UNIQUE constraint failed" in mensagem or "PRIMARY KEY" in mensagem:
+        return ErroBancoLocal(f"ORA-00001: unique constraint violated ({mensagem})")
+    if "FOREIGN KEY constraint failed" in mensagem:
+        if sql.lstrip().upper().startswith("DELETE"):
+            return ErroBancoLocal(f"ORA-02292: integrity constraint violated - child record found ({mensagem})")
+        return ErroBancoLocal(f"ORA-02291: integrity constraint violated - parent key not found ({mensagem})")
+    return ErroBancoLocal(mensagem)
+
+
+class VariavelLocal:
+    """Equivalente ao retorno de cursor.var(): recebe os valores de RETURNING ... INTO."""
+
+    def __init__(self):
+        self._valores = []
+
+    def getvalue(self, pos=0):
+        return self._valores[pos] if pos < len(self._valores) else None
+
+
+class ErroLote:
+    """Equivalente aos objetos devolvidos por cursor.getbatcherrors() no oracledb."""
+
+    def __init__(self, offset, message):
+        self.offset = offset
+        self.message = message
+
+
+class CursorLocal:
+    """Cursor com a interface do oracledb sobre um cursor sqlite3."""
+
+    def __init__(self, conexao_sqlite, remota=True):
+        self._cursor = conexao_sqlite.cursor()
+        self._remota = remota
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rowfactory = None
+        self._linhas_no_buffer = 0  # linhas já trazidas do "servidor" e ainda não lidas
+        self._erros_lote = []
+        self._contagens_lote = []
+        self._binds_saida = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _ida_e_volta(self):
+        if self._remota:
+            _ida_e_volta()
+
+    def __iter__(self):
+        while True:
+            linhas = self.fetchmany()
+            if not linhas:
+                return
+            yield from linhas
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def var(self, tipo=None, *args, **kwargs):
+        return VariavelLocal()
+
+    def setinputsizes(self, *args, **kwargs):
+        # O SQLite não usa tipos de bind pré-declarados; só guardamos as variáveis de saída
+        # (RETURNING ... INTO) declaradas por nome, como no executemany do oracledb.
+        self._binds_saida = {nome: v for nome, v in kwargs.items() if isinstance(v, VariavelLocal)}
+
+    def _separar_returning(self, sql, parametros):
+        """Remove o 'INTO :var' do RETURNING e separa as variáveis de saída dos binds de entrada."""
+        encontrado = _RE_RETURNING.search(sql)
+        if not encontrado or not isinstance(parametros, dict):
+            return sql, parametros, []
+        nomes = [nome.strip()[1:] for nome in encontrado.group(2).split(",")]
+        variaveis = [parametros[nome] if nome in parametros else self._binds_saida[nome] for nome in nomes]
+        entrada = {k: v for k, v in parametros.items() if k not in nomes}
+        sql_sqlite = sql[:encontrado.start()] + f"RETURNING {encontrado.group(1)}"
+        return sql_sqlite, entrada, variaveis
+
+    def _executar(self, sql, parametros):
+        sql_sqlite, entrada, variaveis = self._separar_returning(_traduzir_sql(sql), parametros)
+        try:
+            self._cursor.execute(sql_sqlite, entrada if entrada is not None else {})
+            if variaveis:
+                linhas = self._cursor.fetchall()
+                linha = linhas[0] if linhas else None
+                for i, variavel in enumerate(variaveis):
+                    variavel._valores.append([linha[i]] if linha else [])
+        except sqlite3.Error as e:
+            for variavel in variaveis:
+                variavel._valores.append([])  # Mantém as posições alinhadas às linhas do lote
+            raise _traduzir_erro(e, sql) from e
+
+    def execute(self, sql, parametros=None):
+        self._ida_e_volta()
+        self.rowfactory = None  # Como no driver, a fábrica de linhas vale só para a instrução atual
+        self._executar(sql, parametros)
+        # Como no Oracle, a própria execução já traz as primeiras `prefetchrows` linhas da consulta
+        self._linhas_no_buffer = self.prefetchrows
+        return self
+
+    def executemany(self, sql, lista_parametros, batcherrors=False, arraydmlrowcounts=False):
+        self._erros_lote = []
+        self._contagens_lote = []
+        self._ida_e_volta()
+        if not _RE_RETURNING.search(sql) and not batcherrors and not arraydmlrowcounts:
+            try:
+                self._cursor.executemany(_traduzir_sql(sql), lista_parametros)
+                return
+            except sqlite3.Error as e:
+                raise _traduzir_erro(e, sql) from e
+        # RETURNING, batcherrors e arraydmlrowcounts exigem execução linha a linha no SQLite
+        for offset, parametros in enumerate(lista_parametros):
+            try:
+                self._executar(sql, parametros)
+                self._contagens_lote.append(max(self._cursor.rowcount, 0))
+            except ErroBancoLocal as e:
+                if not batcherrors:
+                    raise
+                self._erros_lote.append(ErroLote(offset, str(e)))
+                self._contagens_lote.append(0)
+
+    def getbatcherrors(self):
+        return self._erros_lote
+
+    def getarraydmlrowcounts(self):
+        return self._contagens_lote
+
+    def _entregar(self, linhas, pedidas):
+        """
+        Contabiliza as idas e voltas da leitura: cada viagem traz `arraysize` linhas e, se o
+        resultado acabou antes do pedido, é preciso ler uma posição a mais para saber disso.
+        """
+        necessarias = len(linhas) + (1 if pedidas is None or len(linhas) < pedidas else 0)
+        while necessarias > self._linhas_no_buffer:
+            self._ida_e_volta()
+            self._linhas_no_buffer += max(self.arraysize, 1)
+        self._linhas_no_buffer -= necessarias
+        if self.rowfactory is not None:
+            return [self.rowfactory(*linha) for linha in linhas]
+        return linhas
+
+    def fetchone(self):
+        linhas = self._entregar(self._cursor.fetchmany(1), 1)
+        return linhas[0] if linhas else None
+
+    def fetchmany(self, tamanho=None):
+        tamanho = tamanho or self.arraysize
+        return self._entregar(self._cursor.fetchmany(tamanho), tamanho)
+
+    def fetchall(self):
+        return self._entregar(self._cursor.fetchall(), None)
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexaoLocal:
+    """Conexão com a interface do oracledb sobre um arquivo SQLite."""
+
+    def __init__(self, caminho, stmtcachesize=20, remota=True):
+        self._remota = remota
+        # O cache de instruções preparadas do sqlite3 faz o papel do stmtcachesize do oracledb
+        self.stmtcachesize = stmtcachesize
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False,
+                                        cached_statements=stmtcachesize)
+        self._conexao.execute("PRAGMA foreign_keys = ON")
+        self._conexao.create_function("TO_DATE", 2, _to_date, deterministic=True)
+        self._conexao.create_function("TO_CHAR", 2, _to_char, deterministic=True)
+        self._conexao.create_function("TO_CHAR", 1, _to_char, deterministic=True)
+        self._conexao.create_function("TO_NUMBER", 1, _to_number, deterministic=True)
+        self._conexao.create_function("MOD", 2, _mod, deterministic=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def conexao_sqlite(self):
+        """A sqlite3.Connection por trás desta conexão (PRAGMA, EXPLAIN QUERY PLAN...), sem a tradução de SQL."""
+        return self._conexao
+
+    def cursor(self):
+        return CursorLocal(self._conexao, self._remota)
+
+    def commit(self):
+        if self._remota:
+            _ida_e_volta()
+        self._conexao.commit()
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def close(self):
+        self._conexao.close()
+
+
+def criar_esquema(caminho):
+    """Cria as tabelas do sistema no arquivo SQLite (uma vez por processo e arquivo)."""
+    with _trava_esquema:
+        if caminho in _esquemas_criados:
+            return
+        conexao = sqlite3.connect(caminho, timeout=30)
+        try:
+            conexao.execute("PRAGMA journal_mode = WAL")
+            conexao.executescript(ESQUEMA)
+            criar_gatilhos_alteracoes(conexao)
+            for tabela, colunas in _COLUNAS_ACRESCENTADAS.items():
+                existentes = {row[1] for row in conexao.execute(f"PRAGMA table_info({tabela})")}
+                for coluna in colunas:
+                    if coluna.split()[0] not in existentes:
+                        conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna}")
+            conexao.execute("ANALYZE sqlite_schema")  # Só cria a sqlite_stat1, se ainda não existir
+            for (tabela, indice), estatistica in _ESTATISTICAS_INDICES.items():
+                conexao.execute("INSERT INTO sqlite_stat1 (tbl, idx, stat) SELECT ?, ?, ? "
+                                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_stat1 WHERE idx = ?)",
+                                (tabela, indice, estatistica, indice))
+            conexao.commit()
+        finally:
+            conexao.close()
+        _esquemas_criados.add(caminho)
+
+
+def conectar_bd_local(caminho, stmtcachesize=20):
+    """Abre uma conexão com o substituto local, criando o esquema se necessário."""
+    criar_esquema(caminho)
+    with _trava_estatisticas:
+        ESTATISTICAS['conexoes'] += 1
+    _ida_e_volta(VIAGENS_POR_CONEXAO)
+    return ConexaoLocal(caminho, stmtcachesize)
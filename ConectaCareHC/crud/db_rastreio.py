@@ -0,0 +1,110 @@
+# crud/db_rastreio.py
+# Conexões e cursores rastreados (utils/rastreio.py), usados por db_conexao._abrir_conexao e pela réplica
+# (crud/replica.py) quando o rastreio está ligado: a abertura, cada execute/executemany, as leituras e o
+# commit viram trechos 'bd' da operação atual, com o nome da instrução registrada em registro_sql (ou o
+# início do SQL, para as não registradas). Fica fora de db_conexao para que o menu não importe o rastreio
+# na inicialização.
+
+import re
+from functools import lru_cache
+
+from ConectaCareHC.utils import rastreio
+
+
+@lru_cache(maxsize=1024)
+def nome_da_instrucao(sql):
+    """Nome registrado em registro_sql para o texto `sql` ou, se não houver, as três primeiras palavras."""
+    from ConectaCareHC.crud.registro_sql import CONSULTAS
+
+    # As instruções com lista IN entram em CONSULTAS no primeiro uso, possivelmente em outra thread
+    for consulta in tuple(CONSULTAS.values()):
+        if consulta.sql == sql:
+            return consulta.nome
+    return " ".join(re.findall(r"\w+", sql)[:3]).lower()
+
+
+class CursorRastreado:
+    """Cursor que cronometra execute, executemany e as leituras como trechos 'bd' da operação atual."""
+
+    __slots__ = ('_cursor', '_nome')
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_nome', None)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __setattr__(self, nome, valor):
+        # rowfactory, arraysize, prefetchrows... valem para o cursor real
+        setattr(self._cursor, nome, valor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._cursor.close()
+
+    def __iter__(self):
+        # A leitura por iteração é feita em lotes de `arraysize`, como no driver
+        while True:
+            linhas = self.fetchmany()
+            if not linhas:
+                return
+            yield from linhas
+
+    def execute(self, sql, parametros=None, **kwargs):
+        nome = nome_da_instrucao(sql)
+        object.__setattr__(self, '_nome', nome)
+        with rastreio.trecho('bd', nome):
+            if parametros is None:
+                resultado = self._cursor.execute(sql, **kwargs)
+            else:
+                resultado = self._cursor.execute(sql, parametros, **kwargs)
+        return self if resultado is self._cursor else resultado
+
+    def executemany(self, sql, lista_parametros, **kwargs):
+        nome = nome_da_instrucao(sql)
+        object.__setattr__(self, '_nome', nome)
+        with rastreio.trecho('bd', nome):
+            return self._cursor.executemany(sql, lista_parametros, **kwargs)
+
+    def fetchone(self):
+        with rastreio.trecho('bd', f"{self._nome} (leitura)"):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, tamanho=None):
+        with rastreio.trecho('bd', f"{self._nome} (leitura)"):
+            return self._cursor.fetchmany(tamanho or self._cursor.arraysize)
+
+    def fetchall(self):
+        with rastreio.trecho('bd', f"{self._nome} (leitura)"):
+            return self._cursor.fetchall()
+
+
+class ConexaoRastreada:
+    """Conexão cujos cursores são CursorRastreado; commit e rollback também viram trechos 'bd'."""
+
+    def __init__(self, conexao):
+        # Os demais atributos (ex.: conexao_sqlite do substituto local) vêm da conexão envolvida, por __getattr__
+        self._original = conexao
+
+    def __getattr__(self, nome):
+        return getattr(self._original, nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._original.close()
+
+    def cursor(self):
+        return CursorRastreado(self._original.cursor())
+
+    def commit(self):
+        with rastreio.trecho('bd', 'commit'):
+            self._original.commit()
+
+    def rollback(self):
+        with rastreio.trecho('bd', 'rollback'):
+            self._original.rollback()
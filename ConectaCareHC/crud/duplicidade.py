@@ -0,0 +1,487 @@
+# crud/duplicidade.py
+# Detecção de pacientes duplicados -- a mesma pessoa cadastrada duas vezes, com o nome ou o endereço
+# escritos de outro jeito ou com outro CPF (erro de digitação que ainda forma um CPF válido) -- sobre
+# PACIENTES ⋈ ENDERECOS.
+#
+# Em vez de comparar todos os pares, cada paciente recebe chaves de bloqueio e só quem compartilha
+# alguma chave é comparado (tempo quase linear):
+#   - CEP;
+#   - ano de nascimento aproximado (ano de referência - IDADE) + prefixo do nome (3 letras do primeiro e
+#     do último nome);
+#   - MinHash LSH dos trigramas do nome: NUM_BANDAS bandas de LINHAS_POR_BANDA valores, cada uma junto
+#     com o ano aproximado -- nomes com similaridade de Jaccard alta caem juntos em alguma banda.
+# As chaves com ano são geradas para o ano e o ano + 1, então idades com 1 ano de diferença (cadastros
+# feitos em épocas diferentes) se encontram. Blocos com mais de LIMITE_BLOCO pacientes (um CEP de
+# condomínio, um nome muito comum) não são comparados naquela chave.
+#
+# Um par é duplicado provável quando os nomes têm similaridade (Jaccard dos trigramas) >= LIMIAR_NOME,
+# as idades diferem em até DIFERENCA_MAXIMA_ANOS e há ao menos um indício: mesmo CEP, mesmo endereço
+# (logradouro, número e cidade), mesmo e-mail, mesmo telefone ou CPF parecido (os 9 primeiros dígitos
+# com um dígito trocado ou dois vizinhos invertidos -- os erros de digitação comuns). O MinHash também
+# dá a estimativa da similaridade, usada para descartar pares antes do cálculo exato.
+#
+# Varredura (cron): lê a tabela em blocos e grava em <diretório>/pares.csv os pares encontrados e em
+# indice.npz as chaves de cada paciente. Verificação online (operacoes.cadastrar_paciente): procura as
+# chaves do novo cadastro no índice e compara também os pacientes incluídos ou alterados depois da
+# varredura (registro de alterações, crud/alteracoes.py). Sem índice, a verificação não é feita.
+#
+# O diretório é o da variável CONECTACARE_DUPLICIDADE ou dados/duplicidade.
+#
+# Uso (cron, a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.duplicidade
+#   python ConectaCareHC/main.py paciente duplicados
+
+import argparse
+import csv
+import os
+import time
+import unicodedata
+from datetime import date
+
+from ConectaCareHC.crud import alteracoes as registro_alteracoes
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import conectar_bd
+
+CONSUMIDOR = "duplicidade"
+TAMANHO_BLOCO = 50_000
+NUM_BANDAS = 8
+LINHAS_POR_BANDA = 5
+SEMENTE_MINHASH = 41
+PRIMO_MINHASH = 2_147_483_647  # 2^31 - 1
+LIMITE_BLOCO = 100
+LIMIAR_NOME = 0.6
+# A estimativa do MinHash (NUM_BANDAS * LINHAS_POR_BANDA valores) erra ~0,1 para mais ou para menos
+MARGEM_ESTIMATIVA = 0.2
+DIFERENCA_MAXIMA_ANOS = 1
+PARES_POR_LOTE = 2_000_000
+BLOCO_ASSINATURAS = 100_000
+CAMINHO_DUPLICIDADE_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "duplicidade")
+
+# Tipo de chave, misturado no hash para separar os espaços de chaves
+CHAVE_CEP, CHAVE_PREFIXO, CHAVE_LSH = 1, 2, 3
+# Indícios, na ordem dos bits de `motivos`
+INDICIOS = ('mesmo CEP', 'mesmo endereço', 'mesmo e-mail', 'mesmo telefone', 'CPF parecido')
+
+
+def diretorio_duplicidade():
+    return os.getenv("CONECTACARE_DUPLICIDADE") or CAMINHO_DUPLICIDADE_PADRAO
+
+
+def caminho_pares():
+    return os.path.join(diretorio_duplicidade(), "pares.csv")
+
+
+def _caminho_indice():
+    return os.path.join(diretorio_duplicidade(), "indice.npz")
+
+
+# --- Normalização e similaridade ---
+
+def normalizar_nome(nome):
+    """Maiúsculas sem acentos, só letras e um espaço entre as palavras."""
+    sem_acentos = unicodedata.normalize('NFKD', nome or '').encode('ascii', 'ignore').decode('ascii')
+    return " ".join("".join(c if c.isalpha() else " " for c in sem_acentos.upper()).split())
+
+
+def _trigramas(normalizado):
+    texto = f" {normalizado} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def similaridade_nomes(a, b):
+    """Similaridade de Jaccard entre os trigramas dos dois nomes (0 a 1)."""
+    trigramas_a, trigramas_b = _trigramas(normalizar_nome(a)), _trigramas(normalizar_nome(b))
+    if not trigramas_a or not trigramas_b:
+        return 0.0
+    return len(trigramas_a & trigramas_b) / len(trigramas_a | trigramas_b)
+
+
+def _so_digitos(texto):
+    return "".join(c for c in str(texto or '') if c.isdigit())
+
+
+def _hash_textos(textos):
+    """Hash (uint64) de cada texto; 0 para o texto vazio."""
+    import numpy as np
+    import pandas as pd
+
+    valores = np.array(textos, dtype=object)
+    hashes = pd.util.hash_array(valores)
+    hashes[valores == ''] = 0
+    return hashes
+
+
+def _splitmix(x):
+    import numpy as np
+
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _misturar(tipo, *colunas):
+    """Chave (uint64) de cada linha a partir do tipo e das colunas inteiras (splitmix64 encadeado)."""
+    import numpy as np
+
+    chaves = np.full(len(colunas[0]), tipo, dtype=np.uint64)
+    for coluna in colunas:
+        chaves = _splitmix(chaves ^ np.asarray(coluna).astype(np.uint64))
+    return chaves
+
+
+def _parametros_minhash():
+    import numpy as np
+
+    rng = np.random.default_rng(SEMENTE_MINHASH)
+    quantidade = NUM_BANDAS * LINHAS_POR_BANDA
+    return (rng.integers(1, PRIMO_MINHASH, quantidade, dtype=np.int64),
+            rng.integers(0, PRIMO_MINHASH, quantidade, dtype=np.int64))
+
+
+def _assinaturas(normalizados):
+    """MinHash dos trigramas de cada nome normalizado: matriz (nomes x NUM_BANDAS * LINHAS_POR_BANDA)."""
+    import numpy as np
+
+    a, b = _parametros_minhash()
+    assinaturas = np.empty((len(normalizados), len(a)), dtype=np.uint32)
+    for inicio in range(0, len(normalizados), BLOCO_ASSINATURAS):
+        textos = np.array([f" {nome} " for nome in normalizados[inicio:inicio + BLOCO_ASSINATURAS]], dtype=bytes)
+        if textos.dtype.itemsize < 3:
+            textos = textos.astype('S3')
+        largura = textos.dtype.itemsize
+        caracteres = textos.view(np.uint8).reshape(len(textos), largura).astype(np.int64)
+        # Cada trigrama vira um inteiro de 24 bits; os que passam do fim do nome ficam de fora do mínimo
+        trigramas = (caracteres[:, :-2] << 16) | (caracteres[:, 1:-1] << 8) | caracteres[:, 2:]
+        fora = np.arange(largura - 2) >= (np.char.str_len(textos) - 2)[:, None]
+        for k in range(len(a)):
+            valores = (a[k] * trigramas + b[k]) % PRIMO_MINHASH
+            valores[fora] = PRIMO_MINHASH
+            assinaturas[inicio:inicio + len(textos), k] = valores.min(axis=1)
+    return assinaturas
+
+
+# --- Registros e chaves ---
+
+class Registros:
+    """Colunas usadas na comparação, uma linha por paciente (linhas na ordem de COLUNAS_DUPLICIDADE)."""
+
+    def __init__(self, linhas=(), ano_referencia=None):
+        import numpy as np
+
+        colunas = list(zip(*linhas)) if linhas else [()] * len(reg.COLUNAS_DUPLICIDADE)
+        cpfs, nomes, idades, emails, telefones, ceps, logradouros, numeros, cidades, ufs = colunas
+        self.cpfs = np.array([int(cpf) for cpf in cpfs], dtype=np.int64)
+        self.nomes = list(nomes)
+        self.normalizados = [normalizar_nome(nome) for nome in nomes]
+        self.anos = (ano_referencia or date.today().year) - np.array(idades, dtype=np.int32)
+        self.ceps = np.array([int(_so_digitos(cep) or 0) for cep in ceps], dtype=np.int64)
+        self.emails = _hash_textos([(email or '').strip().lower() for email in emails])
+        self.telefones = _hash_textos([_so_digitos(telefone) for telefone in telefones])
+        self.enderecos = _hash_textos(
+            [f"{normalizar_nome(logradouro)}|{str(numero or '').strip().upper()}|{normalizar_nome(cidade)}|"
+             f"{str(uf or '').strip().upper()}" if logradouro else ''
+             for logradouro, numero, cidade, uf in zip(logradouros, numeros, cidades, ufs)])
+        self.prefixos = _hash_textos([f"{partes[0][:3]}|{partes[-1][:3]}" if partes else ''
+                                      for partes in (nome.split() for nome in self.normalizados)])
+        self.assinaturas = _assinaturas(self.normalizados)
+
+    def __len__(self):
+        return len(self.cpfs)
+
+    @classmethod
+    def juntar(cls, partes):
+        import numpy as np
+
+        registros = cls()
+        if partes:
+            for nome, valor in vars(registros).items():
+                if isinstance(valor, list):
+                    setattr(registros, nome, [item for parte in partes for item in getattr(parte, nome)])
+                else:
+                    setattr(registros, nome, np.concatenate([getattr(parte, nome) for parte in partes]))
+        return registros
+
+
+def _chaves(registros, deslocamentos):
+    """
+    Chaves de bloqueio dos registros: (chaves, linha de cada chave, deslocamento do ano de cada chave).
+    As chaves com ano são geradas uma vez para cada deslocamento de `deslocamentos`.
+    """
+    import numpy as np
+
+    linhas = np.arange(len(registros), dtype=np.int64)
+    com_cep = registros.ceps > 0
+    chaves = [_misturar(CHAVE_CEP, registros.ceps[com_cep])]
+    de = [linhas[com_cep]]
+    desvios = [np.zeros(int(com_cep.sum()), dtype=np.int8)]
+    for deslocamento in deslocamentos:
+        anos = registros.anos + deslocamento
+        chaves.append(_misturar(CHAVE_PREFIXO, anos, registros.prefixos))
+        for banda in range(NUM_BANDAS):
+            valores = registros.assinaturas[:, banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA]
+            chaves.append(_misturar(CHAVE_LSH, np.full(len(registros), banda), anos, *valores.T))
+        de += [linhas] * (NUM_BANDAS + 1)
+        desvios += [np.full(len(registros), deslocamento, dtype=np.int8)] * (NUM_BANDAS + 1)
+    return np.concatenate(chaves), np.concatenate(de), np.concatenate(desvios)
+
+
+def _pares_dos_blocos(chaves, linhas, estatisticas):
+    """Pares (i, j) de linhas com a mesma chave, em lotes de até PARES_POR_LOTE; blocos grandes são pulados."""
+    import numpy as np
+
+    ordem = np.argsort(chaves, kind='stable')
+    chaves, linhas = chaves[ordem], linhas[ordem]
+    inicios = np.concatenate(([0], np.flatnonzero(chaves[1:] != chaves[:-1]) + 1))
+    tamanhos = np.diff(np.append(inicios, len(chaves)))
+    estatisticas['blocos_ignorados'] = int((tamanhos > LIMITE_BLOCO).sum())
+    for tamanho in np.unique(tamanhos[(tamanhos >= 2) & (tamanhos <= LIMITE_BLOCO)]).tolist():
+        grupos = inicios[tamanhos == tamanho]
+        a, b = np.triu_indices(tamanho, 1)
+        por_lote = max(PARES_POR_LOTE // len(a), 1)
+        for inicio in range(0, len(grupos), por_lote):
+            membros = linhas[grupos[inicio:inicio + por_lote, None] + np.arange(tamanho)]
+            yield membros[:, a].ravel(), membros[:, b].ravel()
+
+
+def _cpfs_parecidos(a, b):
+    """
+    CPFs (arrays inteiros) cujos 9 primeiros dígitos diferem em um só dígito ou por dois dígitos vizinhos
+    invertidos. Os verificadores ficam de fora: mudam junto com qualquer dígito.
+    """
+    import numpy as np
+
+    potencias = 10 ** np.arange(2, 11, dtype=np.int64)
+    digitos_a, digitos_b = a[:, None] // potencias % 10, b[:, None] // potencias % 10
+    diferentes = digitos_a != digitos_b
+    quantidade = diferentes.sum(axis=1)
+    invertidos = (diferentes[:, :-1] & diferentes[:, 1:] & (digitos_a[:, :-1] == digitos_b[:, 1:])
+                  & (digitos_a[:, 1:] == digitos_b[:, :-1])).any(axis=1)
+    return (quantidade <= 1) | ((quantidade == 2) & invertidos)
+
+
+def _filtrar_pares(registros, i, j):
+    """Pares com idade compatível, algum indício e nome estimado parecido: (i, j, motivos)."""
+    import numpy as np
+
+    r = registros
+    manter = (np.abs(r.anos[i] - r.anos[j]) <= DIFERENCA_MAXIMA_ANOS) & (r.cpfs[i] != r.cpfs[j])
+    i, j = i[manter], j[manter]
+    motivos = np.zeros(len(i), dtype=np.uint8)
+    for bit, coluna in enumerate((r.ceps, r.enderecos, r.emails, r.telefones)):
+        motivos |= ((coluna[i] == coluna[j]) & (coluna[i] != 0)).astype(np.uint8) << np.uint8(bit)
+    motivos |= _cpfs_parecidos(r.cpfs[i], r.cpfs[j]).astype(np.uint8) << np.uint8(len(INDICIOS) - 1)
+    manter = motivos > 0
+    i, j, motivos = i[manter], j[manter], motivos[manter]
+    estimativa = (r.assinaturas[i] == r.assinaturas[j]).mean(axis=1)
+    manter = estimativa >= LIMIAR_NOME - MARGEM_ESTIMATIVA
+    return i[manter], j[manter], motivos[manter]
+
+
+def _confirmar(registros, i, j, motivos):
+    """Pares com a similaridade exata dos nomes >= LIMIAR_NOME: lista de (i, j, similaridade, motivos)."""
+    pares = []
+    for a, b, m in zip(i.tolist(), j.tolist(), motivos.tolist()):
+        trigramas_a, trigramas_b = _trigramas(registros.normalizados[a]), _trigramas(registros.normalizados[b])
+        similaridade = len(trigramas_a & trigramas_b) / max(len(trigramas_a | trigramas_b), 1)
+        if similaridade >= LIMIAR_NOME:
+            pares.append((a, b, round(similaridade, 3), m))
+    return pares
+
+
+def descrever_motivos(motivos):
+    return [indicio for bit, indicio in enumerate(INDICIOS) if motivos & (1 << bit)]
+
+
+def comparar_todos(registros):
+    """Pares duplicados prováveis entre todos os registros e as estatísticas da comparação."""
+    import numpy as np
+
+    chaves, linhas, desvios = _chaves(registros, (0, 1))
+    estatisticas = {'pacientes': len(registros), 'chaves': int((desvios == 0).sum()), 'comparacoes': 0}
+    encontrados = ([], [], [])
+    for i, j in _pares_dos_blocos(chaves, linhas, estatisticas):
+        estatisticas['comparacoes'] += len(i)
+        for lista, valores in zip(encontrados, _filtrar_pares(registros, np.minimum(i, j), np.maximum(i, j))):
+            lista.append(valores)
+    if not encontrados[0]:
+        return [], estatisticas
+    i, j, motivos = (np.concatenate(lista) for lista in encontrados)
+    # O mesmo par aparece uma vez para cada chave em comum
+    _, unicos = np.unique(i * len(registros) + j, return_index=True)
+    return _confirmar(registros, i[unicos], j[unicos], motivos[unicos]), estatisticas
+
+
+# --- Varredura ---
+
+def _gravar_pares(registros, pares):
+    caminho = caminho_pares()
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(('cpf_a', 'nome_a', 'cpf_b', 'nome_b', 'similaridade_nome', 'indicios'))
+        for a, b, similaridade, motivos in sorted(pares, key=lambda par: -par[2]):
+            escritor.writerow((str(registros.cpfs[a]).zfill(reg.TAMANHO_CPF), registros.nomes[a],
+                               str(registros.cpfs[b]).zfill(reg.TAMANHO_CPF), registros.nomes[b], similaridade,
+                               "; ".join(descrever_motivos(motivos))))
+    os.replace(temporario, caminho)
+
+
+def _gravar_indice(registros, marca, ano_referencia):
+    """Chaves sem deslocamento do ano (a verificação online procura o ano - 1, o ano e o ano + 1)."""
+    import numpy as np
+
+    chaves, linhas, desvios = _chaves(registros, (0,))
+    ordem = np.argsort(chaves, kind='stable')
+    caminho = _caminho_indice()
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        np.savez(arquivo, chaves=chaves[ordem], linhas=linhas[ordem].astype(np.int32), cpfs=registros.cpfs,
+                 marca=np.int64(marca), ano_referencia=np.int32(ano_referencia))
+    os.replace(temporario, caminho)
+
+
+def varrer():
+    """
+    Compara todos os pacientes (por blocos de chaves) e grava os pares e o índice da verificação online.
+
+    Returns:
+        dict: {'pacientes', 'chaves', 'comparacoes', 'blocos_ignorados', 'pares', 'duracao_s', 'arquivo'};
+        None em caso de erro.
+    """
+    inicio = time.perf_counter()
+    ano_referencia = date.today().year
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            # O que for alterado daqui em diante a verificação online lê do registro de alterações
+            marca = registro_alteracoes.maior_alteracao(cursor)
+            partes = []
+            reg.DUPLICIDADE_PACIENTES.executar(cursor)
+            while True:
+                linhas = cursor.fetchmany(TAMANHO_BLOCO)
+                if not linhas:
+                    break
+                partes.append(Registros(linhas, ano_referencia))
+            registros = Registros.juntar(partes)
+            pares, estatisticas = comparar_todos(registros)
+
+            os.makedirs(diretorio_duplicidade(), exist_ok=True)
+            _gravar_pares(registros, pares)
+            _gravar_indice(registros, marca, ano_referencia)
+            registro_alteracoes.gravar_marca(cursor, CONSUMIDOR, marca)
+            registro_alteracoes.limpar(cursor)
+        conexao.commit()
+        return dict(estatisticas, pares=len(pares), duracao_s=round(time.perf_counter() - inicio, 3),
+                    arquivo=caminho_pares())
+    except Exception as e:
+        print(f"Erro na varredura de pacientes duplicados: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Verificação online ---
+
+_indice_carregado = {}
+
+
+def _carregar_indice():
+    """Índice da última varredura (em cache enquanto o arquivo não muda); None se não houver."""
+    import numpy as np
+
+    caminho = _caminho_indice()
+    try:
+        assinatura = os.stat(caminho).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _indice_carregado.get('assinatura') != assinatura:
+        with np.load(caminho) as arquivo:
+            indice = {nome: arquivo[nome] for nome in arquivo.files}
+        _indice_carregado.clear()
+        _indice_carregado.update(indice, assinatura=assinatura)
+    return _indice_carregado
+
+
+def _cpfs_do_indice(indice, registros):
+    """CPFs do índice que compartilham alguma chave com o registro (ano - 1 a ano + 1)."""
+    import numpy as np
+
+    chaves, _, _ = _chaves(registros, (-1, 0, 1))
+    inicios = np.searchsorted(indice['chaves'], chaves, 'left')
+    fins = np.searchsorted(indice['chaves'], chaves, 'right')
+    linhas = [indice['linhas'][inicio:fim] for inicio, fim in zip(inicios.tolist(), fins.tolist())
+              if fim - inicio <= LIMITE_BLOCO]
+    if not linhas:
+        return set()
+    return {str(cpf).zfill(reg.TAMANHO_CPF) for cpf in indice['cpfs'][np.concatenate(linhas)].tolist()}
+
+
+def verificar_paciente(pessoa):
+    """
+    Pacientes cadastrados que parecem ser a mesma pessoa que `pessoa` (formato de repositorio.inserir_pessoa).
+
+    Returns:
+        list[dict]: {'cpf', 'nome', 'idade', 'cidade', 'uf', 'similaridade_nome', 'indicios'}, do mais parecido
+        para o menos; None se a varredura ainda não foi feita (sem índice) ou em caso de erro.
+    """
+    import numpy as np
+
+    indice = _carregar_indice()
+    if indice is None:
+        return None
+    endereco = pessoa.get('endereco') or {}
+    novo = (pessoa['cpf'], pessoa['nome'], pessoa['idade'], pessoa.get('email'), pessoa.get('telefone_contato'),
+            endereco.get('cep'), endereco.get('logradouro'), endereco.get('numero'), endereco.get('cidade'),
+            endereco.get('uf'))
+    ano_referencia = int(indice['ano_referencia'])
+    cpfs = _cpfs_do_indice(indice, Registros([novo], ano_referencia))
+
+    conexao = conectar_bd()
+    if not conexao: return None
+    try:
+        with conexao.cursor() as cursor:
+            # Incluídos ou alterados depois da varredura ainda não estão no índice
+            alterados = registro_alteracoes.chaves_alteradas(
+                cursor, int(indice['marca']), registro_alteracoes.maior_alteracao(cursor))
+            cpfs |= {cpf.zfill(reg.TAMANHO_CPF) for cpf in alterados.get('PACIENTES', ())}
+            cpfs.discard(pessoa['cpf'])
+            linhas = reg.linhas_por_lista(cursor, reg.DUPLICIDADE_POR_CPF, sorted(cpfs)) if cpfs else []
+    except Exception as e:
+        print(f"Erro na verificação de pacientes duplicados: {e}")
+        return None
+    finally:
+        conexao.close()
+    if not linhas:
+        return []
+
+    registros = Registros([novo] + list(linhas), ano_referencia)
+    outros = np.arange(1, len(registros))
+    i, j, motivos = _filtrar_pares(registros, np.zeros_like(outros), outros)
+    candidatos = []
+    for _, b, similaridade, m in _confirmar(registros, i, j, motivos):
+        linha = linhas[b - 1]
+        candidatos.append({'cpf': str(linha[0]).zfill(reg.TAMANHO_CPF), 'nome': linha[1], 'idade': linha[2],
+                           'cidade': linha[8], 'uf': linha[9], 'similaridade_nome': similaridade,
+                           'indicios': descrever_motivos(m)})
+    return sorted(candidatos, key=lambda candidato: -candidato['similaridade_nome'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procura pacientes cadastrados em duplicidade.")
+    parser.parse_args(argv)
+
+    resultado = varrer()
+    if resultado is None:
+        return 1
+    print(f"{resultado['pares']} pares de possíveis duplicados entre {resultado['pacientes']} pacientes "
+          f"({resultado['comparacoes']} comparações, {resultado['blocos_ignorados']} blocos grandes ignorados) "
+          f"em {resultado['duracao_s']:.1f} s: {resultado['arquivo']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
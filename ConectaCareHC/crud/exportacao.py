@@ -0,0 +1,135 @@
+# crud/exportacao.py
+# Exportação de pacientes (json, ndjson ou csv) serial ou em paralelo com crud/processamento_paralelo.py.
+#
+# Na versão paralela, cada partição de PACIENTES é lida com a sua própria conexão e gravada num arquivo
+# temporário (uma linha por registro); o coordenador junta as partes na ordem das partições. Com a
+# estratégia 'faixas' o resultado sai ordenado por CPF (a exportação serial é ordenada por nome).
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from ConectaCareHC.crud import processamento_paralelo, repositorio
+from ConectaCareHC.crud.registro_sql import COLUNAS_EXPORTACAO, EXPORTACAO_PACIENTES, LEITURA_EM_MASSA, Consulta
+
+FORMATOS = ('json', 'ndjson', 'csv')
+
+_SQL_EXPORTACAO_SEM_ORDEM = EXPORTACAO_PACIENTES.sql[:EXPORTACAO_PACIENTES.sql.rindex("ORDER BY")]
+_consultas_por_estrategia = {}
+
+
+def _consulta_da_particao(particao):
+    """Consulta de exportação restrita à partição (uma por estratégia, para reaproveitar o cache de instruções)."""
+    consulta = _consultas_por_estrategia.get(particao.estrategia)
+    if consulta is None:
+        sql = f"{_SQL_EXPORTACAO_SEM_ORDEM}WHERE {particao.filtro('P')}\n    ORDER BY P.CPF"
+        consulta = Consulta(f'exportacao_pacientes_{particao.estrategia}', sql, COLUNAS_EXPORTACAO,
+                            **LEITURA_EM_MASSA)
+        _consultas_por_estrategia[particao.estrategia] = consulta
+    return consulta
+
+
+def _linha_csv(item):
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=COLUNAS_EXPORTACAO).writerow(item)
+    return buffer.getvalue()
+
+
+def formatar_registro(item, formato):
+    """Texto de um registro na parte temporária: uma linha JSON (json/ndjson) ou uma linha CSV."""
+    if formato == 'csv':
+        return _linha_csv(item)
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def escrever_exportacao(arquivo, itens, formato):
+    """Grava os itens (dicionários de COLUNAS_EXPORTACAO) no formato pedido e retorna a quantidade."""
+    total = 0
+    if formato == 'csv':
+        escritor = csv.DictWriter(arquivo, fieldnames=COLUNAS_EXPORTACAO)
+        escritor.writeheader()
+        for item in itens:
+            escritor.writerow(item)
+            total += 1
+    elif formato == 'ndjson':
+        for item in itens:
+            arquivo.write(json.dumps(item, ensure_ascii=False) + "\n")
+            total += 1
+    else:
+        # Mesmo formato do arquivo gerado pelo menu, escrito à medida que as linhas chegam
+        arquivo.write("[")
+        for item in itens:
+            arquivo.write(("," if total else "") + "\n    " + json.dumps(item, ensure_ascii=False))
+            total += 1
+        arquivo.write("\n]\n")
+    return total
+
+
+def exportar(arquivo, formato):
+    """Exportação serial (uma conexão, ordenada por nome). Retorna a quantidade ou None em caso de erro."""
+    itens = repositorio.iterar_dados_exportacao()
+    if itens is None:
+        return None
+    return escrever_exportacao(arquivo, itens, formato)
+
+
+# --- Exportação em paralelo ---
+
+def exportar_particao(conexao, particao, formato, diretorio):
+    """Tarefa do motor paralelo: grava a partição em <diretorio>/parte_NNNN e retorna (caminho, quantidade)."""
+    caminho = os.path.join(diretorio, f"parte_{particao.indice:04d}")
+    consulta = _consulta_da_particao(particao)
+    total = 0
+    with conexao.cursor() as cursor, open(caminho, 'w', encoding='utf-8', newline='') as parte:
+        consulta.executar(cursor, particao.parametros)
+        while True:
+            linhas = cursor.fetchmany()
+            if not linhas:
+                break
+            parte.writelines(formatar_registro(row._asdict(), formato) for row in linhas)
+            total += len(linhas)
+    return caminho, total
+
+
+def _juntar_partes(arquivo, partes, formato):
+    if formato == 'csv':
+        csv.DictWriter(arquivo, fieldnames=COLUNAS_EXPORTACAO).writeheader()
+    if formato == 'json':
+        arquivo.write("[")
+    total = 0
+    for caminho, quantidade in partes:
+        with open(caminho, encoding='utf-8', newline='') as parte:
+            if formato == 'json':
+                for linha in parte:
+                    arquivo.write(("," if total else "") + "\n    " + linha.rstrip("\n"))
+                    total += 1
+            else:
+                shutil.copyfileobj(parte, arquivo)
+                total += quantidade
+    if formato == 'json':
+        arquivo.write("\n]\n")
+    return total
+
+
+def exportar_em_paralelo(arquivo, formato, workers=4, particoes=None, modo='processos', estrategia='faixas',
+                         progresso=None, diretorio_temporario=None):
+    """
+    Exporta os pacientes dividindo PACIENTES em `particoes` (padrão: 4 por worker) processadas por `workers`.
+    Retorna a quantidade exportada ou None em caso de erro.
+    """
+    lista_particoes = processamento_paralelo.calcular_particoes('PACIENTES', particoes or workers * 4, estrategia)
+    if lista_particoes is None:
+        return None
+
+    diretorio = tempfile.mkdtemp(prefix="exportacao_", dir=diretorio_temporario)
+    try:
+        partes = processamento_paralelo.executar_particionado(
+            exportar_particao, lista_particoes, (formato, diretorio), workers=workers, modo=modo, progresso=progresso)
+        if partes is None:
+            return None
+        return _juntar_partes(arquivo, partes, formato)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
@@ -0,0 +1,455 @@
+# crud/lembretes.py
+# Lembretes das consultas (AGENDAMENTOS) por e-mail e SMS, para o EMAIL e o TELEFONE_CONTATO do paciente.
+#
+# A tabela LEMBRETES funciona como caixa de saída:
+#   1. gerar_lembretes: varre os agendamentos dos próximos dias (faixa de IDX_AGENDAMENTOS_DATA) e grava
+#      um lembrete por agendamento e canal, com a hora de envio (DIAS_ANTECEDENCIA antes, às HORA_ENVIO)
+#      e uma chave de idempotência; rodar de novo não duplica nada.
+#   2. Despachante: reserva lotes de lembretes vencidos (faixa de IDX_LEMBRETES_DEVIDOS, só até o tamanho
+#      do lote) num UPDATE que marca a reserva, então vários despachantes (threads, processos ou máquinas)
+#      podem rodar ao mesmo tempo sem enviar o mesmo lembrete duas vezes. A entrega é feita por um pool de
+#      threads com um transporte por canal (utils/envio.py); só a thread do despachante usa o banco, e os
+#      resultados são gravados em lotes.
+#
+# Garantias e limites:
+#   - a reserva vale VALIDADE_RESERVA_S: se o despachante cair, os lembretes voltam a PENDENTE e outro os
+#     envia. O que já tinha sido enviado chega de novo ao provedor com a mesma chave e é descartado lá;
+#   - backpressure: no máximo `max_em_voo` envios em andamento e um lote reservado por vez. Com o pool
+#     cheio o despachante para de reservar; quando o provedor pede uma pausa (429 + Retry-After), os envios
+#     daquele canal esperam (ocupando as vagas, o que também segura as reservas);
+#   - falhas temporárias voltam para a fila com espera exponencial, até MAX_TENTATIVAS; falhas definitivas
+#     e lembretes de agendamentos excluídos ou já passados são encerrados (FALHOU / CANCELADO).
+#
+# Serviço (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.lembretes --workers 16 --gerar-a-cada 600
+
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from ConectaCareHC.crud.db_conexao import Credenciais, conectar_bd, nova_conexao
+from ConectaCareHC.crud.registro_sql import (AGENDAMENTOS_PARA_LEMBRETE, INSERIR_LEMBRETE, LEMBRETES_RESERVADOS,
+                                             RECUPERAR_RESERVAS_EXPIRADAS, REGISTRAR_ENVIO, RESERVAR_LEMBRETES,
+                                             SITUACAO_LEMBRETES)
+from ConectaCareHC.utils.envio import EnvioSMS, EnvioSMTP, ErroEnvio
+
+PENDENTE = "PENDENTE"
+RESERVADO = "RESERVADO"
+ENVIADO = "ENVIADO"
+FALHOU = "FALHOU"
+CANCELADO = "CANCELADO"
+
+DIAS_ANTECEDENCIA = 1
+HORA_ENVIO = 9
+
+WORKERS = 16
+TAMANHO_RESERVA = 500
+VALIDADE_RESERVA_S = 300
+MAX_TENTATIVAS = 5
+ESPERA_BASE_S = 30
+ESPERA_MAXIMA_S = 3600
+# Pausas pedidas pelo provedor até esse limite são aguardadas no próprio envio; acima dele, reagenda
+PAUSA_MAXIMA_LOCAL_S = 30
+LOTE_GRAVACAO = 200
+INTERVALO_GRAVACAO_S = 0.5
+INTERVALO_OCIOSO_S = 5
+
+ASSUNTO = "Lembrete de consulta - ConectaCare HC"
+
+_FORMATO = "%Y-%m-%d %H:%M:%S"
+
+
+def _texto(momento):
+    return momento.strftime(_FORMATO)
+
+
+# --- Geração ---
+
+def horario_envio(data_consulta, agora):
+    """DIAS_ANTECEDENCIA antes da consulta, às HORA_ENVIO; se esse horário já passou, agora."""
+    previsto = datetime.combine(data_consulta.date() - timedelta(days=DIAS_ANTECEDENCIA), datetime.min.time())
+    return max(previsto.replace(hour=HORA_ENVIO), agora)
+
+
+def _lembretes_do_agendamento(row, agora):
+    enviar_em = _texto(horario_envio(datetime.fromisoformat(row.data_consulta), agora))
+    telefone = ''.join(filter(str.isdigit, row.telefone_contato or ''))
+    for canal, destino in (('EMAIL', (row.email or '').strip()), ('SMS', telefone)):
+        if destino:
+            yield {'id_agendamento': row.id_agendamento, 'canal': canal, 'destino': destino,
+                   'enviar_em': enviar_em, 'chave': f"AG{row.id_agendamento}-{canal}"}
+
+
+def gerar_lembretes(dias=DIAS_ANTECEDENCIA + 1, agora=None, tamanho_lote=5000):
+    """
+    Cria os lembretes dos agendamentos de hoje até `dias` dias à frente (exclusive) que ainda não têm.
+
+    Returns:
+        dict: {'agendamentos', 'lembretes' (criados agora), 'erros'}; None em caso de erro.
+    """
+    agora = agora or datetime.now()
+    conexao = conectar_bd()
+    if not conexao:
+        return None
+
+    resultado = {'agendamentos': 0, 'lembretes': 0, 'erros': []}
+    try:
+        with conexao.cursor() as leitura, conexao.cursor() as escrita:
+            AGENDAMENTOS_PARA_LEMBRETE.executar(leitura, {
+                'inicio': agora.date().isoformat(), 'fim': (agora.date() + timedelta(days=dias)).isoformat()})
+            while True:
+                linhas = leitura.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                lote = [lembrete for row in linhas for lembrete in _lembretes_do_agendamento(row, agora)]
+                resultado['agendamentos'] += len(linhas)
+                if not lote:
+                    continue
+                # Dois geradores ao mesmo tempo podem colidir na CHAVE: o erro fica só na linha repetida
+                INSERIR_LEMBRETE.preparar(escrita)
+                escrita.executemany(INSERIR_LEMBRETE.sql, lote, batcherrors=True, arraydmlrowcounts=True)
+                resultado['lembretes'] += sum(escrita.getarraydmlrowcounts())
+                resultado['erros'] += [{'chave': lote[erro.offset]['chave'], 'erro': erro.message}
+                                       for erro in escrita.getbatcherrors()]
+        conexao.commit()
+        return resultado
+    except Exception as e:
+        print(f"Erro ao gerar os lembretes: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+def situacao_lembretes():
+    """Contagem por situação e canal: {'PENDENTE': {'EMAIL': n, 'SMS': n}, ...}; None em caso de erro."""
+    from ConectaCareHC.crud import repositorio
+
+    linhas = repositorio.executar_sql(SITUACAO_LEMBRETES)
+    if linhas is None:
+        return None
+    situacao = {}
+    for row in linhas:
+        situacao.setdefault(row.situacao, {})[row.canal] = row.quantidade
+    return situacao
+
+
+# --- Métricas ---
+
+class Metricas:
+    """Contadores e latências de entrega de um despachante (atualizados por várias threads)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.inicio = time.monotonic()
+        self.contadores = {'lotes': 0, 'reservados': 0, 'enviados': 0, 'reagendados': 0, 'falhas': 0,
+                           'cancelados': 0, 'pausas': 0, 'descartados': 0}
+        self.por_canal = {}
+        self.latencias = {}
+        self.maximo_em_voo = 0
+
+    def somar(self, campo, quantidade=1):
+        with self._trava:
+            self.contadores[campo] += quantidade
+
+    def entrega(self, canal, duracao_s):
+        with self._trava:
+            self.por_canal[canal] = self.por_canal.get(canal, 0) + 1
+            self.latencias.setdefault(canal, []).append(duracao_s)
+
+    def resumo(self):
+        duracao = time.monotonic() - self.inicio
+        with self._trava:
+            latencias = {}
+            for canal, valores in self.latencias.items():
+                ordenados = sorted(valores)
+                p99 = ordenados[min(int(len(ordenados) * 0.99), len(ordenados) - 1)]
+                latencias[canal] = {'p50_ms': round(ordenados[len(ordenados) // 2] * 1e3, 2),
+                                    'p99_ms': round(p99 * 1e3, 2)}
+            return {**self.contadores, 'por_canal': dict(self.por_canal), 'latencia': latencias,
+                    'maximo_em_voo': self.maximo_em_voo, 'duracao_s': round(duracao, 3),
+                    'por_hora': round(self.contadores['enviados'] / duracao * 3600) if duracao else 0}
+
+
+# --- Despachante ---
+
+def transportes_padrao():
+    """Transportes configurados pelo .env / variáveis de ambiente (CONECTACARE_SMTP_*, CONECTACARE_SMS_*)."""
+    Credenciais.carregar()  # Lê o .env
+    return {
+        'EMAIL': EnvioSMTP(os.getenv("CONECTACARE_SMTP_HOST", "localhost"),
+                           int(os.getenv("CONECTACARE_SMTP_PORTA", "1025")),
+                           os.getenv("CONECTACARE_SMTP_REMETENTE", "lembretes@conectacare.com.br"),
+                           os.getenv("CONECTACARE_SMTP_USUARIO"), os.getenv("CONECTACARE_SMTP_SENHA"),
+                           os.getenv("CONECTACARE_SMTP_TLS") == "1"),
+        'SMS': EnvioSMS(os.getenv("CONECTACARE_SMS_URL", "http://127.0.0.1:8025/sms"),
+                        os.getenv("CONECTACARE_SMS_TOKEN")),
+    }
+
+
+def mensagem(nome, data_consulta):
+    momento = datetime.fromisoformat(data_consulta)
+    quando = momento.strftime("%d/%m/%Y" if (momento.hour, momento.minute) == (0, 0) else "%d/%m/%Y às %H:%M")
+    return f"Olá, {nome}! Lembramos que a sua consulta está marcada para {quando}. ConectaCare HC"
+
+
+def _espera_reagendamento(tentativas, espera_pedida):
+    return min(espera_pedida or ESPERA_BASE_S * 2 ** (tentativas - 1), ESPERA_MAXIMA_S)
+
+
+class Despachante:
+    """
+    Reserva lotes de lembretes vencidos e os entrega pelo pool de envio.
+
+    Args:
+        transportes (dict): canal -> objeto com enviar(destino, assunto, texto, chave) (utils/envio.py).
+        max_em_voo (int): envios em andamento ao mesmo tempo (padrão: 2 * workers).
+    """
+
+    def __init__(self, transportes=None, workers=WORKERS, tamanho_reserva=TAMANHO_RESERVA, max_em_voo=None,
+                 validade_reserva_s=VALIDADE_RESERVA_S, nome=None):
+        self.transportes = transportes if transportes is not None else transportes_padrao()
+        self.workers = workers
+        self.tamanho_reserva = tamanho_reserva
+        self.max_em_voo = max_em_voo or 2 * workers
+        self.validade_reserva_s = validade_reserva_s
+        self.nome = nome or f"{socket.gethostname()}-{os.getpid()}"
+        self.metricas = Metricas()
+        self._vagas = threading.BoundedSemaphore(self.max_em_voo)
+        self._resultados = queue.SimpleQueue()
+        self._a_gravar = []
+        self._ultima_gravacao = time.monotonic()
+        self._em_voo = 0
+        self._pausas = {}  # canal -> time.monotonic() até quando o provedor pediu para esperar
+        self._trava_pausa = threading.Lock()
+        self._parar = threading.Event()
+
+    def parar(self):
+        """Pede o encerramento: termina os envios em andamento, grava os resultados e sai."""
+        self._parar.set()
+
+    # --- Envio (threads do pool) ---
+
+    def _pausar(self, canal, espera_s):
+        with self._trava_pausa:
+            self._pausas[canal] = max(self._pausas.get(canal, 0.0), time.monotonic() + espera_s)
+        self.metricas.somar('pausas')
+
+    def _aguardar_pausa(self, canal):
+        espera = self._pausas.get(canal, 0.0) - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+
+    def _entregar(self, reserva, lembrete):
+        inicio = time.monotonic()
+        resultado = (ENVIADO, None, None)
+        try:
+            transporte = self.transportes[lembrete.canal]
+            texto = mensagem(lembrete.nome, lembrete.data_consulta)
+            while True:
+                self._aguardar_pausa(lembrete.canal)
+                try:
+                    transporte.enviar(lembrete.destino, ASSUNTO, texto, lembrete.chave)
+                    self.metricas.entrega(lembrete.canal, time.monotonic() - inicio)
+                    break
+                except ErroEnvio as e:
+                    if e.temporario and e.espera_s is not None and e.espera_s <= PAUSA_MAXIMA_LOCAL_S \
+                            and time.monotonic() - inicio + e.espera_s < self.validade_reserva_s / 2:
+                        self._pausar(lembrete.canal, e.espera_s)
+                        continue
+                    resultado = (PENDENTE if e.temporario else FALHOU, str(e), e.espera_s)
+                    break
+        except Exception as e:
+            resultado = (PENDENTE, f"Erro inesperado no envio: {e}", None)
+        finally:
+            self._resultados.put((reserva, lembrete, *resultado))
+            self._vagas.release()
+
+    # --- Banco (thread do despachante) ---
+
+    def _reservar(self, conexao, limite, agora):
+        reserva = f"{self.nome}-{uuid.uuid4().hex[:12]}"
+        with conexao.cursor() as cursor:
+            RESERVAR_LEMBRETES.executar(cursor, {
+                'reserva': reserva, 'agora': _texto(agora), 'limite': limite,
+                'reservado_ate': _texto(agora + timedelta(seconds=self.validade_reserva_s))})
+            reservados = cursor.rowcount
+            conexao.commit()
+            if not reservados:
+                return reserva, []
+            LEMBRETES_RESERVADOS.executar(cursor, {'reserva': reserva})
+            lote = cursor.fetchall()
+        self.metricas.somar('lotes')
+        self.metricas.somar('reservados', len(lote))
+        return reserva, lote
+
+    def _recuperar_expiradas(self, conexao):
+        with conexao.cursor() as cursor:
+            RECUPERAR_RESERVAS_EXPIRADAS.executar(cursor, {'agora': _texto(datetime.now())})
+            conexao.commit()
+
+    def _parametros_resultado(self, reserva, lembrete, situacao, erro, espera_s, agora):
+        parametros = {'id_lembrete': lembrete.id_lembrete, 'reserva': reserva, 'situacao': situacao,
+                      'tentativas': 1, 'nova_tentativa': None, 'enviado_em': None,
+                      'erro': erro[:200] if erro else None}
+        tentativas = lembrete.tentativas + 1
+        if situacao == ENVIADO:
+            parametros['enviado_em'] = _texto(agora)
+            self.metricas.somar('enviados')
+        elif situacao == PENDENTE and tentativas < MAX_TENTATIVAS:
+            espera = _espera_reagendamento(tentativas, espera_s)
+            parametros['nova_tentativa'] = _texto(agora + timedelta(seconds=espera))
+            self.metricas.somar('reagendados')
+        elif situacao == CANCELADO:
+            parametros['tentativas'] = 0
+            self.metricas.somar('cancelados')
+        else:
+            parametros['situacao'] = FALHOU
+            self.metricas.somar('falhas')
+        return parametros
+
+    def _gravar(self, conexao, espera_s=0.0, forcar=False):
+        """Recolhe os resultados prontos (esperando até `espera_s` pelo primeiro) e os grava em lote."""
+        try:
+            resultado = self._resultados.get(timeout=espera_s) if espera_s > 0 else self._resultados.get_nowait()
+            while True:
+                self._a_gravar.append(resultado)
+                self._em_voo -= 1
+                resultado = self._resultados.get_nowait()
+        except queue.Empty:
+            pass
+        if not self._a_gravar or not (forcar or len(self._a_gravar) >= LOTE_GRAVACAO
+                                      or time.monotonic() - self._ultima_gravacao >= INTERVALO_GRAVACAO_S):
+            return
+        agora = datetime.now()
+        parametros = [self._parametros_resultado(*resultado, agora) for resultado in self._a_gravar]
+        with conexao.cursor() as cursor:
+            REGISTRAR_ENVIO.preparar(cursor)
+            cursor.executemany(REGISTRAR_ENVIO.sql, parametros)
+            # Linhas não atualizadas: a reserva expirou e passou a outro despachante
+            self.metricas.somar('descartados', len(parametros) - max(cursor.rowcount, 0))
+            conexao.commit()
+        self._a_gravar = []
+        self._ultima_gravacao = time.monotonic()
+
+    def _aguardar_vaga(self, conexao):
+        """Backpressure: com `max_em_voo` envios em andamento, grava resultados até uma thread liberar vaga."""
+        while not self._vagas.acquire(timeout=0.05):
+            self._gravar(conexao)
+        self._em_voo += 1
+        self.metricas.maximo_em_voo = max(self.metricas.maximo_em_voo, self._em_voo)
+
+    def _distribuir(self, conexao, pool, reserva, lote, hoje):
+        for lembrete in lote:
+            if lembrete.data_consulta is None or lembrete.data_consulta[:10] < hoje:
+                motivo = "Agendamento excluído" if lembrete.data_consulta is None else "Consulta já realizada"
+                self._a_gravar.append((reserva, lembrete, CANCELADO, motivo, None))
+                continue
+            self._aguardar_vaga(conexao)
+            pool.submit(self._entregar, reserva, lembrete)
+            self._gravar(conexao)
+
+    def executar(self, ate_esvaziar=False, gerar_a_cada_s=None, progresso=None, intervalo_progresso_s=10):
+        """
+        Laço do despachante, com uma conexão própria.
+
+        Args:
+            ate_esvaziar (bool): termina quando não houver lembretes vencidos nem envios em andamento;
+                senão roda até parar() (ou Ctrl+C no serviço).
+            gerar_a_cada_s (float): também gera os lembretes dos próximos dias nesse intervalo.
+            progresso (callable): progresso(resumo das métricas), a cada `intervalo_progresso_s`.
+
+        Returns:
+            dict: resumo das métricas (ver Metricas.resumo); None se não conseguir conectar.
+        """
+        conexao = nova_conexao()
+        if not conexao:
+            print("Erro ao conectar ao banco de dados para despachar os lembretes.")
+            return None
+
+        proxima_recuperacao = proxima_geracao = proximo_progresso = time.monotonic()
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="envio-lembrete")
+        try:
+            while not self._parar.is_set():
+                agora_monotonico = time.monotonic()
+                if gerar_a_cada_s and agora_monotonico >= proxima_geracao:
+                    gerar_lembretes()
+                    proxima_geracao = agora_monotonico + gerar_a_cada_s
+                if agora_monotonico >= proxima_recuperacao:
+                    self._recuperar_expiradas(conexao)
+                    proxima_recuperacao = agora_monotonico + self.validade_reserva_s / 4
+                if progresso and agora_monotonico >= proximo_progresso:
+                    progresso(self.metricas.resumo())
+                    proximo_progresso = agora_monotonico + intervalo_progresso_s
+
+                agora = datetime.now()
+                reserva, lote = self._reservar(conexao, self.tamanho_reserva, agora)
+                if lote:
+                    self._distribuir(conexao, pool, reserva, lote, agora.date().isoformat())
+                    continue
+                if ate_esvaziar and self._em_voo == 0:
+                    break
+                self._gravar(conexao, espera_s=0.05 if self._em_voo else INTERVALO_OCIOSO_S, forcar=True)
+            while self._em_voo:
+                self._gravar(conexao, espera_s=1.0)
+            self._gravar(conexao, forcar=True)
+        except Exception as e:
+            # Os lembretes reservados e não gravados voltam para a fila quando a reserva expirar
+            print(f"Erro no despachante de lembretes: {e}")
+            conexao.rollback()
+        finally:
+            pool.shutdown(wait=True)
+            for transporte in self.transportes.values():
+                fechar = getattr(transporte, 'fechar', None)
+                if fechar:
+                    fechar()
+            conexao.close()
+        return self.metricas.resumo()
+
+
+def despachar(transportes=None, ate_esvaziar=True, **opcoes):
+    """Atalho: um Despachante até esvaziar a fila (ou até parar). Retorna o resumo das métricas."""
+    return Despachante(transportes, **opcoes).executar(ate_esvaziar=ate_esvaziar)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço de envio dos lembretes de consulta.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Threads de envio.")
+    parser.add_argument("--reserva", type=int, default=TAMANHO_RESERVA, help="Lembretes reservados por lote.")
+    parser.add_argument("--max-em-voo", type=int, dest="max_em_voo", help="Envios em andamento (padrão: 2 * workers).")
+    parser.add_argument("--validade-reserva", type=float, default=VALIDADE_RESERVA_S, dest="validade_reserva",
+                        help="Segundos até uma reserva não concluída voltar para a fila.")
+    parser.add_argument("--gerar-a-cada", type=float, dest="gerar_a_cada",
+                        help="Também gera os lembretes dos próximos dias a cada N segundos.")
+    parser.add_argument("--ate-esvaziar", action="store_true", help="Sai quando não houver lembretes vencidos.")
+    parser.add_argument("--intervalo-progresso", type=float, default=10, dest="intervalo_progresso")
+    args = parser.parse_args(argv)
+
+    despachante = Despachante(workers=args.workers, tamanho_reserva=args.reserva, max_em_voo=args.max_em_voo,
+                              validade_reserva_s=args.validade_reserva)
+
+    def progresso(resumo):
+        print(f"{resumo['enviados']} enviados, {resumo['reagendados']} reagendados, {resumo['falhas']} falhas "
+              f"({resumo['por_hora']}/hora)", flush=True)
+
+    # Ctrl+C / SIGTERM: termina os envios em andamento e grava os resultados antes de sair
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinal, lambda *_: despachante.parar())
+    resumo = despachante.executar(args.ate_esvaziar, args.gerar_a_cada, progresso, args.intervalo_progresso)
+    if resumo is None:
+        return 1
+    # Última linha em JSON, para quem roda o serviço por script (ex.: benchmarks/lembretes.py)
+    print(json.dumps(resumo, ensure_ascii=False), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
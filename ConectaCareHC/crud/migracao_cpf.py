@@ -0,0 +1,278 @@
+# crud/migracao_cpf.py
+# Migração opcional das chaves de CPF de texto (VARCHAR2(11)) para numéricas (NUMBER(11)).
+#
+# Um CPF numérico ocupa de 5 a 6 bytes no Oracle (e até 8 no SQLite) contra 11 do texto, o que encolhe
+# as chaves primárias de PACIENTES/CUIDADORES, as chaves estrangeiras de VINCULOS_PACIENTE_CUIDADOR e
+# AGENDAMENTOS e os índices sobre elas. O restante do código não muda: os binds continuam em texto
+# (o banco os converte para número na comparação) e registro_sql devolve as colunas de CPF como texto
+# de 11 dígitos, com os zeros à esquerda.
+#
+# Só migra se todos os CPFs cadastrados forem válidos (repositorio.verificar_cpfs). Deve ser executada
+# com o sistema parado. No SQLite a migração é uma transação só. No Oracle cada DDL confirma a transação,
+# então uma falha no meio (ex.: falta de espaço) deixa o esquema parcialmente migrado, sem parte das chaves
+# e índices: corrija a causa e execute de novo -- as instruções são geradas a partir do estado atual do
+# dicionário de dados (colunas, chaves e índices) e a migração continua de onde parou.
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.migracao_cpf
+
+import re
+import sqlite3
+
+from ConectaCareHC.crud import repositorio
+from ConectaCareHC.crud.db_conexao import Credenciais, conectar_bd
+
+# Colunas de CPF de cada tabela, na ordem de migração (tabelas referenciadas antes das que as referenciam)
+COLUNAS_MIGRADAS = {
+    'PACIENTES': ('CPF',),
+    'CUIDADORES': ('CPF',),
+    'VINCULOS_PACIENTE_CUIDADOR': ('CPF_PACIENTE', 'CPF_CUIDADOR'),
+    'AGENDAMENTOS': ('CPF_PACIENTE',),
+}
+
+_CHAVES_ESTRANGEIRAS = {
+    'VINCULOS_PACIENTE_CUIDADOR': (('CPF_PACIENTE', 'PACIENTES'), ('CPF_CUIDADOR', 'CUIDADORES')),
+    'AGENDAMENTOS': (('CPF_PACIENTE', 'PACIENTES'),),
+}
+_CHAVES_PRIMARIAS = {
+    'PACIENTES': 'CPF',
+    'CUIDADORES': 'CPF',
+    'VINCULOS_PACIENTE_CUIDADOR': 'CPF_PACIENTE, CPF_CUIDADOR',
+}
+# Índices sobre as colunas migradas (o DROP da coluna ou da tabela também os remove)
+_INDICES = {'IDX_AGENDAMENTOS_PACIENTE': 'AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA)',
+            'IDX_AGENDAMENTOS_DATA': 'AGENDAMENTOS (DATA_CONSULTA)',
+            'IDX_VINCULOS_CUIDADOR': 'VINCULOS_PACIENTE_CUIDADOR (CPF_CUIDADOR)'}
+
+
+def esquema_migrado():
+    """True se a coluna PACIENTES.CPF já é numérica; None em caso de erro."""
+    Credenciais.carregar()
+    if Credenciais.DB_LOCAL:
+        sql = "SELECT TYPE FROM PRAGMA_TABLE_INFO('PACIENTES') WHERE NAME = 'CPF'"
+    else:
+        sql = "SELECT DATA_TYPE FROM USER_TAB_COLUMNS WHERE TABLE_NAME = 'PACIENTES' AND COLUMN_NAME = 'CPF'"
+    row = repositorio.executar_sql(sql, fetch_one=True)
+    return None if row is None else row[0].upper() in ('INTEGER', 'NUMBER')
+
+
+# --- Substituto local (SQLite) ---
+
+def _ddl_local_migrada(tabela):
+    """CREATE TABLE da tabela no esquema de db_local, com as colunas de CPF como INTEGER."""
+    from ConectaCareHC.crud.db_local import ESQUEMA
+
+    ddl = re.search(rf"CREATE TABLE IF NOT EXISTS {tabela} \((.*?)\n\);", ESQUEMA, re.DOTALL).group(1)
+    for coluna in COLUNAS_MIGRADAS[tabela]:
+        ddl = ddl.replace(f"{coluna} VARCHAR(11)", f"{coluna} INTEGER")
+    return f"CREATE TABLE {tabela}_NUMERICA ({ddl}\n)"
+
+
+def migrar_banco_local(caminho):
+    """
+    Reconstrói as tabelas no SQLite com as colunas de CPF INTEGER (o SQLite não altera o tipo de
+    uma coluna): cria a tabela nova, copia, remove a antiga e renomeia, tudo numa transação.
+    """
+    from ConectaCareHC.crud.db_local import criar_gatilhos_alteracoes
+
+    conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None)
+    try:
+        conexao.execute("PRAGMA foreign_keys = OFF")  # Só pode ser alterado fora de transação
+        conexao.execute("BEGIN IMMEDIATE")
+        for tabela, colunas in COLUNAS_MIGRADAS.items():
+            conexao.execute(_ddl_local_migrada(tabela))
+            nomes = [row[1] for row in conexao.execute(f"PRAGMA table_info({tabela})")]
+            selecao = ", ".join(f"CAST({c} AS INTEGER)" if c in colunas else c for c in nomes)
+            conexao.execute(f"INSERT INTO {tabela}_NUMERICA ({', '.join(nomes)}) SELECT {selecao} FROM {tabela}")
+            conexao.execute(f"DROP TABLE {tabela}")
+            conexao.execute(f"ALTER TABLE {tabela}_NUMERICA RENAME TO {tabela}")
+        for indice, definicao in _INDICES.items():
+            conexao.execute(f"CREATE INDEX {indice} ON {definicao}")
+        # O DROP TABLE também removeu os gatilhos de ALTERACOES
+        criar_gatilhos_alteracoes(conexao)
+
+        violacoes = conexao.execute("PRAGMA foreign_key_check").fetchall()
+        if violacoes:
+            raise sqlite3.IntegrityError(f"{len(violacoes)} referências inválidas após a migração: {violacoes[:5]}")
+        conexao.execute("COMMIT")
+        conexao.execute("PRAGMA foreign_keys = ON")
+    except Exception:
+        if conexao.in_transaction:
+            conexao.execute("ROLLBACK")
+        raise
+    finally:
+        conexao.close()
+
+
+# --- Oracle ---
+
+# Remove as chaves estrangeiras que apontam para PACIENTES/CUIDADORES (os nomes são gerados pelo Oracle)
+_REMOVER_CHAVES_ESTRANGEIRAS = """
+BEGIN
+    FOR r IN (SELECT C.TABLE_NAME, C.CONSTRAINT_NAME
+              FROM USER_CONSTRAINTS C
+              JOIN USER_CONSTRAINTS P ON P.CONSTRAINT_NAME = C.R_CONSTRAINT_NAME
+              WHERE C.CONSTRAINT_TYPE = 'R' AND P.TABLE_NAME IN ('PACIENTES', 'CUIDADORES')) LOOP
+        EXECUTE IMMEDIATE 'ALTER TABLE ' || r.TABLE_NAME || ' DROP CONSTRAINT ' || r.CONSTRAINT_NAME;
+    END LOOP;
+END;"""
+
+
+_TABELAS_ORACLE = ", ".join(f"'{tabela}'" for tabela in COLUNAS_MIGRADAS)
+
+
+def _estado_oracle(cursor):
+    """Colunas (tipo, anulável), índices e chaves das tabelas migradas, lidos do dicionário de dados."""
+    cursor.execute("SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, NULLABLE FROM USER_TAB_COLUMNS "
+                   f"WHERE TABLE_NAME IN ({_TABELAS_ORACLE})")
+    colunas = {(tabela, coluna): (tipo, anulavel == 'Y') for tabela, coluna, tipo, anulavel in cursor.fetchall()}
+    cursor.execute(f"SELECT INDEX_NAME FROM USER_INDEXES WHERE TABLE_NAME IN ({_TABELAS_ORACLE})")
+    indices = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT C.TABLE_NAME, C.CONSTRAINT_TYPE, CC.COLUMN_NAME FROM USER_CONSTRAINTS C "
+                   "JOIN USER_CONS_COLUMNS CC ON CC.CONSTRAINT_NAME = C.CONSTRAINT_NAME "
+                   f"WHERE C.CONSTRAINT_TYPE IN ('P', 'R') AND C.TABLE_NAME IN ({_TABELAS_ORACLE})")
+    restricoes = cursor.fetchall()
+    return {
+        'colunas': colunas,
+        'indices': indices,
+        'chaves_primarias': {tabela for tabela, tipo, _ in restricoes if tipo == 'P'},
+        'chaves_estrangeiras': {(tabela, coluna) for tabela, tipo, coluna in restricoes if tipo == 'R'},
+    }
+
+
+def _colunas_pendentes(estado):
+    return [(tabela, coluna) for tabela, colunas in COLUNAS_MIGRADAS.items() for coluna in colunas
+            if estado['colunas'].get((tabela, coluna), (None,))[0] != 'NUMBER']
+
+
+def _migracao_iniciada(estado):
+    """True se alguma coluna de CPF já foi convertida (ou está no meio da conversão)."""
+    return any(estado['colunas'].get((tabela, coluna), (None,))[0] != 'VARCHAR2'
+               or (tabela, f"{coluna}_NUM") in estado['colunas']
+               for tabela, colunas in COLUNAS_MIGRADAS.items() for coluna in colunas)
+
+
+def instrucoes_oracle(estado):
+    """
+    DDL/DML que faltam para migrar o esquema no `estado` (_estado_oracle); lista vazia se já estiver migrado.
+    Cada DDL confirma a transação anterior: depois de uma falha, o estado relido gera só o que falta.
+    """
+    colunas = estado['colunas']
+    pendentes = _colunas_pendentes(estado)
+    indices, chaves_primarias, chaves_estrangeiras = (
+        estado['indices'], estado['chaves_primarias'], estado['chaves_estrangeiras'])
+    instrucoes = []
+    if pendentes:
+        # Chaves e índices sobre as colunas de texto saem antes da troca e são recriados no final
+        instrucoes.append(_REMOVER_CHAVES_ESTRANGEIRAS)
+        instrucoes += [f"DROP INDEX {indice}" for indice in _INDICES if indice in indices]
+        instrucoes += [f"ALTER TABLE {tabela} DROP PRIMARY KEY" for tabela in _CHAVES_PRIMARIAS
+                       if tabela in chaves_primarias]
+        indices, chaves_primarias, chaves_estrangeiras = set(), set(), set()
+
+    for tabela, colunas_tabela in COLUNAS_MIGRADAS.items():
+        for coluna in colunas_tabela:
+            if (tabela, coluna) in pendentes:
+                if (tabela, coluna) in colunas:  # Ainda em texto (a coluna _NUM pode já existir)
+                    if (tabela, f"{coluna}_NUM") not in colunas:
+                        instrucoes.append(f"ALTER TABLE {tabela} ADD ({coluna}_NUM NUMBER(11))")
+                    instrucoes += [f"UPDATE {tabela} SET {coluna}_NUM = TO_NUMBER({coluna})",
+                                   f"ALTER TABLE {tabela} DROP COLUMN {coluna}"]
+                instrucoes.append(f"ALTER TABLE {tabela} RENAME COLUMN {coluna}_NUM TO {coluna}")
+            elif not colunas[(tabela, coluna)][1]:
+                continue  # Já numérica e NOT NULL
+            instrucoes.append(f"ALTER TABLE {tabela} MODIFY ({coluna} NOT NULL)")
+
+    instrucoes += [f"ALTER TABLE {tabela} ADD PRIMARY KEY ({chave})" for tabela, chave in _CHAVES_PRIMARIAS.items()
+                   if tabela not in chaves_primarias]
+    instrucoes += [f"ALTER TABLE {tabela} ADD FOREIGN KEY ({coluna}) REFERENCES {referenciada} (CPF)"
+                   for tabela, chaves in _CHAVES_ESTRANGEIRAS.items() for coluna, referenciada in chaves
+                   if (tabela, coluna) not in chaves_estrangeiras]
+    instrucoes += [f"CREATE INDEX {indice} ON {definicao}" for indice, definicao in _INDICES.items()
+                   if indice not in indices]
+    return instrucoes
+
+
+def _ler_estado_oracle():
+    conexao = conectar_bd()
+    if not conexao:
+        print("Não foi possível conectar ao banco de dados.")
+        return None
+    try:
+        with conexao.cursor() as cursor:
+            return _estado_oracle(cursor)
+    except Exception as e:
+        print(f"Erro ao ler o esquema: {e}")
+        return None
+    finally:
+        conexao.close()
+
+
+def _migrar_oracle():
+    conexao = conectar_bd()
+    if not conexao:
+        raise ConnectionError("Não foi possível conectar ao banco de dados.")
+    try:
+        with conexao.cursor() as cursor:
+            # Relido aqui: é o estado que vale para a sequência executada
+            for instrucao in instrucoes_oracle(_estado_oracle(cursor)):
+                cursor.execute(instrucao)
+        conexao.commit()
+    finally:
+        conexao.close()
+
+
+def _cpfs_validos():
+    for tabela in repositorio.TABELAS_PESSOA:
+        verificacao = repositorio.verificar_cpfs(tabela)
+        if verificacao is None:
+            return False
+        if verificacao['invalidos']:
+            print(f"Migração cancelada: {len(verificacao['invalidos'])} CPFs inválidos em {tabela} "
+                  f"(ex.: {', '.join(verificacao['invalidos'][:5])}).")
+            return False
+    return True
+
+
+def migrar_cpfs_para_numero():
+    """
+    Converte as colunas de CPF para numéricas, depois de conferir que todos os CPFs são válidos.
+
+    Returns:
+        bool: True se migrou (ou se o esquema já estava migrado); False se a verificação ou a migração falharem.
+    """
+    Credenciais.carregar()
+    if Credenciais.DB_LOCAL:
+        # No SQLite a migração é uma transação só: ou todas as colunas foram convertidas ou nenhuma
+        migrado = esquema_migrado()
+        if migrado is None:
+            return False
+        iniciada = False
+    else:
+        estado = _ler_estado_oracle()
+        if estado is None:
+            return False
+        migrado, iniciada = not instrucoes_oracle(estado), _migracao_iniciada(estado)
+    if migrado:
+        print("As colunas de CPF já são numéricas.")
+        return True
+
+    if iniciada:
+        # Os CPFs foram verificados na execução interrompida (e parte das colunas já não é texto)
+        print("Retomando a migração interrompida das colunas de CPF.")
+    elif not _cpfs_validos():
+        return False
+
+    try:
+        if Credenciais.DB_LOCAL:
+            migrar_banco_local(Credenciais.DB_LOCAL)
+        else:
+            _migrar_oracle()
+    except Exception as e:
+        print(f"Erro na migração das colunas de CPF: {e}")
+        return False
+    print("Colunas de CPF migradas para chave numérica.")
+    return True
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if migrar_cpfs_para_numero() else 1)
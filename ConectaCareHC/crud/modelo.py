@@ -0,0 +1,240 @@
+# crud/modelo.py
+# Modelo de demanda servido por api_predicao.py: probabilidade de o paciente ter consulta nos DIAS_JANELA
+# dias seguintes, a partir da idade, UF/cidade, quantidade de cuidadores, consultas anteriores e dias desde
+# a última. O treinamento (em blocos, direto das tabelas) está em crud/treinamento.py.
+#
+# Registro local de versões: <diretório>/<versão>/{modelo.joblib, metadados.json}, com o nome da versão
+# ativa no arquivo ATUAL. Uma versão é montada num diretório temporário e renomeada, e nunca é alterada
+# depois; ATUAL é trocado com os.replace -- quem lê vê a versão anterior ou a nova, nunca metade de uma.
+#
+# ModeloEmUso (um por processo, como cada worker do Gunicorn) confere ATUAL no máximo a cada
+# INTERVALO_VERIFICACAO_S e só troca a referência ao modelo depois de carregar a nova versão inteira: as
+# requisições em andamento terminam com o modelo que pegaram e nenhuma espera pela carga (as que chegam
+# durante a carga seguem com a versão anterior). Se a nova versão não carregar, a anterior continua.
+#
+# O diretório é o da variável CONECTACARE_MODELOS ou dados/modelos.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.treinamento              (treina e ativa uma nova versão)
+#   python ConectaCareHC/main.py modelo versoes
+#   python ConectaCareHC/main.py modelo ativar --versao 20261019-101500
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+DIAS_JANELA = 90
+# Atributos hasheados (UF, cidade e faixa de idade): o espaço é fixo, então cidades novas não exigem
+# vocabulário -- o mesmo vale para o treinamento em blocos e para a previsão
+N_ATRIBUTOS_HASH = 2 ** 12
+ESCALA_DIAS = 8.2  # ~log1p(10 anos em dias)
+ATRIBUTOS = ('idade', 'uf', 'cidade', 'cuidadores', 'consultas_anteriores', 'dias_desde_ultima')
+INTERVALO_VERIFICACAO_S = 1.0
+ARQUIVO_ATUAL = "ATUAL"
+ARQUIVO_MODELO = "modelo.joblib"
+ARQUIVO_METADADOS = "metadados.json"
+CAMINHO_MODELOS_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "modelos")
+
+
+def diretorio_modelos():
+    return os.getenv("CONECTACARE_MODELOS") or CAMINHO_MODELOS_PADRAO
+
+
+def _caminho_atual():
+    return os.path.join(diretorio_modelos(), ARQUIVO_ATUAL)
+
+
+# --- Atributos ---
+
+def matriz(colunas):
+    """
+    Matriz esparsa (CSR) dos atributos. `colunas` tem uma sequência por nome de ATRIBUTOS;
+    dias_desde_ultima é None/NaN para quem nunca teve consulta.
+    """
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction import FeatureHasher
+
+    idades = np.asarray(colunas['idade'], dtype=np.float64)
+    dias = np.asarray(colunas['dias_desde_ultima'], dtype=np.float64)
+    sem_consulta = np.isnan(dias)
+    numericos = np.column_stack((
+        idades / 100,
+        np.log1p(np.asarray(colunas['cuidadores'], dtype=np.float64)),
+        np.log1p(np.asarray(colunas['consultas_anteriores'], dtype=np.float64)),
+        sem_consulta,
+        np.where(sem_consulta, 0.0, np.log1p(np.clip(np.nan_to_num(dias), 0, None)) / ESCALA_DIAS),
+    ))
+    tokens = [(f"uf={uf}", f"cidade={cidade}/{uf}", f"faixa={min(int(idade) // 10, 9)}")
+              for uf, cidade, idade in zip((str(uf).strip().upper() for uf in colunas['uf']),
+                                           (str(cidade).strip().upper() for cidade in colunas['cidade']),
+                                           idades)]
+    hasheados = FeatureHasher(N_ATRIBUTOS_HASH, input_type='string', alternate_sign=False).transform(tokens)
+    return sparse.hstack((sparse.csr_matrix(numericos), hasheados), format='csr')
+
+
+def colunas_de_registros(registros):
+    """Colunas para matriz() a partir de dicts (corpo do /predict). ValueError se faltar algum atributo."""
+    if not isinstance(registros, list) or not registros:
+        raise ValueError("Informe 'pacientes': uma lista de objetos com os atributos.")
+    colunas = {nome: [] for nome in ATRIBUTOS}
+    for i, registro in enumerate(registros):
+        if not isinstance(registro, dict):
+            raise ValueError(f"Paciente {i}: esperado um objeto.")
+        faltando = [nome for nome in ('idade', 'uf', 'cidade') if registro.get(nome) in (None, '')]
+        if faltando:
+            raise ValueError(f"Paciente {i}: faltam {', '.join(faltando)}.")
+        try:
+            colunas['idade'].append(int(registro['idade']))
+            colunas['cuidadores'].append(int(registro.get('cuidadores') or 0))
+            colunas['consultas_anteriores'].append(int(registro.get('consultas_anteriores') or 0))
+            dias = registro.get('dias_desde_ultima')
+            colunas['dias_desde_ultima'].append(None if dias is None else float(dias))
+        except (TypeError, ValueError):
+            raise ValueError(f"Paciente {i}: idade, cuidadores, consultas_anteriores e dias_desde_ultima "
+                             "devem ser números.") from None
+        colunas['uf'].append(str(registro['uf']))
+        colunas['cidade'].append(str(registro['cidade']))
+    return colunas
+
+
+# --- Registro de versões ---
+
+class Modelo:
+    """Versão carregada do registro: o estimador e os metadados gravados com ele."""
+
+    def __init__(self, versao, estimador, metadados):
+        self.versao = versao
+        self.estimador = estimador
+        self.metadados = metadados
+
+    def prever(self, colunas):
+        """Probabilidade de consulta na janela, uma por paciente (lista de float)."""
+        return self.estimador.predict_proba(matriz(colunas))[:, 1].tolist()
+
+
+def _nova_versao(diretorio):
+    versao = datetime.now().strftime("%Y%m%d-%H%M%S")
+    sufixo = 1
+    candidata = versao
+    while os.path.exists(os.path.join(diretorio, candidata)):
+        sufixo += 1
+        candidata = f"{versao}-{sufixo}"
+    return candidata
+
+
+def gravar_versao(estimador, metadados):
+    """Grava o estimador e os metadados como uma nova versão (sem ativá-la). Retorna o nome da versão."""
+    import joblib
+
+    diretorio = diretorio_modelos()
+    os.makedirs(diretorio, exist_ok=True)
+    versao = _nova_versao(diretorio)
+    temporario = os.path.join(diretorio, f".{versao}.tmp")
+    os.makedirs(temporario)
+    joblib.dump(estimador, os.path.join(temporario, ARQUIVO_MODELO))
+    with open(os.path.join(temporario, ARQUIVO_METADADOS), "w", encoding="utf-8") as arquivo:
+        json.dump(dict(metadados, versao=versao), arquivo, ensure_ascii=False, indent=2)
+    os.rename(temporario, os.path.join(diretorio, versao))
+    return versao
+
+
+def versao_ativa():
+    """Nome da versão em ATUAL; None se nenhuma foi ativada."""
+    try:
+        with open(_caminho_atual(), encoding="utf-8") as arquivo:
+            return arquivo.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _metadados(versao):
+    with open(os.path.join(diretorio_modelos(), versao, ARQUIVO_METADADOS), encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def versoes():
+    """Metadados de todas as versões gravadas, da mais antiga para a mais nova, com 'ativa'."""
+    diretorio = diretorio_modelos()
+    if not os.path.isdir(diretorio):
+        return []
+    ativa = versao_ativa()
+    return [dict(_metadados(nome), ativa=nome == ativa) for nome in sorted(os.listdir(diretorio))
+            if not nome.startswith(".") and os.path.isfile(os.path.join(diretorio, nome, ARQUIVO_METADADOS))]
+
+
+def ativar(versao):
+    """Torna `versao` a ativa (os workers a carregam na próxima verificação). Retorna True ou None."""
+    if not os.path.isfile(os.path.join(diretorio_modelos(), versao, ARQUIVO_MODELO)):
+        print(f"Versão de modelo não encontrada: {versao}")
+        return None
+    temporario = _caminho_atual() + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(versao + "\n")
+    os.replace(temporario, _caminho_atual())
+    return True
+
+
+def carregar(versao):
+    """Modelo da `versao`; None (com a mensagem) se não puder ser carregado."""
+    import joblib
+
+    try:
+        estimador = joblib.load(os.path.join(diretorio_modelos(), versao, ARQUIVO_MODELO))
+        return Modelo(versao, estimador, _metadados(versao))
+    except Exception as e:
+        print(f"Erro ao carregar a versão de modelo {versao}: {e}")
+        return None
+
+
+class ModeloEmUso:
+    """Modelo ativo do processo, trocado atomicamente quando ATUAL muda."""
+
+    def __init__(self, intervalo_s=INTERVALO_VERIFICACAO_S):
+        self.intervalo_s = intervalo_s
+        self._modelo = None
+        self._assinatura = None  # (inode, mtime) de ATUAL na última verificação
+        self._proxima_verificacao = 0.0
+        self._trava = threading.Lock()
+
+    def obter(self):
+        """
+        Modelo ativo (None se não houver). Quem chama deve usar a referência devolvida até o fim da
+        requisição: uma troca de versão não altera esse objeto.
+        """
+        agora = time.monotonic()
+        # Uma verificação por vez; as outras requisições seguem com o modelo atual sem esperar. Sem modelo
+        # ainda, esperam a carga em andamento em vez de responder que não há modelo ativo
+        if agora >= self._proxima_verificacao and self._trava.acquire(blocking=self._modelo is None):
+            try:
+                if agora >= self._proxima_verificacao:
+                    self._proxima_verificacao = agora + self.intervalo_s
+                    self._recarregar_se_mudou()
+            finally:
+                self._trava.release()
+        return self._modelo
+
+    def carregar_ativo(self):
+        """Carrega já a versão ativa (na subida do worker); depois, obter() só verifica se ela mudou."""
+        with self._trava:
+            self._proxima_verificacao = time.monotonic() + self.intervalo_s
+            self._recarregar_se_mudou()
+        return self._modelo
+
+    def _recarregar_se_mudou(self):
+        try:
+            estado = os.stat(_caminho_atual())
+            assinatura = (estado.st_ino, estado.st_mtime_ns)
+        except FileNotFoundError:
+            assinatura = None
+        if assinatura == self._assinatura:
+            return
+        self._assinatura = assinatura
+        versao = versao_ativa()
+        if versao is None or (self._modelo is not None and self._modelo.versao == versao):
+            return
+        modelo = carregar(versao)
+        if modelo is not None:
+            self._modelo = modelo  # Troca da referência: atômica para as outras threads
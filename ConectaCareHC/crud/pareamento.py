@@ -0,0 +1,289 @@
+# crud/pareamento.py
+# Sugestão de cuidadores por proximidade entre os endereços (coordenadas de utils/coordenadas.py).
+#
+# Os cuidadores com coordenadas ficam num índice espacial (k-d tree do SciPy) sobre a esfera unitária:
+# a distância euclidiana entre os pontos (corda) cresce com a distância real, então os k vizinhos da
+# árvore são os k mais próximos em km. Um cuidador está disponível enquanto tiver menos de `capacidade`
+# pacientes vinculados.
+#   - cuidadores_proximos: os k cuidadores disponíveis mais próximos de um paciente (usa um índice em
+#     cache, recarregado a cada VALIDADE_INDICE_S segundos);
+#   - sugerir_vinculos: um cuidador próximo para cada paciente sem vínculo, respeitando as vagas (cada
+#     cuidador fica com os pacientes mais próximos que o escolheram). As sugestões não são gravadas:
+#     aplicar_sugestoes (ou o endpoint de vínculos em lote) grava as que forem aceitas.
+#
+# Endereços cadastrados antes das colunas LATITUDE/LONGITUDE são preenchidos com preencher_coordenadas.
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.pareamento
+
+import threading
+import time
+
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud import repositorio
+from ConectaCareHC.crud.db_conexao import Credenciais, conectar_bd
+from ConectaCareHC.utils.coordenadas import coordenadas_do_cep, corda_para_km, km_para_corda, para_cartesianas
+
+CAPACIDADE_CUIDADOR = 5  # Pacientes por cuidador
+CANDIDATOS_POR_PACIENTE = 8  # Vizinhos consultados por paciente em cada rodada de sugerir_vinculos
+VALIDADE_INDICE_S = 60
+
+SEM_COORDENADAS = "sem_coordenadas"
+
+
+class IndiceCuidadores:
+    """Índice espacial dos cuidadores com coordenadas e as vagas de cada um."""
+
+    def __init__(self, cpfs, nomes, latitudes, longitudes, vinculados, capacidade=CAPACIDADE_CUIDADOR):
+        import numpy as np
+        from scipy.spatial import cKDTree
+
+        self.cpfs = list(cpfs)
+        self.nomes = list(nomes)
+        self.capacidade = capacidade
+        self.vagas = np.maximum(capacidade - np.asarray(vinculados, dtype=np.int64), 0)
+        self._pontos = para_cartesianas(latitudes, longitudes)
+        self._arvore = cKDTree(self._pontos) if self.cpfs else None
+        self.criado_em = time.monotonic()
+
+    def __len__(self):
+        return len(self.cpfs)
+
+    def proximos(self, latitude, longitude, k=5, excluir=(), raio_km=None):
+        """
+        Os k cuidadores com vaga mais próximos do ponto, ignorando os CPFs em `excluir`.
+
+        Returns:
+            list: [(indice, distancia_km), ...] do mais próximo para o mais distante.
+        """
+        import numpy as np
+
+        if self._arvore is None:
+            return []
+        ponto = para_cartesianas([latitude], [longitude])[0]
+        limite = km_para_corda(raio_km) if raio_km else np.inf
+        consultados = k
+        while True:
+            quantidade = min(consultados, len(self.cpfs))
+            distancias, indices = self._arvore.query(ponto, k=quantidade, distance_upper_bound=limite)
+            distancias, indices = np.atleast_1d(distancias), np.atleast_1d(indices)
+            encontrados = [(int(i), d) for d, i in zip(distancias, indices)
+                           if i < len(self.cpfs) and self.vagas[i] > 0 and self.cpfs[i] not in excluir]
+            # Os vizinhos sem vaga ocupam posições: consulta mais vizinhos até achar k ou esgotar o raio
+            if len(encontrados) >= k or quantidade == len(self.cpfs) or np.isinf(distancias[-1]):
+                return [(i, float(corda_para_km(d))) for i, d in encontrados[:k]]
+            consultados *= 4
+
+    def sugerir(self, latitudes, longitudes, k=CANDIDATOS_POR_PACIENTE, raio_km=None):
+        """
+        Atribui a cada ponto (paciente) um cuidador com vaga, sem alterar as vagas do índice.
+
+        Em cada rodada, os pacientes pendentes consultam os k cuidadores disponíveis mais próximos. Todos
+        tentam primeiro o 1º candidato: cada cuidador aceita os mais próximos até lotar; os recusados
+        tentam o 2º candidato, e assim por diante. Quem encontrou os k candidatos lotados volta na rodada
+        seguinte, com uma árvore só dos cuidadores que ainda têm vagas.
+
+        Returns:
+            tuple: (atribuicoes, distancias_km) -- arrays com o índice do cuidador de cada paciente
+            (-1 se nenhum cuidador com vaga estiver dentro do raio) e a distância em km (NaN sem cuidador).
+        """
+        import numpy as np
+        from scipy.spatial import cKDTree
+
+        pontos = para_cartesianas(latitudes, longitudes)
+        atribuicoes = np.full(len(pontos), -1, dtype=np.int64)
+        cordas = np.full(len(pontos), np.nan)
+        limite = km_para_corda(raio_km) if raio_km else np.inf
+        vagas = self.vagas.copy()
+        pendentes = np.arange(len(pontos))
+        disponiveis = np.flatnonzero(vagas > 0)
+
+        while pendentes.size and disponiveis.size:
+            arvore = self._arvore if disponiveis.size == len(self.cpfs) else cKDTree(self._pontos[disponiveis])
+            quantidade = min(k, disponiveis.size)
+            distancias, indices = arvore.query(pontos[pendentes], k=quantidade, distance_upper_bound=limite,
+                                               workers=-1)
+            distancias = distancias.reshape(len(pendentes), quantidade)
+            indices = indices.reshape(len(pendentes), quantidade)
+
+            restantes = np.arange(len(pendentes))  # Linhas de `pendentes` ainda sem cuidador nesta rodada
+            for coluna in range(quantidade):
+                # Índice igual a disponiveis.size: não há mais vizinhos dentro do raio
+                restantes = restantes[indices[restantes, coluna] < disponiveis.size]
+                if not restantes.size:
+                    break
+                cuidadores = disponiveis[indices[restantes, coluna]]
+                # Posição de cada paciente na fila do seu candidato (por distância); aceita os que cabem nas vagas
+                ordem = np.lexsort((distancias[restantes, coluna], cuidadores))
+                fila = cuidadores[ordem]
+                inicio_fila = np.flatnonzero(np.r_[True, fila[1:] != fila[:-1]])
+                posicao = np.arange(len(fila)) - np.repeat(inicio_fila, np.diff(np.r_[inicio_fila, len(fila)]))
+                aceitos = np.zeros(len(fila), dtype=bool)
+                aceitos[ordem] = posicao < vagas[fila]
+
+                linhas = restantes[aceitos]
+                atribuicoes[pendentes[linhas]] = cuidadores[aceitos]
+                cordas[pendentes[linhas]] = distancias[linhas, coluna]
+                vagas -= np.bincount(cuidadores[aceitos], minlength=len(vagas))
+                restantes = restantes[~aceitos]
+
+            pendentes = pendentes[restantes]  # Encontraram todos os candidatos lotados
+            disponiveis = np.flatnonzero(vagas > 0)
+
+        return atribuicoes, corda_para_km(cordas)
+
+
+def carregar_indice(capacidade=CAPACIDADE_CUIDADOR):
+    """Lê os cuidadores com coordenadas e as suas vagas. Retorna IndiceCuidadores ou None em caso de erro."""
+    linhas = repositorio.consulta_em_lotes(reg.CUIDADORES_COM_COORDENADAS, tamanho_lote=10_000)
+    if linhas is None:
+        return None
+    cpfs, nomes, latitudes, longitudes, vinculados = [], [], [], [], []
+    for row in linhas:
+        cpfs.append(row.cpf)
+        nomes.append(row.nome)
+        latitudes.append(row.latitude)
+        longitudes.append(row.longitude)
+        vinculados.append(row.vinculados)
+    return IndiceCuidadores(cpfs, nomes, latitudes, longitudes, vinculados, capacidade)
+
+
+# Índice usado nas consultas de um paciente (menu e API), recarregado depois de VALIDADE_INDICE_S
+_indice = None
+_trava_indice = threading.Lock()
+
+
+def indice_cuidadores():
+    """Índice em cache (as vagas podem estar defasadas em até VALIDADE_INDICE_S segundos)."""
+    global _indice
+    with _trava_indice:
+        if _indice is None or time.monotonic() - _indice.criado_em > VALIDADE_INDICE_S:
+            _indice = carregar_indice()
+        return _indice
+
+
+def invalidar_indice():
+    global _indice
+    with _trava_indice:
+        _indice = None
+
+
+def cuidadores_proximos(cpf_paciente, k=5, raio_km=None):
+    """
+    Os k cuidadores com vaga mais próximos do endereço do paciente (sem os já vinculados a ele).
+
+    Returns:
+        dict: {'situacao', 'cuidadores': [{'cpf', 'nome', 'distancia_km'}, ...]} com situacao SUCESSO,
+        PACIENTE_NAO_ENCONTRADO ou SEM_COORDENADAS (CEP fora da base de centroides); None em caso de erro.
+    """
+    linhas = repositorio.executar_sql(reg.COORDENADAS_PACIENTE, {'cpf': cpf_paciente})
+    if linhas is None:
+        return None
+    if not linhas:
+        return {'situacao': repositorio.PACIENTE_NAO_ENCONTRADO, 'cuidadores': []}
+    if linhas[0].latitude is None:
+        return {'situacao': SEM_COORDENADAS, 'cuidadores': []}
+
+    indice = indice_cuidadores()
+    if indice is None:
+        return None
+    vinculados = {row.cpf_cuidador for row in linhas if row.cpf_cuidador}
+    proximos = indice.proximos(linhas[0].latitude, linhas[0].longitude, k, vinculados, raio_km)
+    return {'situacao': repositorio.SUCESSO,
+            'cuidadores': [{'cpf': indice.cpfs[i], 'nome': indice.nomes[i], 'distancia_km': round(km, 2)}
+                           for i, km in proximos]}
+
+
+def sugerir_vinculos(raio_km=None, capacidade=CAPACIDADE_CUIDADOR, k=CANDIDATOS_POR_PACIENTE):
+    """
+    Sugere um cuidador próximo para cada paciente sem vínculo (nada é gravado).
+
+    Returns:
+        dict: {'sugestoes': [{'cpf_paciente', 'cpf_cuidador', 'distancia_km'}, ...],
+               'sem_sugestao': [cpf, ...]}; None em caso de erro.
+    """
+    indice = carregar_indice(capacidade)
+    if indice is None:
+        return None
+    linhas = repositorio.consulta_em_lotes(reg.PACIENTES_SEM_VINCULO, tamanho_lote=10_000)
+    if linhas is None:
+        return None
+    cpfs, latitudes, longitudes = [], [], []
+    for row in linhas:
+        cpfs.append(row.cpf)
+        latitudes.append(row.latitude)
+        longitudes.append(row.longitude)
+
+    atribuicoes, distancias = indice.sugerir(latitudes, longitudes, k, raio_km)
+    sugestoes, sem_sugestao = [], []
+    for cpf, cuidador, km in zip(cpfs, atribuicoes.tolist(), distancias.tolist()):
+        if cuidador < 0:
+            sem_sugestao.append(cpf)
+        else:
+            sugestoes.append({'cpf_paciente': cpf, 'cpf_cuidador': indice.cpfs[cuidador],
+                              'distancia_km': round(km, 2)})
+    return {'sugestoes': sugestoes, 'sem_sugestao': sem_sugestao}
+
+
+def aplicar_sugestoes(sugestoes):
+    """Grava os vínculos sugeridos (mesmo retorno de repositorio.vincular_em_lote)."""
+    resultado = repositorio.vincular_em_lote(sugestoes)
+    invalidar_indice()
+    return resultado
+
+
+# --- Preenchimento das coordenadas ---
+
+def adicionar_colunas_coordenadas():
+    """Cria ENDERECOS.LATITUDE/LONGITUDE no Oracle, se ainda não existirem (o substituto local já as cria)."""
+    Credenciais.carregar()
+    if Credenciais.DB_LOCAL:
+        return True
+    existentes = repositorio.executar_sql(
+        "SELECT COUNT(*) FROM USER_TAB_COLUMNS WHERE TABLE_NAME = 'ENDERECOS' AND COLUMN_NAME = 'LATITUDE'",
+        fetch_one=True)
+    if existentes is None:
+        return False
+    if existentes[0]:
+        return True
+    return repositorio.executar_sql(
+        "ALTER TABLE ENDERECOS ADD (LATITUDE NUMBER(9, 6), LONGITUDE NUMBER(9, 6))", commit=True) is not None
+
+
+def preencher_coordenadas(tamanho_lote=5000):
+    """
+    Calcula as coordenadas dos endereços que ainda não as têm, a partir do CEP.
+    Retorna a quantidade de endereços atualizados ou None em caso de erro.
+    """
+    linhas = repositorio.consulta_em_lotes(reg.ENDERECOS_SEM_COORDENADAS, tamanho_lote=tamanho_lote)
+    if linhas is None:
+        return None
+    atualizacoes = []
+    for row in linhas:
+        coordenadas = coordenadas_do_cep(row.cep)
+        if coordenadas:
+            atualizacoes.append({'latitude': coordenadas[0], 'longitude': coordenadas[1], 'id_end': row.id_endereco})
+
+    conexao = conectar_bd()
+    if not conexao: return None
+    try:
+        with conexao.cursor() as cursor:
+            reg.ATUALIZAR_COORDENADAS.preparar(cursor)
+            for inicio in range(0, len(atualizacoes), tamanho_lote):
+                cursor.executemany(reg.ATUALIZAR_COORDENADAS.sql, atualizacoes[inicio:inicio + tamanho_lote])
+                conexao.commit()
+        return len(atualizacoes)
+    except Exception as e:
+        print(f"Erro ao preencher as coordenadas dos endereços: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+if __name__ == "__main__":
+    if not adicionar_colunas_coordenadas():
+        raise SystemExit(1)
+    atualizados = preencher_coordenadas()
+    if atualizados is None:
+        raise SystemExit(1)
+    print(f"Coordenadas preenchidas em {atualizados} endereços.")
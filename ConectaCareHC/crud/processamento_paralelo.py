@@ -0,0 +1,213 @@
+# crud/processamento_paralelo.py
+# Motor de processamento em lote particionado (exportação, importação, reprocessamentos...).
+#
+# A tabela é dividida em partições disjuntas:
+#   - 'faixas': faixas contíguas da chave com a mesma quantidade de linhas (NTILE sobre a chave);
+#     concatenar os resultados na ordem das partições mantém a ordem da chave;
+#   - 'hash': MOD(chave numérica, n) = i; não precisa consultar o banco para particionar.
+# Cada partição roda num pool de processos (trabalho de CPU, ex.: serialização) ou de threads (trabalho
+# dominado por espera no banco). Cada worker mantém a sua própria conexão, aberta uma única vez e
+# reaproveitada por todas as partições que ele executar. Partições que falham são repetidas até
+# `tentativas` vezes, com uma conexão nova, e os resultados são devolvidos na ordem das partições,
+# independentemente da ordem em que terminaram.
+#
+# Uma tarefa é uma função de módulo (precisa ser "picklable" no modo processos) com a assinatura
+# tarefa(conexao, particao, *argumentos), que usa particao.filtro(alias) e particao.parametros na sua
+# consulta. Exemplo: crud/exportacao.py.
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from ConectaCareHC.crud.db_conexao import Credenciais, conectar_bd, nova_conexao
+
+# Chave de particionamento de cada tabela: coluna e expressão numérica (para a estratégia 'hash')
+TABELAS_PARTICIONAVEIS = {
+    'PACIENTES': {'chave': 'CPF', 'numerica': 'TO_NUMBER({alias}CPF)'},
+    'CUIDADORES': {'chave': 'CPF', 'numerica': 'TO_NUMBER({alias}CPF)'},
+    'AGENDAMENTOS': {'chave': 'ID_AGENDAMENTO', 'numerica': '{alias}ID_AGENDAMENTO'},
+}
+
+ESTRATEGIAS = ('faixas', 'hash')
+MODOS = ('processos', 'threads')
+
+
+class Particao:
+    """Fatia disjunta de uma tabela: um intervalo [inicio, fim] da chave ou um resto de MOD(chave, total)."""
+
+    def __init__(self, indice, tabela, estrategia, inicio=None, fim=None, total=None, linhas=None):
+        self.indice = indice
+        self.tabela = tabela
+        self.estrategia = estrategia
+        self.inicio = inicio
+        self.fim = fim
+        self.total = total
+        self.linhas = linhas  # Quantidade estimada (conhecida só na estratégia 'faixas')
+
+    def __repr__(self):
+        if self.estrategia == 'hash':
+            return f"Particao({self.indice}, {self.tabela}, MOD = {self.indice}/{self.total})"
+        return f"Particao({self.indice}, {self.tabela}, {self.inicio!r}..{self.fim!r})"
+
+    def filtro(self, alias=""):
+        """Condição SQL da partição (para o WHERE), com a coluna prefixada por `alias`."""
+        prefixo = f"{alias}." if alias else ""
+        configuracao = TABELAS_PARTICIONAVEIS[self.tabela]
+        if self.estrategia == 'hash':
+            return f"MOD({configuracao['numerica'].format(alias=prefixo)}, :particoes) = :particao"
+        return f"{prefixo}{configuracao['chave']} BETWEEN :chave_inicio AND :chave_fim"
+
+    @property
+    def parametros(self):
+        if self.estrategia == 'hash':
+            return {'particoes': self.total, 'particao': self.indice}
+        return {'chave_inicio': self.inicio, 'chave_fim': self.fim}
+
+
+def calcular_particoes(tabela, quantidade, estrategia='faixas'):
+    """
+    Divide a tabela em até `quantidade` partições disjuntas que cobrem todas as linhas.
+    Retorna a lista de Particao (vazia se a tabela estiver vazia) ou None em caso de erro.
+    """
+    if tabela not in TABELAS_PARTICIONAVEIS:
+        raise ValueError(f"Tabela não particionável: {tabela}")
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estratégia de particionamento inválida: {estrategia}")
+    if estrategia == 'hash':
+        return [Particao(i, tabela, 'hash', total=quantidade) for i in range(quantidade)]
+
+    chave = TABELAS_PARTICIONAVEIS[tabela]['chave']
+    sql = f"""
+    SELECT MIN({chave}), MAX({chave}), COUNT(*)
+    FROM (SELECT {chave}, NTILE(:quantidade) OVER (ORDER BY {chave}) AS FAIXA FROM {tabela})
+    GROUP BY FAIXA
+    ORDER BY FAIXA"""
+
+    conexao = conectar_bd()
+    if not conexao: return None
+    try:
+        with conexao.cursor() as cursor:
+            faixas = cursor.execute(sql, {'quantidade': quantidade}).fetchall()
+        return [Particao(i, tabela, 'faixas', inicio, fim, linhas=linhas)
+                for i, (inicio, fim, linhas) in enumerate(faixas)]
+    except Exception as e:
+        print(f"Erro ao particionar {tabela}: {e}")
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Lado do worker ---
+
+# Conexão do worker (processo ou thread), aberta na primeira partição e reaproveitada nas seguintes
+_local = threading.local()
+
+
+def _inicializar_processo(credenciais, latencia_local):
+    """Replica no processo worker a configuração de banco do processo principal."""
+    Credenciais.USER, Credenciais.PASSWORD, Credenciais.DSN, Credenciais.DB_LOCAL = credenciais
+    Credenciais._carregadas = True
+    if Credenciais.DB_LOCAL:
+        from ConectaCareHC.crud import db_local
+        db_local.LATENCIA_REDE_S = latencia_local
+
+
+def _conexao_do_worker(abertas):
+    conexao = getattr(_local, 'conexao', None)
+    if conexao is None:
+        conexao = nova_conexao()
+        if not conexao:
+            raise ConnectionError("Não foi possível conectar ao banco de dados.")
+        _local.conexao = conexao
+        if abertas is not None:
+            abertas.append(conexao)  # No modo threads, o coordenador fecha as conexões ao final
+    return conexao
+
+
+def _descartar_conexao_do_worker():
+    conexao = getattr(_local, 'conexao', None)
+    _local.conexao = None
+    if conexao is not None:
+        try:
+            conexao.rollback()
+            conexao.close()
+        except Exception:
+            pass  # A conexão já pode estar quebrada; a próxima partição abre outra
+
+
+def _executar_particao(tarefa, particao, argumentos, abertas=None):
+    try:
+        return tarefa(_conexao_do_worker(abertas), particao, *argumentos)
+    except Exception:
+        _descartar_conexao_do_worker()
+        raise
+
+
+# --- Lado do coordenador ---
+
+def executar_particionado(tarefa, particoes, argumentos=(), workers=4, modo='processos', tentativas=2,
+                          progresso=None):
+    """
+    Executa tarefa(conexao, particao, *argumentos) para cada partição num pool de `workers`.
+
+    Args:
+        particoes (list): resultado de calcular_particoes.
+        modo (str): 'processos' ou 'threads'.
+        tentativas (int): execuções extras permitidas para uma partição que falhou.
+        progresso (callable): chamado como progresso(concluidas, total, particao) a cada partição concluída.
+
+    Returns:
+        list: resultados na ordem das partições; None se alguma partição falhar em todas as tentativas.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de execução inválido: {modo}")
+    if not particoes:
+        return []
+
+    if modo == 'processos':
+        from ConectaCareHC.crud import db_local
+
+        Credenciais.carregar()
+        credenciais = (Credenciais.USER, Credenciais.PASSWORD, Credenciais.DSN, Credenciais.DB_LOCAL)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_processo,
+                                       initargs=(credenciais, db_local.LATENCIA_REDE_S))
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="particao")
+    # Conexões abertas pelas threads (no modo processos, fecham junto com os processos)
+    abertas = [] if modo == 'threads' else None
+
+    def submeter(particao):
+        return executor.submit(_executar_particao, tarefa, particao, argumentos, abertas)
+
+    resultados = [None] * len(particoes)
+    falhas = {}
+    concluidas = 0
+    try:
+        pendentes = {submeter(p): p for p in particoes}
+        while pendentes:
+            prontas, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                particao = pendentes.pop(futuro)
+                erro = futuro.exception()
+                if erro is None:
+                    resultados[particao.indice] = futuro.result()
+                    concluidas += 1
+                    if progresso:
+                        progresso(concluidas, len(particoes), particao)
+                    continue
+
+                falhas[particao.indice] = falhas.get(particao.indice, 0) + 1
+                if falhas[particao.indice] > tentativas:
+                    print(f"Erro no processamento da {particao} após {falhas[particao.indice]} tentativas: {erro}")
+                    for restante in pendentes:
+                        restante.cancel()
+                    return None
+                print(f"Falha na {particao} ({erro}); tentando novamente.")
+                pendentes[submeter(particao)] = particao
+        return resultados
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for conexao in abertas or []:
+            try:
+                conexao.close()
+            except Exception:
+                pass  # Já descartada após uma falha
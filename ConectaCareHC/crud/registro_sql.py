@@ -0,0 +1,601 @@
+# crud/registro_sql.py
+# Registro central das instruções SQL do sistema.
+#
+# Cada instrução é definida uma única vez, com:
+#   - colunas nomeadas: as linhas voltam como namedtuple (acesso por nome ou por índice), então
+#     nenhum código depende da posição das colunas no SELECT;
+#   - tipos de bind pré-declarados (cursor.setinputsizes): um int indica VARCHAR2 com esse tamanho
+#     máximo e `int` indica NUMBER, como no oracledb. Assim o driver não precisa redefinir os binds
+#     quando o tamanho dos valores muda de uma execução para outra;
+#   - arraysize/prefetchrows por consulta: leituras de uma linha pedem só o necessário e leituras
+#     em massa buscam lotes grandes por ida e volta ao servidor.
+# O texto de cada instrução é sempre o mesmo, então o cache de instruções do driver
+# (TAMANHO_CACHE_INSTRUCOES, usado em db_conexao) evita reanalisar o SQL a cada chamada.
+
+import re
+import threading
+from collections import namedtuple
+
+# Leitura de uma linha: arraysize=1 e prefetchrows=2 trazem a linha e o "fim dos dados" numa viagem
+LEITURA_UNICA = {'arraysize': 1, 'prefetchrows': 2}
+# Listagens curtas (ex.: agendamentos de um paciente)
+LEITURA_CURTA = {'arraysize': 100, 'prefetchrows': 100}
+# Listagens e exportação: poucos lotes grandes
+LEITURA_EM_MASSA = {'arraysize': 1000, 'prefetchrows': 1000}
+
+TAMANHO_CPF = 11
+# Colunas de CPF: depois da migração opcional para chave numérica (crud/migracao_cpf.py) o banco as
+# devolve como número, e a fábrica de linhas as converte de volta para o texto de 11 dígitos.
+COLUNAS_CPF = frozenset({'cpf', 'cpf_paciente', 'cpf_cuidador'})
+
+CONSULTAS = {}
+INSTRUCOES_POR_LISTA = []  # ConsultasPorLista: registradas no primeiro uso de cada tamanho
+
+
+def _cpf_texto(valor):
+    return valor if valor is None or isinstance(valor, str) else str(valor).zfill(TAMANHO_CPF)
+
+
+class Consulta:
+    """Instrução SQL registrada: texto, colunas nomeadas, tipos de bind e parâmetros de leitura."""
+
+    def __init__(self, nome, sql, colunas=(), tipos_bind=None, arraysize=None, prefetchrows=None):
+        self.nome = nome
+        self.sql = sql
+        self.colunas = tuple(colunas)
+        self.tipos_bind = tipos_bind or {}
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        self.tipo_linha = namedtuple(f"Linha_{nome}", self.colunas) if self.colunas else None
+        self.linha = self._fabrica_de_linhas()
+
+        binds = set(re.findall(r":(\w+)", sql))
+        desconhecidos = set(self.tipos_bind) - binds
+        if desconhecidos:
+            raise ValueError(f"Consulta '{nome}': tipos declarados para binds inexistentes {sorted(desconhecidos)}")
+
+    def __repr__(self):
+        return f"Consulta({self.nome!r})"
+
+    def _fabrica_de_linhas(self):
+        posicoes_cpf = [i for i, coluna in enumerate(self.colunas) if coluna in COLUNAS_CPF]
+        if not posicoes_cpf:
+            return self.tipo_linha
+        tipo_linha = self.tipo_linha
+
+        def linha(*valores):
+            valores = list(valores)
+            for i in posicoes_cpf:
+                valores[i] = _cpf_texto(valores[i])
+            return tipo_linha(*valores)
+        return linha
+
+    def preparar(self, cursor, **binds_extras):
+        """Aplica ao cursor os tipos de bind e o arraysize/prefetchrows (antes do execute/executemany)."""
+        if self.tipos_bind or binds_extras:
+            cursor.setinputsizes(**self.tipos_bind, **binds_extras)
+        if self.prefetchrows is not None:
+            cursor.prefetchrows = self.prefetchrows
+        if self.arraysize is not None:
+            cursor.arraysize = self.arraysize
+
+    def executar(self, cursor, parametros=None):
+        """
+        Prepara o cursor, executa a instrução e devolve o cursor. A fábrica de linhas nomeadas é
+        aplicada depois do execute porque o driver a descarta a cada nova instrução.
+        """
+        self.preparar(cursor)
+        cursor.execute(self.sql, parametros or {})
+        if self.linha is not None:
+            cursor.rowfactory = self.linha
+        return cursor
+
+
+def registrar(nome, sql, colunas=(), tipos_bind=None, leitura=None):
+    consulta = Consulta(nome, sql, colunas, tipos_bind, **(leitura or {}))
+    CONSULTAS[nome] = consulta
+    return consulta
+
+
+class ConsultasPorLista:
+    """
+    Uma instrução por tamanho de lista IN (completada com NULL, para que o texto se repita e seja
+    reaproveitado pelo cache). `sql` tem {lista} no lugar da lista; os binds são :k0, :k1... (ou outro
+    prefixo). Cada tamanho é montado e registrado no primeiro uso: as listas de 1000 binds custariam
+    vários milissegundos na importação.
+    """
+
+    def __init__(self, nome, sql, tipo_bind, tamanhos, colunas=(), tipos_bind=None, prefixo='k'):
+        self.nome = nome
+        self.sql = sql
+        self.tipo_bind = tipo_bind
+        self.tamanhos = tamanhos
+        self.colunas = colunas
+        self.tipos_bind = tipos_bind or {}
+        self.prefixo = prefixo
+        self._consultas = {}
+        self._trava = threading.Lock()
+        INSTRUCOES_POR_LISTA.append(self)
+
+    def __getitem__(self, tamanho):
+        consulta = self._consultas.get(tamanho)
+        if consulta is None:
+            if tamanho not in self.tamanhos:
+                raise KeyError(tamanho)
+            with self._trava:
+                consulta = self._consultas.get(tamanho)
+                if consulta is None:
+                    binds = [f"{self.prefixo}{i}" for i in range(tamanho)]
+                    consulta = self._consultas[tamanho] = registrar(
+                        f"{self.nome}_{tamanho}", self.sql.format(lista=", ".join(f":{b}" for b in binds)),
+                        self.colunas, {**{b: self.tipo_bind for b in binds}, **self.tipos_bind}, LEITURA_EM_MASSA)
+        return consulta
+
+    def para(self, quantidade):
+        """Devolve (Consulta, tamanho da lista IN) da menor instrução que comporta `quantidade` chaves."""
+        for tamanho in self.tamanhos:
+            if quantidade <= tamanho:
+                return self[tamanho], tamanho
+        return self[self.tamanhos[-1]], self.tamanhos[-1]
+
+
+# --- Pessoas (PACIENTES / CUIDADORES) com endereço ---
+
+COLUNAS_PESSOA = ('nome', 'cpf', 'idade', 'email', 'telefone_contato', 'id_endereco',
+                  'logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf', 'cep')
+
+
+def _select_pessoa(tabela):
+    return f"""
+    SELECT
+        T.NOME, T.CPF, T.IDADE, T.EMAIL, T.TELEFONE_CONTATO, T.ID_ENDERECO,
+        E.LOGRADOURO, E.NUMERO, E.COMPLEMENTO, E.BAIRRO, E.CIDADE, E.UF, E.CEP
+    FROM {tabela} T
+    JOIN ENDERECOS E ON T.ID_ENDERECO = E.ID_ENDERECO"""
+
+
+PACIENTE_POR_CPF = registrar(
+    'paciente_por_cpf', _select_pessoa('PACIENTES') + "\n    WHERE T.CPF = :cpf",
+    COLUNAS_PESSOA, {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+CUIDADOR_POR_CPF = registrar(
+    'cuidador_por_cpf', _select_pessoa('CUIDADORES') + "\n    WHERE T.CPF = :cpf",
+    COLUNAS_PESSOA, {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+PACIENTES = registrar(
+    'pacientes', _select_pessoa('PACIENTES') + "\n    ORDER BY T.NOME",
+    COLUNAS_PESSOA, leitura=LEITURA_EM_MASSA)
+
+PACIENTES_POR_IDADE_MINIMA = registrar(
+    'pacientes_por_idade_minima',
+    _select_pessoa('PACIENTES') + "\n    WHERE T.IDADE >= :idade_minima\n    ORDER BY T.IDADE DESC, T.NOME",
+    COLUNAS_PESSOA, {'idade_minima': int}, LEITURA_EM_MASSA)
+
+CUIDADORES = registrar(
+    'cuidadores', _select_pessoa('CUIDADORES') + "\n    ORDER BY T.NOME",
+    COLUNAS_PESSOA, leitura=LEITURA_EM_MASSA)
+
+CPFS_PACIENTES = registrar('cpfs_pacientes', "SELECT CPF FROM PACIENTES", ('cpf',), leitura=LEITURA_EM_MASSA)
+CPFS_CUIDADORES = registrar('cpfs_cuidadores', "SELECT CPF FROM CUIDADORES", ('cpf',), leitura=LEITURA_EM_MASSA)
+
+COLUNAS_EXPORTACAO = ('nome', 'cpf', 'idade', 'email', 'telefone_contato', 'logradouro', 'numero', 'complemento',
+                      'bairro', 'cidade', 'uf', 'cep')
+
+EXPORTACAO_PACIENTES = registrar('exportacao_pacientes', """
+    SELECT
+        P.NOME, P.CPF, P.IDADE, P.EMAIL, P.TELEFONE_CONTATO,
+        E.LOGRADOURO, E.NUMERO, E.COMPLEMENTO, E.BAIRRO, E.CIDADE, E.UF, E.CEP
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON P.ID_ENDERECO = E.ID_ENDERECO
+    ORDER BY P.NOME""", COLUNAS_EXPORTACAO, leitura=LEITURA_EM_MASSA)
+
+NOME_PACIENTE = registrar(
+    'nome_paciente', "SELECT NOME FROM PACIENTES WHERE CPF = :cpf",
+    ('nome',), {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+NOME_CUIDADOR = registrar(
+    'nome_cuidador', "SELECT NOME FROM CUIDADORES WHERE CPF = :cpf",
+    ('nome',), {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+
+def _endereco_da_pessoa(tabela):
+    return f"SELECT ID_ENDERECO FROM {tabela} WHERE CPF = :cpf"
+
+
+ENDERECO_PACIENTE = registrar(
+    'endereco_paciente', _endereco_da_pessoa('PACIENTES'), ('id_endereco',), {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+ENDERECO_CUIDADOR = registrar(
+    'endereco_cuidador', _endereco_da_pessoa('CUIDADORES'), ('id_endereco',), {'cpf': TAMANHO_CPF}, LEITURA_UNICA)
+
+# --- Escritas ---
+
+INSERIR_ENDERECO = registrar('inserir_endereco', """
+    INSERT INTO ENDERECOS
+        (CEP, LOGRADOURO, NUMERO, COMPLEMENTO, BAIRRO, CIDADE, UF, LATITUDE, LONGITUDE)
+    VALUES
+        (:cep, :logradouro, :numero, :complemento, :bairro, :cidade, :uf, :latitude, :longitude)
+    RETURNING ID_ENDERECO INTO :id_endereco""",
+    tipos_bind={'cep': 9, 'logradouro': 150, 'numero': 20, 'complemento': 100, 'bairro': 100, 'cidade': 100, 'uf': 2,
+                'latitude': float, 'longitude': float})
+
+TIPOS_BIND_PESSOA = {'nome': 150, 'cpf': TAMANHO_CPF, 'idade': int, 'email': 150, 'telefone_contato': 20,
+                     'id_endereco': int}
+
+
+def _inserir_pessoa(tabela):
+    return f"""
+    INSERT INTO {tabela} (NOME, CPF, IDADE, EMAIL, TELEFONE_CONTATO, ID_ENDERECO)
+    VALUES (:nome, :cpf, :idade, :email, :telefone_contato, :id_endereco)"""
+
+
+INSERIR_PACIENTE = registrar('inserir_paciente', _inserir_pessoa('PACIENTES'), tipos_bind=TIPOS_BIND_PESSOA)
+INSERIR_CUIDADOR = registrar('inserir_cuidador', _inserir_pessoa('CUIDADORES'), tipos_bind=TIPOS_BIND_PESSOA)
+
+EXCLUIR_PACIENTE = registrar(
+    'excluir_paciente', "DELETE FROM PACIENTES WHERE CPF = :cpf", tipos_bind={'cpf': TAMANHO_CPF})
+EXCLUIR_CUIDADOR = registrar(
+    'excluir_cuidador', "DELETE FROM CUIDADORES WHERE CPF = :cpf", tipos_bind={'cpf': TAMANHO_CPF})
+EXCLUIR_ENDERECO = registrar(
+    'excluir_endereco', "DELETE FROM ENDERECOS WHERE ID_ENDERECO = :id_end", tipos_bind={'id_end': int})
+
+INSERIR_VINCULO = registrar('inserir_vinculo', """
+    INSERT INTO VINCULOS_PACIENTE_CUIDADOR (CPF_PACIENTE, CPF_CUIDADOR)
+    SELECT :cpf_paciente, :cpf_cuidador FROM DUAL
+    WHERE NOT EXISTS (
+        SELECT 1 FROM VINCULOS_PACIENTE_CUIDADOR
+        WHERE CPF_PACIENTE = :cpf_paciente AND CPF_CUIDADOR = :cpf_cuidador
+    )""", tipos_bind={'cpf_paciente': TAMANHO_CPF, 'cpf_cuidador': TAMANHO_CPF})
+
+INSERIR_AGENDAMENTO = registrar(
+    'inserir_agendamento',
+    "INSERT INTO AGENDAMENTOS (CPF_PACIENTE, DATA_CONSULTA) VALUES (:cpf_paciente, TO_DATE(:data_consulta, 'DD/MM/YYYY'))",
+    tipos_bind={'cpf_paciente': TAMANHO_CPF, 'data_consulta': 10})
+
+# Períodos como [inicio, fim) em AAAA-MM-DD: sem período, repositorio usa limites que cobrem qualquer data
+AGENDAMENTOS_PACIENTE = registrar('agendamentos_paciente', """
+    SELECT ID_AGENDAMENTO, TO_CHAR(DATA_CONSULTA, 'YYYY-MM-DD') FROM AGENDAMENTOS
+    WHERE CPF_PACIENTE = :cpf_paciente
+      AND DATA_CONSULTA >= TO_DATE(:inicio, 'YYYY-MM-DD') AND DATA_CONSULTA < TO_DATE(:fim, 'YYYY-MM-DD')
+    ORDER BY DATA_CONSULTA""", ('id_agendamento', 'data_consulta'),
+    {'cpf_paciente': TAMANHO_CPF, 'inicio': 10, 'fim': 10}, LEITURA_CURTA)
+
+# --- Arquivamento dos agendamentos antigos (crud/arquivamento.py) ---
+
+MESES_AGENDAMENTOS_ANTERIORES = registrar('meses_agendamentos_anteriores', """
+    SELECT TO_CHAR(DATA_CONSULTA, 'YYYY-MM'), COUNT(*) FROM AGENDAMENTOS
+    WHERE DATA_CONSULTA < TO_DATE(:corte, 'YYYY-MM-DD')
+    GROUP BY TO_CHAR(DATA_CONSULTA, 'YYYY-MM')
+    ORDER BY 1""", ('mes', 'quantidade'), {'corte': 10})
+
+AGENDAMENTOS_DO_PERIODO = registrar('agendamentos_do_periodo', """
+    SELECT ID_AGENDAMENTO, CPF_PACIENTE, TO_CHAR(DATA_CONSULTA, 'YYYY-MM-DD') FROM AGENDAMENTOS
+    WHERE DATA_CONSULTA >= TO_DATE(:inicio, 'YYYY-MM-DD') AND DATA_CONSULTA < TO_DATE(:fim, 'YYYY-MM-DD')
+    ORDER BY DATA_CONSULTA, ID_AGENDAMENTO""", ('id_agendamento', 'cpf_paciente', 'data_consulta'),
+    {'inicio': 10, 'fim': 10}, LEITURA_EM_MASSA)
+
+EXCLUIR_AGENDAMENTO = registrar(
+    'excluir_agendamento', "DELETE FROM AGENDAMENTOS WHERE ID_AGENDAMENTO = :id_agendamento")
+
+# --- Visão 360 do paciente (dados, endereço, cuidadores vinculados e próximos agendamentos) ---
+# Uma única consulta com três blocos UNION ALL, distinguidos pela coluna TIPO ('P' paciente, 'C' cuidador,
+# 'A' agendamento) e ordenados por paciente, tipo e data. crud/repositorio.py agrupa as linhas por paciente.
+
+COLUNAS_VISAO_PACIENTE = ('tipo', 'cpf_paciente', 'nome', 'cpf', 'idade', 'email', 'telefone_contato',
+                          'logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf', 'cep',
+                          'data_consulta', 'ordem')
+
+
+def _select_visao_pacientes(filtro_paciente, filtro_vinculo, filtro_agendamento):
+    return f"""
+    SELECT 'P' AS TIPO, P.CPF AS CPF_PACIENTE, P.NOME, P.CPF, P.IDADE, P.EMAIL, P.TELEFONE_CONTATO,
+           E.LOGRADOURO, E.NUMERO, E.COMPLEMENTO, E.BAIRRO, E.CIDADE, E.UF, E.CEP,
+           NULL AS DATA_CONSULTA, NULL AS ORDEM
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON P.ID_ENDERECO = E.ID_ENDERECO
+    WHERE {filtro_paciente}
+    UNION ALL
+    SELECT 'C', V.CPF_PACIENTE, C.NOME, C.CPF, C.IDADE, C.EMAIL, C.TELEFONE_CONTATO,
+           NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           NULL, C.NOME
+    FROM VINCULOS_PACIENTE_CUIDADOR V
+    JOIN CUIDADORES C ON C.CPF = V.CPF_CUIDADOR
+    WHERE {filtro_vinculo}
+    UNION ALL
+    SELECT 'A', A.CPF_PACIENTE, NULL, NULL, NULL, NULL, NULL,
+           NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+           TO_CHAR(A.DATA_CONSULTA, 'DD/MM/YYYY'), TO_CHAR(A.DATA_CONSULTA, 'YYYY-MM-DD')
+    FROM AGENDAMENTOS A
+    WHERE {filtro_agendamento} AND A.DATA_CONSULTA >= TO_DATE(:a_partir_de, 'DD/MM/YYYY')
+    ORDER BY 2, 1 DESC, 16"""
+
+
+VISAO_PACIENTE = registrar(
+    'visao_paciente',
+    _select_visao_pacientes("P.CPF = :cpf", "V.CPF_PACIENTE = :cpf", "A.CPF_PACIENTE = :cpf"),
+    COLUNAS_VISAO_PACIENTE, {'cpf': TAMANHO_CPF, 'a_partir_de': 10}, LEITURA_CURTA)
+
+# A versão em lote usa uma lista IN de tamanho fixo (ConsultasPorLista); listas maiores são divididas em
+# blocos do maior tamanho.
+TAMANHOS_LOTE_VISAO = (10, 100, 1000)  # 1000 é o limite de itens de uma lista IN no Oracle
+_VISOES_EM_LOTE = ConsultasPorLista(
+    'visao_pacientes',
+    _select_visao_pacientes("P.CPF IN ({lista})", "V.CPF_PACIENTE IN ({lista})", "A.CPF_PACIENTE IN ({lista})"),
+    TAMANHO_CPF, TAMANHOS_LOTE_VISAO, COLUNAS_VISAO_PACIENTE, {'a_partir_de': 10}, prefixo='cpf')
+
+
+def visao_pacientes_em_lote(quantidade):
+    """Devolve (Consulta, tamanho da lista IN) da menor instrução em lote que comporta `quantidade` CPFs."""
+    return _VISOES_EM_LOTE.para(quantidade)
+
+
+# --- Pareamento por proximidade (crud/pareamento.py) ---
+
+ENDERECOS_SEM_COORDENADAS = registrar(
+    'enderecos_sem_coordenadas',
+    "SELECT ID_ENDERECO, CEP FROM ENDERECOS WHERE LATITUDE IS NULL AND CEP IS NOT NULL",
+    ('id_endereco', 'cep'), leitura=LEITURA_EM_MASSA)
+
+ATUALIZAR_COORDENADAS = registrar(
+    'atualizar_coordenadas',
+    "UPDATE ENDERECOS SET LATITUDE = :latitude, LONGITUDE = :longitude WHERE ID_ENDERECO = :id_end",
+    tipos_bind={'latitude': float, 'longitude': float, 'id_end': int})
+
+# Vagas: a contagem de vínculos é agregada uma vez (o índice da chave de VINCULOS começa pelo paciente)
+CUIDADORES_COM_COORDENADAS = registrar('cuidadores_com_coordenadas', """
+    SELECT C.CPF, C.NOME, E.LATITUDE, E.LONGITUDE, COALESCE(V.VINCULADOS, 0)
+    FROM CUIDADORES C
+    JOIN ENDERECOS E ON C.ID_ENDERECO = E.ID_ENDERECO
+    LEFT JOIN (SELECT CPF_CUIDADOR, COUNT(*) AS VINCULADOS
+               FROM VINCULOS_PACIENTE_CUIDADOR
+               GROUP BY CPF_CUIDADOR) V ON V.CPF_CUIDADOR = C.CPF
+    WHERE E.LATITUDE IS NOT NULL""", ('cpf', 'nome', 'latitude', 'longitude', 'vinculados'), leitura=LEITURA_EM_MASSA)
+
+PACIENTES_SEM_VINCULO = registrar('pacientes_sem_vinculo', """
+    SELECT P.CPF, E.LATITUDE, E.LONGITUDE
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON P.ID_ENDERECO = E.ID_ENDERECO
+    WHERE E.LATITUDE IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM VINCULOS_PACIENTE_CUIDADOR V WHERE V.CPF_PACIENTE = P.CPF)
+    ORDER BY P.CPF""", ('cpf', 'latitude', 'longitude'), leitura=LEITURA_EM_MASSA)
+
+# Coordenadas do paciente e os cuidadores já vinculados a ele (uma linha por vínculo, ou uma com NULL)
+COORDENADAS_PACIENTE = registrar('coordenadas_paciente', """
+    SELECT E.LATITUDE, E.LONGITUDE, V.CPF_CUIDADOR
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON P.ID_ENDERECO = E.ID_ENDERECO
+    LEFT JOIN VINCULOS_PACIENTE_CUIDADOR V ON V.CPF_PACIENTE = P.CPF
+    WHERE P.CPF = :cpf""", ('latitude', 'longitude', 'cpf_cuidador'), {'cpf': TAMANHO_CPF}, LEITURA_CURTA)
+
+
+# --- Roteirização das visitas do dia (crud/roteirizacao.py) ---
+# Uma linha por visita (agendamento do dia x cuidador vinculado ao paciente), com o endereço do cuidador
+# (ponto de partida) e o do paciente, agrupadas por cuidador.
+
+COLUNAS_VISITAS = ('cpf_cuidador', 'latitude_cuidador', 'longitude_cuidador', 'cpf_paciente', 'nome_paciente',
+                   'latitude', 'longitude', 'id_agendamento')
+
+
+def select_visitas_do_dia(filtro_cuidador):
+    return f"""
+    SELECT C.CPF, EC.LATITUDE, EC.LONGITUDE, P.CPF, P.NOME, EP.LATITUDE, EP.LONGITUDE, A.ID_AGENDAMENTO
+    FROM AGENDAMENTOS A
+    JOIN VINCULOS_PACIENTE_CUIDADOR V ON V.CPF_PACIENTE = A.CPF_PACIENTE
+    JOIN CUIDADORES C ON C.CPF = V.CPF_CUIDADOR
+    JOIN ENDERECOS EC ON EC.ID_ENDERECO = C.ID_ENDERECO
+    JOIN PACIENTES P ON P.CPF = A.CPF_PACIENTE
+    JOIN ENDERECOS EP ON EP.ID_ENDERECO = P.ID_ENDERECO
+    WHERE A.DATA_CONSULTA >= TO_DATE(:data, 'DD/MM/YYYY') AND A.DATA_CONSULTA < TO_DATE(:dia_seguinte, 'DD/MM/YYYY')
+      AND {filtro_cuidador}
+    ORDER BY C.CPF, A.ID_AGENDAMENTO"""
+
+
+VISITAS_DO_CUIDADOR = registrar(
+    'visitas_do_cuidador', select_visitas_do_dia("C.CPF = :cpf"), COLUNAS_VISITAS,
+    {'cpf': TAMANHO_CPF, 'data': 10, 'dia_seguinte': 10}, LEITURA_CURTA)
+
+VISITAS_DO_DIA = registrar(
+    'visitas_do_dia', select_visitas_do_dia("1 = 1"), COLUNAS_VISITAS, {'data': 10, 'dia_seguinte': 10},
+    LEITURA_EM_MASSA)
+
+
+# --- Lembretes de consulta (crud/lembretes.py) ---
+# LEMBRETES funciona como caixa de saída: um registro por agendamento e canal, com a chave de
+# idempotência (CHAVE) também enviada ao provedor. Datas e horas como 'YYYY-MM-DD HH24:MI:SS'.
+
+FORMATO_DATA_HORA = 'YYYY-MM-DD HH24:MI:SS'
+
+AGENDAMENTOS_PARA_LEMBRETE = registrar('agendamentos_para_lembrete', f"""
+    SELECT A.ID_AGENDAMENTO, TO_CHAR(A.DATA_CONSULTA, '{FORMATO_DATA_HORA}'), P.EMAIL, P.TELEFONE_CONTATO
+    FROM AGENDAMENTOS A
+    JOIN PACIENTES P ON P.CPF = A.CPF_PACIENTE
+    WHERE A.DATA_CONSULTA >= TO_DATE(:inicio, 'YYYY-MM-DD') AND A.DATA_CONSULTA < TO_DATE(:fim, 'YYYY-MM-DD')""",
+    ('id_agendamento', 'data_consulta', 'email', 'telefone_contato'), {'inicio': 10, 'fim': 10}, LEITURA_EM_MASSA)
+
+INSERIR_LEMBRETE = registrar('inserir_lembrete', f"""
+    INSERT INTO LEMBRETES (ID_AGENDAMENTO, CANAL, DESTINO, ENVIAR_EM, CHAVE)
+    SELECT :id_agendamento, :canal, :destino, TO_DATE(:enviar_em, '{FORMATO_DATA_HORA}'), :chave FROM DUAL
+    WHERE NOT EXISTS (SELECT 1 FROM LEMBRETES WHERE CHAVE = :chave)""",
+    tipos_bind={'id_agendamento': int, 'canal': 5, 'destino': 150, 'enviar_em': 19, 'chave': 40})
+
+# Reserva de um lote: varredura de IDX_LEMBRETES_DEVIDOS (SITUACAO, ENVIAR_EM) só até `limite` linhas.
+# A condição SITUACAO = 'PENDENTE' repetida no UPDATE faz com que, entre despachantes concorrentes,
+# só um fique com cada lembrete; os reservados são lidos depois pela RESERVA (única por lote).
+RESERVAR_LEMBRETES = registrar('reservar_lembretes', f"""
+    UPDATE LEMBRETES SET SITUACAO = 'RESERVADO', RESERVA = :reserva,
+        RESERVADO_ATE = TO_DATE(:reservado_ate, '{FORMATO_DATA_HORA}')
+    WHERE ID_LEMBRETE IN (
+        SELECT ID_LEMBRETE FROM LEMBRETES
+        WHERE SITUACAO = 'PENDENTE' AND ENVIAR_EM <= TO_DATE(:agora, '{FORMATO_DATA_HORA}')
+        ORDER BY ENVIAR_EM
+        FETCH FIRST :limite ROWS ONLY
+    ) AND SITUACAO = 'PENDENTE'""", tipos_bind={'reserva': 64, 'reservado_ate': 19, 'agora': 19, 'limite': int})
+
+LEMBRETES_RESERVADOS = registrar('lembretes_reservados', f"""
+    SELECT L.ID_LEMBRETE, L.CANAL, L.DESTINO, L.CHAVE, L.TENTATIVAS, P.NOME,
+           TO_CHAR(A.DATA_CONSULTA, '{FORMATO_DATA_HORA}')
+    FROM LEMBRETES L
+    LEFT JOIN AGENDAMENTOS A ON A.ID_AGENDAMENTO = L.ID_AGENDAMENTO
+    LEFT JOIN PACIENTES P ON P.CPF = A.CPF_PACIENTE
+    WHERE L.RESERVA = :reserva AND L.SITUACAO = 'RESERVADO'""",
+    ('id_lembrete', 'canal', 'destino', 'chave', 'tentativas', 'nome', 'data_consulta'), {'reserva': 64},
+    LEITURA_EM_MASSA)
+
+# Só quem ainda detém a reserva grava o resultado (uma reserva expirada pode ter passado a outro despachante)
+REGISTRAR_ENVIO = registrar('registrar_envio', f"""
+    UPDATE LEMBRETES SET SITUACAO = :situacao, TENTATIVAS = TENTATIVAS + :tentativas,
+        ENVIAR_EM = COALESCE(TO_DATE(:nova_tentativa, '{FORMATO_DATA_HORA}'), ENVIAR_EM),
+        ENVIADO_EM = TO_DATE(:enviado_em, '{FORMATO_DATA_HORA}'), ULTIMO_ERRO = :erro
+    WHERE ID_LEMBRETE = :id_lembrete AND RESERVA = :reserva AND SITUACAO = 'RESERVADO'""",
+    tipos_bind={'situacao': 10, 'tentativas': int, 'nova_tentativa': 19, 'enviado_em': 19, 'erro': 200,
+                'id_lembrete': int, 'reserva': 64})
+
+RECUPERAR_RESERVAS_EXPIRADAS = registrar('recuperar_reservas_expiradas', f"""
+    UPDATE LEMBRETES SET SITUACAO = 'PENDENTE'
+    WHERE SITUACAO = 'RESERVADO' AND RESERVADO_ATE < TO_DATE(:agora, '{FORMATO_DATA_HORA}')""",
+    tipos_bind={'agora': 19})
+
+SITUACAO_LEMBRETES = registrar(
+    'situacao_lembretes', "SELECT SITUACAO, CANAL, COUNT(*) FROM LEMBRETES GROUP BY SITUACAO, CANAL",
+    ('situacao', 'canal', 'quantidade'))
+
+# --- Indicadores (crud/analitico.py) ---
+# Leituras sem fábrica de linhas (vão direto para arrays) e o registro de alterações (ALTERACOES, gravado
+# por gatilhos) com a marca de cada consumidor. As leituras das chaves alteradas usam listas IN de tamanho
+# fixo completadas com NULL, como a visão em lote.
+
+MAIOR_ALTERACAO = registrar(
+    'maior_alteracao', "SELECT COALESCE(MAX(ID_ALTERACAO), 0) FROM ALTERACOES", ('maior',), leitura=LEITURA_UNICA)
+
+ALTERACOES_DO_INTERVALO = registrar(
+    'alteracoes_do_intervalo', "SELECT TABELA, CHAVE FROM ALTERACOES WHERE ID_ALTERACAO > :de AND ID_ALTERACAO <= :ate",
+    tipos_bind={'de': int, 'ate': int}, leitura=LEITURA_EM_MASSA)
+
+ATUALIZAR_MARCA_CONSUMIDOR = registrar(
+    'atualizar_marca_consumidor', "UPDATE CONSUMIDORES_ALTERACOES SET ID_ALTERACAO = :marca WHERE CONSUMIDOR = :consumidor",
+    tipos_bind={'marca': int, 'consumidor': 60})
+
+INSERIR_MARCA_CONSUMIDOR = registrar(
+    'inserir_marca_consumidor', "INSERT INTO CONSUMIDORES_ALTERACOES (CONSUMIDOR, ID_ALTERACAO) VALUES (:consumidor, :marca)",
+    tipos_bind={'marca': int, 'consumidor': 60})
+
+MARCA_CONSUMIDOR = registrar(
+    'marca_consumidor', "SELECT ID_ALTERACAO FROM CONSUMIDORES_ALTERACOES WHERE CONSUMIDOR = :consumidor",
+    ('marca',), {'consumidor': 60}, LEITURA_UNICA)
+
+# Só o que todos os consumidores já leram (menos a margem que eles releem) pode ser apagado
+LIMPAR_ALTERACOES = registrar('limpar_alteracoes', """
+    DELETE FROM ALTERACOES
+    WHERE ID_ALTERACAO <= (SELECT MIN(ID_ALTERACAO) FROM CONSUMIDORES_ALTERACOES) - :margem""",
+    tipos_bind={'margem': int})
+
+SELECT_INDICADORES_PACIENTES = """
+    SELECT P.CPF, P.IDADE, E.UF, E.CIDADE
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON E.ID_ENDERECO = P.ID_ENDERECO"""
+SELECT_INDICADORES_AGENDAMENTOS = "SELECT A.ID_AGENDAMENTO, A.DATA_CONSULTA FROM AGENDAMENTOS A"
+SELECT_INDICADORES_CUIDADORES = """
+    SELECT C.CPF, COUNT(V.CPF_PACIENTE)
+    FROM CUIDADORES C
+    LEFT JOIN VINCULOS_PACIENTE_CUIDADOR V ON V.CPF_CUIDADOR = C.CPF"""
+
+INDICADORES_PACIENTES = registrar('indicadores_pacientes', SELECT_INDICADORES_PACIENTES, leitura=LEITURA_EM_MASSA)
+INDICADORES_AGENDAMENTOS = registrar(
+    'indicadores_agendamentos', SELECT_INDICADORES_AGENDAMENTOS, leitura=LEITURA_EM_MASSA)
+INDICADORES_CUIDADORES = registrar(
+    'indicadores_cuidadores', SELECT_INDICADORES_CUIDADORES + " GROUP BY C.CPF", leitura=LEITURA_EM_MASSA)
+
+TAMANHOS_LISTA_INDICADORES = (100, 1000)
+
+
+def _registrar_por_lista(nome, sql, tipo_bind):
+    """Instruções por tamanho de TAMANHOS_LISTA_INDICADORES; `sql` tem {lista} no lugar da lista IN."""
+    return ConsultasPorLista(nome, sql, tipo_bind, TAMANHOS_LISTA_INDICADORES)
+
+
+INDICADORES_PACIENTES_POR_CPF = _registrar_por_lista(
+    'indicadores_pacientes_por_cpf', SELECT_INDICADORES_PACIENTES + " WHERE P.CPF IN ({lista})", TAMANHO_CPF)
+PACIENTES_DOS_ENDERECOS = _registrar_por_lista(
+    'pacientes_dos_enderecos', "SELECT CPF FROM PACIENTES WHERE ID_ENDERECO IN ({lista})", int)
+INDICADORES_AGENDAMENTOS_POR_ID = _registrar_por_lista(
+    'indicadores_agendamentos_por_id', SELECT_INDICADORES_AGENDAMENTOS + " WHERE A.ID_AGENDAMENTO IN ({lista})", int)
+INDICADORES_CUIDADORES_POR_CPF = _registrar_por_lista(
+    'indicadores_cuidadores_por_cpf', SELECT_INDICADORES_CUIDADORES + " WHERE C.CPF IN ({lista}) GROUP BY C.CPF",
+    TAMANHO_CPF)
+
+
+def linhas_por_lista(cursor, consultas, chaves):
+    """Linhas de todas as `chaves`, em blocos do tamanho das listas IN (completadas com NULL)."""
+    linhas = []
+    inicio = 0
+    while inicio < len(chaves):
+        consulta, tamanho = consultas.para(len(chaves) - inicio)
+        bloco = chaves[inicio:inicio + tamanho]
+        parametros = {f"k{i}": (bloco[i] if i < len(bloco) else None) for i in range(tamanho)}
+        linhas.extend(consulta.executar(cursor, parametros).fetchall())
+        inicio += tamanho
+    return linhas
+
+
+# --- Réplica de leitura (crud/replica.py) ---
+# Cópia das colunas das tabelas do cadastro: completa ou só das chaves registradas em ALTERACOES.
+# {tabela: (coluna da chave, tipo de bind da chave, colunas)}
+
+_COLUNAS_PESSOA_REPLICA = ('CPF', 'NOME', 'IDADE', 'EMAIL', 'TELEFONE_CONTATO', 'ID_ENDERECO')
+TABELAS_REPLICA = {
+    'ENDERECOS': ('ID_ENDERECO', int, ('ID_ENDERECO', 'CEP', 'LOGRADOURO', 'NUMERO', 'COMPLEMENTO', 'BAIRRO',
+                                      'CIDADE', 'UF', 'LATITUDE', 'LONGITUDE')),
+    'PACIENTES': ('CPF', TAMANHO_CPF, _COLUNAS_PESSOA_REPLICA),
+    'CUIDADORES': ('CPF', TAMANHO_CPF, _COLUNAS_PESSOA_REPLICA),
+    'VINCULOS_PACIENTE_CUIDADOR': ('CPF_CUIDADOR', TAMANHO_CPF, ('CPF_PACIENTE', 'CPF_CUIDADOR')),
+}
+
+REPLICA_COMPLETA = {
+    tabela: registrar(f"replica_{tabela.lower()}", f"SELECT {', '.join(colunas)} FROM {tabela}",
+                      leitura=LEITURA_EM_MASSA)
+    for tabela, (_, _, colunas) in TABELAS_REPLICA.items()}
+REPLICA_POR_CHAVE = {
+    tabela: _registrar_por_lista(f"replica_{tabela.lower()}_por_chave",
+                                 f"SELECT {', '.join(colunas)} FROM {tabela} WHERE {chave} IN ({{lista}})", tipo_bind)
+    for tabela, (chave, tipo_bind, colunas) in TABELAS_REPLICA.items()}
+
+
+# --- Treinamento do modelo de demanda (crud/treinamento.py) ---
+# Uma linha por paciente: os atributos com o que havia antes do :corte e, como rótulo, as consultas
+# em [:corte, :fim). As subconsultas usam os índices por paciente de VINCULOS e AGENDAMENTOS.
+
+_AGENDAMENTOS_DO_PACIENTE = "FROM AGENDAMENTOS A WHERE A.CPF_PACIENTE = P.CPF"
+ATRIBUTOS_PACIENTES = registrar('atributos_pacientes', f"""
+    SELECT P.CPF, P.IDADE, E.UF, E.CIDADE,
+        (SELECT COUNT(*) FROM VINCULOS_PACIENTE_CUIDADOR V WHERE V.CPF_PACIENTE = P.CPF),
+        (SELECT COUNT(*) {_AGENDAMENTOS_DO_PACIENTE} AND A.DATA_CONSULTA < TO_DATE(:corte, 'YYYY-MM-DD')),
+        (SELECT TO_CHAR(MAX(A.DATA_CONSULTA), 'YYYY-MM-DD') {_AGENDAMENTOS_DO_PACIENTE}
+            AND A.DATA_CONSULTA < TO_DATE(:corte, 'YYYY-MM-DD')),
+        (SELECT COUNT(*) {_AGENDAMENTOS_DO_PACIENTE}
+            AND A.DATA_CONSULTA >= TO_DATE(:corte, 'YYYY-MM-DD') AND A.DATA_CONSULTA < TO_DATE(:fim, 'YYYY-MM-DD'))
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON E.ID_ENDERECO = P.ID_ENDERECO""",
+    ('cpf', 'idade', 'uf', 'cidade', 'cuidadores', 'consultas_anteriores', 'ultima_consulta', 'consultas_janela'),
+    {'corte': 10, 'fim': 10}, LEITURA_EM_MASSA)
+
+
+# --- Pacientes duplicados (crud/duplicidade.py) ---
+
+COLUNAS_DUPLICIDADE = ('cpf', 'nome', 'idade', 'email', 'telefone_contato', 'cep', 'logradouro', 'numero',
+                       'cidade', 'uf')
+SELECT_DUPLICIDADE = """
+    SELECT P.CPF, P.NOME, P.IDADE, P.EMAIL, P.TELEFONE_CONTATO, E.CEP, E.LOGRADOURO, E.NUMERO, E.CIDADE, E.UF
+    FROM PACIENTES P
+    JOIN ENDERECOS E ON E.ID_ENDERECO = P.ID_ENDERECO"""
+
+DUPLICIDADE_PACIENTES = registrar(
+    'duplicidade_pacientes', SELECT_DUPLICIDADE, COLUNAS_DUPLICIDADE, leitura=LEITURA_EM_MASSA)
+# Colunas na ordem de COLUNAS_DUPLICIDADE (linhas sem nomes, como as outras listas IN)
+DUPLICIDADE_POR_CPF = _registrar_por_lista(
+    'duplicidade_por_cpf', SELECT_DUPLICIDADE + " WHERE P.CPF IN ({lista})", TAMANHO_CPF)
+
+
+# Instruções montadas dinamicamente (UPDATE só dos campos informados) também passam pelo cache;
+# a margem cobre as combinações mais comuns delas.
+TAMANHO_CACHE_INSTRUCOES = (len(CONSULTAS) + sum(len(instrucoes.tamanhos) for instrucoes in INSTRUCOES_POR_LISTA)
+                            + 20)
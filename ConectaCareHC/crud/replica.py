@@ -0,0 +1,306 @@
+# crud/replica.py
+# Réplica local de leitura do cadastro: PACIENTES, CUIDADORES, ENDERECOS e VINCULOS_PACIENTE_CUIDADOR
+# copiados para um arquivo SQLite na máquina da aplicação, com as mesmas tabelas e colunas -- as consultas
+# registradas (crud/registro_sql.py) rodam nela sem mudança, pela interface do substituto local sem a
+# latência de rede (db_local.ConexaoLocal com remota=False).
+#
+# - sincronizar(): a primeira execução (ou --completa) copia as tabelas inteiras numa transação; as
+#   seguintes são consumidoras do registro de alterações (crud/alteracoes.py) e só releem do banco
+#   principal as chaves alteradas desde a marca gravada na própria réplica (REPLICA_ESTADO).
+# - conectar_leitura(): usada pelas leituras do cadastro em crud/repositorio.py (replica=True). Devolve
+#   None -- e a leitura vai para o banco principal -- se a réplica não estiver configurada ou se a última
+#   sincronização começou há mais que a defasagem aceita. As escritas vão sempre para o principal;
+#   uma leitura feita logo depois de uma escrita pode não vê-la até a próxima sincronização.
+#
+# Configuração: CONECTACARE_REPLICA (caminho do arquivo; sem ela, nada é roteado) e
+# CONECTACARE_REPLICA_DEFASAGEM_S (padrão 60), lidas por db_conexao.Credenciais (ambiente ou .env) na
+# primeira leitura.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.replica [--completa]
+#   python -m ConectaCareHC.crud.replica --intervalo 30     (sincroniza a cada 30 s, até ser interrompido)
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from ConectaCareHC.crud import alteracoes
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import ConexaoCompartilhada, Credenciais, conectar_bd
+from ConectaCareHC.crud.db_rastreio import ConexaoRastreada
+from ConectaCareHC.crud.db_local import ConexaoLocal
+from ConectaCareHC.utils import rastreio
+
+CONSUMIDOR = "replica"
+TAMANHO_BLOCO = 50_000
+
+
+# Sem chaves estrangeiras: cada sincronização lê as tabelas em momentos diferentes
+ESQUEMA_REPLICA = """
+CREATE TABLE IF NOT EXISTS ENDERECOS (
+    ID_ENDERECO INTEGER PRIMARY KEY,
+    CEP VARCHAR(8),
+    LOGRADOURO VARCHAR(150),
+    NUMERO VARCHAR(20),
+    COMPLEMENTO VARCHAR(100),
+    BAIRRO VARCHAR(100),
+    CIDADE VARCHAR(100),
+    UF VARCHAR(2),
+    LATITUDE REAL,
+    LONGITUDE REAL
+);
+CREATE TABLE IF NOT EXISTS PACIENTES (
+    CPF VARCHAR(11) PRIMARY KEY,
+    NOME VARCHAR(150),
+    IDADE INTEGER,
+    EMAIL VARCHAR(150),
+    TELEFONE_CONTATO VARCHAR(20),
+    ID_ENDERECO INTEGER
+);
+CREATE TABLE IF NOT EXISTS CUIDADORES (
+    CPF VARCHAR(11) PRIMARY KEY,
+    NOME VARCHAR(150),
+    IDADE INTEGER,
+    EMAIL VARCHAR(150),
+    TELEFONE_CONTATO VARCHAR(20),
+    ID_ENDERECO INTEGER
+);
+CREATE TABLE IF NOT EXISTS VINCULOS_PACIENTE_CUIDADOR (
+    CPF_PACIENTE VARCHAR(11) NOT NULL,
+    CPF_CUIDADOR VARCHAR(11) NOT NULL,
+    PRIMARY KEY (CPF_PACIENTE, CPF_CUIDADOR)
+);
+CREATE INDEX IF NOT EXISTS IDX_VINCULOS_CUIDADOR ON VINCULOS_PACIENTE_CUIDADOR (CPF_CUIDADOR);
+CREATE TABLE IF NOT EXISTS REPLICA_ESTADO (
+    ID INTEGER PRIMARY KEY CHECK (ID = 1),
+    MARCA INTEGER NOT NULL,
+    SINCRONIZADA_EM REAL NOT NULL
+);
+"""
+
+# Conexão de leitura de cada thread: (caminho, ConexaoLocal)
+_leitura = threading.local()
+
+
+def configurar(caminho=None, defasagem_maxima_s=None):
+    """Muda o arquivo da réplica e/ou a defasagem aceita (ex.: benchmarks); caminho '' desliga o roteamento."""
+    if caminho is not None:
+        Credenciais.REPLICA = caminho
+    if defasagem_maxima_s is not None:
+        Credenciais.REPLICA_DEFASAGEM_S = defasagem_maxima_s
+
+
+def _configuracao():
+    """(arquivo da réplica ou None, defasagem máxima aceita em segundos)."""
+    Credenciais.carregar()
+    return Credenciais.REPLICA or None, Credenciais.REPLICA_DEFASAGEM_S
+
+
+# --- Leitura ---
+
+def _estado(conexao_sqlite):
+    """(marca, sincronizada_em) da réplica; None se ela ainda não foi sincronizada."""
+    try:
+        return conexao_sqlite.execute("SELECT MARCA, SINCRONIZADA_EM FROM REPLICA_ESTADO").fetchone()
+    except sqlite3.OperationalError:  # Arquivo ainda sem o esquema
+        return None
+
+
+def conectar_leitura():
+    """Conexão com a réplica para leituras que aceitam defasagem; None se ela não estiver configurada ou em dia."""
+    caminho, defasagem_maxima_s = _configuracao()
+    if caminho is None:
+        return None
+    aberta = getattr(_leitura, 'conexao', None)
+    if aberta is None or aberta[0] != caminho:
+        if not os.path.exists(caminho):
+            return None
+        aberta = _leitura.conexao = (caminho, ConexaoLocal(caminho, reg.TAMANHO_CACHE_INSTRUCOES, remota=False))
+    conexao = aberta[1]
+    estado = _estado(conexao.conexao_sqlite)
+    if estado is None or time.time() - estado[1] > defasagem_maxima_s:
+        return None
+    # Reaproveitada pela thread: o close() do repositório não a encerra
+    conexao = ConexaoCompartilhada(conexao)
+    return ConexaoRastreada(conexao) if rastreio.ATIVO else conexao
+
+
+def situacao(caminho=None):
+    """Marca, horário da última sincronização e defasagem da réplica; None se ela ainda não existe."""
+    configurado, defasagem_maxima_s = _configuracao()
+    caminho = caminho or configurado
+    if caminho is None or not os.path.exists(caminho):
+        return None
+    conexao = sqlite3.connect(caminho)
+    try:
+        estado = _estado(conexao)
+    finally:
+        conexao.close()
+    if estado is None:
+        return None
+    defasagem = time.time() - estado[1]
+    return {'caminho': caminho, 'marca': estado[0],
+            'sincronizada_em': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(estado[1])),
+            'defasagem_s': round(defasagem, 1), 'em_uso': caminho == configurado and defasagem <= defasagem_maxima_s}
+
+
+# --- Sincronização ---
+
+def _insercao(tabela):
+    colunas = reg.TABELAS_REPLICA[tabela][2]
+    return f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+
+
+def _normalizar(tabela, linhas):
+    """CPFs sempre como texto de 11 dígitos, mesmo que o banco principal os guarde como número."""
+    posicoes = [i for i, coluna in enumerate(reg.TABELAS_REPLICA[tabela][2]) if coluna.startswith('CPF')]
+    if not posicoes:
+        return linhas
+    normalizadas = []
+    for linha in linhas:
+        linha = list(linha)
+        for i in posicoes:
+            linha[i] = str(linha[i]).zfill(reg.TAMANHO_CPF)
+        normalizadas.append(linha)
+    return normalizadas
+
+
+def _copia_completa(cursor, replica):
+    copiadas = 0
+    for tabela in reg.TABELAS_REPLICA:
+        replica.execute(f"DELETE FROM {tabela}")
+        reg.REPLICA_COMPLETA[tabela].executar(cursor)
+        while True:
+            linhas = cursor.fetchmany(TAMANHO_BLOCO)
+            if not linhas:
+                break
+            replica.executemany(_insercao(tabela), _normalizar(tabela, linhas))
+            copiadas += len(linhas)
+    return copiadas
+
+
+def _substituir(cursor, replica, tabela, chaves):
+    """Troca as linhas das `chaves` na réplica pelas atuais do banco principal. Retorna as linhas relidas."""
+    linhas = _normalizar(tabela, reg.linhas_por_lista(cursor, reg.REPLICA_POR_CHAVE[tabela], chaves))
+    replica.executemany(f"DELETE FROM {tabela} WHERE {reg.TABELAS_REPLICA[tabela][0]} = ?",
+                        [(chave,) for chave in chaves])
+    replica.executemany(_insercao(tabela), linhas)
+    return linhas
+
+
+def _aplicar_alteracoes(cursor, replica, chaves):
+    """Relê as chaves alteradas. Retorna a quantidade de chaves."""
+    def cpfs(tabela):
+        return sorted(chave.zfill(reg.TAMANHO_CPF) for chave in chaves.get(tabela, ()))
+
+    enderecos = {int(chave) for chave in chaves.get('ENDERECOS', ())}
+    for tabela in ('PACIENTES', 'CUIDADORES'):
+        alteradas = cpfs(tabela)
+        # O endereço antigo (na réplica) e o atual da pessoa também são relidos: inclusões e exclusões de
+        # endereço não são registradas, chegam pela pessoa
+        for cpf in alteradas:
+            enderecos.update(linha[0] for linha in replica.execute(
+                f"SELECT ID_ENDERECO FROM {tabela} WHERE CPF = ?", (cpf,)))
+        enderecos.update(linha[5] for linha in _substituir(cursor, replica, tabela, alteradas))
+    _substituir(cursor, replica, 'VINCULOS_PACIENTE_CUIDADOR', cpfs('VINCULOS_PACIENTE_CUIDADOR'))
+    _substituir(cursor, replica, 'ENDERECOS', sorted(enderecos))
+    return sum(len(c) for c in chaves.values())
+
+
+def _abrir_replica(caminho):
+    replica = sqlite3.connect(caminho, timeout=30)
+    replica.execute("PRAGMA journal_mode = WAL")  # As leituras continuam durante a sincronização
+    replica.executescript(ESQUEMA_REPLICA)
+    return replica
+
+
+def sincronizar(completa=False, caminho=None):
+    """
+    Atualiza a réplica: só as alterações desde a última sincronização ou, com `completa` (ou na primeira
+    vez), a cópia de todas as tabelas.
+
+    Returns:
+        dict: {'modo', 'marca', 'linhas' (copiadas) ou 'chaves' (relidas), 'duracao_s'}; None em caso de erro.
+    """
+    caminho = caminho or _configuracao()[0]
+    if caminho is None:
+        print("Réplica não configurada: defina CONECTACARE_REPLICA com o caminho do arquivo.")
+        return None
+    inicio, relogio = time.time(), time.perf_counter()
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    replica = None
+    try:
+        replica = _abrir_replica(caminho)
+        estado = _estado(replica)
+        with conexao.cursor() as cursor:
+            ate = alteracoes.maior_alteracao(cursor)
+            registrada = alteracoes.marca_registrada(cursor, CONSUMIDOR)
+            # Sem a marca no banco (ou com ela adiante da réplica), as alterações podem ter sido limpas
+            if completa or estado is None or registrada is None or registrada > estado[0]:
+                # Reserva as alterações a partir daqui antes da cópia, que pode ser longa
+                alteracoes.gravar_marca(cursor, CONSUMIDOR, ate)
+                conexao.commit()
+                resultado = {'modo': 'completa', 'linhas': _copia_completa(cursor, replica)}
+            else:
+                chaves = alteracoes.chaves_alteradas(cursor, estado[0], ate)
+                resultado = {'modo': 'incremental', 'chaves': _aplicar_alteracoes(cursor, replica, chaves)}
+            # A réplica contém tudo o que estava gravado no início da sincronização
+            replica.execute("INSERT OR REPLACE INTO REPLICA_ESTADO (ID, MARCA, SINCRONIZADA_EM) VALUES (1, ?, ?)",
+                            (ate, inicio))
+            replica.commit()
+
+            alteracoes.gravar_marca(cursor, CONSUMIDOR, ate)
+            alteracoes.limpar(cursor)
+        conexao.commit()
+        return dict(resultado, marca=ate, duracao_s=round(time.perf_counter() - relogio, 3))
+    except Exception as e:
+        print(f"Erro ao sincronizar a réplica: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        if replica is not None:
+            replica.close()  # Sem commit, desfaz o que foi aplicado
+        conexao.close()
+
+
+def manter_sincronizada(intervalo_s, completa=False, caminho=None, ao_sincronizar=None):
+    """Sincroniza a cada `intervalo_s` segundos (só a primeira pode ser completa), até KeyboardInterrupt."""
+    while True:
+        inicio = time.monotonic()
+        resultado = sincronizar(completa, caminho)
+        completa = False
+        if ao_sincronizar:
+            ao_sincronizar(resultado)
+        time.sleep(max(intervalo_s - (time.monotonic() - inicio), 0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincroniza a réplica local de leitura do cadastro.")
+    parser.add_argument("--completa", action="store_true", help="Copia todas as tabelas em vez das alterações.")
+    parser.add_argument("--intervalo", type=float, help="Repete a sincronização a cada N segundos.")
+    parser.add_argument("--caminho", help="Arquivo da réplica (padrão: CONECTACARE_REPLICA).")
+    args = parser.parse_args(argv)
+
+    def mostrar(resultado):
+        if resultado is not None:
+            alterado = (f"{resultado['linhas']} linhas copiadas" if resultado['modo'] == 'completa'
+                        else f"{resultado['chaves']} chaves relidas")
+            print(f"Sincronização {resultado['modo']} em {resultado['duracao_s']:.3f} s "
+                  f"(marca {resultado['marca']}): {alterado}.")
+
+    if args.intervalo:
+        try:
+            manter_sincronizada(args.intervalo, args.completa, args.caminho, mostrar)
+        except KeyboardInterrupt:
+            return 0
+    resultado = sincronizar(args.completa, args.caminho)
+    mostrar(resultado)
+    return 0 if resultado is not None else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
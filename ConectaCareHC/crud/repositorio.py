@@ -0,0 +1,742 @@
+# crud/repositorio.py
+# Camada de dados: operações no DB sem input() nem menus.
+# É usada pelo menu interativo (crud/operacoes.py) e pela API REST (api/rotas_crud.py).
+# As consultas e listagens do cadastro (pessoas e exportação) vão para a réplica local (crud/replica.py)
+# quando ela está configurada e em dia; as demais leituras -- inclusive buscar_nome_*, que confirma a
+# existência antes das escritas, e buscar_*_por_cpf(replica=False), que lê o registro a ser atualizado --
+# e todas as escritas vão para o banco principal.
+
+from datetime import date, datetime, timedelta
+
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import conectar_bd
+from ConectaCareHC.crud.registro_sql import COLUNAS_EXPORTACAO, COLUNAS_PESSOA, Consulta
+from ConectaCareHC.utils.coordenadas import coordenadas_do_cep
+from ConectaCareHC.utils.cpf import validar_cpfs_em_lote
+
+# Situações devolvidas pelas operações de escrita (interpretadas pelo menu e pela API)
+SUCESSO = "sucesso"
+DUPLICADO = "duplicado"
+NAO_ENCONTRADO = "nao_encontrado"
+PACIENTE_NAO_ENCONTRADO = "paciente_nao_encontrado"
+CUIDADOR_NAO_ENCONTRADO = "cuidador_nao_encontrado"
+COM_DEPENDENCIAS = "com_dependencias"
+
+CAMPOS_PESSOA_ATUALIZAVEIS = ['nome', 'idade', 'email', 'telefone_contato']
+CAMPOS_ENDERECO_ATUALIZAVEIS = ['cep', 'logradouro', 'numero', 'complemento', 'bairro', 'cidade', 'uf']
+
+TABELAS_PESSOA = ('PACIENTES', 'CUIDADORES')
+
+# Instruções registradas (crud/registro_sql.py) de cada tabela de pessoa
+_CONSULTAS_PESSOA = {
+    'PACIENTES': {'endereco': reg.ENDERECO_PACIENTE, 'inserir': reg.INSERIR_PACIENTE, 'excluir': reg.EXCLUIR_PACIENTE,
+                  'cpfs': reg.CPFS_PACIENTES},
+    'CUIDADORES': {'endereco': reg.ENDERECO_CUIDADOR, 'inserir': reg.INSERIR_CUIDADOR, 'excluir': reg.EXCLUIR_CUIDADOR,
+                   'cpfs': reg.CPFS_CUIDADORES},
+}
+
+
+# --- Funções Auxiliares para DB ---
+
+def _executar(cursor, sql, parametros=None):
+    """Executa o texto SQL ou a Consulta registrada (com binds tipados e linhas nomeadas)."""
+    if isinstance(sql, Consulta):
+        return sql.executar(cursor, parametros)
+    return cursor.execute(sql, parametros or {})
+
+
+def _conectar(replica=False):
+    """Conexão com a réplica local (se `replica` e ela estiver em dia) ou com o banco principal."""
+    if replica:
+        # Importada aqui: a réplica traz o sqlite3 e o substituto local, que o menu não usa na inicialização
+        from ConectaCareHC.crud import replica as replica_local
+
+        conexao = replica_local.conectar_leitura()
+        if conexao is not None:
+            return conexao
+    return conectar_bd()
+
+
+def executar_sql(sql, parametros=None, fetch_one=False, commit=False, replica=False):
+    """
+    Função genérica para executar comandos SQL no Oracle.
+    `sql` pode ser o texto da instrução ou uma Consulta do registro (linhas com colunas nomeadas).
+    Com `replica`, a leitura aceita a defasagem da réplica local.
+    """
+    conexao = _conectar(replica)
+    if not conexao:
+        return None
+
+    try:
+        with conexao.cursor() as cursor:
+            _executar(cursor, sql, parametros)
+
+            if commit:
+                conexao.commit()
+                return cursor.rowcount
+
+            if fetch_one:
+                return cursor.fetchone()
+
+            return cursor.fetchall()
+
+    except Exception as e:
+        # Erro de integridade ORA-02292 ocorre ao tentar apagar uma chave primária referenciada
+        if "ORA-02292" in str(e):
+            print(
+                f"Erro de Integridade: Não é possível excluir o registro. Existem dependências (vínculos ou agendamentos) em outras tabelas.")
+        else:
+            print(f"Erro na operação SQL: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+def consulta_em_lotes(sql, parametros=None, tamanho_lote=500, replica=False):
+    """
+    Executa um SELECT e devolve um gerador que lê as linhas em lotes de `tamanho_lote` (fetchmany),
+    sem carregar o resultado inteiro na memória. Retorna None se a conexão ou a consulta falharem.
+    A conexão é fechada quando o gerador termina (ou é fechado).
+    """
+    conexao = _conectar(replica)
+    if not conexao:
+        return None
+
+    cursor = conexao.cursor()
+    try:
+        if isinstance(sql, Consulta):
+            sql.preparar(cursor)
+            sql, fabrica_linhas = sql.sql, sql.linha
+        else:
+            fabrica_linhas = None
+        cursor.arraysize = tamanho_lote
+        cursor.prefetchrows = tamanho_lote
+        cursor.execute(sql, parametros or {})
+        cursor.rowfactory = fabrica_linhas
+    except Exception as e:
+        print(f"Erro na operação SQL: {e}")
+        cursor.close()
+        conexao.close()
+        return None
+
+    def gerar_linhas():
+        try:
+            while True:
+                linhas = cursor.fetchmany()
+                if not linhas:
+                    break
+                yield from linhas
+        finally:
+            cursor.close()
+            conexao.close()
+
+    return gerar_linhas()
+
+
+def _parametros_endereco(dados_endereco):
+    latitude, longitude = coordenadas_do_cep(dados_endereco.get('cep')) or (None, None)
+    return {
+        'cep': dados_endereco.get('cep'),
+        'logradouro': dados_endereco['logradouro'],
+        'numero': dados_endereco['numero'],
+        'complemento': dados_endereco.get('complemento'),
+        'bairro': dados_endereco['bairro'],
+        'cidade': dados_endereco['cidade'],
+        'uf': dados_endereco['uf'],
+        'latitude': latitude,
+        'longitude': longitude,
+    }
+
+
+def _inserir_endereco(cursor, dados_endereco):
+    """Insere o endereço usando um cursor já aberto (sem commit) e retorna o ID_ENDERECO."""
+    id_retornado = cursor.var(int)  # int = NUMBER no oracledb; evita importar o driver aqui
+    parametros = _parametros_endereco(dados_endereco)
+    parametros['id_endereco'] = id_retornado
+    reg.INSERIR_ENDERECO.executar(cursor, parametros)
+    return int(id_retornado.getvalue()[0])
+
+
+def inserir_endereco_db(dados_endereco):
+    """Insere o endereço estruturado no DB e retorna o ID_ENDERECO (PRIMARY KEY)."""
+
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            id_endereco = _inserir_endereco(cursor, dados_endereco)
+            conexao.commit()
+            return id_endereco
+
+    except Exception as e:
+        print(f" Erro ao inserir endereço no DB: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+def formatar_endereco(row_a_partir_do_join):
+    """Função auxiliar para formatar os dados de endereço vindos do JOIN (linha com colunas nomeadas)."""
+    row = row_a_partir_do_join
+    complemento = f" ({row.complemento})" if row.complemento else ""
+    return f"{row.logradouro}, {row.numero}{complemento} - {row.bairro} ({row.cidade}/{row.uf}) CEP: {row.cep}"
+
+
+def pessoa_para_dict(row):
+    """Converte uma linha do SELECT de pessoa (COLUNAS_PESSOA) num dicionário sem o ID_ENDERECO."""
+    dados = row._asdict()
+    dados.pop('id_endereco')
+    return dados
+
+
+def _validar_tabela(tabela):
+    if tabela not in TABELAS_PESSOA:
+        raise ValueError(f"Tabela de pessoa inválida: {tabela}")
+
+
+# --- Leitura (Read) ---
+
+def _consultas(tabela):
+    _validar_tabela(tabela)
+    return _CONSULTAS_PESSOA[tabela]
+
+
+def buscar_paciente_por_cpf(cpf, replica=True):
+    """Retorna a linha do paciente (COLUNAS_PESSOA, acesso por nome) ou None. replica=False lê do banco principal."""
+    return executar_sql(reg.PACIENTE_POR_CPF, {'cpf': cpf}, fetch_one=True, replica=replica)
+
+
+def buscar_cuidador_por_cpf(cpf, replica=True):
+    """Retorna a linha do cuidador (COLUNAS_PESSOA, acesso por nome) ou None. replica=False lê do banco principal."""
+    return executar_sql(reg.CUIDADOR_POR_CPF, {'cpf': cpf}, fetch_one=True, replica=replica)
+
+
+def buscar_pacientes(idade_minima=None):
+    """Lista os pacientes (ordenados por nome, ou por idade decrescente quando filtrados por idade mínima)."""
+    if idade_minima is None:
+        return executar_sql(reg.PACIENTES, replica=True)
+    return executar_sql(reg.PACIENTES_POR_IDADE_MINIMA, {'idade_minima': idade_minima}, replica=True)
+
+
+def buscar_cuidadores():
+    """Lista todos os cuidadores ordenados por nome."""
+    return executar_sql(reg.CUIDADORES, replica=True)
+
+
+def iterar_pacientes(idade_minima=None, tamanho_lote=500):
+    """Versão em streaming de buscar_pacientes (gerador de linhas ou None em caso de erro)."""
+    if idade_minima is None:
+        return consulta_em_lotes(reg.PACIENTES, tamanho_lote=tamanho_lote, replica=True)
+    return consulta_em_lotes(reg.PACIENTES_POR_IDADE_MINIMA, {'idade_minima': idade_minima}, tamanho_lote,
+                             replica=True)
+
+
+def iterar_cuidadores(tamanho_lote=500):
+    """Versão em streaming de buscar_cuidadores (gerador de linhas ou None em caso de erro)."""
+    return consulta_em_lotes(reg.CUIDADORES, tamanho_lote=tamanho_lote, replica=True)
+
+
+def buscar_nome_paciente(cpf):
+    resultado = executar_sql(reg.NOME_PACIENTE, {'cpf': cpf}, fetch_one=True)
+    return resultado.nome if resultado else None
+
+
+def buscar_nome_cuidador(cpf):
+    resultado = executar_sql(reg.NOME_CUIDADOR, {'cpf': cpf}, fetch_one=True)
+    return resultado.nome if resultado else None
+
+
+# Limites usados quando o período não é informado (o banco compara datas, não aceita NULL no TO_DATE)
+DATA_MINIMA = date(1900, 1, 1)
+DATA_MAXIMA = date(9999, 12, 31)
+
+
+def data_valida(texto):
+    """True se `texto` é uma data existente no formato DD/MM/AAAA (o do TO_DATE dos agendamentos)."""
+    try:
+        datetime.strptime(texto, "%d/%m/%Y")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def converter_periodo(inicio=None, fim=None):
+    """Converte `inicio` e `fim` (DD/MM/AAAA, inclusive, opcionais) em datas [inicio, fim). Lança ValueError."""
+    de = datetime.strptime(inicio, "%d/%m/%Y").date() if inicio else None
+    ate = datetime.strptime(fim, "%d/%m/%Y").date() + timedelta(days=1) if fim else None
+    return de, ate
+
+
+def buscar_agendamentos(cpf_paciente, inicio=None, fim=None):
+    """
+    Lista as datas (DD/MM/AAAA) das consultas de um paciente, em ordem cronológica, opcionalmente
+    só entre `inicio` e `fim` (DD/MM/AAAA, inclusive). Os meses arquivados (crud/arquivamento.py) só
+    são lidos se o período começar antes do horizonte do arquivo.
+    """
+    from ConectaCareHC.crud import arquivamento
+
+    try:
+        de, ate = converter_periodo(inicio, fim)
+    except ValueError:
+        print("Data inválida. Use o formato DD/MM/AAAA.")
+        return None
+    agendamentos = executar_sql(reg.AGENDAMENTOS_PACIENTE, {'cpf_paciente': cpf_paciente,
+                                                            'inicio': (de or DATA_MINIMA).isoformat(),
+                                                            'fim': (ate or DATA_MAXIMA).isoformat()})
+    if agendamentos is None:
+        return None
+    arquivados = arquivamento.agendamentos_do_paciente(cpf_paciente, de, ate)
+    if arquivados is None:
+        return None
+
+    datas = [row.data_consulta for row in agendamentos]
+    if arquivados:
+        quentes = {row.id_agendamento for row in agendamentos}
+        datas = sorted(datas + [data for id_agendamento, data in arquivados if id_agendamento not in quentes])
+    return [f"{data[8:10]}/{data[5:7]}/{data[:4]}" for data in datas]
+
+
+def iterar_agendamentos(inicio=None, fim=None, tamanho_lote=5000):
+    """
+    Agendamentos de todos os pacientes entre `inicio` e `fim` (DD/MM/AAAA, inclusive, opcionais), em ordem
+    de data, como dicts (id_agendamento, cpf_paciente, data_consulta AAAA-MM-DD). Inclui os meses
+    arquivados quando o período começa antes do horizonte do arquivo.
+
+    Returns:
+        Gerador de dicionários ou None em caso de erro.
+    """
+    from ConectaCareHC.crud import arquivamento
+
+    try:
+        de, ate = converter_periodo(inicio, fim)
+    except ValueError:
+        print("Data inválida. Use o formato DD/MM/AAAA.")
+        return None
+    de, ate = de or DATA_MINIMA, ate or DATA_MAXIMA
+    limite = arquivamento.horizonte()
+
+    if limite is None or de >= limite:
+        linhas = consulta_em_lotes(reg.AGENDAMENTOS_DO_PERIODO, {'inicio': de.isoformat(), 'fim': ate.isoformat()},
+                                   tamanho_lote)
+        return None if linhas is None else (row._asdict() for row in linhas)
+
+    # Antes do horizonte, o banco só tem o que foi agendado depois do último arquivamento (poucas linhas)
+    corte = min(limite, ate)
+    atrasados = executar_sql(reg.AGENDAMENTOS_DO_PERIODO, {'inicio': de.isoformat(), 'fim': corte.isoformat()})
+    if atrasados is None:
+        return None
+    recentes = iter(())
+    if ate > limite:
+        recentes = consulta_em_lotes(reg.AGENDAMENTOS_DO_PERIODO, {'inicio': limite.isoformat(), 'fim': ate.isoformat()},
+                                     tamanho_lote)
+        if recentes is None:
+            return None
+    return arquivamento.mesclar_com_arquivo(de, corte, (row._asdict() for row in atrasados),
+                                            (row._asdict() for row in recentes))
+
+
+def excluir_agendamentos(ids, tamanho_lote=50_000):
+    """Exclui os agendamentos pelos IDs numa única transação. Retorna a quantidade excluída ou None em caso de erro."""
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        excluidos = 0
+        with conexao.cursor() as cursor:
+            reg.EXCLUIR_AGENDAMENTO.preparar(cursor)
+            for inicio in range(0, len(ids), tamanho_lote):
+                cursor.executemany(reg.EXCLUIR_AGENDAMENTO.sql,
+                                   [{'id_agendamento': i} for i in ids[inicio:inicio + tamanho_lote]])
+                excluidos += cursor.rowcount
+        conexao.commit()
+        return excluidos
+    except Exception as e:
+        print(f"Erro na operação SQL em lote: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+def buscar_dados_exportacao():
+    """Retorna os pacientes com endereço como lista de dicionários (COLUNAS_EXPORTACAO)."""
+    resultados = executar_sql(reg.EXPORTACAO_PACIENTES, replica=True)
+    if resultados is None:
+        return None
+    return [row._asdict() for row in resultados]
+
+
+def iterar_dados_exportacao(tamanho_lote=500):
+    """Versão em streaming de buscar_dados_exportacao (gerador de dicionários ou None em caso de erro)."""
+    linhas = consulta_em_lotes(reg.EXPORTACAO_PACIENTES, tamanho_lote=tamanho_lote, replica=True)
+    if linhas is None:
+        return None
+    return (row._asdict() for row in linhas)
+
+
+def verificar_cpfs(tabela, tamanho_bloco=100_000):
+    """
+    Confere os dígitos verificadores de todos os CPFs da tabela (validação vetorizada em blocos).
+
+    Returns:
+        dict: {'tabela', 'verificados', 'invalidos': [cpf, ...]}; None em caso de erro.
+    """
+    linhas = consulta_em_lotes(_consultas(tabela)['cpfs'], tamanho_lote=tamanho_bloco)
+    if linhas is None:
+        return None
+
+    resultado = {'tabela': tabela, 'verificados': 0, 'invalidos': []}
+
+    def verificar(bloco):
+        resultado['invalidos'] += [cpf for cpf, valido in zip(bloco, validar_cpfs_em_lote(bloco)) if not valido]
+        resultado['verificados'] += len(bloco)
+
+    bloco = []
+    for row in linhas:
+        bloco.append(row.cpf)
+        if len(bloco) == tamanho_bloco:
+            verificar(bloco)
+            bloco = []
+    if bloco:
+        verificar(bloco)
+    return resultado
+
+
+# --- Visão 360 do paciente ---
+
+CAMPOS_PACIENTE_VISAO = tuple(c for c in COLUNAS_PESSOA if c != 'id_endereco')
+CAMPOS_CUIDADOR_VISAO = ('nome', 'cpf', 'idade', 'email', 'telefone_contato')
+
+
+def _montar_visoes(linhas):
+    """Agrupa as linhas da consulta de visão (registro_sql.COLUNAS_VISAO_PACIENTE) em {cpf: visão}."""
+    visoes = {}
+    for row in linhas:
+        if row.tipo == 'P':
+            visao = {c: getattr(row, c) for c in CAMPOS_PACIENTE_VISAO}
+            visao['cuidadores'] = []
+            visao['agendamentos'] = []
+            visoes[row.cpf_paciente] = visao
+        elif row.cpf_paciente in visoes:
+            if row.tipo == 'C':
+                visoes[row.cpf_paciente]['cuidadores'].append({c: getattr(row, c) for c in CAMPOS_CUIDADOR_VISAO})
+            else:
+                visoes[row.cpf_paciente]['agendamentos'].append(row.data_consulta)
+    return visoes
+
+
+def _hoje():
+    return date.today().strftime("%d/%m/%Y")
+
+
+def buscar_visao_paciente(cpf, a_partir_de=None):
+    """
+    Paciente com endereço, cuidadores vinculados e agendamentos a partir de `a_partir_de`
+    (DD/MM/AAAA, padrão: hoje) numa única consulta.
+
+    Returns:
+        dict: visão do paciente; {} se o CPF não existir; None em caso de erro.
+    """
+    linhas = executar_sql(reg.VISAO_PACIENTE, {'cpf': cpf, 'a_partir_de': a_partir_de or _hoje()})
+    if linhas is None:
+        return None
+    return _montar_visoes(linhas).get(cpf, {})
+
+
+def buscar_visoes_pacientes(cpfs, a_partir_de=None):
+    """
+    Versão em lote de buscar_visao_paciente: uma consulta por bloco de até 1000 CPFs, na mesma conexão.
+
+    Returns:
+        dict: {cpf: visão} apenas dos CPFs encontrados; None em caso de erro.
+    """
+    cpfs = list(dict.fromkeys(cpfs))
+    if not cpfs:
+        return {}
+
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    visoes = {}
+    try:
+        with conexao.cursor() as cursor:
+            inicio = 0
+            while inicio < len(cpfs):
+                consulta, tamanho = reg.visao_pacientes_em_lote(len(cpfs) - inicio)
+                bloco = cpfs[inicio:inicio + tamanho]
+                parametros = {f'cpf{i}': (bloco[i] if i < len(bloco) else None) for i in range(tamanho)}
+                parametros['a_partir_de'] = a_partir_de or _hoje()
+                visoes.update(_montar_visoes(consulta.executar(cursor, parametros).fetchall()))
+                inicio += tamanho
+        return visoes
+    except Exception as e:
+        print(f"Erro na operação SQL: {e}")
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Criação (Create) ---
+
+def _parametros_pessoa(dados, id_endereco):
+    return {
+        'nome': dados['nome'], 'cpf': dados['cpf'], 'idade': dados['idade'], 'email': dados['email'],
+        'telefone_contato': dados['telefone_contato'], 'id_endereco': id_endereco
+    }
+
+
+def inserir_pessoa(tabela, dados):
+    """
+    Insere o endereço e a pessoa (PACIENTES ou CUIDADORES) numa única transação.
+
+    Args:
+        tabela (str): 'PACIENTES' ou 'CUIDADORES'.
+        dados (dict): nome, cpf, idade, email, telefone_contato e 'endereco' (dict com cep, logradouro,
+            numero, complemento, bairro, cidade, uf).
+
+    Returns:
+        str: SUCESSO ou DUPLICADO (CPF já cadastrado); None em caso de erro.
+    """
+    consulta = _consultas(tabela)['inserir']
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            id_endereco = _inserir_endereco(cursor, dados['endereco'])
+            consulta.executar(cursor, _parametros_pessoa(dados, id_endereco))
+        conexao.commit()
+        return SUCESSO
+    except Exception as e:
+        conexao.rollback()
+        if "ORA-00001" in str(e):
+            return DUPLICADO
+        print(f" Erro ao inserir registro em {tabela} no DB: {e}")
+        return None
+    finally:
+        conexao.close()
+
+
+def inserir_pessoas_em_lote(tabela, registros):
+    """
+    Insere vários registros (mesmo formato de inserir_pessoa) numa única transação, com executemany.
+    Os registros recusados pelo banco (ex.: CPF duplicado) são informados e os demais são gravados.
+
+    Returns:
+        list: erros por posição ({'indice': int, 'erro': str}); None se o lote inteiro falhar.
+    """
+    consulta = _consultas(tabela)['inserir']
+    if not registros:
+        return []
+
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            ids = cursor.var(int, arraysize=len(registros))
+            reg.INSERIR_ENDERECO.preparar(cursor, id_endereco=ids)
+            cursor.executemany(reg.INSERIR_ENDERECO.sql, [_parametros_endereco(r['endereco']) for r in registros])
+            ids_endereco = [int(ids.getvalue(i)[0]) for i in range(len(registros))]
+
+        with conexao.cursor() as cursor:
+            parametros = [_parametros_pessoa(r, id_end) for r, id_end in zip(registros, ids_endereco)]
+            consulta.preparar(cursor)
+            cursor.executemany(consulta.sql, parametros, batcherrors=True)
+            erros = [{'indice': erro.offset, 'erro': erro.message} for erro in cursor.getbatcherrors()]
+
+            # Remove os endereços que ficaram sem dono (registros recusados)
+            if erros:
+                orfaos = [{'id_end': ids_endereco[erro['indice']]} for erro in erros]
+                reg.EXCLUIR_ENDERECO.preparar(cursor)
+                cursor.executemany(reg.EXCLUIR_ENDERECO.sql, orfaos)
+
+        conexao.commit()
+        return erros
+    except Exception as e:
+        print(f" Erro ao inserir lote em {tabela} no DB: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Atualização (Update) ---
+
+def atualizar_pessoa(tabela, cpf, dados):
+    """
+    Atualiza os campos informados da pessoa e do seu endereço numa única transação.
+
+    Args:
+        dados (dict): qualquer subconjunto de CAMPOS_PESSOA_ATUALIZAVEIS e CAMPOS_ENDERECO_ATUALIZAVEIS.
+
+    Returns:
+        str: SUCESSO ou NAO_ENCONTRADO; None em caso de erro.
+    """
+    consultas = _consultas(tabela)
+    campos_pessoa = [c for c in CAMPOS_PESSOA_ATUALIZAVEIS if c in dados]
+    campos_endereco = [c for c in CAMPOS_ENDERECO_ATUALIZAVEIS if c in dados]
+
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            existe = consultas['endereco'].executar(cursor, {'cpf': cpf}).fetchone()
+            if not existe:
+                return NAO_ENCONTRADO
+
+            if campos_pessoa:
+                atribuicoes = ", ".join(f"{c.upper()} = :{c}" for c in campos_pessoa)
+                parametros = {c: dados[c] for c in campos_pessoa}
+                parametros['cpf'] = cpf
+                cursor.execute(f"UPDATE {tabela} SET {atribuicoes} WHERE CPF = :cpf", parametros)
+
+            if campos_endereco:
+                atribuicoes = ", ".join(f"{c.upper()} = :{c}" for c in campos_endereco)
+                parametros = {c: dados[c] for c in campos_endereco}
+                if 'cep' in campos_endereco:
+                    # As coordenadas acompanham o CEP (crud/pareamento.py usa a localização do endereço)
+                    atribuicoes += ", LATITUDE = :latitude, LONGITUDE = :longitude"
+                    parametros['latitude'], parametros['longitude'] = coordenadas_do_cep(dados['cep']) or (None, None)
+                parametros['id_end'] = existe.id_endereco
+                cursor.execute(f"UPDATE ENDERECOS SET {atribuicoes} WHERE ID_ENDERECO = :id_end", parametros)
+
+        conexao.commit()
+        return SUCESSO
+    except Exception as e:
+        print(f" Erro ao atualizar registro em {tabela} no DB: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Exclusão (Delete) ---
+
+def excluir_pessoa(tabela, cpf):
+    """
+    Exclui a pessoa e o endereço associado numa única transação.
+
+    Returns:
+        str: SUCESSO, NAO_ENCONTRADO ou COM_DEPENDENCIAS (vínculos/agendamentos); None em caso de erro.
+    """
+    consultas = _consultas(tabela)
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            resultado = consultas['endereco'].executar(cursor, {'cpf': cpf}).fetchone()
+            if not resultado:
+                return NAO_ENCONTRADO
+
+            # 1. DELETE da pessoa (obrigatório primeiro, devido à FK); 2. DELETE do endereço
+            consultas['excluir'].executar(cursor, {'cpf': cpf})
+            reg.EXCLUIR_ENDERECO.executar(cursor, {'id_end': resultado.id_endereco})
+        conexao.commit()
+        return SUCESSO
+    except Exception as e:
+        conexao.rollback()
+        # Erro de integridade ORA-02292 ocorre ao tentar apagar uma chave primária referenciada
+        if "ORA-02292" in str(e):
+            return COM_DEPENDENCIAS
+        print(f" Erro ao excluir registro de {tabela} no DB: {e}")
+        return None
+    finally:
+        conexao.close()
+
+
+# --- Vínculos e Agendamentos ---
+
+def vincular(cpf_paciente, cpf_cuidador):
+    """
+    Vincula um paciente a um cuidador.
+
+    Returns:
+        dict: {'situacao', 'paciente', 'cuidador'} com situacao SUCESSO, DUPLICADO, PACIENTE_NAO_ENCONTRADO
+        ou CUIDADOR_NAO_ENCONTRADO; None em caso de erro.
+    """
+    nome_paciente = buscar_nome_paciente(cpf_paciente)
+    if not nome_paciente:
+        return {'situacao': PACIENTE_NAO_ENCONTRADO, 'paciente': None, 'cuidador': None}
+
+    nome_cuidador = buscar_nome_cuidador(cpf_cuidador)
+    if not nome_cuidador:
+        return {'situacao': CUIDADOR_NAO_ENCONTRADO, 'paciente': nome_paciente, 'cuidador': None}
+
+    params = {'cpf_paciente': cpf_paciente, 'cpf_cuidador': cpf_cuidador}
+    linhas_afetadas = executar_sql(reg.INSERIR_VINCULO, params, commit=True)
+    if linhas_afetadas is None:
+        return None
+
+    situacao = SUCESSO if linhas_afetadas == 1 else DUPLICADO
+    return {'situacao': situacao, 'paciente': nome_paciente, 'cuidador': nome_cuidador}
+
+
+def agendar(cpf_paciente, data_consulta):
+    """
+    Agenda uma consulta (data no formato DD/MM/AAAA) para o paciente.
+
+    Returns:
+        dict: {'situacao', 'paciente'} com situacao SUCESSO ou PACIENTE_NAO_ENCONTRADO; None em caso de erro.
+    """
+    nome_paciente = buscar_nome_paciente(cpf_paciente)
+    if not nome_paciente:
+        return {'situacao': PACIENTE_NAO_ENCONTRADO, 'paciente': None}
+
+    parametros = {'cpf_paciente': cpf_paciente, 'data_consulta': data_consulta}
+    linhas_afetadas = executar_sql(reg.INSERIR_AGENDAMENTO, parametros, commit=True)
+    if linhas_afetadas != 1:
+        return None
+    return {'situacao': SUCESSO, 'paciente': nome_paciente}
+
+
+def _executar_lote(sql, parametros):
+    """Executa um executemany (Consulta registrada) com batcherrors numa única transação e retorna (inseridos, erros)."""
+    if not parametros:
+        return 0, []
+
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    try:
+        with conexao.cursor() as cursor:
+            sql.preparar(cursor)
+            cursor.executemany(sql.sql, parametros, batcherrors=True, arraydmlrowcounts=True)
+            erros = [{'indice': erro.offset, 'erro': erro.message} for erro in cursor.getbatcherrors()]
+            inseridos = sum(cursor.getarraydmlrowcounts())
+        conexao.commit()
+        return inseridos, erros
+    except Exception as e:
+        print(f"Erro na operação SQL em lote: {e}")
+        conexao.rollback()
+        return None
+    finally:
+        conexao.close()
+
+
+def vincular_em_lote(pares):
+    """
+    Cria vários vínculos (lista de dicts com cpf_paciente e cpf_cuidador) numa única transação.
+    Vínculos já existentes são ignorados; CPFs inexistentes aparecem nos erros.
+
+    Returns:
+        tuple: (quantidade inserida, erros por posição); None se o lote inteiro falhar.
+    """
+    parametros = [{'cpf_paciente': p['cpf_paciente'], 'cpf_cuidador': p['cpf_cuidador']} for p in pares]
+    return _executar_lote(reg.INSERIR_VINCULO, parametros)
+
+
+def agendar_em_lote(agendamentos):
+    """
+    Cria vários agendamentos (lista de dicts com cpf_paciente e data_consulta DD/MM/AAAA) numa única transação.
+
+    Returns:
+        tuple: (quantidade inserida, erros por posição); None se o lote inteiro falhar.
+    """
+    parametros = [{'cpf_paciente': a['cpf_paciente'], 'data_consulta': a['data_consulta']} for a in agendamentos]
+    return _executar_lote(reg.INSERIR_AGENDAMENTO, parametros)
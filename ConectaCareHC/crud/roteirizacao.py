@@ -0,0 +1,232 @@
+# crud/roteirizacao.py
+# Ordem das visitas do dia de cada cuidador (roteirização).
+#
+# Para uma data, junta AGENDAMENTOS, VINCULOS_PACIENTE_CUIDADOR e ENDERECOS: cada cuidador sai do seu
+# endereço e visita os pacientes vinculados que têm consulta no dia (e, com `retornar`, volta para casa).
+# A rota de cada cuidador é resolvida com heurísticas sobre a matriz de distâncias (haversine, calculada
+# de forma vetorizada):
+#   1. vizinho mais próximo, para a rota inicial;
+#   2. 2-opt (inverte trechos da rota enquanto isso a encurtar), avaliando de uma vez todas as trocas a
+#      partir de cada posição, até não haver melhoria ou estourar `tempo_por_rota_s`.
+# Com `workers`, os cuidadores são divididos em partições (faixas de CPF) resolvidas em paralelo pelo motor
+# de crud/processamento_paralelo.py: cada worker lê só as visitas dos seus cuidadores. Sem `workers`, tudo
+# roda na conexão atual (uso na API). O filtro por data usa o índice IDX_AGENDAMENTOS_DATA.
+#
+# Visitas sem coordenadas (CEP fora da base de centroides) vão para o fim da rota, na ordem do agendamento.
+
+import time
+from datetime import datetime, timedelta
+
+from ConectaCareHC.crud import processamento_paralelo, repositorio
+from ConectaCareHC.crud.registro_sql import (COLUNAS_VISITAS, LEITURA_EM_MASSA, VISITAS_DO_CUIDADOR, VISITAS_DO_DIA,
+                                             Consulta,
+                                             select_visitas_do_dia)
+from ConectaCareHC.utils.coordenadas import matriz_distancias_km
+
+TEMPO_POR_ROTA_S = 0.05
+_MELHORIA_MINIMA_KM = 1e-9
+
+_consultas_por_estrategia = {}
+
+
+# --- Heurísticas ---
+
+def comprimento(rota, matriz):
+    """Soma das distâncias entre posições consecutivas da rota (lista de nós)."""
+    return float(sum(matriz[a, b] for a, b in zip(rota, rota[1:])))
+
+
+def vizinho_mais_proximo(matriz, inicio=0):
+    """Rota que parte de `inicio` e sempre segue para o nó ainda não visitado mais próximo."""
+    import numpy as np
+
+    visitados = np.zeros(len(matriz), dtype=bool)
+    rota = [inicio]
+    visitados[inicio] = True
+    for _ in range(len(matriz) - 1):
+        distancias = np.where(visitados, np.inf, matriz[rota[-1]])
+        proximo = int(np.argmin(distancias))
+        rota.append(proximo)
+        visitados[proximo] = True
+    return rota
+
+
+def dois_opt(rota, matriz, prazo=None):
+    """
+    Melhora a rota invertendo trechos, com o primeiro e o último nó fixos.
+
+    Para cada posição i, calcula de uma vez o ganho de trocar as arestas (i, i+1) e (j, j+1) por
+    (i, j) e (i+1, j+1), para todo j, e aplica a melhor troca. Para no ótimo local ou no `prazo`
+    (time.monotonic()).
+    """
+    import numpy as np
+
+    rota = np.asarray(rota)
+    arestas = len(rota) - 1
+    melhorou = True
+    while melhorou:
+        melhorou = False
+        for i in range(arestas - 2):
+            if prazo is not None and time.monotonic() > prazo:
+                return rota.tolist()
+            a, b = rota[i], rota[i + 1]
+            c, d = rota[i + 2:arestas], rota[i + 3:arestas + 1]
+            ganhos = matriz[a, b] + matriz[c, d] - matriz[a, c] - matriz[b, d]
+            j = int(np.argmax(ganhos))
+            if ganhos[j] > _MELHORIA_MINIMA_KM:
+                j += i + 2
+                rota[i + 1:j + 1] = rota[i + 1:j + 1][::-1]
+                melhorou = True
+    return rota.tolist()
+
+
+def resolver_rota(latitudes, longitudes, retornar=True, tempo_limite_s=TEMPO_POR_ROTA_S, melhorar=True):
+    """
+    Ordem de visita dos pontos 1..n partindo do ponto 0 (endereço do cuidador).
+
+    A rota termina no ponto 0 (`retornar`) ou num nó fictício a distância zero de todos, que deixa o
+    2-opt escolher a última visita. Um ponto de partida sem coordenadas (None) fica a distância zero
+    de todos: a rota começa pela visita que a deixar mais curta.
+
+    Returns:
+        tuple: (ordem das visitas -- índices 1..n --, distância total em km)
+    """
+    import numpy as np
+
+    n = len(latitudes) - 1
+    if n <= 0:
+        return [], 0.0
+    sem_partida = latitudes[0] is None
+    if sem_partida:
+        latitudes, longitudes = [latitudes[1]] + list(latitudes[1:]), [longitudes[1]] + list(longitudes[1:])
+    matriz = matriz_distancias_km(latitudes, longitudes)
+    if sem_partida:
+        matriz[0, :] = matriz[:, 0] = 0.0
+
+    rota = vizinho_mais_proximo(matriz)
+    if retornar:
+        rota.append(0)
+    else:
+        matriz = np.pad(matriz, ((0, 1), (0, 1)))
+        rota.append(n + 1)
+    if melhorar and n > 1:
+        rota = dois_opt(rota, matriz, time.monotonic() + tempo_limite_s if tempo_limite_s else None)
+    return rota[1:-1], comprimento(rota, matriz)
+
+
+# --- Montagem das rotas a partir das linhas do banco ---
+
+def _agrupar_por_cuidador(linhas):
+    grupo, atual = [], None
+    for row in linhas:
+        if row.cpf_cuidador != atual and grupo:
+            yield grupo
+            grupo = []
+        atual = row.cpf_cuidador
+        grupo.append(row)
+    if grupo:
+        yield grupo
+
+
+def montar_rota(visitas, retornar=True, tempo_limite_s=TEMPO_POR_ROTA_S):
+    """Rota de um cuidador a partir das suas linhas de COLUNAS_VISITAS (na ordem dos agendamentos)."""
+    com_coordenadas = [v for v in visitas if v.latitude is not None]
+    sem_coordenadas = [v for v in visitas if v.latitude is None]
+    partida = visitas[0]
+    latitudes = [partida.latitude_cuidador] + [v.latitude for v in com_coordenadas]
+    longitudes = [partida.longitude_cuidador] + [v.longitude for v in com_coordenadas]
+
+    ordem, distancia = resolver_rota(latitudes, longitudes, retornar, tempo_limite_s)
+    ordenadas = [com_coordenadas[i - 1] for i in ordem] + sem_coordenadas
+    return {
+        'cpf_cuidador': partida.cpf_cuidador,
+        'distancia_km': round(distancia, 3),
+        'visitas': [{'cpf_paciente': v.cpf_paciente, 'nome': v.nome_paciente, 'latitude': v.latitude,
+                     'longitude': v.longitude, 'id_agendamento': v.id_agendamento} for v in ordenadas],
+    }
+
+
+def _datas(data):
+    """
+    Binds da data (DD/MM/AAAA) e do dia seguinte: o filtro é [data, dia seguinte) para aceitar horários.
+    Lança ValueError se a data for inválida.
+    """
+    dia = datetime.strptime(data, "%d/%m/%Y")
+    return {'data': data, 'dia_seguinte': (dia + timedelta(days=1)).strftime("%d/%m/%Y")}
+
+
+def data_valida(data):
+    try:
+        _datas(data)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def rota_do_cuidador(cpf_cuidador, data, retornar=True, tempo_limite_s=TEMPO_POR_ROTA_S):
+    """
+    Rota do dia de um cuidador.
+
+    Returns:
+        dict: {'cpf_cuidador', 'distancia_km', 'visitas': [...]} (visitas vazia se não houver
+        agendamentos); None em caso de erro.
+    """
+    if not data_valida(data):
+        print(f"Data inválida: {data}. Use o formato DD/MM/AAAA.")
+        return None
+    linhas = repositorio.executar_sql(VISITAS_DO_CUIDADOR, {'cpf': cpf_cuidador, **_datas(data)})
+    if linhas is None:
+        return None
+    if not linhas:
+        return {'cpf_cuidador': cpf_cuidador, 'distancia_km': 0.0, 'visitas': []}
+    return montar_rota(linhas, retornar, tempo_limite_s)
+
+
+# --- Todos os cuidadores, em paralelo ---
+
+def _consulta_da_particao(particao):
+    consulta = _consultas_por_estrategia.get(particao.estrategia)
+    if consulta is None:
+        consulta = Consulta(f'visitas_do_dia_{particao.estrategia}', select_visitas_do_dia(particao.filtro('C')),
+                            COLUNAS_VISITAS, **LEITURA_EM_MASSA)
+        _consultas_por_estrategia[particao.estrategia] = consulta
+    return consulta
+
+
+def otimizar_particao(conexao, particao, data, retornar, tempo_limite_s):
+    """Tarefa do motor paralelo: rotas dos cuidadores da partição."""
+    with conexao.cursor() as cursor:
+        _consulta_da_particao(particao).executar(cursor, {**particao.parametros, **_datas(data)})
+        linhas = cursor.fetchall()
+    return [montar_rota(visitas, retornar, tempo_limite_s) for visitas in _agrupar_por_cuidador(linhas)]
+
+
+def otimizar_rotas(data, workers=None, modo='processos', particoes=None, retornar=True,
+                   tempo_por_rota_s=TEMPO_POR_ROTA_S, progresso=None):
+    """
+    Rotas do dia (DD/MM/AAAA) de todos os cuidadores com visitas.
+
+    Args:
+        workers (int): resolve as partições em paralelo; None = tudo na conexão atual.
+
+    Returns:
+        list: rotas (ver rota_do_cuidador) ordenadas por CPF do cuidador; None em caso de erro.
+    """
+    if not data_valida(data):
+        print(f"Data inválida: {data}. Use o formato DD/MM/AAAA.")
+        return None
+    if not workers:
+        linhas = repositorio.executar_sql(VISITAS_DO_DIA, _datas(data))
+        if linhas is None:
+            return None
+        return [montar_rota(visitas, retornar, tempo_por_rota_s) for visitas in _agrupar_por_cuidador(linhas)]
+
+    lista_particoes = processamento_paralelo.calcular_particoes('CUIDADORES', particoes or workers * 4)
+    if lista_particoes is None:
+        return None
+    resultados = processamento_paralelo.executar_particionado(
+        otimizar_particao, lista_particoes, (data, retornar, tempo_por_rota_s), workers=workers, modo=modo,
+        progresso=progresso)
+    if resultados is None:
+        return None
+    return [rota for rotas in resultados for rota in rotas]
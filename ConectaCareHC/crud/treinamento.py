@@ -0,0 +1,209 @@
+# crud/treinamento.py
+# Treinamento do modelo de demanda (crud/modelo.py) sem carregar a base na memória: a consulta
+# ATRIBUTOS_PACIENTES é lida em blocos de TAMANHO_BLOCO linhas (fetchmany) e cada bloco vai para o
+# partial_fit do estimador -- a memória depende do tamanho do bloco, não da quantidade de pacientes.
+# Com --epocas N a consulta é relida N vezes.
+#
+# Rótulo: o paciente teve consulta nos DIAS_JANELA dias a partir do corte (por padrão, hoje menos a
+# janela, para que a janela inteira já seja conhecida); os atributos só usam o que havia antes do corte.
+# Os pacientes com o último dígito antes dos verificadores do CPF igual a 0 (10%) ficam fora do treino e
+# formam a validação, guardada como matriz esparsa (até LIMITE_VALIDACAO linhas).
+#
+# A versão treinada é gravada no registro de modelos e ativada, a menos que --nao-ativar; os workers de
+# api_predicao.py passam a usá-la na próxima verificação, sem reinício.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.crud.treinamento [--estimador logistica] [--bloco 50000] [--epocas 2]
+#   python -m ConectaCareHC.crud.treinamento --corte 2026-06-01 --nao-ativar
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from ConectaCareHC.crud import modelo
+from ConectaCareHC.crud import registro_sql as reg
+from ConectaCareHC.crud.db_conexao import conectar_bd
+
+TAMANHO_BLOCO = 50_000
+PARTE_VALIDACAO = 10  # 9º dígito do CPF == 0 (os verificadores não são uniformes)
+LIMITE_VALIDACAO = 200_000
+# Estimadores com partial_fit e predict_proba
+ESTIMADORES = ('logistica', 'huber', 'bernoulli')
+
+
+def _estimador(nome):
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.naive_bayes import BernoulliNB
+
+    if nome == 'logistica':
+        # Passo adaptativo: com o 'optimal' padrão os primeiros blocos deixam as probabilidades extremas
+        return SGDClassifier(loss='log_loss', learning_rate='adaptive', eta0=0.01, random_state=0)
+    if nome == 'huber':
+        return SGDClassifier(loss='modified_huber', learning_rate='adaptive', eta0=0.01, random_state=0)
+    if nome == 'bernoulli':
+        return BernoulliNB()
+    raise ValueError(f"Estimador desconhecido: {nome} (opções: {', '.join(ESTIMADORES)})")
+
+
+# --- Leitura ---
+
+def _blocos(cursor, corte, tamanho_bloco):
+    """DataFrames de até `tamanho_bloco` pacientes com atributos e rótulo (fetchmany)."""
+    import pandas as pd
+
+    fim = corte + timedelta(days=modelo.DIAS_JANELA)
+    reg.ATRIBUTOS_PACIENTES.executar(cursor, {'corte': corte.isoformat(), 'fim': fim.isoformat()})
+    while True:
+        linhas = cursor.fetchmany(tamanho_bloco)
+        if not linhas:
+            break
+        yield pd.DataFrame.from_records(linhas, columns=reg.ATRIBUTOS_PACIENTES.colunas)
+
+
+def _preparar(quadro, corte):
+    """(matriz, rótulos, máscara da validação) de um bloco."""
+    import numpy as np
+    import pandas as pd
+
+    ultima = pd.to_datetime(quadro['ultima_consulta'], format='ISO8601')
+    colunas = {
+        'idade': quadro['idade'], 'uf': quadro['uf'], 'cidade': quadro['cidade'],
+        'cuidadores': quadro['cuidadores'], 'consultas_anteriores': quadro['consultas_anteriores'],
+        'dias_desde_ultima': (pd.Timestamp(corte) - ultima).dt.days,
+    }
+    rotulos = (quadro['consultas_janela'] > 0).to_numpy(np.int8)
+    validacao = (pd.to_numeric(quadro['cpf']) // 100 % PARTE_VALIDACAO == 0).to_numpy()
+    return modelo.matriz(colunas), rotulos, validacao
+
+
+# --- Treinamento ---
+
+def _metricas(estimador, matriz, rotulos):
+    import numpy as np
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    probabilidades = estimador.predict_proba(matriz)[:, 1]
+    return {
+        'linhas': int(len(rotulos)),
+        'taxa_positiva': round(float(rotulos.mean()), 4),
+        'log_loss': round(float(log_loss(rotulos, probabilidades, labels=[0, 1])), 4),
+        'auc': round(float(roc_auc_score(rotulos, probabilidades)), 4) if len(np.unique(rotulos)) == 2 else None,
+        'acuracia': round(float(((probabilidades >= 0.5) == rotulos).mean()), 4),
+    }
+
+
+def _parametros(estimador):
+    return {nome: valor for nome, valor in estimador.get_params().items()
+            if isinstance(valor, (bool, int, float, str, type(None)))}
+
+
+def treinar(estimador='logistica', corte=None, tamanho_bloco=TAMANHO_BLOCO, epocas=1, ativar=True,
+            ao_progredir=None):
+    """
+    Treina uma nova versão do modelo lendo os pacientes em blocos e a grava no registro.
+
+    Args:
+        corte (date): início da janela do rótulo; padrão hoje menos modelo.DIAS_JANELA.
+        ao_progredir: chamada com (época, linhas de treino lidas) a cada bloco.
+
+    Returns:
+        dict: metadados da versão ('versao', 'validacao', 'duracao_s'...); None em caso de erro.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    inicio = time.perf_counter()
+    corte = corte or date.today() - timedelta(days=modelo.DIAS_JANELA)
+    try:
+        nome_estimador, estimador = estimador, _estimador(estimador)
+    except ValueError as e:
+        print(e)
+        return None
+    conexao = conectar_bd()
+    if not conexao: return None
+
+    rng = np.random.default_rng(0)
+    linhas_treino = positivos = 0
+    matrizes_validacao, rotulos_validacao = [], []
+    linhas_validacao = 0
+    try:
+        with conexao.cursor() as cursor:
+            for epoca in range(1, epocas + 1):
+                lidas = 0
+                for quadro in _blocos(cursor, corte, tamanho_bloco):
+                    matriz, rotulos, validacao = _preparar(quadro, corte)
+                    if epoca == 1 and linhas_validacao < LIMITE_VALIDACAO and validacao.any():
+                        restantes = LIMITE_VALIDACAO - linhas_validacao
+                        matrizes_validacao.append(matriz[validacao][:restantes])
+                        rotulos_validacao.append(rotulos[validacao][:restantes])
+                        linhas_validacao += len(rotulos_validacao[-1])
+                    treino = np.flatnonzero(~validacao)
+                    if not len(treino):
+                        continue
+                    # Blocos saem na ordem do banco: embaralhar ajuda o SGD
+                    treino = rng.permutation(treino)
+                    estimador.partial_fit(matriz[treino], rotulos[treino], classes=[0, 1])
+                    lidas += len(treino)
+                    if epoca == 1:
+                        positivos += int(rotulos[treino].sum())
+                    if ao_progredir:
+                        ao_progredir(epoca, lidas)
+                if epoca == 1:
+                    linhas_treino = lidas
+    except Exception as e:
+        print(f"Erro ao ler os atributos para o treinamento: {e}")
+        return None
+    finally:
+        conexao.close()
+
+    if not linhas_treino:
+        print("Nenhum paciente para treinar o modelo.")
+        return None
+    validacao = None
+    if matrizes_validacao:
+        validacao = _metricas(estimador, sparse.vstack(matrizes_validacao, format='csr'),
+                              np.concatenate(rotulos_validacao))
+    metadados = {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'estimador': nome_estimador,
+        'parametros': _parametros(estimador),
+        'corte': corte.isoformat(),
+        'janela_dias': modelo.DIAS_JANELA,
+        'atributos': list(modelo.ATRIBUTOS),
+        'n_atributos_hash': modelo.N_ATRIBUTOS_HASH,
+        'epocas': epocas,
+        'tamanho_bloco': tamanho_bloco,
+        'linhas_treino': linhas_treino,
+        'taxa_positiva_treino': round(positivos / linhas_treino, 4),
+        'validacao': validacao,
+        'duracao_s': round(time.perf_counter() - inicio, 3),
+    }
+    versao = modelo.gravar_versao(estimador, metadados)
+    if ativar and not modelo.ativar(versao):
+        return None
+    return dict(metadados, versao=versao, ativa=ativar)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Treina e registra uma nova versão do modelo de demanda.")
+    parser.add_argument("--estimador", choices=ESTIMADORES, default='logistica')
+    parser.add_argument("--corte", type=date.fromisoformat,
+                        help=f"Início da janela do rótulo, AAAA-MM-DD (padrão: hoje menos {modelo.DIAS_JANELA} dias).")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="Pacientes por bloco (partial_fit).")
+    parser.add_argument("--epocas", type=int, default=1)
+    parser.add_argument("--nao-ativar", action="store_true", dest="nao_ativar",
+                        help="Só grava a versão; ative depois com 'modelo ativar'.")
+    args = parser.parse_args(argv)
+
+    resultado = treinar(args.estimador, args.corte, args.bloco, args.epocas, not args.nao_ativar)
+    if resultado is None:
+        return 1
+    validacao = resultado['validacao'] or {}
+    print(f"Versão {resultado['versao']} ({'ativa' if resultado['ativa'] else 'não ativada'}): "
+          f"{resultado['linhas_treino']} pacientes em {resultado['duracao_s']:.1f} s; "
+          f"validação: AUC {validacao.get('auc')}, log loss {validacao.get('log_loss')}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+# implantacao/gunicorn_comum.py
+# Configurações comuns aos perfis do Gunicorn (gunicorn_sync.py, gunicorn_threads.py, gunicorn_gevent.py).
+# Cada perfil é um arquivo de configuração do Gunicorn; os valores podem ser ajustados por variáveis de
+# ambiente sem editar o arquivo:
+#   CONECTACARE_BIND       endereço (padrão 0.0.0.0:8000)
+#   CONECTACARE_WORKERS    processos
+#   CONECTACARE_THREADS    threads por processo (perfil threads)
+#   CONECTACARE_CONEXOES   conexões simultâneas por processo (perfil gevent)
+#   CONECTACARE_TIMEOUT    segundos até um worker travado ser reiniciado
+
+import multiprocessing
+import os
+
+
+def inteiro(variavel, padrao):
+    valor = os.getenv(variavel)
+    return int(valor) if valor else padrao
+
+
+def nucleos():
+    """CPUs disponíveis para o processo (respeita o affinity do container), no mínimo 1."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, multiprocessing.cpu_count())
+
+
+bind = os.getenv("CONECTACARE_BIND", "0.0.0.0:8000")
+# A consulta ao ViaCEP tem timeout de 10 s (app.py): o worker não pode ser morto antes
+timeout = inteiro("CONECTACARE_TIMEOUT", 30)
+graceful_timeout = 30
+# O arquivo de heartbeat dos workers em memória: em /tmp sobre disco lento o worker pode parecer travado
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+loglevel = "info"
@@ -0,0 +1,18 @@
+# implantacao/gunicorn_gevent.py
+# Perfil gevent: um worker por núcleo com até CONEXOES requisições simultâneas em greenlets. Alternativa
+# ao perfil threads para app.py quando há muitas conexões lentas ao mesmo tempo (o custo por conexão é
+# menor que o de uma thread). Não use com api_predicao.py: a inferência não cede o processador e trava
+# as demais requisições do worker (p99 de 670 ms a 32 clientes, contra 90 ms do perfil sync).
+# Na medida de benchmarks/carga_gunicorn.py (1 núcleo, /api/cep com o ViaCEP local a 50 ms), ficou
+# abaixo do perfil threads (~230 contra ~300 req/s a 32 clientes); 2 workers não melhoraram.
+# Requer o pacote gevent (em requirements.txt; só este perfil o usa).
+#
+# Uso (a partir da raiz do repositório):
+#   gunicorn -c python:ConectaCareHC.implantacao.gunicorn_gevent ConectaCareHC.app:app
+
+from ConectaCareHC.implantacao.gunicorn_comum import bind, graceful_timeout, inteiro, loglevel, nucleos, timeout, worker_tmp_dir  # noqa: F401
+
+worker_class = "gevent"
+workers = inteiro("CONECTACARE_WORKERS", nucleos())
+# Limita a concorrência por worker: além disso as requisições esperam na fila do socket
+worker_connections = inteiro("CONECTACARE_CONEXOES", 256)
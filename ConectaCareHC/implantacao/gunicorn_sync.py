@@ -0,0 +1,15 @@
+# implantacao/gunicorn_sync.py
+# Perfil sync: cada worker atende uma requisição por vez. É o perfil de api_predicao.py, em que o tempo
+# vai para a inferência (CPU) -- um worker por núcleo: mais workers só disputam a CPU. Na medida de
+# benchmarks/carga_gunicorn.py (1 núcleo, /predict), 1 worker fez ~500 req/s com p99 de 29 ms a 8
+# clientes; 2 workers, ~360 req/s; 3, ~310 req/s.
+# Não serve para app.py: cada consulta ao ViaCEP prende o worker, e a vazão fica em workers / latência
+# do ViaCEP (9 workers e 50 ms: ~145 req/s, contra ~300 req/s do perfil threads).
+#
+# Uso (a partir da raiz do repositório):
+#   gunicorn -c python:ConectaCareHC.implantacao.gunicorn_sync ConectaCareHC.api_predicao:app
+
+from ConectaCareHC.implantacao.gunicorn_comum import bind, graceful_timeout, inteiro, loglevel, nucleos, timeout, worker_tmp_dir  # noqa: F401
+
+worker_class = "sync"
+workers = inteiro("CONECTACARE_WORKERS", nucleos())
@@ -0,0 +1,17 @@
+# implantacao/gunicorn_threads.py
+# Perfil threads (gthread): um worker por núcleo, cada um com THREADS threads. É o perfil de app.py, em
+# que a requisição passa a maior parte do tempo esperando o ViaCEP ou o banco: as threads aguardam em
+# paralelo, e o número necessário é ~ vazão por worker x latência do serviço externo.
+# Na medida de benchmarks/carga_gunicorn.py (1 núcleo, /api/cep com o ViaCEP local a 50 ms):
+#   1 worker x 16 threads: ~235 req/s a 32 clientes; 1 x 32: ~300 req/s (p99 170 ms, CPU saturada);
+#   1 x 64 e 2 x 32: a mesma vazão com p99 maior.
+# Com o ViaCEP real (latência maior), aumente CONECTACARE_THREADS na mesma proporção.
+#
+# Uso (a partir da raiz do repositório):
+#   gunicorn -c python:ConectaCareHC.implantacao.gunicorn_threads ConectaCareHC.app:app
+
+from ConectaCareHC.implantacao.gunicorn_comum import bind, graceful_timeout, inteiro, loglevel, nucleos, timeout, worker_tmp_dir  # noqa: F401
+
+worker_class = "gthread"
+workers = inteiro("CONECTACARE_WORKERS", nucleos())
+threads = inteiro("CONECTACARE_THREADS", 32)
@@ -15,6 +15,7 @@ from ConectaCareHC.crud.operacoes import (
     vincular_paciente,
     agendar_consulta,
     listar_consultas,
+    exibir_ficha_paciente,
     # NOVAS IMPORTAÇÕES (Funções de Cuidador e Filtro)
     cadastrar_cuidador,  # C
     consultar_cuidador_por_cpf,  # R (Específico)
@@ -25,6 +26,15 @@ from ConectaCareHC.crud.operacoes import (
 )
 
 from ConectaCareHC.utils.validacao import validar_entrada
+from ConectaCareHC.crud.db_conexao import iniciar_sessao_em_segundo_plano, encerrar_sessao
+
+
+def executar_acao(acao):
+    # Cada ação do menu é uma operação rastreada (utils/rastreio.py); com CONECTACARE_PERFIL, também perfilada
+    from ConectaCareHC.utils import rastreio
+
+    with rastreio.operacao(f"menu {acao.__name__}"):
+        acao()
 
 
 # --- Submenus (Adaptação para refletir o DB) ---
@@ -41,11 +51,11 @@ def submenu_cadastro():
         opcao = validar_entrada("Escolha uma opção: ", "int")
 
         if opcao == 1:
-            cadastrar_paciente()
+            executar_acao(cadastrar_paciente)
         elif opcao == 2:
-            cadastrar_cuidador()  # Função que insere no DB
+            executar_acao(cadastrar_cuidador)  # Função que insere no DB
         elif opcao == 3:
-            vincular_paciente()  # Função que insere no DB
+            executar_acao(vincular_paciente)  # Função que insere no DB
         elif opcao == 0:
             return
         else:
@@ -66,26 +76,29 @@ def submenu_consulta():
         print("6. Agendar Consulta (INSERT no AGENDAMENTOS)")
         print("7. Listar Consultas Agendadas de um Paciente (SELECT no AGENDAMENTOS)")
         print("8. Exportar Dados de Pacientes para JSON")  # R + JSON
+        print("9. Ficha Completa do Paciente (dados, cuidadores e próximas consultas)")
         print("0. Voltar ao Menu Principal")
 
         opcao = validar_entrada("Escolha uma opção: ", "int")
 
         if opcao == 1:
-            consultar_paciente_por_cpf()
+            executar_acao(consultar_paciente_por_cpf)
         elif opcao == 2:
-            mostrar_pacientes()
+            executar_acao(mostrar_pacientes)
         elif opcao == 3:
-            filtrar_pacientes_por_idade()  # R
+            executar_acao(filtrar_pacientes_por_idade)  # R
         elif opcao == 4:
-            mostrar_cuidadores()  # R
+            executar_acao(mostrar_cuidadores)  # R
         elif opcao == 5:
-            consultar_cuidador_por_cpf()  # R
+            executar_acao(consultar_cuidador_por_cpf)  # R
         elif opcao == 6:
-            agendar_consulta()
+            executar_acao(agendar_consulta)
         elif opcao == 7:
-            listar_consultas()
+            executar_acao(listar_consultas)
         elif opcao == 8:
-            exportar_consulta_para_json()
+            executar_acao(exportar_consulta_para_json)
+        elif opcao == 9:
+            executar_acao(exibir_ficha_paciente)
         elif opcao == 0:
             return
         else:
@@ -107,13 +120,13 @@ def submenu_crud_manutencao():
         opcao = validar_entrada("Escolha uma opção: ", "int")
 
         if opcao == 1:
-            atualizar_paciente_db()
+            executar_acao(atualizar_paciente_db)
         elif opcao == 2:
-            atualizar_cuidador_db()  # U - NOVO
+            executar_acao(atualizar_cuidador_db)  # U - NOVO
         elif opcao == 3:
-            excluir_paciente_db()
+            executar_acao(excluir_paciente_db)
         elif opcao == 4:
-            excluir_cuidador_db()  # D - NOVO
+            executar_acao(excluir_cuidador_db)  # D - NOVO
         elif opcao == 0:
             return
         else:
@@ -153,4 +166,18 @@ def menu_principal():
 
 
 if __name__ == "__main__":
-    menu_principal()
\ No newline at end of file
+    # Com argumentos, roda o modo scriptado (ver comandos.py); sem argumentos, abre o menu interativo.
+    if len(sys.argv) > 1:
+        from ConectaCareHC.comandos import main as executar_modo_scriptado
+        sys.exit(executar_modo_scriptado(sys.argv[1:]))
+
+    # A conexão é aberta em segundo plano enquanto o menu é exibido e reaproveitada por todas as opções
+    iniciar_sessao_em_segundo_plano()
+    try:
+        menu_principal()
+    finally:
+        encerrar_sessao()
+        from ConectaCareHC.utils import rastreio
+
+        if rastreio.PERFIL_PADRAO:
+            rastreio.imprimir_resumo()
@@ -1,5 +1,45 @@
-import requests
 import json
+import os
+import threading
+
+# O 'requests' e o rastreio são importados dentro de _consultar_viacep: só são carregados quando um
+# CEP é consultado, e não na inicialização do menu.
+
+# Base da API; CONECTACARE_VIACEP_URL aponta para outro servidor (ex.: o substituto local, utils/viacep_local.py)
+URL_VIACEP = os.getenv("CONECTACARE_VIACEP_URL", "https://viacep.com.br/ws").rstrip("/")
+
+# Respostas definitivas do ViaCEP (endereço ou CEP inexistente) ficam em memória; falhas de rede não
+CONSULTAS_SIMULTANEAS = 8
+TAMANHO_CACHE = 10_000
+_cache = {}
+_trava_cache = threading.Lock()
+
+
+def _consultar_viacep(cep_limpo):
+    """
+    Dados do ViaCEP para um CEP de 8 dígitos, ou None se ele não existir. Usa o cache; erros de rede,
+    timeout e respostas inválidas propagam (requests.exceptions.RequestException, json.JSONDecodeError).
+    """
+    with _trava_cache:
+        if cep_limpo in _cache:
+            return _cache[cep_limpo]
+
+    import requests
+
+    from ConectaCareHC.utils.rastreio import trecho
+
+    # Consumo da API externa pública
+    with trecho('http', 'viacep'):
+        response = requests.get(f"{URL_VIACEP}/{cep_limpo}/json/", timeout=5)  # Define um timeout de 5 segundos
+    response.raise_for_status()  # Lança exceção para códigos de erro HTTP (4xx ou 5xx)
+    dados = response.json()
+    dados = None if dados.get('erro') else dados
+
+    with _trava_cache:
+        if len(_cache) >= TAMANHO_CACHE:
+            _cache.clear()
+        _cache[cep_limpo] = dados
+    return dados
 
 
 def buscar_endereco_por_cep(cep):
@@ -19,16 +59,12 @@ def buscar_endereco_por_cep(cep):
         print(" CEP inválido. Deve conter 8 dígitos.")
         return None
 
-    url = f"https://viacep.com.br/ws/{cep_limpo}/json/"
+    import requests
 
     try:
-        # Consumo da API externa pública
-        response = requests.get(url, timeout=5)  # Define um timeout de 5 segundos
-        response.raise_for_status()  # Lança exceção para códigos de erro HTTP (4xx ou 5xx)
-
-        dados = response.json()
+        dados = _consultar_viacep(cep_limpo)
 
-        if dados.get('erro'):
+        if dados is None:
             print(f" Erro ao buscar CEP {cep}: CEP não encontrado.")
             return None
 
@@ -40,4 +76,35 @@ def buscar_endereco_por_cep(cep):
         return None
     except json.JSONDecodeError:
         print("Erro ao decodificar a resposta JSON da API.")
-        return None
\ No newline at end of file
+        return None
+
+
+def resolver_ceps(ceps):
+    """
+    Consulta de uma vez, em paralelo e pelo cache, os CEPs distintos de um lote (cadastro em lote da API).
+
+    Returns:
+        dict: {CEP de 8 dígitos: dados do ViaCEP ou None se o CEP não existir}. Na primeira falha de rede
+        as consultas que faltam são abandonadas, e os CEPs delas ficam fora do dicionário.
+    """
+    distintos = {c for c in (''.join(filter(str.isdigit, str(cep))) for cep in ceps) if len(c) == 8}
+    if not distintos:
+        return {}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    resolvidos = {}
+    falhou = threading.Event()
+
+    def consultar(cep_limpo):
+        if falhou.is_set():
+            return
+        try:
+            resolvidos[cep_limpo] = _consultar_viacep(cep_limpo)
+        except Exception:
+            falhou.set()
+
+    with ThreadPoolExecutor(max_workers=min(CONSULTAS_SIMULTANEAS, len(distintos)),
+                            thread_name_prefix="viacep") as executor:
+        list(executor.map(consultar, distintos))
+    return resolvidos
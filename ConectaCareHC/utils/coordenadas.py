@@ -0,0 +1,89 @@
+# utils/coordenadas.py
+# Coordenadas aproximadas (latitude, longitude) a partir do CEP, sem acesso à rede.
+#
+# Usa uma base local de centroides (CSV com as colunas prefixo,latitude,longitude): o CEP é procurado
+# pelo prefixo mais longo presente na base (8 dígitos = CEP exato, 5 = setor, 2 = sub-região...).
+# A base distribuída em dados/centroides_cep.csv tem um ponto de referência por sub-região (2 dígitos);
+# uma base mais detalhada, no mesmo formato, pode ser indicada na variável CONECTACARE_CENTROIDES_CEP.
+
+import csv
+import math
+import os
+
+CAMINHO_CENTROIDES_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "centroides_cep.csv")
+RAIO_TERRA_KM = 6371.0
+
+# Carregada no primeiro uso: {prefixo: (latitude, longitude)} e os tamanhos de prefixo presentes
+_centroides = None
+_tamanhos_prefixo = ()
+
+
+def carregar_centroides(caminho=None):
+    """(Re)carrega a base de centroides. Retorna a quantidade de prefixos lidos."""
+    global _centroides, _tamanhos_prefixo
+    caminho = caminho or os.getenv("CONECTACARE_CENTROIDES_CEP") or CAMINHO_CENTROIDES_PADRAO
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        centroides = {linha['prefixo'].strip(): (float(linha['latitude']), float(linha['longitude']))
+                      for linha in csv.DictReader(arquivo)}
+    _tamanhos_prefixo = tuple(sorted({len(prefixo) for prefixo in centroides}, reverse=True))
+    _centroides = centroides
+    return len(centroides)
+
+
+def coordenadas_do_cep(cep):
+    """
+    Centroide do CEP (texto com ou sem hífen).
+
+    Returns:
+        tuple: (latitude, longitude); None se o CEP for inválido ou não estiver coberto pela base.
+    """
+    if _centroides is None:
+        carregar_centroides()
+    cep_limpo = ''.join(filter(str.isdigit, cep or ''))
+    if len(cep_limpo) != 8:
+        return None
+    for tamanho in _tamanhos_prefixo:
+        coordenadas = _centroides.get(cep_limpo[:tamanho])
+        if coordenadas is not None:
+            return coordenadas
+    return None
+
+
+def distancia_km(latitude1, longitude1, latitude2, longitude2):
+    """Distância em linha reta (haversine) entre dois pontos, em km."""
+    fi1, fi2 = math.radians(latitude1), math.radians(latitude2)
+    delta_fi = fi2 - fi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(delta_fi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# --- Versões vetorizadas (NumPy, importado só quando usadas) ---
+
+def para_cartesianas(latitudes, longitudes):
+    """Pontos na esfera unitária (n, 3): a distância euclidiana entre eles cresce com a distância real."""
+    import numpy as np
+
+    fi = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lam = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_fi = np.cos(fi)
+    return np.column_stack((cos_fi * np.cos(lam), cos_fi * np.sin(lam), np.sin(fi)))
+
+
+def corda_para_km(cordas):
+    """Converte distâncias euclidianas na esfera unitária (cordas) em distâncias sobre a superfície (km)."""
+    import numpy as np
+
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.minimum(np.asarray(cordas) / 2, 1.0))
+
+
+def km_para_corda(km):
+    return 2 * math.sin(min(km / (2 * RAIO_TERRA_KM), math.pi / 2))
+
+
+def matriz_distancias_km(latitudes, longitudes):
+    """Matriz (n, n) das distâncias em km entre todos os pares de pontos."""
+    import numpy as np
+
+    pontos = para_cartesianas(latitudes, longitudes)
+    return corda_para_km(np.linalg.norm(pontos[:, None, :] - pontos[None, :, :], axis=2))
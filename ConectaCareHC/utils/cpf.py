@@ -0,0 +1,164 @@
+# utils/cpf.py
+# Validação e normalização de CPF.
+#
+# A forma canônica de um CPF é o texto com 11 dígitos, sem pontuação ("12345678909"). A versão
+# numérica (int de até 11 dígitos, sem os zeros à esquerda) é a chave usada depois da migração
+# opcional de crud/migracao_cpf.py.
+#
+# validar_cpfs_em_lote usa NumPy (importado só quando a função é chamada) para validar milhões de
+# CPFs de uma vez em importações e verificações da base.
+
+TAMANHO_CPF = 11
+MAIOR_CPF = 10 ** TAMANHO_CPF - 1
+_SEPARADORES = str.maketrans("", "", ".- ")
+TAMANHO_BLOCO_LOTE = 1_000_000
+
+# Pesos dos dígitos verificadores: 10..2 para o primeiro e 11..2 para o segundo
+_PESOS_DV1 = tuple(range(10, 1, -1))
+_PESOS_DV2 = tuple(range(11, 1, -1))
+
+
+def _digito_verificador(digitos, pesos):
+    resto = sum(d * p for d, p in zip(digitos, pesos)) * 10 % 11
+    return 0 if resto == 10 else resto
+
+
+def normalizar_cpf(cpf):
+    """
+    Converte o CPF (texto com ou sem pontuação, ou número) para a forma canônica de 11 dígitos.
+    Retorna None se não for um CPF bem formado (não confere os dígitos verificadores).
+    """
+    if isinstance(cpf, bool):
+        return None
+    if isinstance(cpf, int):
+        return str(cpf).zfill(TAMANHO_CPF) if 0 <= cpf <= MAIOR_CPF else None
+    if not isinstance(cpf, str):
+        return None
+    # Só os inteiros (colunas numéricas) perdem os zeros à esquerda; um texto curto ("191") é mal formado
+    texto = cpf.strip().translate(_SEPARADORES)
+    if not texto.isdigit() or not texto.isascii():
+        return None
+    return texto if len(texto) == TAMANHO_CPF else None
+
+
+def cpf_valido(cpf):
+    """Confere o formato e os dígitos verificadores (CPFs com todos os dígitos iguais são inválidos)."""
+    texto = normalizar_cpf(cpf)
+    if texto is None or len(set(texto)) == 1:
+        return False
+    digitos = [int(c) for c in texto]
+    return (digitos[9] == _digito_verificador(digitos[:9], _PESOS_DV1)
+            and digitos[10] == _digito_verificador(digitos[:10], _PESOS_DV2))
+
+
+def completar_cpf(base):
+    """Calcula os dígitos verificadores para os 9 primeiros dígitos (int ou texto) e devolve o CPF canônico."""
+    digitos = [int(c) for c in str(base).zfill(9)]
+    if len(digitos) != 9:
+        raise ValueError(f"A base do CPF deve ter 9 dígitos: {base}")
+    digitos.append(_digito_verificador(digitos, _PESOS_DV1))
+    digitos.append(_digito_verificador(digitos, _PESOS_DV2))
+    return "".join(map(str, digitos))
+
+
+def cpf_para_numero(cpf):
+    """Chave numérica do CPF (para o esquema migrado); None se o CPF for inválido."""
+    return int(normalizar_cpf(cpf)) if cpf_valido(cpf) else None
+
+
+def formatar_cpf(cpf):
+    """Máscara de exibição: 123.456.789-09."""
+    texto = normalizar_cpf(cpf)
+    if texto is None:
+        return str(cpf)
+    return f"{texto[:3]}.{texto[3:6]}.{texto[6:9]}-{texto[9:]}"
+
+
+# --- Validação em lote (NumPy) ---
+
+def _matriz_digitos(cpfs):
+    """Converte os CPFs para uma matriz (n, 11) de dígitos e uma máscara dos que estão bem formados."""
+    import numpy as np
+
+    valores = np.asarray(cpfs)
+    if valores.dtype.kind in "iu":
+        numeros = valores.astype(np.int64)
+        bem_formados = (numeros >= 0) & (numeros <= MAIOR_CPF)
+        potencias = 10 ** np.arange(TAMANHO_CPF - 1, -1, -1, dtype=np.int64)
+        return (np.where(bem_formados, numeros, 0)[:, None] // potencias) % 10, bem_formados
+
+    # Texto: os bytes de cada CPF (sem acentos, senão é mal formado) numa matriz (n, largura)
+    try:
+        bytes_cpfs = valores.astype("S")
+    except UnicodeEncodeError:
+        return _matriz_digitos_lenta(np, cpfs)
+    largura = max(bytes_cpfs.dtype.itemsize, 1)
+    matriz = np.frombuffer(bytes_cpfs.tobytes(), dtype=np.uint8).reshape(len(bytes_cpfs), largura)
+
+    e_digito = (matriz >= ord("0")) & (matriz <= ord("9"))
+    if largura == TAMANHO_CPF and e_digito.all():
+        # Caso comum: todos já estão na forma canônica
+        return matriz.astype(np.int16) - ord("0"), np.ones(len(matriz), dtype=bool)
+
+    # Texto precisa de exatamente 11 dígitos, como em normalizar_cpf (só os inteiros são completados)
+    e_separador = np.isin(matriz, np.frombuffer(b".- \0", dtype=np.uint8))
+    bem_formados = (e_digito | e_separador).all(axis=1) & (e_digito.sum(axis=1) == TAMANHO_CPF)
+    if largura < TAMANHO_CPF:
+        return np.zeros((len(matriz), TAMANHO_CPF), dtype=np.int16), bem_formados
+
+    # Os dígitos de cada CPF, na ordem, sem os separadores
+    ordem = np.argsort(~e_digito, axis=1, kind="stable")
+    digitos = np.take_along_axis(matriz, ordem, axis=1)[:, :TAMANHO_CPF].astype(np.int16) - ord("0")
+    return np.where(bem_formados[:, None], digitos, 0), bem_formados
+
+
+def _matriz_digitos_lenta(np, cpfs):
+    normalizados = [normalizar_cpf(cpf) for cpf in cpfs]
+    bem_formados = np.array([cpf is not None for cpf in normalizados])
+    texto = "".join(cpf or "0" * TAMANHO_CPF for cpf in normalizados).encode()
+    matriz = np.frombuffer(texto, dtype=np.uint8).reshape(len(normalizados), TAMANHO_CPF)
+    return matriz.astype(np.int16) - ord("0"), bem_formados
+
+
+def _validar_bloco(cpfs):
+    """Retorna (matriz de dígitos, máscara de válidos) de um bloco de CPFs."""
+    import numpy as np
+
+    digitos, bem_formados = _matriz_digitos(cpfs)
+    dv1 = (digitos[:, :9] @ np.array(_PESOS_DV1, dtype=np.int16)).astype(np.int32) * 10 % 11 % 10
+    dv2 = (digitos[:, :10] @ np.array(_PESOS_DV2, dtype=np.int16)).astype(np.int32) * 10 % 11 % 10
+    repetidos = (digitos == digitos[:, :1]).all(axis=1)
+    return digitos, bem_formados & ~repetidos & (digitos[:, 9] == dv1) & (digitos[:, 10] == dv2)
+
+
+def _em_blocos(cpfs, funcao, tipo):
+    """Aplica `funcao` em blocos de TAMANHO_BLOCO_LOTE CPFs (limita a memória das matrizes intermediárias)."""
+    import numpy as np
+
+    if len(cpfs) == 0:
+        return np.zeros(0, dtype=tipo)
+    return np.concatenate([funcao(cpfs[inicio:inicio + TAMANHO_BLOCO_LOTE])
+                           for inicio in range(0, len(cpfs), TAMANHO_BLOCO_LOTE)])
+
+
+def validar_cpfs_em_lote(cpfs):
+    """
+    Valida uma sequência de CPFs (textos com ou sem pontuação, ou inteiros) de forma vetorizada.
+
+    Returns:
+        numpy.ndarray: máscara booleana (True = CPF válido), na mesma ordem da entrada.
+    """
+    return _em_blocos(cpfs, lambda bloco: _validar_bloco(bloco)[1], bool)
+
+
+def cpfs_para_numeros(cpfs):
+    """Versão vetorizada de cpf_para_numero: array int64 com -1 nas posições de CPFs inválidos."""
+    import numpy as np
+
+    potencias = 10 ** np.arange(TAMANHO_CPF - 1, -1, -1, dtype=np.int64)
+
+    def converter(bloco):
+        digitos, validos = _validar_bloco(bloco)
+        return np.where(validos, digitos.astype(np.int64) @ potencias, -1)
+
+    return _em_blocos(cpfs, converter, np.int64)
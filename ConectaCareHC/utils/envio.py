@@ -0,0 +1,143 @@
+# utils/envio.py
+# Transportes de mensagens usados pelos lembretes (crud/lembretes.py): e-mail por SMTP e SMS por um
+# gateway HTTP. Todo transporte tem o método enviar(destino, assunto, texto, chave) e lança ErroEnvio
+# em caso de falha; outros canais podem ser plugados com a mesma interface.
+#
+# A `chave` (idempotência) vai para o provedor no cabeçalho Message-ID/X-Idempotency-Key (SMTP) ou
+# Idempotency-Key (HTTP): se uma mensagem for reenviada (ex.: despachante que caiu depois de enviar e
+# antes de gravar o resultado), o provedor a descarta em vez de entregá-la de novo.
+#
+# Os transportes são usados por várias threads ao mesmo tempo: cada thread mantém a sua própria conexão
+# SMTP / sessão HTTP, aberta no primeiro envio e reaproveitada nos seguintes.
+# O 'requests' é importado só no primeiro envio de SMS.
+
+import smtplib
+import threading
+from email.message import EmailMessage
+from email.utils import formatdate
+
+from ConectaCareHC.utils.rastreio import trecho
+
+
+class ErroEnvio(Exception):
+    """
+    Falha na entrega. `temporario` indica que vale tentar de novo (rede, limite de taxa, 4xx do SMTP);
+    `espera_s` é o tempo pedido pelo provedor antes da próxima tentativa (ex.: Retry-After), se houver.
+    """
+
+    def __init__(self, mensagem, temporario=True, espera_s=None):
+        super().__init__(mensagem)
+        self.temporario = temporario
+        self.espera_s = espera_s
+
+
+class EnvioSMTP:
+    """E-mail por SMTP, com uma conexão persistente por thread."""
+
+    canal = 'EMAIL'
+
+    def __init__(self, host="localhost", porta=25, remetente="lembretes@conectacare.com.br", usuario=None,
+                 senha=None, tls=False, timeout=10):
+        self.host = host
+        self.porta = porta
+        self.remetente = remetente
+        self.usuario = usuario
+        self.senha = senha
+        self.tls = tls
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+            if self.tls:
+                conexao.starttls()
+            if self.usuario:
+                conexao.login(self.usuario, self.senha)
+            self._local.conexao = conexao
+        return conexao
+
+    def _descartar_conexao(self):
+        conexao, self._local.conexao = getattr(self._local, 'conexao', None), None
+        if conexao is not None:
+            try:
+                conexao.close()
+            except OSError:
+                pass
+
+    def enviar(self, destino, assunto, texto, chave):
+        mensagem = EmailMessage()
+        mensagem['From'] = self.remetente
+        mensagem['To'] = destino
+        mensagem['Subject'] = assunto
+        mensagem['Date'] = formatdate(localtime=True)
+        mensagem['Message-ID'] = f"<{chave}@conectacare.com.br>"
+        mensagem['X-Idempotency-Key'] = chave
+        mensagem.set_content(texto)
+        try:
+            with trecho('smtp', 'enviar'):
+                self._conexao().send_message(mensagem)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise ErroEnvio(f"Destinatário recusado: {destino}", temporario=False) from e
+        except smtplib.SMTPResponseException as e:
+            # 4xx: falha temporária (ex.: 421, 451); 5xx: definitiva. Após um 421 o servidor fecha a conexão.
+            self._descartar_conexao()
+            raise ErroEnvio(f"SMTP {e.smtp_code}: {e.smtp_error!r}", temporario=400 <= e.smtp_code < 500) from e
+        except (smtplib.SMTPException, OSError) as e:
+            self._descartar_conexao()
+            raise ErroEnvio(f"Falha na conexão SMTP: {e}") from e
+
+    def fechar(self):
+        """Fecha a conexão da thread atual (as das outras threads fecham quando elas terminam)."""
+        self._descartar_conexao()
+
+
+def _espera_pedida(resposta):
+    try:
+        return float(resposta.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class EnvioSMS:
+    """SMS por um gateway HTTP: POST JSON {"para", "mensagem"} com o cabeçalho Idempotency-Key."""
+
+    canal = 'SMS'
+
+    def __init__(self, url="http://127.0.0.1:8025/sms", token=None, timeout=5):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _sessao(self):
+        sessao = getattr(self._local, 'sessao', None)
+        if sessao is None:
+            import requests
+
+            sessao = requests.Session()
+            if self.token:
+                sessao.headers['Authorization'] = f"Bearer {self.token}"
+            self._local.sessao = sessao
+        return sessao
+
+    def enviar(self, destino, assunto, texto, chave):
+        import requests
+
+        try:
+            with trecho('http', 'gateway_sms'):
+                resposta = self._sessao().post(self.url, json={'para': destino, 'mensagem': texto},
+                                               headers={'Idempotency-Key': chave}, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise ErroEnvio(f"Falha ao conectar no gateway de SMS: {e}") from e
+        if resposta.status_code < 300:
+            return
+        temporario = resposta.status_code in (408, 429) or resposta.status_code >= 500
+        raise ErroEnvio(f"Gateway de SMS respondeu {resposta.status_code}: {resposta.text[:100]}",
+                        temporario=temporario, espera_s=_espera_pedida(resposta))
+
+    def fechar(self):
+        sessao, self._local.sessao = getattr(self._local, 'sessao', None), None
+        if sessao is not None:
+            sessao.close()
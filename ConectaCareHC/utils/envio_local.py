@@ -0,0 +1,275 @@
+# utils/envio_local.py
+# Provedores locais (substitutos) de e-mail e SMS, para desenvolvimento, demonstrações e benchmarks dos
+# lembretes (crud/lembretes.py), no mesmo espírito do banco local (crud/db_local.py):
+#   - servidor SMTP mínimo (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT), uma thread por conexão;
+#   - gateway de SMS HTTP: POST /sms com JSON {"para", "mensagem"} e o cabeçalho Idempotency-Key.
+# Ambos descartam mensagens com uma chave de idempotência já recebida (contadas como duplicadas) e podem
+# simular a latência do provedor. O gateway de SMS pode limitar a taxa (responde 429 com Retry-After).
+# GET /estatisticas devolve os contadores dos dois provedores e POST /zerar os reinicia.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.utils.envio_local --porta-smtp 1025 --porta-http 8025 --latencia-ms 20
+# e, para os lembretes, CONECTACARE_SMTP_PORTA=1025 e CONECTACARE_SMS_URL=http://127.0.0.1:8025/sms.
+
+import argparse
+import json
+import math
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class EstatisticasProvedor:
+    """Mensagens recebidas por canal, entregues (chaves distintas), duplicadas e limitadas (429)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._trava:
+            self._chaves = set()
+            self._contadores = {}
+
+    def _somar(self, canal, campo):
+        contadores = self._contadores.setdefault(canal, {'recebidas': 0, 'entregues': 0, 'duplicadas': 0,
+                                                         'limitadas': 0})
+        contadores[campo] += 1
+
+    def registrar(self, canal, chave):
+        """Conta a mensagem; retorna False se a chave já tinha sido recebida (não é entregue de novo)."""
+        with self._trava:
+            self._somar(canal, 'recebidas')
+            if chave and (canal, chave) in self._chaves:
+                self._somar(canal, 'duplicadas')
+                return False
+            if chave:
+                self._chaves.add((canal, chave))
+            self._somar(canal, 'entregues')
+            return True
+
+    def limitada(self, canal):
+        with self._trava:
+            self._somar(canal, 'limitadas')
+
+    def resumo(self):
+        with self._trava:
+            return {canal: dict(contadores) for canal, contadores in self._contadores.items()}
+
+
+class LimitadorTaxa:
+    """Balde de fichas: até `taxa_por_s` mensagens por segundo, com rajadas de até um segundo de fichas."""
+
+    def __init__(self, taxa_por_s):
+        self.taxa = taxa_por_s
+        self._fichas = float(taxa_por_s)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def permitir(self):
+        """Retorna 0 se a mensagem pode passar ou os segundos até haver uma ficha."""
+        with self._trava:
+            agora = time.monotonic()
+            self._fichas = min(self.taxa, self._fichas + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return 0.0
+            return (1 - self._fichas) / self.taxa
+
+
+# --- SMTP ---
+
+class _ManipuladorSMTP(socketserver.StreamRequestHandler):
+
+    def _responder(self, texto):
+        # As respostas do SMTP são ASCII
+        self.wfile.write(texto.encode('ascii') + b"\r\n")
+
+    def _ler_dados(self):
+        """Lê o conteúdo do DATA até a linha com '.', devolvendo a chave de idempotência dos cabeçalhos."""
+        chave = None
+        nos_cabecalhos = True
+        while True:
+            linha = self.rfile.readline()
+            if not linha or linha in (b".\r\n", b".\n"):
+                return chave
+            if nos_cabecalhos:
+                if not linha.strip():
+                    nos_cabecalhos = False
+                elif linha[:18].lower() == b"x-idempotency-key:":
+                    chave = linha[18:].decode('ascii', 'replace').strip()
+
+    def handle(self):
+        servidor = self.server
+        self._responder("220 conectacare-local ESMTP")
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            verbo = linha[:4].decode('ascii', 'replace').upper()
+            if verbo == "EHLO":
+                self._responder("250-conectacare-local\r\n250-8BITMIME\r\n250 SMTPUTF8")
+            elif verbo in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self._responder("250 OK")
+            elif verbo == "DATA":
+                self._responder("354 Fim com <CRLF>.<CRLF>")
+                chave = self._ler_dados()
+                if servidor.latencia_s:
+                    time.sleep(servidor.latencia_s)
+                servidor.estatisticas.registrar('EMAIL', chave)
+                self._responder("250 OK")
+            elif verbo == "QUIT":
+                self._responder("221 Ate logo")
+                return
+            else:
+                self._responder("502 Comando nao implementado")
+
+
+def ignorar_desconexao(servidor_base):
+    """handle_error que não mostra o traceback quando o cliente derruba a conexão (ex.: processo morto)."""
+    def handle_error(self, requisicao, endereco):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            servidor_base.handle_error(self, requisicao, endereco)
+    return handle_error
+
+
+class ServidorSMTPLocal(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    handle_error = ignorar_desconexao(socketserver.ThreadingTCPServer)
+
+    def __init__(self, endereco, estatisticas, latencia_s=0.0):
+        super().__init__(endereco, _ManipuladorSMTP)
+        self.estatisticas = estatisticas
+        self.latencia_s = latencia_s
+
+
+# --- Gateway de SMS (HTTP) ---
+
+class _ManipuladorSMS(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Mantém a conexão aberta entre requisições (sessões do requests)
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder_json(self, status, corpo, cabecalhos=None):
+        dados = json.dumps(corpo).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path == "/estatisticas":
+            self._responder_json(200, self.server.estatisticas.resumo())
+        else:
+            self._responder_json(404, {'erro': "não encontrado"})
+
+    def do_POST(self):
+        servidor = self.server
+        corpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path == "/zerar":
+            servidor.estatisticas.zerar()
+            self._responder_json(200, {})
+            return
+        if self.path != "/sms":
+            self._responder_json(404, {'erro': "não encontrado"})
+            return
+        try:
+            dados = json.loads(corpo)
+        except ValueError:
+            dados = None
+        if not isinstance(dados, dict) or not dados.get('para') or not dados.get('mensagem'):
+            self._responder_json(400, {'erro': "informe 'para' e 'mensagem'"})
+            return
+        if servidor.limitador is not None:
+            espera = servidor.limitador.permitir()
+            if espera:
+                servidor.estatisticas.limitada('SMS')
+                self._responder_json(429, {'erro': "limite de taxa"}, {'Retry-After': str(math.ceil(espera))})
+                return
+        if servidor.latencia_s:
+            time.sleep(servidor.latencia_s)
+        entregue = servidor.estatisticas.registrar('SMS', self.headers.get('Idempotency-Key'))
+        self._responder_json(200, {'duplicada': not entregue})
+
+
+class GatewaySMSLocal(ThreadingHTTPServer):
+    daemon_threads = True
+    handle_error = ignorar_desconexao(ThreadingHTTPServer)
+
+    def __init__(self, endereco, estatisticas, latencia_s=0.0, limite_por_s=None):
+        super().__init__(endereco, _ManipuladorSMS)
+        self.estatisticas = estatisticas
+        self.latencia_s = latencia_s
+        self.limitador = LimitadorTaxa(limite_por_s) if limite_por_s else None
+
+
+class ProvedoresLocais:
+    """Sobe o SMTP e o gateway de SMS locais em threads (porta 0 = porta livre escolhida pelo sistema)."""
+
+    def __init__(self, host="127.0.0.1", porta_smtp=0, porta_http=0, latencia_s=0.0, limite_sms_por_s=None):
+        self.estatisticas = EstatisticasProvedor()
+        self.smtp = ServidorSMTPLocal((host, porta_smtp), self.estatisticas, latencia_s)
+        self.http = GatewaySMSLocal((host, porta_http), self.estatisticas, latencia_s, limite_sms_por_s)
+        self.host = host
+        self._threads = []
+
+    @property
+    def porta_smtp(self):
+        return self.smtp.server_address[1]
+
+    @property
+    def url_sms(self):
+        return f"http://{self.host}:{self.http.server_address[1]}/sms"
+
+    def iniciar(self):
+        for servidor in (self.smtp, self.http):
+            thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def encerrar(self):
+        for servidor in (self.smtp, self.http):
+            servidor.shutdown()
+            servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.encerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provedores locais de e-mail (SMTP) e SMS (HTTP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta-smtp", type=int, default=1025, help="0 = porta livre.")
+    parser.add_argument("--porta-http", type=int, default=8025, help="0 = porta livre.")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="Tempo simulado de cada entrega.")
+    parser.add_argument("--limite-sms", type=float, help="Mensagens de SMS por segundo (acima disso, 429).")
+    args = parser.parse_args(argv)
+
+    provedores = ProvedoresLocais(args.host, args.porta_smtp, args.porta_http, args.latencia_ms / 1000,
+                                  args.limite_sms)
+    with provedores:
+        # Primeira linha em JSON: quem sobe os provedores com porta 0 (ex.: benchmarks) lê as portas dela
+        print(json.dumps({'porta_smtp': provedores.porta_smtp, 'url_sms': provedores.url_sms}), flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(json.dumps(provedores.estatisticas.resumo()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,396 @@
+# utils/rastreio.py
+# Instrumentação das operações (ações do menu, comandos do modo scriptado e requisições das APIs Flask).
+#
+# Cada operação acumula "trechos" cronometrados por categoria e nome: 'bd' (conexão, cada instrução SQL e
+# suas leituras, commit), 'http' (ViaCEP, gateway de SMS), 'modelo' (inferência), 'json' (serialização) e
+# 'entrada' (espera pelo usuário no menu, descontada do tempo ativo). O que sobra é o tempo do Python fora
+# dos trechos (validação, montagem de objetos...). As últimas OPERACOES_RECENTES ficam em memória para o
+# resumo das mais lentas (resumo_lentas; endpoint /api/diagnostico/lentas em api/diagnostico.py, ligado
+# com CONECTACARE_DIAGNOSTICO=1).
+#
+# Perfis opcionais, por operação (cabeçalho X-ConectaCare-Perfil, opção --perfil do modo scriptado) ou para
+# todas (variável CONECTACARE_PERFIL), gravados em DIRETORIO_PERFIS:
+#   - 'cprofile': estatísticas do cProfile (.prof: pstats, snakeviz, flameprof);
+#   - 'pilhas': amostragem das pilhas da thread da operação a cada INTERVALO_AMOSTRAGEM_S, no formato
+#     "folded" (.folded) do flamegraph.pl / speedscope;
+#   - 'tracemalloc': memória alocada e não liberada durante a operação, por pilha (.folded, em bytes),
+#     e o pico (.txt com as maiores origens).
+# Vários podem ser combinados com vírgula (ex.: "pilhas,tracemalloc").
+#
+# Variáveis de ambiente: CONECTACARE_RASTREIO=0 desliga os trechos (trecho() passa a devolver um
+# contexto vazio compartilhado); CONECTACARE_PERFIL_POR_CABECALHO=1 permite o perfil pelo cabeçalho.
+# Os módulos de perfil (cProfile, tracemalloc) só são importados quando um perfil é pedido.
+
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+OPERACOES_RECENTES = 500
+INTERVALO_AMOSTRAGEM_S = 0.001
+PROFUNDIDADE_TRACEMALLOC = 25
+PERFIS = ('cprofile', 'pilhas', 'tracemalloc')
+DIRETORIO_PERFIS_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dados", "perfis")
+
+ATIVO = os.getenv("CONECTACARE_RASTREIO", "1") != "0"
+PERFIL_PADRAO = os.getenv("CONECTACARE_PERFIL") or None
+PERFIL_POR_CABECALHO = os.getenv("CONECTACARE_PERFIL_POR_CABECALHO") == "1"
+
+_NULO = nullcontext()
+_atual = contextvars.ContextVar('operacao_rastreada', default=None)
+_recentes = deque(maxlen=OPERACOES_RECENTES)
+_trava_recentes = threading.Lock()
+_trava_tracemalloc = threading.Lock()
+_operacoes_com_tracemalloc = 0
+_sequencia = iter(range(1, sys.maxsize))
+
+
+def configurar(ativo=None, perfil=None, por_cabecalho=None):
+    """Altera a configuração lida das variáveis de ambiente (perfil='' desliga o perfil padrão)."""
+    global ATIVO, PERFIL_PADRAO, PERFIL_POR_CABECALHO
+    if ativo is not None:
+        ATIVO = ativo
+    if perfil is not None:
+        PERFIL_PADRAO = perfil or None
+    if por_cabecalho is not None:
+        PERFIL_POR_CABECALHO = por_cabecalho
+
+
+def diretorio_perfis():
+    return os.getenv("CONECTACARE_PERFIS") or DIRETORIO_PERFIS_PADRAO
+
+
+def perfis_validos(texto):
+    """Lista dos perfis pedidos em `texto` ("cprofile,pilhas"); ValueError se algum for desconhecido."""
+    pedidos = [p.strip().lower() for p in (texto or "").split(",") if p.strip()]
+    desconhecidos = [p for p in pedidos if p not in PERFIS]
+    if desconhecidos:
+        raise ValueError(f"Perfil desconhecido: {', '.join(desconhecidos)}. Use {', '.join(PERFIS)}.")
+    return pedidos
+
+
+# --- Operações e trechos ---
+
+class Operacao:
+    """Uma ação do menu, comando ou requisição: duração total e trechos agregados por (categoria, nome)."""
+
+    __slots__ = ('id', 'nome', 'inicio', 'relogio', 'duracao', 'status', 'trechos', 'profundidade', 'coberto',
+                 'perfis')
+
+    def __init__(self, nome):
+        self.id = next(_sequencia)
+        self.nome = nome
+        self.inicio = datetime.now()
+        self.relogio = time.perf_counter()
+        self.duracao = None
+        self.status = None
+        self.trechos = {}  # (categoria, nome) -> [vezes, total_s, maior_s]
+        self.profundidade = 0
+        self.coberto = 0.0  # Tempo dos trechos de primeiro nível
+        self.perfis = {}
+
+    def tempo_em(self, categoria):
+        return sum(total for (cat, _), (_, total, _) in self.trechos.items() if cat == categoria)
+
+    def para_dict(self, trechos=10):
+        duracao = self.duracao if self.duracao is not None else time.perf_counter() - self.relogio
+        espera = self.tempo_em('entrada')
+        ordenados = sorted(self.trechos.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'id': self.id, 'operacao': self.nome, 'inicio': self.inicio.isoformat(timespec='seconds'),
+            'duracao_ms': round(duracao * 1e3, 3), 'ativo_ms': round((duracao - espera) * 1e3, 3),
+            'status': self.status, 'fora_dos_trechos_ms': round((duracao - self.coberto) * 1e3, 3),
+            'por_categoria_ms': {categoria: round(self.tempo_em(categoria) * 1e3, 3)
+                                 for categoria in sorted({cat for cat, _ in self.trechos})},
+            'trechos': [{'categoria': cat, 'nome': nome, 'vezes': vezes, 'total_ms': round(total * 1e3, 3),
+                         'maior_ms': round(maior * 1e3, 3)}
+                        for (cat, nome), (vezes, total, maior) in ordenados[:trechos]],
+            'perfis': dict(self.perfis),
+        }
+
+
+class _Trecho:
+    __slots__ = ('operacao', 'chave', 'inicio')
+
+    def __init__(self, operacao, categoria, nome):
+        self.operacao = operacao
+        self.chave = (categoria, nome)
+
+    def __enter__(self):
+        self.operacao.profundidade += 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duracao = time.perf_counter() - self.inicio
+        operacao = self.operacao
+        operacao.profundidade -= 1
+        if not operacao.profundidade:
+            operacao.coberto += duracao
+        agregado = operacao.trechos.get(self.chave)
+        if agregado is None:
+            operacao.trechos[self.chave] = [1, duracao, duracao]
+        else:
+            agregado[0] += 1
+            agregado[1] += duracao
+            if duracao > agregado[2]:
+                agregado[2] = duracao
+        return False
+
+
+def trecho(categoria, nome):
+    """Cronometra um trecho da operação atual (`with trecho('bd', 'paciente_por_cpf'): ...`)."""
+    operacao = _atual.get()
+    if operacao is None:
+        return _NULO
+    return _Trecho(operacao, categoria, nome)
+
+
+def operacao_atual():
+    return _atual.get()
+
+
+def iniciar_operacao(nome, perfil=None):
+    """
+    Começa uma operação na thread (contexto) atual. Para hooks que não cabem num `with` (ex.: Flask).
+
+    Returns:
+        tuple: estado a ser passado para encerrar_operacao; None se o rastreio estiver desligado e
+        nenhum perfil for pedido.
+    """
+    perfis = perfis_validos(perfil or PERFIL_PADRAO)
+    if not ATIVO and not perfis:
+        return None
+    operacao = Operacao(nome)
+    token = _atual.set(operacao)
+    coletores = [_COLETORES[p]() for p in perfis]
+    if coletores:
+        base = _base_arquivo(operacao)
+        operacao.perfis = {coletor.nome: base + coletor.extensao for coletor in coletores}
+    for coletor in coletores:
+        coletor.iniciar()
+    return operacao, token, coletores
+
+
+def encerrar_operacao(estado, status=None):
+    """Encerra a operação, grava os perfis e a registra entre as recentes. Retorna a Operacao."""
+    if estado is None:
+        return None
+    operacao, token, coletores = estado
+    for coletor in reversed(coletores):
+        coletor.parar()
+    operacao.duracao = time.perf_counter() - operacao.relogio
+    operacao.status = status
+    try:
+        _atual.reset(token)
+    except ValueError:
+        # Encerrada num contexto diferente do início (ex.: teardown depois de uma resposta em streaming)
+        _atual.set(None)
+    for coletor in coletores:
+        try:
+            coletor.gravar(operacao.perfis[coletor.nome])
+        except OSError as e:
+            print(f"Erro ao gravar o perfil {coletor.nome}: {e}", file=sys.stderr)
+            del operacao.perfis[coletor.nome]
+    with _trava_recentes:
+        _recentes.append(operacao)
+    return operacao
+
+
+class operacao:
+    """`with operacao('menu cadastrar_paciente'):` -- iniciar_operacao/encerrar_operacao num bloco."""
+
+    __slots__ = ('nome', 'perfil', '_estado')
+
+    def __init__(self, nome, perfil=None):
+        self.nome = nome
+        self.perfil = perfil
+
+    def __enter__(self):
+        self._estado = iniciar_operacao(self.nome, self.perfil)
+        return self._estado[0] if self._estado else None
+
+    def __exit__(self, tipo, valor, traceback):
+        encerrar_operacao(self._estado, 'erro' if tipo is not None else 'ok')
+        return False
+
+
+# --- Resumo ---
+
+def operacoes_recentes():
+    with _trava_recentes:
+        return list(_recentes)
+
+
+def _percentil(ordenados, fracao):
+    return ordenados[min(int(len(ordenados) * fracao), len(ordenados) - 1)]
+
+
+def resumo_lentas(limite=20, trechos=10):
+    """
+    As `limite` operações recentes mais lentas (com os trechos) e, por nome de operação, quantidade,
+    p50, p95 e maior duração entre as recentes.
+    """
+    recentes = operacoes_recentes()
+    por_nome = {}
+    for op in recentes:
+        por_nome.setdefault(op.nome, []).append(op.duracao)
+    agregado = []
+    for nome, duracoes in por_nome.items():
+        duracoes.sort()
+        agregado.append({'operacao': nome, 'vezes': len(duracoes),
+                         'p50_ms': round(_percentil(duracoes, 0.5) * 1e3, 3),
+                         'p95_ms': round(_percentil(duracoes, 0.95) * 1e3, 3),
+                         'maior_ms': round(duracoes[-1] * 1e3, 3)})
+    agregado.sort(key=lambda item: item['p95_ms'], reverse=True)
+    lentas = sorted(recentes, key=lambda op: op.duracao, reverse=True)[:limite]
+    return {'operacoes_registradas': len(recentes), 'rastreio_ativo': ATIVO,
+            'por_operacao': agregado, 'mais_lentas': [op.para_dict(trechos) for op in lentas]}
+
+
+def imprimir_resumo(arquivo=sys.stderr, limite=10):
+    """Resumo legível das operações mais lentas (fim do menu ou do modo scriptado)."""
+    resumo = resumo_lentas(limite, trechos=5)
+    if not resumo['mais_lentas']:
+        return
+    print(f"\n--- Operações mais lentas ({resumo['operacoes_registradas']} registradas) ---", file=arquivo)
+    for op in resumo['mais_lentas']:
+        categorias = ", ".join(f"{cat} {ms:.1f}" for cat, ms in op['por_categoria_ms'].items())
+        print(f"{op['duracao_ms']:10.1f} ms  {op['operacao']}  [{categorias}; fora dos trechos "
+              f"{op['fora_dos_trechos_ms']:.1f}]", file=arquivo)
+        for t in op['trechos']:
+            print(f"{'':14}{t['categoria']:<8} {t['nome']:<40} {t['vezes']:>5}x {t['total_ms']:>10.1f} ms",
+                  file=arquivo)
+        for nome, caminho in op['perfis'].items():
+            print(f"{'':14}perfil {nome}: {caminho}", file=arquivo)
+
+
+# --- Perfis ---
+
+def _base_arquivo(operacao):
+    diretorio = diretorio_perfis()
+    os.makedirs(diretorio, exist_ok=True)
+    nome = re.sub(r"[^\w.-]+", "_", operacao.nome).strip("_")[:60]
+    return os.path.join(diretorio, f"{operacao.inicio:%Y%m%d-%H%M%S}-{os.getpid()}-{operacao.id}-{nome}")
+
+
+def _rotulo(arquivo, funcao):
+    # O formato "folded" separa os quadros por ';' e a contagem pelo último espaço
+    return f"{funcao} ({os.path.basename(arquivo)})".replace(";", ":")
+
+
+def _gravar_folded(caminho, contagens):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for pilha, quantidade in sorted(contagens.items()):
+            if quantidade > 0:
+                arquivo.write(f"{pilha} {quantidade}\n")
+
+
+class _PerfilCProfile:
+    nome = 'cprofile'
+    extensao = '.prof'
+
+    def iniciar(self):
+        import cProfile
+
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def parar(self):
+        self._perfil.disable()
+
+    def gravar(self, caminho):
+        self._perfil.dump_stats(caminho)
+
+
+class _PerfilPilhas:
+    """Amostra a pilha da thread da operação numa thread auxiliar (não desacelera o código medido)."""
+
+    nome = 'pilhas'
+    extensao = '.folded'
+
+    def iniciar(self):
+        self._alvo = threading.get_ident()
+        self._contagens = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="amostragem-pilhas", daemon=True)
+        self._thread.start()
+
+    def _amostrar(self):
+        quadros_por_codigo = {}
+        while not self._parar.wait(INTERVALO_AMOSTRAGEM_S):
+            quadro = sys._current_frames().get(self._alvo)
+            rotulos = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                rotulo = quadros_por_codigo.get(codigo)
+                if rotulo is None:
+                    rotulo = quadros_por_codigo[codigo] = _rotulo(codigo.co_filename, codigo.co_name)
+                rotulos.append(rotulo)
+                quadro = quadro.f_back
+            if rotulos:
+                pilha = ";".join(reversed(rotulos))
+                self._contagens[pilha] = self._contagens.get(pilha, 0) + 1
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def gravar(self, caminho):
+        _gravar_folded(caminho, self._contagens)
+
+
+class _PerfilTracemalloc:
+    """Memória alocada e não liberada durante a operação (diferença entre dois instantâneos) e o pico."""
+
+    nome = 'tracemalloc'
+    extensao = '.memoria.folded'
+
+    def iniciar(self):
+        global _operacoes_com_tracemalloc
+        import tracemalloc
+
+        with _trava_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(PROFUNDIDADE_TRACEMALLOC)
+            _operacoes_com_tracemalloc += 1
+            tracemalloc.reset_peak()
+        self._antes = tracemalloc.take_snapshot()
+        self._inicial = tracemalloc.get_traced_memory()[0]
+
+    def parar(self):
+        global _operacoes_com_tracemalloc
+        import tracemalloc
+
+        self._depois = tracemalloc.take_snapshot()
+        self._pico = tracemalloc.get_traced_memory()[1] - self._inicial
+        with _trava_tracemalloc:
+            _operacoes_com_tracemalloc -= 1
+            if not _operacoes_com_tracemalloc:
+                tracemalloc.stop()
+
+    def gravar(self, caminho):
+        import tracemalloc
+
+        filtros = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diferencas = self._depois.filter_traces(filtros).compare_to(self._antes.filter_traces(filtros), 'traceback')
+        contagens = {}
+        for estatistica in diferencas:
+            pilha = ";".join(_rotulo(quadro.filename, f"linha {quadro.lineno}")
+                             for quadro in reversed(estatistica.traceback))
+            contagens[pilha] = contagens.get(pilha, 0) + estatistica.size_diff
+        with open(caminho[:-len(".folded")] + ".txt", "w", encoding="utf-8") as arquivo:
+            arquivo.write(f"Pico acima do início da operação: {self._pico / 1024:.1f} KiB\n")
+            for estatistica in diferencas[:20]:
+                quadro = estatistica.traceback[0]
+                arquivo.write(f"{estatistica.size_diff / 1024:+10.1f} KiB {estatistica.count_diff:+8d} blocos  "
+                              f"{quadro.filename}:{quadro.lineno}\n")
+        _gravar_folded(caminho, contagens)
+
+
+_COLETORES = {'cprofile': _PerfilCProfile, 'pilhas': _PerfilPilhas, 'tracemalloc': _PerfilTracemalloc}
@@ -1,17 +1,29 @@
+from ConectaCareHC.utils.api_cep import buscar_endereco_por_cep, resolver_ceps
+from ConectaCareHC.utils.cpf import cpf_valido, normalizar_cpf
+
+
+def ler_entrada(texto):
+    """input() cronometrado como 'entrada': o tempo em que o menu espera o usuário não conta como trabalho."""
+    from ConectaCareHC.utils.rastreio import trecho
+
+    with trecho('entrada', 'usuario'):
+        return input(texto)
+
+
 def validar_entrada(texto, tipo="str"):
     """
     Função para validar entrada do usuário.
 
     Args:
         texto (str): O prompt a ser exibido ao usuário.
-        tipo (str): O tipo de dado esperado ('str' ou 'int').
+        tipo (str): O tipo de dado esperado ('str', 'int' ou 'cpf').
 
     Returns:
-        A entrada validada (str ou int).
+        A entrada validada (str ou int; CPF na forma canônica de 11 dígitos).
     """
     while True:
         try:
-            entrada = input(texto).strip()
+            entrada = ler_entrada(texto).strip()
 
             if tipo == "int":
                 # Tenta converter para int, garantindo que não há ponto decimal
@@ -23,6 +35,11 @@ def validar_entrada(texto, tipo="str"):
                     raise ValueError("O valor deve ser um número positivo.")
                 return valor_int
 
+            elif tipo == "cpf":
+                if not cpf_valido(entrada):
+                    raise ValueError("CPF inválido (confira os 11 dígitos e os dígitos verificadores).")
+                return normalizar_cpf(entrada)
+
             else:  # tipo == "str" (ou qualquer outro)
                 if not entrada:  # Verifica se a string está vazia após o strip()
                     raise ValueError("A entrada não pode estar vazia.")
@@ -31,4 +48,76 @@ def validar_entrada(texto, tipo="str"):
         except ValueError as e:
             # Tratamento de erro para inserção de dados
             print(f"**Entrada Inválida!** {e}")
-            # Não é necessário 'finally' neste loop, pois o 'while' garante a repetição.
\ No newline at end of file
+            # Não é necessário 'finally' neste loop, pois o 'while' garante a repetição.
+
+
+CAMPOS_OBRIGATORIOS_PESSOA = ['nome', 'cpf', 'idade', 'email', 'telefone_contato']
+CAMPOS_ENDERECO_MANUAL = ['logradouro', 'bairro', 'cidade', 'uf']
+
+
+def _precisa_do_viacep(endereco):
+    return not all(endereco.get(c) for c in CAMPOS_ENDERECO_MANUAL)
+
+
+def resolver_ceps_do_lote(registros):
+    """Consulta uma única vez os CEPs distintos dos registros que dependem do ViaCEP (ver resolver_ceps)."""
+    ceps = [dados['endereco']['cep'] for dados in registros
+            if isinstance(dados, dict) and isinstance(dados.get('endereco'), dict)
+            and dados['endereco'].get('cep') and _precisa_do_viacep(dados['endereco'])]
+    return resolver_ceps(ceps)
+
+
+def validar_dados_pessoa(dados, enderecos_cep=None):
+    """
+    Valida os dados de cadastro de paciente/cuidador vindos da API ou do modo scriptado e completa
+    o endereço via ViaCEP quando só o CEP e o número forem informados. No cadastro em lote,
+    `enderecos_cep` traz os CEPs já consultados (resolver_ceps_do_lote) e o ViaCEP não é chamado.
+
+    Returns:
+        tuple: (dados no formato de repositorio.inserir_pessoa, None) ou (None, mensagem de erro).
+    """
+    if not isinstance(dados, dict):
+        return None, "Os dados do cadastro devem ser um objeto JSON."
+
+    faltando = [c for c in CAMPOS_OBRIGATORIOS_PESSOA if dados.get(c) in (None, '')]
+    if faltando:
+        return None, f"Campos obrigatórios ausentes: {', '.join(faltando)}"
+
+    if not cpf_valido(dados['cpf']):
+        return None, f"CPF inválido: {dados['cpf']}"
+
+    if not isinstance(dados['idade'], int) or dados['idade'] < 0:
+        return None, "O campo 'idade' deve ser um número inteiro positivo."
+
+    endereco = dados.get('endereco')
+    if not isinstance(endereco, dict) or not endereco.get('numero'):
+        return None, "Informe 'endereco' com pelo menos 'numero' e 'cep' (ou o endereço completo)."
+
+    # Sem logradouro informado, o endereço base vem do ViaCEP (mesma regra do menu)
+    if _precisa_do_viacep(endereco):
+        if not endereco.get('cep'):
+            return None, "Informe o 'cep' ou todos os campos do endereço (logradouro, bairro, cidade, uf)."
+        if enderecos_cep is None:
+            dados_cep = buscar_endereco_por_cep(str(endereco['cep']))
+        else:
+            cep_limpo = ''.join(filter(str.isdigit, str(endereco['cep'])))
+            if len(cep_limpo) == 8 and cep_limpo not in enderecos_cep:
+                return None, (f"Não foi possível consultar o CEP {endereco['cep']} no ViaCEP; "
+                              "tente novamente ou informe o endereço completo.")
+            dados_cep = enderecos_cep.get(cep_limpo)
+        if not dados_cep:
+            return None, f"CEP {endereco['cep']} não encontrado no ViaCEP."
+        endereco = {
+            'cep': endereco['cep'],
+            'logradouro': dados_cep.get('logradouro', 'N/A'),
+            'bairro': dados_cep.get('bairro', 'N/A'),
+            'cidade': dados_cep.get('localidade', 'N/A'),
+            'uf': dados_cep.get('uf', 'N/A'),
+            'numero': endereco['numero'],
+            'complemento': endereco.get('complemento'),
+        }
+
+    pessoa = {c: dados[c] for c in CAMPOS_OBRIGATORIOS_PESSOA}
+    pessoa['cpf'] = normalizar_cpf(pessoa['cpf'])
+    pessoa['endereco'] = endereco
+    return pessoa, None
@@ -0,0 +1,129 @@
+# utils/viacep_local.py
+# Substituto local do ViaCEP, para desenvolvimento e testes de carga de /api/cep/<cep> (app.py) sem
+# depender do serviço público, no mesmo espírito dos provedores de envio locais (utils/envio_local.py):
+#   GET /ws/<cep>/json/  -> endereço sintético (determinístico a partir do CEP), ou {"erro": true} para
+#                           os CEPs começados por "000" (o ViaCEP responde assim aos CEPs inexistentes).
+# Pode simular a latência do serviço (--latencia-ms); cada conexão é atendida por uma thread e mantida
+# aberta entre requisições (HTTP/1.1). GET /estatisticas devolve as consultas atendidas.
+#
+# Uso (a partir da raiz do repositório):
+#   python -m ConectaCareHC.utils.viacep_local --porta 8030 --latencia-ms 40
+# e, para app.py, CONECTACARE_VIACEP_URL=http://127.0.0.1:8030/ws.
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ConectaCareHC.utils.envio_local import ignorar_desconexao
+
+ROTA_CEP = re.compile(r"^/ws/(\d{8})/json/?$")
+UFS = ('SP', 'RJ', 'MG', 'RS', 'PR', 'BA', 'PE', 'CE', 'SC', 'GO')
+
+
+def endereco_sintetico(cep):
+    """Endereço no formato do ViaCEP; a UF e a cidade saem dos primeiros dígitos do CEP."""
+    if cep.startswith("000"):
+        return {'erro': True}
+    return {
+        'cep': f"{cep[:5]}-{cep[5:]}",
+        'logradouro': f"Rua {int(cep[5:])}",
+        'complemento': "",
+        'bairro': "Centro",
+        'localidade': f"Cidade {cep[:3]}",
+        'uf': UFS[int(cep[0])],
+        'ibge': cep[:7],
+        'ddd': "11",
+    }
+
+
+class _ManipuladorViaCEP(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em dois envios: com o Nagle, o corpo esperaria o ACK atrasado do cliente
+    # (~40 ms) nas conexões mantidas abertas
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder_json(self, status, corpo):
+        dados = json.dumps(corpo).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        servidor = self.server
+        if self.path == "/estatisticas":
+            with servidor.trava:
+                self._responder_json(200, {'consultas': servidor.consultas})
+            return
+        rota = ROTA_CEP.match(self.path)
+        if not rota:
+            # O ViaCEP responde 400 aos CEPs mal formados
+            self._responder_json(400, {'erro': "formato inválido"})
+            return
+        if servidor.latencia_s:
+            time.sleep(servidor.latencia_s)
+        with servidor.trava:
+            servidor.consultas += 1
+        self._responder_json(200, endereco_sintetico(rota.group(1)))
+
+
+class ViaCEPLocal(ThreadingHTTPServer):
+    """Servidor do substituto; porta 0 = porta livre escolhida pelo sistema. iniciar() o serve numa thread."""
+
+    daemon_threads = True
+    handle_error = ignorar_desconexao(ThreadingHTTPServer)
+
+    def __init__(self, host="127.0.0.1", porta=0, latencia_s=0.0):
+        super().__init__((host, porta), _ManipuladorViaCEP)
+        self.latencia_s = latencia_s
+        self.consultas = 0
+        self.trava = threading.Lock()
+
+    @property
+    def url(self):
+        """Valor para CONECTACARE_VIACEP_URL."""
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/ws"
+
+    def iniciar(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def encerrar(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.encerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substituto local do ViaCEP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8030)
+    parser.add_argument("--latencia-ms", type=float, default=0.0, dest="latencia_ms",
+                        help="Atraso de cada resposta, simulando o serviço público.")
+    args = parser.parse_args()
+
+    servidor = ViaCEPLocal(args.host, args.porta, args.latencia_ms / 1000)
+    print(f"ViaCEP local em {servidor.url} (CONECTACARE_VIACEP_URL). Ctrl+C para encerrar.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()